@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark des encodages d'envoi à Whisper
+ffmpeg/libmp3lame 128 kbps (sous-processus) contre FLAC et Opus en processus
+
+Usage:
+    python3 benchmarks/bench_encoder.py
+    python3 benchmarks/bench_encoder.py --wav ma_voix.wav --runs 5
+"""
+
+import os
+import sys
+import wave
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from typing import Dict, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from mocks import make_speech_fixture
+from audio_encoder import CODECS, StreamingEncoder, encoder_available
+
+
+def _cpu_seconds() -> float:
+    """Temps CPU du processus et de ses sous-processus terminés"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+def encode_ffmpeg(wav_file: str, output_file: str) -> bool:
+    """Chemin actuel : conversion WAV -> MP3 128 kbps après la capture"""
+    command = ['ffmpeg', '-loglevel', 'error', '-i', wav_file,
+               '-acodec', 'libmp3lame', '-ab', '128k', '-y', output_file]
+    return subprocess.run(command, capture_output=True).returncode == 0
+
+
+def encode_streaming(wav_file: str, output_file: str, codec: str, chunk_size: int,
+                     compression_level: float) -> bool:
+    """Encodage en processus alimenté bloc par bloc comme pendant la capture"""
+    with wave.open(wav_file, 'rb') as wf:
+        encoder = StreamingEncoder(output_file, codec, wf.getframerate(),
+                                   wf.getnchannels(), compression_level).start()
+        while True:
+            chunk = wf.readframes(chunk_size)
+            if not chunk:
+                break
+            encoder.feed(chunk)
+    return encoder.finish() is not None
+
+
+def measure(name: str, encode, output_file: str, speech_seconds: float,
+            runs: int) -> Optional[Dict[str, float]]:
+    """
+    Mesure un encodage sur plusieurs exécutions
+
+    Returns:
+        Octets et ms CPU par seconde de parole, ou None si indisponible
+    """
+    cpu_start = _cpu_seconds()
+    for _ in range(runs):
+        if not encode(output_file):
+            return None
+    cpu = (_cpu_seconds() - cpu_start) / runs
+
+    return {
+        'bytes_per_second': round(os.path.getsize(output_file) / speech_seconds),
+        'cpu_ms_per_second': round(cpu * 1000 / speech_seconds, 1),
+    }
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmark des encodages d'envoi")
+    parser.add_argument('--wav', help="WAV de voix (sinon fixture synthétique)")
+    parser.add_argument('--seconds', type=float, default=10.0, help="Durée de la fixture")
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--compression-level', type=float, default=0.5)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='rpi-assistant-encoder-')
+    wav_file = args.wav or make_speech_fixture(os.path.join(work_dir, 'speech.wav'),
+                                               seconds=args.seconds, sample_rate=args.sample_rate)
+    with wave.open(wav_file, 'rb') as wf:
+        rate = wf.getframerate()
+        speech_seconds = wf.getnframes() / rate
+
+    candidates = {}
+    if shutil.which('ffmpeg'):
+        candidates['ffmpeg mp3 128k'] = (
+            os.path.join(work_dir, 'out.mp3'), lambda out: encode_ffmpeg(wav_file, out))
+    for codec in CODECS:
+        if encoder_available(codec, rate):
+            candidates[f'{codec} (en processus)'] = (
+                os.path.join(work_dir, 'out' + CODECS[codec][2]),
+                lambda out, codec=codec: encode_streaming(wav_file, out, codec, args.chunk_size,
+                                                          args.compression_level))
+
+    print(f"\n=== Encodage de {speech_seconds:.1f} s de parole à {rate} Hz ({args.runs} exécutions) ===")
+    print(f"{'Encodage':<24} {'octets/s':>10} {'CPU ms/s':>10}")
+    print(f"{'WAV brut':<24} {os.path.getsize(wav_file) / speech_seconds:>10.0f} {'-':>10}")
+
+    for name, (output_file, encode) in candidates.items():
+        result = measure(name, encode, output_file, speech_seconds, args.runs)
+        if result is None:
+            print(f"{name:<24} {'échec':>10}")
+        else:
+            print(f"{name:<24} {result['bytes_per_second']:>10} {result['cpu_ms_per_second']:>10}")
+
+    missing = []
+    if not shutil.which('ffmpeg'):
+        missing.append('ffmpeg')
+    missing.extend(f"{codec} (soundfile)" for codec in CODECS if not encoder_available(codec, rate))
+    if missing:
+        print(f"\nNon mesuré (absent): {', '.join(missing)}")
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
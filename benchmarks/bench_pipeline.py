@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark reproductible du pipeline vocal (VoiceAssistant.handle_voice_command)
+Micro simulé alimenté par un WAV, serveur OpenAI local, bluetoothctl/paplay factices
+
+Usage:
+    python3 benchmarks/bench_pipeline.py                      # compare à baseline.json
+    python3 benchmarks/bench_pipeline.py --save-baseline      # enregistre la référence
+    python3 benchmarks/bench_pipeline.py --allow-missing-baseline --baseline autre.json
+    python3 benchmarks/bench_pipeline.py --wav ma_voix.wav --commands 50
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from mocks import (MockOpenAIServer, install_fake_audio_modules, install_stub_commands,
+                   make_speech_fixture, write_config_files)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def build_assistant(work_dir: str, server: MockOpenAIServer, args):
+    """
+    Construit un VoiceAssistant sur la configuration de benchmark
+
+    Args:
+        work_dir: Répertoire de travail temporaire
+        server: Serveur OpenAI simulé démarré
+        args: Arguments de la ligne de commande
+
+    Returns:
+        Instance de VoiceAssistant prête (enceinte déjà découverte)
+    """
+    config_dir = os.path.join(work_dir, 'boot')
+    write_config_files(config_dir, {
+        'gpt': {
+            'enabled': 'true',
+            'recording_duration': str(args.duration),
+            'sample_rate': str(args.sample_rate),
+            'trace_file': os.path.join(work_dir, 'traces.jsonl'),
+            'metrics_enabled': 'false',
+        },
+        'openai': {
+            'api_key': 'sk-bench-0000000000000000',
+            'api_base_url': server.base_url,
+            'max_retries': '0',
+        },
+        'bluetooth': {'speaker_name': 'Bench Speaker'},
+        'spotify': {},
+    })
+
+    from assistant import VoiceAssistant
+
+    class BenchAssistant(VoiceAssistant):
+        def setup_logging(self) -> None:
+            # Le benchmark configure son propre logging (pas de fichier dans /opt)
+            pass
+
+    assistant = BenchAssistant(config_dir)
+    assistant.setup_openai()
+    # Régime permanent : l'enceinte a déjà été découverte au démarrage
+    assistant.bluetooth_manager.target_mac = 'AA:BB:CC:DD:EE:FF'
+    return assistant
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """
+    Exécute les commandes vocales et collecte les mesures
+
+    Args:
+        args: Arguments de la ligne de commande
+
+    Returns:
+        Résultats (latences par étape, CPU, RSS)
+    """
+    work_dir = tempfile.mkdtemp(prefix='rpi-assistant-bench-')
+    wav_file = args.wav or make_speech_fixture(os.path.join(work_dir, 'speech.wav'),
+                                               seconds=3.0, sample_rate=args.sample_rate)
+
+    install_fake_audio_modules(wav_file, realtime=args.realtime)
+    install_stub_commands(os.path.join(work_dir, 'bin'), args.playback_s, args.tts_s)
+
+    server = MockOpenAIServer(stt_latency_ms=args.stt_ms, ttft_ms=args.ttft_ms,
+                              token_delay_ms=args.token_ms).start()
+    try:
+        assistant = build_assistant(work_dir, server, args)
+        if not assistant.openai_client:
+            raise RuntimeError("Client OpenAI non initialisé (paquet openai installé ?)")
+
+        from tracing import tracer
+
+        # Commande de chauffe non mesurée (imports paresseux, caches)
+        assistant.handle_voice_command()
+        tracer._recent.clear()
+
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+        wall_start = time.monotonic()
+
+        for _ in range(args.commands):
+            assistant.handle_voice_command()
+
+        wall = time.monotonic() - wall_start
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    finally:
+        server.stop()
+
+    cpu_self = (usage.ru_utime + usage.ru_stime) - (usage_start.ru_utime + usage_start.ru_stime)
+    cpu_children = ((children.ru_utime + children.ru_stime) -
+                    (children_start.ru_utime + children_start.ru_stime))
+
+    return {
+        'commands': args.commands,
+        'stages': tracer.summary(),
+        'wall_ms_per_command': round(wall * 1000 / args.commands, 1),
+        'cpu_ms_per_command': round(cpu_self * 1000 / args.commands, 1),
+        'child_cpu_ms_per_command': round(cpu_children * 1000 / args.commands, 1),
+        'peak_rss_kb': usage.ru_maxrss,
+        'uploaded_bytes_per_command': server.uploaded_bytes // (args.commands + 1),
+    }
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Affiche le rapport du benchmark"""
+    print(f"\n=== Benchmark pipeline vocal ({results['commands']} commandes) ===")
+    print(f"{'Étape':<32} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, stats in sorted(results['stages'].items()):
+        print(f"{stage:<32} {stats['count']:>5} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9}")
+    print()
+    print(f"Temps réel par commande:     {results['wall_ms_per_command']} ms")
+    print(f"CPU par commande:            {results['cpu_ms_per_command']} ms "
+          f"(+ {results['child_cpu_ms_per_command']} ms sous-processus)")
+    print(f"RSS maximal:                 {results['peak_rss_kb']} Ko")
+    print(f"Octets envoyés par commande: {results['uploaded_bytes_per_command']}")
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float, slack_ms: float) -> List[str]:
+    """
+    Compare les résultats à la référence enregistrée
+
+    Args:
+        results: Résultats courants
+        baseline: Résultats de référence
+        tolerance: Dégradation relative tolérée (0.2 = 20 %)
+        slack_ms: Marge absolue pour les petites valeurs
+
+    Returns:
+        Liste des régressions détectées
+    """
+    regressions = []
+
+    def check(label: str, current: float, reference: float, slack: float) -> None:
+        limit = reference * (1 + tolerance) + slack
+        if current > limit:
+            regressions.append(f"{label}: {current} > {limit:.1f} (référence {reference})")
+
+    for stage, stats in baseline.get('stages', {}).items():
+        if stage in results['stages']:
+            check(f"{stage} p95", results['stages'][stage]['p95'], stats['p95'], slack_ms)
+
+    for key in ('wall_ms_per_command', 'cpu_ms_per_command', 'child_cpu_ms_per_command'):
+        if key in baseline:
+            check(key, results[key], baseline[key], slack_ms)
+
+    if 'peak_rss_kb' in baseline:
+        check('peak_rss_kb', results['peak_rss_kb'], baseline['peak_rss_kb'], 1024)
+
+    if 'uploaded_bytes_per_command' in baseline:
+        check('uploaded_bytes_per_command', results['uploaded_bytes_per_command'],
+              baseline['uploaded_bytes_per_command'], 0)
+
+    return regressions
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline vocal")
+    parser.add_argument('--commands', type=int, default=20, help="Nombre de commandes mesurées")
+    parser.add_argument('--wav', help="WAV de voix à rejouer (sinon fixture synthétique)")
+    parser.add_argument('--duration', type=int, default=3, help="Durée d'enregistrement (s)")
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--realtime', action='store_true', help="Capture cadencée en temps réel")
+    parser.add_argument('--stt-ms', type=float, default=300, help="Latence Whisper simulée")
+    parser.add_argument('--ttft-ms', type=float, default=400, help="Premier token GPT simulé")
+    parser.add_argument('--token-ms', type=float, default=20, help="Délai entre tokens simulé")
+    parser.add_argument('--tts-s', type=float, default=0.0, help="Durée espeak-ng simulée")
+    parser.add_argument('--playback-s', type=float, default=0.0, help="Durée paplay simulée")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Fichier de référence")
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistrer la référence")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="Ne pas échouer si la référence est absente")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Dégradation tolérée")
+    parser.add_argument('--slack-ms', type=float, default=5.0, help="Marge absolue (ms)")
+    parser.add_argument('--json', help="Écrire les résultats bruts dans ce fichier")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        results = run_benchmark(args)
+    except Exception as e:
+        print(f"✗ Benchmark impossible: {e}")
+        sys.exit(2)
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Référence enregistrée dans {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\n✗ Aucune référence ({args.baseline}), utilisez --save-baseline")
+        sys.exit(0 if args.allow_missing_baseline else 1)
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.slack_ms)
+    if regressions:
+        print("\n✗ RÉGRESSIONS DE PERFORMANCE:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+
+    print("\n✓ Aucune régression par rapport à la référence")
+
+
+if __name__ == "__main__":
+    main()
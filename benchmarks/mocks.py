@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Services simulés pour les benchmarks de l'assistant vocal
+Micro PyAudio alimenté par un WAV, serveur OpenAI local, commandes système factices
+
+Les modèles (micro, sortie audio, API OpenAI) viennent de src/simulation.py ;
+ce module garde les commandes système en shell, dont le coût fait partie des mesures.
+"""
+
+import os
+import sys
+import stat
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from simulation import (FakePulseServer, OpenAIStubServer, ScriptedMicrophone, VirtualClock,
+                        fake_audio_modules, synthetic_speech, write_config_files)
+
+# Nom historique des benchmarks
+MockOpenAIServer = OpenAIStubServer
+
+
+def make_speech_fixture(path: str, seconds: float = 3.0, sample_rate: int = 16000) -> str:
+    """
+    Génère un WAV déterministe imitant une voix (salves de tonalités modulées)
+
+    Args:
+        path: Fichier de sortie
+        seconds: Durée en secondes
+        sample_rate: Fréquence d'échantillonnage
+
+    Returns:
+        Chemin du fichier généré
+    """
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(synthetic_speech(seconds, sample_rate))
+    return path
+
+
+def install_fake_audio_modules(wav_file: str, realtime: bool = False) -> None:
+    """
+    Installe des modules pyaudio, pygame et gtts simulés dans sys.modules
+
+    À appeler avant d'importer audio_utils.
+
+    Args:
+        wav_file: WAV rejoué par le micro simulé
+        realtime: Cadencer la capture sur le temps réel
+    """
+    microphone = ScriptedMicrophone([('wav', wav_file)], VirtualClock(1.0 if realtime else 0.0))
+    # Écritures bloquantes comme PortAudio : la sortie avance toujours en temps réel
+    pulse = FakePulseServer(VirtualClock(1.0), spotify=False)
+    sys.modules.update(fake_audio_modules(microphone, pulse))
+
+
+# Commandes système factices (shell POSIX), cadencées par variables d'environnement
+STUB_COMMANDS = {
+    'bluetoothctl': """#!/bin/sh
+[ -t 0 ] || cat >/dev/null
+echo "Device AA:BB:CC:DD:EE:FF Bench Speaker"
+echo "Powered: yes"
+echo "Paired: yes"
+# Enceinte hors de portée tant que le fichier $BENCH_BT_DOWN_FILE existe
+if [ -n "$BENCH_BT_DOWN_FILE" ] && [ -e "$BENCH_BT_DOWN_FILE" ]; then
+    echo "Connected: no"
+    echo "Failed to connect: org.bluez.Error.Failed"
+else
+    echo "Connected: yes"
+    echo "Connection successful"
+fi
+""",
+    'paplay': """#!/bin/sh
+sleep "${BENCH_PLAYBACK_S:-0}"
+""",
+    'espeak-ng': """#!/bin/sh
+sleep "${BENCH_TTS_S:-0}"
+# -w <fichier> : écrire un WAV muet au lieu de jouer ; --stdout : WAV muet 22050 Hz sur la sortie
+while [ $# -gt 0 ]; do
+    if [ "$1" = "-w" ]; then printf 'RIFF$\\000\\000\\000WAVE' > "$2"; fi
+    if [ "$1" = "--stdout" ]; then
+        printf 'RIFF\\044\\020\\000\\000WAVEfmt \\020\\000\\000\\000\\001\\000\\001\\000\\042\\126\\000\\000\\104\\254\\000\\000\\002\\000\\020\\000data\\000\\020\\000\\000'
+        head -c 4096 /dev/zero
+    fi
+    shift
+done
+""",
+    'ffmpeg': """#!/bin/sh
+# Copie l'entrée (-i) vers le dernier argument
+while [ $# -gt 1 ]; do
+    if [ "$1" = "-i" ]; then input="$2"; fi
+    shift
+done
+# "-" : sortie standard (décodage PCM)
+if [ "$1" = "-" ]; then cat "$input"; else cp "$input" "$1"; fi
+""",
+    'pactl': """#!/bin/sh
+case "$*" in
+    get-default-sink) echo "bluez_sink.AA_BB_CC_DD_EE_FF.a2dp_sink" ;;
+    "-f json list sinks")
+        echo '[{"index":1,"name":"bluez_sink.AA_BB_CC_DD_EE_FF.a2dp_sink","description":"Bench Speaker","properties":{}}]' ;;
+    "-f json list sink-inputs") echo '[]' ;;
+    subscribe) exec cat >/dev/null ;;
+    *) printf '1\\tbluez_sink.AA_BB_CC_DD_EE_FF.a2dp_sink\\tmodule-bluez5-device.c\\ts16le 2ch 44100Hz\\tRUNNING\\n' ;;
+esac
+""",
+    'sudo': """#!/bin/sh
+exec "$@"
+""",
+    'systemctl': "#!/bin/sh\nexit 0\n",
+    'rfkill': "#!/bin/sh\nexit 0\n",
+}
+
+
+def install_stub_commands(bin_dir: str, playback_s: float = 0.0, tts_s: float = 0.0) -> None:
+    """
+    Écrit les commandes factices et les place en tête du PATH
+
+    Args:
+        bin_dir: Dossier des scripts
+        playback_s: Durée simulée de chaque lecture paplay
+        tts_s: Durée simulée de chaque synthèse espeak-ng
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, script in STUB_COMMANDS.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(script)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+    os.environ['BENCH_PLAYBACK_S'] = str(playback_s)
+    os.environ['BENCH_TTS_S'] = str(tts_s)
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Test d'endurance de l'assistant vocal (équivalent de plusieurs jours d'utilisation)
+Des milliers d'appuis simulés sur le bouton, avec annulations, déconnexions de
+l'enceinte et pannes réseau ; échoue si une ressource dérive à la hausse
+
+Usage:
+    python3 benchmarks/soak_test.py                           # 2000 commandes
+    python3 benchmarks/soak_test.py --commands 5000 --release-every 500
+    python3 benchmarks/soak_test.py --disconnect-every 0 --outage-every 0   # sans pannes
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from mocks import (MockOpenAIServer, install_fake_audio_modules, install_stub_commands,
+                   make_speech_fixture, write_config_files)
+
+
+# Séries échantillonnées et unité de leur dérive (pour 1000 commandes)
+SERIES = {
+    'rss_kb': 'Ko',
+    'fds': 'descripteurs',
+    'threads': 'threads',
+    'temp_kb': 'Ko',
+    'p95_ms': 'ms',
+}
+
+
+def slope(points: List[List[float]]) -> float:
+    """Pente de la régression linéaire (moindres carrés) de points (x, y)"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def open_fds() -> int:
+    """Descripteurs de fichiers ouverts par le processus"""
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return 0
+
+
+def dir_size(path: str) -> int:
+    """Taille totale des fichiers d'un dossier (octets)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class Faults:
+    def __init__(self, args, server: MockOpenAIServer, bt_down_file: str):
+        """
+        Calendrier des pannes injectées (en nombre de commandes)
+
+        Args:
+            args: Arguments de la ligne de commande
+            server: Serveur OpenAI simulé (panne réseau)
+            bt_down_file: Fichier dont la présence déconnecte l'enceinte simulée
+        """
+        self.args = args
+        self.server = server
+        self.bt_down_file = bt_down_file
+        self.speaker_down_until = 0
+        self.network_down_until = 0
+
+    @staticmethod
+    def _due(index: int, every: int) -> bool:
+        return every > 0 and index % every == 0
+
+    def before(self, index: int, assistant) -> List[str]:
+        """
+        Déclenche ou lève les pannes avant la commande index
+
+        Returns:
+            Pannes actives pendant la commande
+        """
+        connection = assistant.bluetooth_manager.connection
+        if self._due(index, self.args.disconnect_every):
+            open(self.bt_down_file, 'w').close()
+            self.speaker_down_until = index + self.args.fault_commands
+            # La machine d'états vérifie la connexion sans attendre check_interval
+            connection._wake.set()
+        elif index == self.speaker_down_until and os.path.exists(self.bt_down_file):
+            os.remove(self.bt_down_file)
+
+        if self._due(index, self.args.outage_every):
+            self.server.outage = True
+            self.network_down_until = index + self.args.fault_commands
+        elif index == self.network_down_until and self.server.outage:
+            self.server.outage = False
+            # Retour du réseau constaté par la sonde de fond
+            assistant.network_estimator.probe()
+
+        active = []
+        if os.path.exists(self.bt_down_file):
+            active.append('speaker')
+        if self.server.outage:
+            active.append('network')
+        return active
+
+
+def build_soak_assistant(work_dir: str, server: MockOpenAIServer, args):
+    """
+    Construit un VoiceAssistant piloté par son bouton simulé
+
+    Args:
+        work_dir: Répertoire de travail temporaire
+        server: Serveur OpenAI simulé démarré
+        args: Arguments de la ligne de commande
+
+    Returns:
+        Instance de VoiceAssistant (bouton et connexion Bluetooth démarrés)
+    """
+    config_dir = os.path.join(work_dir, 'boot')
+    write_config_files(config_dir, {
+        'gpt': {
+            'enabled': 'true',
+            'recording_duration': str(args.duration),
+            'sample_rate': str(args.sample_rate),
+            'trace_file': os.path.join(work_dir, 'traces.jsonl'),
+            'metrics_enabled': 'false',
+            'spool_dir': os.path.join(work_dir, 'spool'),
+            # Fenêtre courte : l'appui simple est confirmé rapidement
+            'button_double_press_ms': '150',
+        },
+        'openai': {
+            'api_key': 'sk-bench-0000000000000000',
+            'api_base_url': server.base_url,
+            'max_retries': '0',
+        },
+        'bluetooth': {
+            'speaker_name': 'Bench Speaker',
+            'check_interval': '1',
+            'backoff_max': '5',
+        },
+        'spotify': {},
+    })
+
+    from assistant import VoiceAssistant
+    from gpio_input import SimulatedBackend
+
+    class SoakAssistant(VoiceAssistant):
+        def setup_logging(self) -> None:
+            # Le test configure son propre logging (pas de fichier dans /opt)
+            pass
+
+    assistant = SoakAssistant(config_dir)
+    if not assistant.gpio_input.simulated:
+        # Sur un Raspberry Pi : le bouton physique est remplacé par le bouton simulé
+        assistant.gpio_input.stop()
+        assistant.gpio_input.backend = SimulatedBackend(assistant.config_manager.get_gpio_pin())
+        assistant.gpio_input.start()
+    assistant.setup_openai()
+    assistant.bluetooth_manager.target_mac = 'AA:BB:CC:DD:EE:FF'
+    assistant.bluetooth_manager.start_connection()
+    return assistant
+
+
+def run_soak(args) -> Dict[str, Any]:
+    """
+    Enchaîne les appuis, injecte les pannes et échantillonne les ressources
+
+    Args:
+        args: Arguments de la ligne de commande
+
+    Returns:
+        Échantillons, issues des commandes et dérive de chaque série
+    """
+    work_dir = tempfile.mkdtemp(prefix='rpi-assistant-soak-')
+    wav_file = make_speech_fixture(os.path.join(work_dir, 'speech.wav'),
+                                   seconds=args.duration, sample_rate=args.sample_rate)
+    install_fake_audio_modules(wav_file)
+    install_stub_commands(os.path.join(work_dir, 'bin'))
+    bt_down_file = os.path.join(work_dir, 'speaker-down')
+    os.environ['BENCH_BT_DOWN_FILE'] = bt_down_file
+
+    server = MockOpenAIServer(stt_latency_ms=0, ttft_ms=0, token_delay_ms=0).start()
+    assistant = None
+    try:
+        assistant = build_soak_assistant(work_dir, server, args)
+        if not assistant.openai_client:
+            raise RuntimeError("Client OpenAI non initialisé (paquet openai installé ?)")
+
+        from tracing import tracer, percentile
+        from memory_governor import memory_governor, read_rss, PRESSURE
+
+        finished: queue.SimpleQueue = queue.SimpleQueue()
+        tracer.add_listener(lambda record: record['trace'] == 'voice_command' and finished.put(record))
+
+        button = assistant.gpio_input.backend
+        faults = Faults(args, server, bt_down_file)
+        statuses: Counter = Counter()
+        faulted: Counter = Counter()
+        window: List[float] = []
+        samples: List[Dict[str, Any]] = []
+        missed = 0
+        started = time.monotonic()
+        total = args.warmup_commands + args.commands
+
+        for index in range(1, total + 1):
+            # Numéro de la commande mesurée (négatif ou nul pendant la chauffe)
+            measured = index - args.warmup_commands
+            active = faults.before(index, assistant)
+            cancel = args.cancel_every > 0 and index % args.cancel_every == 0
+
+            button.press(args.press_ms / 1000.0)
+            if cancel:
+                # Double appui pendant la commande : annulation
+                deadline = time.monotonic() + 1.0
+                while not assistant.button_pressed and time.monotonic() < deadline:
+                    time.sleep(0.005)
+                button.press(0.03)
+                time.sleep(0.05)
+                button.press(0.03)
+
+            try:
+                record = finished.get(timeout=args.command_timeout)
+            except queue.Empty:
+                missed += 1
+                record = None
+            # Le planificateur reste libre pour l'appui suivant
+            while assistant.button_pressed:
+                time.sleep(0.01)
+
+            if record is not None:
+                statuses[record['status']] += 1
+                if active:
+                    faulted[record['status']] += 1
+                elif record['status'] == 'ok':
+                    window.append(record['total_ms'])
+
+            if args.release_every and index % args.release_every == 0:
+                # Chemin de libération du gouverneur (PyAudio déchargé puis rechargé)
+                memory_governor.release(PRESSURE)
+
+            if measured == 0:
+                # Fin de la chauffe : premier échantillon sur des tampons déjà pleins
+                window = []
+            elif measured > 0 and measured % args.sample_every == 0:
+                samples.append({
+                    'command': measured,
+                    'elapsed_s': round(time.monotonic() - started, 1),
+                    'rss_kb': read_rss() // 1024,
+                    'fds': open_fds(),
+                    'threads': threading.active_count(),
+                    'temp_kb': dir_size(assistant.audio_manager.spool.directory) // 1024,
+                    'spool_bytes': assistant.audio_manager.spool.usage(),
+                    'subsystems': memory_governor.subsystems(),
+                    'p95_ms': round(percentile(window, 95), 1),
+                    'ok': len(window),
+                })
+                window = []
+        wall = time.monotonic() - started
+    finally:
+        if assistant is not None:
+            assistant.shutdown()
+        server.stop()
+
+    # Dérive sur la partie stable (après chauffe des imports et caches)
+    steady = samples[int(len(samples) * args.warmup):]
+    drift = {}
+    for name in SERIES:
+        # Fenêtre sans commande réussie : pas de p95 mesuré
+        points = [[s['command'], s[name]] for s in steady if s['ok'] or name != 'p95_ms']
+        drift[name] = round(slope(points) * 1000, 2)
+    return {
+        'commands': args.commands,
+        'warmup_commands': args.warmup_commands,
+        'wall_ms_per_command': round(wall * 1000 / total, 1),
+        'statuses': dict(statuses),
+        'faulted_statuses': dict(faulted),
+        'missed': missed,
+        'samples': samples,
+        'drift_per_1000': drift,
+        'final_spool_bytes': samples[-1]['spool_bytes'] if samples else 0,
+        'recovered': bool(samples and samples[-1]['ok']),
+    }
+
+
+def check(results: Dict[str, Any], args) -> List[str]:
+    """
+    Compare les dérives aux seuils
+
+    Returns:
+        Échecs constatés (vide si le test passe)
+    """
+    limits = {
+        'rss_kb': args.max_growth_kb,
+        'fds': args.max_fd_growth,
+        'threads': args.max_thread_growth,
+        'temp_kb': args.max_temp_growth_kb,
+        'p95_ms': args.max_latency_growth_ms,
+    }
+    failures = []
+    for name, limit in limits.items():
+        value = results['drift_per_1000'][name]
+        if value > limit:
+            failures.append(f"{name} en hausse: {value} {SERIES[name]} / 1000 commandes (limite {limit})")
+    if results['final_spool_bytes']:
+        failures.append(f"Spool non vidé: {results['final_spool_bytes']} octets")
+    if results['missed']:
+        failures.append(f"{results['missed']} commandes sans réponse (délai {args.command_timeout} s)")
+    if not results['recovered']:
+        failures.append("Aucune commande réussie dans la dernière fenêtre (pas de reprise après panne)")
+    return failures
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Test d'endurance de l'assistant vocal")
+    parser.add_argument('--commands', type=int, default=2000, help="Nombre d'appuis sur le bouton")
+    parser.add_argument('--sample-every', type=int, default=100, help="Échantillonnage (commandes)")
+    parser.add_argument('--warmup', type=float, default=0.2, help="Part initiale ignorée (0 à 1)")
+    parser.add_argument('--warmup-commands', type=int, default=200,
+                        help="Commandes de chauffe jouées avant le premier échantillon")
+    parser.add_argument('--duration', type=int, default=1, help="Durée d'enregistrement (s)")
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--press-ms', type=int, default=50, help="Durée de chaque appui")
+    parser.add_argument('--command-timeout', type=float, default=30.0,
+                        help="Attente maximale d'une commande (s)")
+    parser.add_argument('--cancel-every', type=int, default=25,
+                        help="Double appui d'annulation toutes les N commandes (0: jamais)")
+    parser.add_argument('--disconnect-every', type=int, default=200,
+                        help="Déconnexion de l'enceinte toutes les N commandes (0: jamais)")
+    parser.add_argument('--outage-every', type=int, default=150,
+                        help="Panne réseau toutes les N commandes (0: jamais)")
+    parser.add_argument('--fault-commands', type=int, default=3,
+                        help="Durée de chaque panne (commandes)")
+    parser.add_argument('--release-every', type=int, default=0,
+                        help="Simuler une pression mémoire toutes les N commandes")
+    parser.add_argument('--max-growth-kb', type=float, default=512.0,
+                        help="Croissance RSS tolérée pour 1000 commandes (Ko)")
+    parser.add_argument('--max-fd-growth', type=float, default=1.0,
+                        help="Croissance des descripteurs tolérée pour 1000 commandes")
+    parser.add_argument('--max-thread-growth', type=float, default=1.0,
+                        help="Croissance des threads tolérée pour 1000 commandes")
+    parser.add_argument('--max-temp-growth-kb', type=float, default=64.0,
+                        help="Croissance du dossier temporaire tolérée pour 1000 commandes (Ko)")
+    parser.add_argument('--max-latency-growth-ms', type=float, default=100.0,
+                        help="Croissance du p95 tolérée pour 1000 commandes (ms)")
+    parser.add_argument('--log-level', default='CRITICAL', help="Niveau des logs de l'assistant")
+    parser.add_argument('--json', help="Écrire les résultats bruts dans ce fichier")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.CRITICAL),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        results = run_soak(args)
+    except Exception as e:
+        print(f"✗ Test d'endurance impossible: {e}")
+        sys.exit(2)
+
+    print(f"\n=== Endurance ({results['commands']} commandes après {results['warmup_commands']} "
+          f"de chauffe, {results['wall_ms_per_command']} ms/commande) ===")
+    print(f"{'Commande':>9} {'Durée s':>8} {'RSS Ko':>8} {'FD':>4} {'Threads':>7} "
+          f"{'Temp Ko':>8} {'p95 ms':>8}")
+    for s in results['samples']:
+        print(f"{s['command']:>9} {s['elapsed_s']:>8} {s['rss_kb']:>8} {s['fds']:>4} "
+              f"{s['threads']:>7} {s['temp_kb']:>8} {s['p95_ms']:>8}")
+
+    print(f"\nIssues: {results['statuses']}")
+    print(f"Issues pendant une panne: {results['faulted_statuses']}")
+    print("Dérive pour 1000 commandes: " + ', '.join(
+        f"{name}={value} {SERIES[name]}" for name, value in results['drift_per_1000'].items()))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    failures = check(results, args)
+    if failures:
+        print("\n✗ DÉRIVE:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+    print("\n✓ Ressources stables")
+
+
+if __name__ == "__main__":
+    main()
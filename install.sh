@@ -66,6 +66,8 @@ apt install -y \
     libportaudio2 \
     libportaudiocpp0 \
     ffmpeg \
+    libsndfile1 \
+    python3-pulsectl \
     dnsmasq \
     hostapd \
     iptables-persistent \
@@ -76,6 +78,7 @@ apt install -y \
 log "Création des dossiers..."
 mkdir -p $PROJECT_DIR
 mkdir -p $PROJECT_DIR/logs
+mkdir -p $PROJECT_DIR/cache
 mkdir -p $PROJECT_DIR/temp
 chown -R $SERVICE_USER:$SERVICE_USER $PROJECT_DIR
 
@@ -270,6 +273,9 @@ server {
         proxy_pass http://127.0.0.1:8080/;
         proxy_set_header Host \$host;
         proxy_set_header X-Real-IP \$remote_addr;
+        # Progress stream (Server-Sent Events) of provisioning jobs
+        proxy_http_version 1.1;
+        proxy_read_timeout 300s;
     }
 }
 EOF
@@ -363,6 +369,16 @@ cat > /var/www/captive-portal/index.html << 'EOF'
             background: #f8d7da;
             color: #721c24;
         }
+        .steps {
+            padding-left: 1.2rem;
+            color: #555;
+        }
+        .steps .ok {
+            color: #155724;
+        }
+        .steps .error {
+            color: #721c24;
+        }
     </style>
 </head>
 <body>
@@ -392,23 +408,64 @@ cat > /var/www/captive-portal/index.html << 'EOF'
         </form>
         
         <div id="status" class="status" style="display: none;"></div>
+        <ul id="steps" class="steps"></ul>
     </div>
 
     <script>
+        const status = document.getElementById('status');
+        const steps = document.getElementById('steps');
+        
+        function showEvent(event) {
+            const item = document.createElement('li');
+            item.className = event.status;
+            item.textContent = event.message;
+            steps.appendChild(item);
+            if (event.step === 'done') {
+                status.className = event.status === 'ok' ? 'status success' : 'status error';
+                status.textContent = event.status === 'ok'
+                    ? 'Configuration réussie! Redémarrage en cours...'
+                    : event.message;
+            }
+        }
+        
+        // Progress via Server-Sent Events, polling when EventSource is unavailable
+        function followJob(job) {
+            if (window.EventSource) {
+                const source = new EventSource('/api/jobs/' + job + '/events');
+                source.onmessage = e => showEvent(JSON.parse(e.data));
+                source.addEventListener('end', () => source.close());
+                // The hotspot stops at the end of the job: no reconnection
+                source.onerror = () => source.close();
+                return;
+            }
+            let since = 0;
+            const poll = () => fetch('/api/jobs/' + job + '?since=' + since)
+                .then(response => response.json())
+                .then(data => {
+                    data.events.forEach(showEvent);
+                    since += data.events.length;
+                    if (data.state !== 'done' && data.state !== 'failed') {
+                        setTimeout(poll, 1000);
+                    }
+                })
+                .catch(() => {});
+            poll();
+        }
+        
         document.getElementById('wifiForm').addEventListener('submit', function(e) {
             e.preventDefault();
             
             const ssid = document.getElementById('ssid').value;
             const password = document.getElementById('password').value;
             const speaker_name = document.getElementById('speaker_name').value;
-            const status = document.getElementById('status');
             
             // Show loading
             status.style.display = 'block';
             status.className = 'status';
             status.textContent = 'Configuration en cours...';
+            steps.innerHTML = '';
             
-            // Send configuration to API
+            // Send configuration to API (accepted immediately, progress follows)
             fetch('/api/configure', {
                 method: 'POST',
                 headers: {
@@ -419,8 +476,7 @@ cat > /var/www/captive-portal/index.html << 'EOF'
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    status.className = 'status success';
-                    status.textContent = 'Configuration réussie! Redémarrage en cours...';
+                    followJob(data.job);
                 } else {
                     status.className = 'status error';
                     status.textContent = 'Erreur: ' + (data.error || 'Configuration échouée');
@@ -440,45 +496,97 @@ EOF
 cat > $PROJECT_DIR/captive_portal_api.py << 'EOF'
 #!/usr/bin/env python3
 import json
+import queue
 import subprocess
 import os
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import threading
 import time
+import uuid
+import sys
+
+sys.path.insert(0, '/opt/rpi-assistant/src')
+from audio_sinks import user_sink_manager
+from bluetooth_manager import BluetoothManager
+from config_manager import ConfigManager
+from spotify_service import SpotifyService
+
+# User owning the audio server (raspotify and the assistant run as pi)
+AUDIO_USER = 'pi'
+
+# SSE comment sent when no event arrived, keeps nginx and the browser connected
+KEEPALIVE_SECONDS = 15
+
+class ProvisioningJob:
+    """Wi-Fi and Bluetooth provisioning run in the background, with its progress events"""
+
+    def __init__(self, ssid, password, speaker_name):
+        self.id = uuid.uuid4().hex[:12]
+        self.ssid = ssid
+        self.password = password
+        self.speaker_name = speaker_name
+        self.state = 'queued'
+        self.events = []
+        self.condition = threading.Condition()
+
+    def emit(self, step, status, message):
+        """Record a progress event and wake up the clients streaming this job"""
+        print(f"[{self.id}] {step} {status}: {message}")
+        with self.condition:
+            self.events.append({'index': len(self.events), 'step': step, 'status': status,
+                                'message': message, 'time': round(time.time(), 3)})
+            self.condition.notify_all()
+
+    def finish(self, state):
+        with self.condition:
+            self.state = state
+            self.condition.notify_all()
+
+    @property
+    def finished(self):
+        return self.state in ('done', 'failed')
+
+    def wait_events(self, since, timeout):
+        """Events after index since, waiting up to timeout for new ones"""
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.events) > since or self.finished, timeout)
+            return self.events[since:]
+
+    def snapshot(self, since=0):
+        with self.condition:
+            return {'job': self.id, 'state': self.state, 'events': self.events[since:]}
+
+    def run(self):
+        self.finish('running')
+        try:
+            # Bluetooth provisioning runs while the Wi-Fi configuration is written
+            bluetooth = None
+            if self.speaker_name:
+                bluetooth = threading.Thread(target=self.configure_bluetooth)
+                bluetooth.start()
+
+            wifi_ok = self.configure_wifi()
+            if bluetooth is not None:
+                bluetooth.join()
+
+            if not wifi_ok:
+                self.finish('failed')
+                return
+
+            self.emit('done', 'ok', 'Configuration terminée, connexion au réseau WiFi...')
+            self.finish('done')
+        except Exception as e:
+            self.emit('done', 'error', f"Erreur: {e}")
+            self.finish('failed')
+            return
 
-class CaptivePortalHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        if self.path == '/configure':
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            
-            try:
-                data = json.loads(post_data.decode('utf-8'))
-                ssid = data.get('ssid', '').strip()
-                password = data.get('password', '').strip()
-                speaker_name = data.get('speaker_name', '').strip()
-                
-                if not ssid:
-                    self.send_json_response({'success': False, 'error': 'SSID requis'})
-                    return
-                
-                # Configure WiFi
-                success = self.configure_wifi(ssid, password, speaker_name)
-                
-                if success:
-                    self.send_json_response({'success': True})
-                    # Restart networking after a delay
-                    threading.Thread(target=self.restart_networking).start()
-                else:
-                    self.send_json_response({'success': False, 'error': 'Erreur de configuration'})
-                    
-            except json.JSONDecodeError:
-                self.send_json_response({'success': False, 'error': 'JSON invalide'})
-            except Exception as e:
-                self.send_json_response({'success': False, 'error': str(e)})
-    
-    def configure_wifi(self, ssid, password, speaker_name):
+        # The hotspot goes down with the networking restart: leave clients time to read 'done'
+        time.sleep(2)
+        self.restart_networking()
+
+    def configure_wifi(self):
+        self.emit('wifi', 'running', f"Configuration du réseau {self.ssid}")
         try:
             # Create wpa_supplicant configuration
             config = f"""
@@ -487,231 +595,149 @@ ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
 update_config=1
 
 network={{
-    ssid="{ssid}"
-    psk="{password}"
+    ssid="{self.ssid}"
+    psk="{self.password}"
     key_mgmt=WPA-PSK
 }}
 """
-            
+
             with open('/etc/wpa_supplicant/wpa_supplicant.conf', 'w') as f:
                 f.write(config)
-            
-            # Configure Bluetooth speaker if name is provided
-            if speaker_name:
-                self.configure_bluetooth(speaker_name)
-            
+
+            self.emit('wifi', 'ok', f"Réseau {self.ssid} enregistré")
             return True
         except Exception as e:
-            print(f"Error configuring WiFi: {e}")
+            self.emit('wifi', 'error', f"Erreur de configuration WiFi: {e}")
             return False
-    
-    def configure_bluetooth(self, speaker_name):
-        try:
-            # Ensure bluetooth is enabled and running
-            subprocess.run(['systemctl', 'start', 'bluetooth'], check=False)
-            subprocess.run(['systemctl', 'enable', 'bluetooth'], check=False)
-            time.sleep(2)
-            
-            print(f"Scanning for Bluetooth devices named: {speaker_name}")
-            
-            # Use bluetoothctl commands step by step
-            commands = [
-                'power on',
-                'agent on',
-                'default-agent',
-                'scan on'
-            ]
-            
-            for cmd in commands:
-                subprocess.run(['bluetoothctl'] + cmd.split(), check=False)
-                time.sleep(1)
-            
-            # Scan for longer to find devices
-            time.sleep(15)
-            
-            # Get list of discovered devices
-            result = subprocess.run(['bluetoothctl', 'devices'], capture_output=True, text=True)
-            devices_output = result.stdout
-            print(f"Found devices: {devices_output}")
-            
-            # Look for device with partial name match (case insensitive)
-            mac_address = None
-            for line in devices_output.split('\n'):
-                if speaker_name.lower() in line.lower():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        mac_address = parts[1]
-                        break
-            
-            if mac_address:
-                print(f"Found device {speaker_name} with MAC: {mac_address}")
-                
-                # Pair, trust and connect with retry logic
-                success = False
-                for attempt in range(3):  # Try 3 times
-                    print(f"Pairing attempt {attempt + 1}/3 for {speaker_name}")
-                    
-                    try:
-                        # Remove device if it exists
-                        subprocess.run(['bluetoothctl', 'remove', mac_address], 
-                                     capture_output=True, check=False)
-                        time.sleep(2)
-                        
-                        # Pair with extended timeout
-                        result = subprocess.run(['bluetoothctl', 'pair', mac_address], 
-                                              capture_output=True, text=True, timeout=45)
-                        print(f"Pair result: {result.stdout}")
-                        
-                        if "successful" in result.stdout.lower() or result.returncode == 0:
-                            # Trust the device
-                            subprocess.run(['bluetoothctl', 'trust', mac_address], 
-                                         capture_output=True, timeout=10)
-                            time.sleep(2)
-                            
-                            # Connect to device
-                            result = subprocess.run(['bluetoothctl', 'connect', mac_address], 
-                                                  capture_output=True, text=True, timeout=30)
-                            print(f"Connect result: {result.stdout}")
-                            
-                            if "successful" in result.stdout.lower() or result.returncode == 0:
-                                success = True
-                                # Configure audio routing
-                                self.configure_bluetooth_audio(mac_address)
-                                break
-                        
-                    except subprocess.TimeoutExpired:
-                        print(f"Timeout on attempt {attempt + 1}")
-                    except Exception as e:
-                        print(f"Error on attempt {attempt + 1}: {e}")
-                    
-                    if attempt < 2:  # Don't sleep after last attempt
-                        print("Waiting before retry...")
-                        time.sleep(5)
-                 
-                # Stop scanning
-                subprocess.run(['bluetoothctl', 'scan', 'off'], check=False)
-                
-                if success:
-                    print(f"Bluetooth device {speaker_name} configured successfully")
-                else:
-                    print(f"Failed to pair {speaker_name} after 3 attempts")
-            else:
-                print(f"Device {speaker_name} not found. Available devices:")
-                print(devices_output)
-                
-        except Exception as e:
-            print(f"Error configuring Bluetooth: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    def configure_bluetooth_audio(self, mac_address):
+
+    def configure_bluetooth(self):
         try:
-            # Wait for audio system to detect the Bluetooth device
-            time.sleep(5)
-            
-            # Convert MAC address to audio sink format (works with both PulseAudio and PipeWire)
-            pa_mac = mac_address.replace(':', '_')
-            
-            # Try both possible sink name formats
-            sink_names = [
-                f"bluez_output.{pa_mac}.1",  # PipeWire format
-                f"bluez_sink.{pa_mac}.a2dp_sink"  # PulseAudio format
-            ]
-            
-            print(f"Configuring audio routing for Bluetooth device {mac_address}")
-            
-            # Check which sink exists
-            result = subprocess.run(['pactl', 'list', 'sinks', 'short'], 
-                                  capture_output=True, text=True)
-            available_sinks = result.stdout
-            
-            active_sink = None
-            for sink_name in sink_names:
-                if sink_name in available_sinks:
-                    active_sink = sink_name
-                    break
-            
-            if active_sink:
-                print(f"Found audio sink: {active_sink}")
-                
-                # Set as default sink
-                subprocess.run(['pactl', 'set-default-sink', active_sink], 
-                             capture_output=True, check=False)
-                
+            # Shared provisioning engine (same scan, pairing and sink timings as the assistant)
+            engine = BluetoothManager(ConfigManager('/boot'), progress=self.emit)
+            result = engine.provision(self.speaker_name, sinks=user_sink_manager(AUDIO_USER))
+
+            if result and result['sink']:
                 # Update Raspotify configuration to use this device
-                self.update_raspotify_config(active_sink)
-                
-                print(f"Audio routing configured successfully")
-            else:
-                print(f"No audio sink found for {mac_address}")
-                print(f"Available sinks: {available_sinks}")
-            
+                self.update_raspotify_config(result['sink'])
         except Exception as e:
-            print(f"Error configuring audio routing: {e}")
+            self.emit('error', 'error', f"Erreur Bluetooth: {e}")
             import traceback
             traceback.print_exc()
-    
+
     def update_raspotify_config(self, sink_name):
         try:
-            # Set the Bluetooth device as default for pi user
-            subprocess.run(['sudo', '-u', 'pi', 'pactl', 'set-default-sink', sink_name], 
-                         capture_output=True, check=False)
-            
-            # Don't specify device in Raspotify - let it use system default
-            # This avoids permission issues
-            config_content = '''# Raspotify configuration
-DEVICE_NAME="Mon Assistant Pi"
-BITRATE="320"
-CACHE_SIZE="1G"
-DEVICE_TYPE="speaker"
-INITIAL_VOLUME="50"
-VOLUME_NORMALISATION="true"
-NORMALISATION_PREGAIN="0"
-AUTOPLAY="true"
-# Device not specified - uses system default
-'''
-            
-            # Write config file
-            with open('/etc/default/raspotify', 'w') as f:
-                f.write(config_content)
-            
-            # Restart raspotify
-            subprocess.run(['systemctl', 'restart', 'raspotify'], check=False)
-            
+            # The engine already made the Bluetooth device the default sink. Render /etc/raspotify/conf from config-spotify.txt (device not specified,
+            # raspotify uses the default sink); restarts raspotify only if it changed
+            SpotifyService(ConfigManager('/boot')).apply()
+
             print(f"Updated Raspotify configuration to use default sink {sink_name}")
-            
+
         except Exception as e:
             print(f"Error updating Raspotify config: {e}")
-    
+
     def restart_networking(self):
-        time.sleep(2)
         try:
             # Stop hotspot
             subprocess.run(['systemctl', 'stop', 'rpi-hotspot'], check=False)
             subprocess.run(['systemctl', 'stop', 'hostapd'], check=False)
             subprocess.run(['systemctl', 'stop', 'dnsmasq'], check=False)
-            
+
             # Reset interface to managed mode
             subprocess.run(['ip', 'link', 'set', 'wlan0', 'down'], check=False)
             subprocess.run(['iw', 'dev', 'wlan0', 'set', 'type', 'managed'], check=False)
             subprocess.run(['ip', 'link', 'set', 'wlan0', 'up'], check=False)
-            
+
             # Start wpa_supplicant
             subprocess.run(['systemctl', 'restart', 'wpa_supplicant'], check=False)
-            
+
             print("Network configuration applied")
         except Exception as e:
             print(f"Error restarting networking: {e}")
-    
-    def send_json_response(self, data):
+
+# Jobs by id, run one at a time by the provisioning worker (bluetoothctl and wlan0 are shared)
+JOBS = {}
+JOB_QUEUE = queue.Queue()
+
+def provisioning_worker():
+    while True:
+        job = JOB_QUEUE.get()
+        job.run()
+
+class CaptivePortalHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path == '/configure':
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+
+            try:
+                data = json.loads(post_data.decode('utf-8'))
+                ssid = data.get('ssid', '').strip()
+                password = data.get('password', '').strip()
+                speaker_name = data.get('speaker_name', '').strip()
+
+                if not ssid:
+                    self.send_json_response({'success': False, 'error': 'SSID requis'})
+                    return
+
+                # Accept immediately, provisioning continues in the background
+                job = ProvisioningJob(ssid, password, speaker_name)
+                JOBS[job.id] = job
+                JOB_QUEUE.put(job)
+                self.send_json_response({'success': True, 'job': job.id}, status=202)
+
+            except json.JSONDecodeError:
+                self.send_json_response({'success': False, 'error': 'JSON invalide'})
+            except Exception as e:
+                self.send_json_response({'success': False, 'error': str(e)})
+
+    def do_GET(self):
+        # /jobs/<id> : progress snapshot (polling), /jobs/<id>/events : Server-Sent Events
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'jobs' or parts[1] not in JOBS:
+            self.send_json_response({'success': False, 'error': 'Tâche inconnue'}, status=404)
+            return
+
+        job = JOBS[parts[1]]
+        since = int(parse_qs(url.query).get('since', ['0'])[0])
+        if len(parts) == 3 and parts[2] == 'events':
+            self.stream_events(job, int(self.headers.get('Last-Event-ID', since - 1)) + 1)
+        else:
+            self.send_json_response(job.snapshot(since))
+
+    def stream_events(self, job, since):
         self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        # Disable nginx buffering for this response
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        try:
+            while True:
+                events = job.wait_events(since, KEEPALIVE_SECONDS)
+                if not events:
+                    if job.finished:
+                        break
+                    self.wfile.write(b': keepalive\n\n')
+                for event in events:
+                    self.wfile.write(f"id: {event['index']}\ndata: {json.dumps(event)}\n\n".encode('utf-8'))
+                    since = event['index'] + 1
+                self.wfile.flush()
+            self.wfile.write(f"event: end\ndata: {json.dumps({'state': job.state})}\n\n".encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_json_response(self, data, status=200):
+        self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
         self.wfile.write(json.dumps(data).encode('utf-8'))
 
 if __name__ == '__main__':
-    server = HTTPServer(('127.0.0.1', 8080), CaptivePortalHandler)
+    threading.Thread(target=provisioning_worker, daemon=True).start()
+    server = ThreadingHTTPServer(('127.0.0.1', 8080), CaptivePortalHandler)
+    server.daemon_threads = True
     print("Captive portal API server started on port 8080")
     server.serve_forever()
 EOF
@@ -741,16 +767,35 @@ log "Installation de Raspotify..."
 curl -sL https://dtcooper.github.io/raspotify/install.sh | sh
 
 # Configuration de Raspotify
-cat > /etc/default/raspotify << EOF
-# Raspotify configuration
-DEVICE_NAME="Mon Assistant Pi"
-BITRATE="320"
-CACHE_SIZE="1G"
-DEVICE_TYPE="speaker"
-INITIAL_VOLUME="50"
-VOLUME_NORMALISATION="true"
-NORMALISATION_PREGAIN="0"
-AUTOPLAY="true"
+# /etc/raspotify/conf est généré depuis $BOOT_DIR/config-spotify.txt par rpi-assistant-spotify.service,
+# au démarrage et à chaque modification du fichier (rpi-assistant-spotify.path)
+cat > /etc/systemd/system/rpi-assistant-spotify.service << EOF
+[Unit]
+Description=Configuration de Raspotify depuis config-spotify.txt
+Before=raspotify.service
+
+[Service]
+Type=oneshot
+Environment=PYTHONPATH=$PROJECT_DIR/src
+ExecStart=$PROJECT_DIR/venv/bin/python $PROJECT_DIR/src/spotify_service.py apply --config-dir $BOOT_DIR
+StandardOutput=journal
+StandardError=journal
+SyslogIdentifier=rpi-assistant-spotify
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+cat > /etc/systemd/system/rpi-assistant-spotify.path << EOF
+[Unit]
+Description=Surveillance de config-spotify.txt
+
+[Path]
+PathChanged=$BOOT_DIR/config-spotify.txt
+Unit=rpi-assistant-spotify.service
+
+[Install]
+WantedBy=multi-user.target
 EOF
 
 # Configuration du service Raspotify pour qu'il fonctionne avec l'audio utilisateur
@@ -807,6 +852,9 @@ pip install \
     configparser \
     RPi.GPIO \
     pydub \
+    soundfile \
+    pulsectl \
+    jeepney \
     gTTS \
     pygame
 
@@ -828,8 +876,8 @@ Type=simple
 User=$SERVICE_USER
 WorkingDirectory=$PROJECT_DIR
 Environment=PATH=$PROJECT_DIR/venv/bin
-ExecStartPre=/bin/sleep 10
 ExecStart=$PROJECT_DIR/venv/bin/python $PROJECT_DIR/src/assistant.py
+ExecReload=/bin/kill -HUP \$MAINPID
 Restart=always
 RestartSec=10
 StandardOutput=journal
@@ -843,7 +891,7 @@ EOF
 mkdir -p $PROJECT_DIR/scripts
 cat > $PROJECT_DIR/scripts/setup_bluetooth.sh << 'EOF'
 #!/bin/bash
-# Script de configuration Bluetooth
+# Script de configuration Bluetooth (moteur d'appairage de l'assistant)
 
 SPEAKER_NAME="$1"
 if [ -z "$SPEAKER_NAME" ]; then
@@ -851,29 +899,7 @@ if [ -z "$SPEAKER_NAME" ]; then
     exit 1
 fi
 
-# Rechercher et appairer l'enceinte
-bluetoothctl << EOL
-agent on
-default-agent
-scan on
-EOL
-
-# Attendre un peu pour la découverte
-sleep 10
-
-# Essayer de se connecter
-MAC_ADDRESS=$(bluetoothctl devices | grep "$SPEAKER_NAME" | awk '{print $2}')
-if [ -n "$MAC_ADDRESS" ]; then
-    bluetoothctl << EOL
-pair $MAC_ADDRESS
-trust $MAC_ADDRESS
-connect $MAC_ADDRESS
-EOL
-    echo "Enceinte $SPEAKER_NAME connectée avec succès"
-else
-    echo "Enceinte $SPEAKER_NAME non trouvée"
-    exit 1
-fi
+exec /opt/rpi-assistant/venv/bin/python /opt/rpi-assistant/src/bluetooth_manager.py provision "$SPEAKER_NAME"
 EOF
 
 chmod +x $PROJECT_DIR/scripts/setup_bluetooth.sh
@@ -891,6 +917,8 @@ systemctl unmask hostapd
 
 systemctl enable rpi-assistant
 systemctl enable raspotify
+systemctl enable rpi-assistant-spotify.service
+systemctl enable rpi-assistant-spotify.path
 systemctl enable hostapd
 systemctl enable dnsmasq
 systemctl enable unblock-rfkill
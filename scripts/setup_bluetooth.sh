@@ -41,110 +41,30 @@ if ! command -v bluetoothctl &> /dev/null; then
     exit 1
 fi
 
-# Fonction pour exécuter des commandes bluetoothctl
-run_bluetoothctl() {
-    local commands="$1"
-    echo -e "$commands" | bluetoothctl
-}
-
-# Démarrer le service Bluetooth
-log "Démarrage du service Bluetooth..."
-sudo systemctl start bluetooth
-sudo rfkill unblock bluetooth
-sleep 2
-
-# Initialiser Bluetooth
-log "Initialisation de Bluetooth..."
-run_bluetoothctl "power on\nagent on\ndefault-agent"
-sleep 2
-
-# Scanner les appareils
-log "Scan des appareils Bluetooth (20 secondes)..."
-run_bluetoothctl "scan on"
-sleep 20
-run_bluetoothctl "scan off"
-
-# Rechercher l'enceinte
-log "Recherche de l'enceinte: $SPEAKER_NAME"
-DEVICES=$(echo "devices" | bluetoothctl | grep "Device")
-MAC_ADDRESS=""
-
-# Chercher l'adresse MAC de l'enceinte
-while IFS= read -r line; do
-    if [[ "$line" == *"$SPEAKER_NAME"* ]]; then
-        MAC_ADDRESS=$(echo "$line" | awk '{print $2}')
-        break
-    fi
-done <<< "$DEVICES"
-
-if [ -z "$MAC_ADDRESS" ]; then
-    error "Enceinte '$SPEAKER_NAME' non trouvée"
+# Moteur d'appairage de l'assistant (mêmes délais et tentatives que le portail et le service)
+SRC_DIR="$(cd "$(dirname "$0")/../src" && pwd)"
+PYTHON="$(dirname "$SRC_DIR")/venv/bin/python"
+[ -x "$PYTHON" ] || PYTHON=python3
+
+# Recherche, appairage, connexion et sortie audio ; le résultat termine la sortie (mac=, name=, sink=)
+RESULT_FILE=$(mktemp)
+trap 'rm -f "$RESULT_FILE"' EXIT
+
+log "Appairage de l'enceinte: $SPEAKER_NAME"
+set -o pipefail
+if ! "$PYTHON" "$SRC_DIR/bluetooth_manager.py" provision "$SPEAKER_NAME" | tee "$RESULT_FILE"; then
+    error "Échec de la configuration de l'enceinte '$SPEAKER_NAME'"
     error "Appareils disponibles:"
-    echo "$DEVICES"
-    exit 1
-fi
-
-log "Enceinte trouvée: $MAC_ADDRESS"
-
-# Supprimer l'appareil s'il existe déjà
-log "Suppression de l'ancien appairage..."
-run_bluetoothctl "remove $MAC_ADDRESS" || true
-sleep 2
-
-# Appairer l'enceinte
-log "Appairage de l'enceinte..."
-PAIR_RESULT=$(run_bluetoothctl "pair $MAC_ADDRESS")
-
-if [[ "$PAIR_RESULT" == *"successful"* ]] || [[ "$PAIR_RESULT" == *"already paired"* ]]; then
-    log "Appairage réussi"
-else
-    error "Échec de l'appairage: $PAIR_RESULT"
+    "$PYTHON" "$SRC_DIR/bluetooth_manager.py" scan --duration 5 || true
     exit 1
 fi
 
-# Faire confiance à l'enceinte
-log "Configuration de la confiance..."
-run_bluetoothctl "trust $MAC_ADDRESS"
-
-# Connecter l'enceinte
-log "Connexion à l'enceinte..."
-CONNECT_RESULT=$(run_bluetoothctl "connect $MAC_ADDRESS")
-
-if [[ "$CONNECT_RESULT" == *"successful"* ]] || [[ "$CONNECT_RESULT" == *"already connected"* ]]; then
-    log "Connexion réussie"
-else
-    warn "Connexion échouée, mais l'appairage est configuré"
-fi
-
-# Vérifier la connexion
-sleep 3
-INFO_RESULT=$(run_bluetoothctl "info $MAC_ADDRESS")
-
-if [[ "$INFO_RESULT" == *"Connected: yes"* ]]; then
-    log "✓ Enceinte connectée avec succès"
-else
-    warn "Enceinte appairée mais non connectée"
-fi
-
-# Configuration PulseAudio
-log "Configuration PulseAudio..."
-sleep 3
-
-# Attendre que PulseAudio détecte l'enceinte
-SINK_NAME=""
-for i in {1..10}; do
-    SINKS=$(pactl list sinks short 2>/dev/null || echo "")
-    if [[ "$SINKS" == *"bluez"* ]]; then
-        SINK_NAME=$(echo "$SINKS" | grep bluez | head -1 | awk '{print $2}')
-        break
-    fi
-    sleep 2
-done
+MAC_ADDRESS=$(sed -n 's/^mac=//p' "$RESULT_FILE")
+SINK_NAME=$(sed -n 's/^sink=//p' "$RESULT_FILE")
 
+log "✓ Enceinte connectée: $MAC_ADDRESS"
 if [ -n "$SINK_NAME" ]; then
-    log "Configuration du sink audio: $SINK_NAME"
-    pactl set-default-sink "$SINK_NAME"
-    log "✓ Sink audio configuré"
+    log "✓ Sink audio configuré: $SINK_NAME"
 else
     warn "Sink Bluetooth non détecté par PulseAudio"
 fi
@@ -159,7 +79,7 @@ fi
 # Afficher les informations finales
 log "Configuration terminée!"
 log "Informations de l'enceinte:"
-run_bluetoothctl "info $MAC_ADDRESS" | grep -E "(Name|Paired|Connected|Trusted)"
+bluetoothctl info "$MAC_ADDRESS" | grep -E "(Name|Paired|Connected|Trusted)"
 
 # Sauvegarder les informations dans un fichier
 cat > /tmp/bluetooth_config.txt << EOF
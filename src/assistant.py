@@ -10,22 +10,29 @@ import time
 import logging
 import signal
 import threading
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
 
-# Imports pour Raspberry Pi
-try:
-    import RPi.GPIO as GPIO
-except ImportError:
-    print("RPi.GPIO non disponible, mode simulation activé")
-    GPIO = None
-
-import openai
-from openai import OpenAI
+# openai est importé dans setup_openai, en parallèle de l'initialisation Bluetooth
 
 # Imports locaux
 from config_manager import ConfigManager
 from bluetooth_manager import BluetoothManager
+from audio_sinks import sink_manager
+from media_control import MediaController
+from spotify_service import SpotifyStats
 from audio_utils import AudioManager
+from gpio_input import DOUBLE_PRESS, DOWN, LONG_PRESS, PRESS, UP, GpioInput
+from tracing import tracer
+from log_pipeline import log_pipeline
+from memory_governor import memory_governor
+from thermal_governor import thermal_governor
+from metrics import FAILURES, RETRIES, MetricsServer, metrics, observe_trace
+from startup_profile import process_age
+from network_quality import NetworkQualityEstimator, PipelinePolicy
+from audio_encoder import encoder_available
+from health_monitor import (CRITICAL, WARNING, HealthMonitor, bluetooth_check, disk_check,
+                            memory_check, network_check, thermal_check)
 
 
 class VoiceAssistant:
@@ -39,6 +46,15 @@ class VoiceAssistant:
         self.config_dir = config_dir
         self.running = False
         self.button_pressed = False
+        self.last_response: Optional[str] = None
+        self._cancel = threading.Event()
+        # Maintien pour parler : appui et relâchement de la capture en cours
+        self._talk_pressed_at: Optional[float] = None
+        self._talk_release: Optional[float] = None
+        self._talk_duration = 0.0
+        self.metrics_server = None
+        self.openai_client = None
+        self.startup_seconds: Optional[float] = None
         
         # Configuration du logging
         self.setup_logging()
@@ -46,11 +62,45 @@ class VoiceAssistant:
         
         # Initialiser les composants
         self.config_manager = ConfigManager(config_dir)
+        log_pipeline.configure(self.config_manager)
+        memory_governor.configure(self.config_manager)
+        thermal_governor.configure(self.config_manager)
+        tracer.configure(self.config_manager)
+        tracer.add_listener(observe_trace)
         self.bluetooth_manager = BluetoothManager(self.config_manager)
         self.audio_manager = AudioManager(self.config_manager)
+        self.media_controller = MediaController(self.config_manager, self.audio_manager.speech.ducker)
+        self.spotify_stats = SpotifyStats(self.config_manager)
+        self.gpio_input = GpioInput(self.config_manager,
+                                    gestures=(DOWN, UP, PRESS, DOUBLE_PRESS, LONG_PRESS))
+        # Commandes exécutées une à une, hors du thread des gestes
+        self.command_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='command')
+        # Attente de l'enceinte pendant une capture en maintien pour parler
+        self._speaker_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speaker')
+        self._button_thread: Optional[threading.Thread] = None
+        self.config_manager.subscribe(self.on_config_changed)
+        
+        # Qualité réseau mesurée sur les requêtes réelles, sondes au repos
+        self.network_estimator = NetworkQualityEstimator()
+        self.network_estimator.configure(self.config_manager)
+        self.pipeline_policy = PipelinePolicy(self.config_manager, self.network_estimator)
+        tracer.add_listener(self.network_estimator.observe_trace)
+        tracer.add_listener(self.pipeline_policy.observe_outcome)
+        metrics.gauge('network_rtt_seconds', "RTT lissé vers l'API (sonde TCP)",
+                      lambda: None if self.network_estimator.rtt_ms is None
+                      else self.network_estimator.rtt_ms / 1000.0)
+        metrics.gauge('network_upload_bytes_per_second', "Débit montant lissé mesuré sur Whisper",
+                      lambda: self.network_estimator.upload_bps)
+        
+        # Contrôles de santé planifiés par la boucle principale
+        self.health_monitor = HealthMonitor()
+        self.health_monitor.add_listener(self.on_health_changed)
+        self.setup_health_checks()
         
-        # Configuration OpenAI
-        self.setup_openai()
+        # Le client OpenAI est configuré dans startup_sequence, en parallèle
+        # de Bluetooth et de l'audio
+        metrics.gauge('assistant_startup_seconds', "Délai jusqu'à « Assistant vocal prêt »",
+                      lambda: self.startup_seconds)
         
         # Configuration GPIO
         self.setup_gpio()
@@ -58,16 +108,14 @@ class VoiceAssistant:
         self.logger.info("Assistant vocal initialisé")
     
     def setup_logging(self) -> None:
-        """Configure le système de logging"""
-        log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        logging.basicConfig(
-            level=logging.INFO,
-            format=log_format,
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('/opt/rpi-assistant/logs/assistant.log')
-            ]
-        )
+        """
+        Configure le système de logging
+        
+        Les logs passent par une file : les sorties (fichier avec rotation,
+        console ou journald) sont écrites par un thread dédié, configuré depuis
+        config-gpt.txt dès le chargement de la configuration.
+        """
+        log_pipeline.install()
     
     def setup_openai(self) -> None:
         """Configure le client OpenAI"""
@@ -79,7 +127,13 @@ class VoiceAssistant:
                 self.openai_client = None
                 return
             
-            self.openai_client = OpenAI(api_key=api_key)
+            # Les nouvelles tentatives sont gérées par _call_with_retries
+            timeout = self.config_manager.get_int_value('openai', 'request_timeout', 30)
+            base_url = self.config_manager.get_value('openai', 'api_base_url', '') or None
+            from openai import OpenAI
+            
+            self.openai_client = OpenAI(api_key=api_key, base_url=base_url,
+                                        timeout=timeout, max_retries=0)
             self.logger.info("Client OpenAI configuré")
             
         except Exception as e:
@@ -87,101 +141,234 @@ class VoiceAssistant:
             self.openai_client = None
     
     def setup_gpio(self) -> None:
-        """Configure les pins GPIO"""
-        if not GPIO:
-            self.logger.warning("GPIO non disponible, mode simulation")
-            return
-        
-        try:
-            # Configuration du mode GPIO
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)
-            
-            # Configuration du bouton
-            self.button_pin = self.config_manager.get_gpio_pin()
-            GPIO.setup(self.button_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
-            
-            # Configuration de l'interruption
-            GPIO.add_event_detect(
-                self.button_pin,
-                GPIO.FALLING,
-                callback=self.button_callback,
-                bouncetime=300
-            )
-            
-            self.logger.info(f"GPIO configuré, bouton sur pin {self.button_pin}")
-            
-        except Exception as e:
-            self.logger.error(f"Erreur configuration GPIO: {e}")
+        """Démarre le bouton et le traitement des gestes"""
+        self.gpio_input.start()
+        if self._button_thread is None:
+            self._button_thread = threading.Thread(target=self._dispatch_buttons, name='button-events')
+            self._button_thread.daemon = True
+            self._button_thread.start()
     
-    def button_callback(self, channel):
-        """Callback appelé lors de l'appui sur le bouton"""
+    def _dispatch_buttons(self) -> None:
+        """Planificateur des gestes du bouton (file alimentée par gpio_input)"""
+        while True:
+            event = self.gpio_input.events.get()
+            if event is None:
+                return
+            try:
+                push_to_talk = self.config_manager.get_bool_value('gpt', 'push_to_talk', False)
+                if event.gesture == DOUBLE_PRESS:
+                    self.on_double_press(event)
+                elif push_to_talk:
+                    # Maintien pour parler : l'appui long est la parole elle-même
+                    if event.gesture == DOWN:
+                        self.on_talk_pressed(event)
+                    elif event.gesture == UP and self._talk_release is None:
+                        self._talk_duration = event.duration
+                        self._talk_release = event.time
+                elif event.gesture == PRESS:
+                    self.button_callback(event)
+                elif event.gesture == LONG_PRESS:
+                    self.logger.info("Appui long: pause de Spotify")
+                    self.media_controller.execute(('pause', None))
+            except Exception as e:
+                self.logger.error(f"Erreur lors du traitement du geste {event.gesture}: {e}")
+    
+    def button_callback(self, event=None) -> None:
+        """Appui sur le bouton : commande vocale, sauf si une commande est en cours"""
         if not self.button_pressed:
             self.button_pressed = True
             self.logger.info("Bouton pressé, démarrage de l'enregistrement")
-            
-            # Démarrer l'enregistrement dans un thread séparé
-            thread = threading.Thread(target=self.handle_voice_command)
-            thread.daemon = True
-            thread.start()
+            self.command_executor.submit(self.handle_voice_command)
     
-    def handle_voice_command(self) -> None:
-        """Gère une commande vocale complète"""
-        try:
-            self.logger.info("Traitement de la commande vocale...")
-            
-            # Vérifier que l'enceinte est connectée
-            if not self.bluetooth_manager.ensure_connection():
-                self.logger.warning("Enceinte Bluetooth non connectée")
-                self.audio_manager.speak_text("Enceinte non connectée", use_bluetooth=False)
-                return
-            
-            # Signal sonore de début d'enregistrement
-            self.audio_manager.speak_text("J'écoute", use_bluetooth=True)
-            
-            # Enregistrer l'audio
-            duration = self.config_manager.get_recording_duration()
-            audio_file = self.audio_manager.record_audio(duration)
-            
-            if not audio_file:
-                self.logger.error("Échec de l'enregistrement audio")
-                self.audio_manager.speak_text("Erreur d'enregistrement", use_bluetooth=True)
-                return
-            
-            # Transcrire avec Whisper
-            self.audio_manager.speak_text("Je traite votre demande", use_bluetooth=True)
-            transcription = self.transcribe_audio(audio_file)
-            
-            if not transcription:
-                self.logger.error("Échec de la transcription")
-                self.audio_manager.speak_text("Je n'ai pas compris", use_bluetooth=True)
-                return
-            
-            self.logger.info(f"Transcription: {transcription}")
-            
-            # Générer la réponse avec GPT
-            response = self.generate_response(transcription)
-            
-            if not response:
-                self.logger.error("Échec de la génération de réponse")
-                self.audio_manager.speak_text("Erreur de connexion", use_bluetooth=True)
-                return
-            
-            self.logger.info(f"Réponse: {response}")
-            
-            # Lire la réponse
-            self.audio_manager.speak_text(response, use_bluetooth=True)
-            
-            # Nettoyer le fichier audio
-            self.audio_manager.cleanup_file(audio_file)
-            
-        except Exception as e:
-            self.logger.error(f"Erreur lors du traitement: {e}")
-            self.audio_manager.speak_text("Une erreur est survenue", use_bluetooth=True)
+    def on_talk_pressed(self, event) -> None:
+        """Maintien pour parler : la capture démarre dès le front descendant"""
+        if self.button_pressed:
+            return
+        self.button_pressed = True
+        self._talk_pressed_at = event.time
+        self._talk_release = None
+        self._talk_duration = 0.0
+        self.logger.info("Bouton maintenu, enregistrement jusqu'au relâchement")
+        self.command_executor.submit(self.handle_voice_command, True)
+    
+    def on_double_press(self, event=None) -> None:
+        """Double appui : annule la commande en cours, sinon répète la dernière réponse"""
+        # En maintien pour parler, le second appui a lui-même lancé une capture
+        # (trop courte, abandonnée) : ce n'est pas une commande à annuler
+        tap_capture = event is not None and event.time == self._talk_pressed_at
+        if self.button_pressed and not tap_capture:
+            self.logger.info("Double appui: annulation de la commande")
+            self._cancel.set()
+            self.audio_manager.speech.interrupt()
+        elif self.last_response:
+            self.logger.info("Double appui: répétition de la dernière réponse")
+            self.command_executor.submit(self.audio_manager.speak_text, self.last_response, True)
+    
+    def _cancelled(self, trace) -> bool:
+        """Vrai si la commande a été annulée par un double appui"""
+        if not self._cancel.is_set():
+            return False
+        self.logger.info("Commande annulée")
+        self._set_trace_status(trace, 'cancelled')
+        return True
+    
+    def handle_voice_command(self, hold: bool = False) -> None:
+        """
+        Gère une commande vocale complète
         
-        finally:
-            # Réinitialiser le flag
-            self.button_pressed = False
+        Args:
+            hold: Maintien pour parler (capture bornée par le relâchement du bouton)
+        """
+        with tracer.start_trace('voice_command') as trace:
+            audio_file = None
+            self._cancel.clear()
+            try:
+                self.logger.info("Traitement de la commande vocale...")
+                
+                # Mémoire critique : refuser plutôt que risquer l'OOM killer
+                if not memory_governor.allows('voice_command'):
+                    self.logger.warning("Mémoire insuffisante, commande refusée")
+                    self._set_trace_status(trace, 'low_memory')
+                    self.audio_manager.speak_text("Mémoire insuffisante", use_bluetooth=True)
+                    return
+                
+                # Maintien pour parler : l'utilisateur parle dès l'appui, l'enceinte
+                # est attendue pendant la capture plutôt qu'avant
+                speaker = None
+                if hold:
+                    speaker = self._speaker_executor.submit(self._timed, self.bluetooth_manager.ensure_connection)
+                elif not self.bluetooth_manager.ensure_connection():
+                    self._no_speaker(trace)
+                    return
+                
+                # Choisir codec, modèle et synthèse selon le réseau
+                duration = self.config_manager.get_recording_duration()
+                sample_rate = self.audio_manager.capture_rate()
+                decision = self.pipeline_policy.decide(duration, sample_rate, encoder_available)
+                tracer.record('policy.decide', 0.0, **decision.to_dict())
+                self.audio_manager.cloud_tts_enabled = decision.cloud_tts
+                
+                if not decision.cloud_stt:
+                    self.logger.warning("Réseau indisponible, commande abandonnée")
+                    self._set_trace_status(trace, 'offline')
+                    self.audio_manager.speak_text("Pas de connexion réseau", use_bluetooth=True)
+                    return
+                
+                # Signal sonore de début d'enregistrement (inutile en maintien :
+                # l'utilisateur parle dès l'appui)
+                if not hold:
+                    with tracer.span('prompt.listening'):
+                        self.audio_manager.speak_text("J'écoute", use_bluetooth=True)
+                
+                # Enregistrer l'audio ; en maintien, recording_duration est la durée
+                # maximale, comptée comme la traîne depuis l'appui
+                audio_file = self.audio_manager.record_audio(
+                    duration, encode=True, codec=decision.codec,
+                    compression_level=decision.compression_level,
+                    until=(lambda: self._talk_release) if hold else None,
+                    tail=self.config_manager.get_int_value('gpt', 'push_to_talk_tail_ms', 250) / 1000.0,
+                    started_at=self._talk_pressed_at if hold else None)
+                
+                if speaker is not None:
+                    connected, start, elapsed = speaker.result()
+                    if trace is not None:
+                        trace.add_span('bluetooth.ensure_connection', start, elapsed, {'parallel': True})
+                    if not connected:
+                        self._no_speaker(trace)
+                        return
+                
+                if self._cancelled(trace):
+                    return
+                
+                # Appui bref, ou capture plus courte que l'appui (flux ouvert trop tard)
+                min_talk = self.config_manager.get_int_value('gpt', 'push_to_talk_min_ms', 250) / 1000.0
+                if hold and ((self._talk_release is not None and self._talk_duration < min_talk) or
+                             (audio_file and self.audio_manager.last_capture_seconds < min_talk)):
+                    self.logger.info("Appui trop court, enregistrement abandonné")
+                    self._set_trace_status(trace, 'too_short')
+                    return
+                
+                if not audio_file:
+                    self.logger.error("Échec de l'enregistrement audio")
+                    self._set_trace_status(trace, 'record_failed')
+                    self.audio_manager.speak_text("Erreur d'enregistrement", use_bluetooth=True)
+                    return
+                
+                # Transcrire avec Whisper
+                with tracer.span('prompt.processing'):
+                    self.audio_manager.speak_text("Je traite votre demande", use_bluetooth=True)
+                transcription = self.transcribe_audio(audio_file)
+                
+                if self._cancelled(trace):
+                    return
+                
+                if not transcription:
+                    self.logger.error("Échec de la transcription")
+                    self._set_trace_status(trace, 'stt_failed')
+                    self.audio_manager.speak_text("Je n'ai pas compris", use_bluetooth=True)
+                    return
+                
+                # Texte complet en DEBUG seulement (log_levels=assistant=DEBUG)
+                self.logger.info("Transcription reçue", extra={'fields': {'chars': len(transcription)}})
+                self.logger.debug(f"Transcription: {transcription}")
+                
+                # Commande Spotify reconnue localement : pas de GPT
+                intent = self.media_controller.match(transcription)
+                if intent:
+                    self._set_trace_status(trace, 'local_intent')
+                    if not self.media_controller.execute(intent):
+                        self.audio_manager.speak_text("Commande Spotify indisponible", use_bluetooth=True)
+                    return
+                
+                # Générer la réponse avec GPT
+                response = self.generate_response(transcription, model=decision.model)
+                
+                if self._cancelled(trace):
+                    return
+                
+                if not response:
+                    self.logger.error("Échec de la génération de réponse")
+                    self._set_trace_status(trace, 'gpt_failed')
+                    self.audio_manager.speak_text("Erreur de connexion", use_bluetooth=True)
+                    return
+                
+                self.logger.info("Réponse reçue", extra={'fields': {'chars': len(response)}})
+                self.logger.debug(f"Réponse: {response}")
+                self.last_response = response
+                
+                # Lire la réponse
+                with tracer.span('response.speak'):
+                    self.audio_manager.speak_text(response, use_bluetooth=True)
+                
+            except Exception as e:
+                self.logger.error(f"Erreur lors du traitement: {e}")
+                self._set_trace_status(trace, 'error')
+                self.audio_manager.speak_text("Une erreur est survenue", use_bluetooth=True)
+            
+            finally:
+                # Libérer l'enregistrement, y compris après un échec
+                if audio_file:
+                    self.audio_manager.cleanup_file(audio_file)
+                
+                # Réinitialiser le flag
+                self.button_pressed = False
+    
+    def _no_speaker(self, trace) -> None:
+        """Commande abandonnée faute d'enceinte (message sur la sortie locale)"""
+        self.logger.warning("Enceinte Bluetooth non connectée")
+        self._set_trace_status(trace, 'no_speaker')
+        self.audio_manager.speak_text("Enceinte non connectée", use_bluetooth=False)
+    
+    @staticmethod
+    def _timed(func: Callable[[], object]):
+        """Résultat, début et durée d'un appel (étape exécutée hors du thread de la trace)"""
+        start = time.monotonic()
+        return func(), start, time.monotonic() - start
+    
+    def _set_trace_status(self, trace, status: str) -> None:
+        """Marque l'issue de la commande dans la trace active"""
+        if trace is not None:
+            trace.status = status
     
     def transcribe_audio(self, audio_file: str) -> Optional[str]:
         """
@@ -198,34 +385,44 @@ class VoiceAssistant:
                 self.logger.error("Client OpenAI non configuré")
                 return None
             
-            # Convertir en MP3 si nécessaire
+            # Convertir en MP3 si l'encodage pendant la capture n'a pas eu lieu
+            upload_file = None
             if audio_file.endswith('.wav'):
-                mp3_file = self.audio_manager.convert_to_mp3(audio_file)
-                if mp3_file:
-                    audio_file = mp3_file
+                upload_file = self.audio_manager.convert_to_mp3(audio_file)
+                if upload_file:
+                    audio_file = upload_file
             
             # Transcrire avec Whisper
-            with open(audio_file, 'rb') as audio_data:
-                model = self.config_manager.get_value('openai', 'whisper_model', 'whisper-1')
-                
-                response = self.openai_client.audio.transcriptions.create(
-                    model=model,
-                    file=audio_data,
-                    language='fr'
-                )
-                
-                return response.text.strip()
+            model = self.config_manager.get_value('openai', 'whisper_model', 'whisper-1')
+            
+            def request():
+                with open(audio_file, 'rb') as audio_data:
+                    return self.openai_client.audio.transcriptions.create(
+                        model=model,
+                        file=audio_data,
+                        language='fr'
+                    )
+            
+            try:
+                with tracer.span('openai.whisper', bytes=os.path.getsize(audio_file)):
+                    response = self._call_with_retries('stt', request)
+            finally:
+                if upload_file:
+                    self.audio_manager.cleanup_file(upload_file)
+            
+            return response.text.strip()
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la transcription: {e}")
             return None
     
-    def generate_response(self, text: str) -> Optional[str]:
+    def generate_response(self, text: str, model: Optional[str] = None) -> Optional[str]:
         """
         Génère une réponse via GPT
         
         Args:
             text: Texte de la question
+            model: Modèle à utiliser (par défaut celui de la configuration)
             
         Returns:
             Réponse générée ou None en cas d'erreur
@@ -236,32 +433,155 @@ class VoiceAssistant:
                 return None
             
             # Configuration du modèle
-            model = self.config_manager.get_value('openai', 'model', 'gpt-4o')
+            model = model or self.config_manager.get_value('openai', 'model', 'gpt-4o')
             max_tokens = self.config_manager.get_int_value('openai', 'max_tokens', 150)
-            temperature = float(self.config_manager.get_value('openai', 'temperature', '0.7'))
+            temperature = self.config_manager.get_float_value('openai', 'temperature', 0.7)
             
             # Système de prompt
             system_prompt = """Tu es un assistant vocal amical et concis pour une enceinte connectée. 
             Réponds en français de manière claire et brève. 
             Limite tes réponses à 2-3 phrases maximum pour un confort d'écoute optimal."""
             
-            # Générer la réponse
-            response = self.openai_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            
-            return response.choices[0].message.content.strip()
+            # Générer la réponse en streaming pour mesurer le délai du premier token
+            def request():
+                request_start = time.monotonic()
+                stream = self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": text}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True
+                )
+                
+                parts = []
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if not parts:
+                            tracer.record('openai.chat.first_token', time.monotonic() - request_start)
+                        parts.append(delta)
+                return ''.join(parts)
+            
+            with tracer.span('openai.chat', model=model):
+                response = self._call_with_retries('gpt', request)
+            
+            return response.strip()
             
         except Exception as e:
             self.logger.error(f"Erreur lors de la génération de réponse: {e}")
             return None
     
+    def _call_with_retries(self, stage: str, request):
+        """
+        Exécute une requête OpenAI avec nouvelles tentatives sur erreur transitoire
+        
+        Args:
+            stage: Étape concernée pour les métriques (stt, gpt)
+            request: Fonction effectuant la requête
+            
+        Returns:
+            Résultat de la requête
+        """
+        import openai
+        
+        max_retries = self.config_manager.get_int_value('openai', 'max_retries', 3)
+        retry_delay = self.config_manager.get_float_value('openai', 'retry_delay', 2.0)
+        transient_errors = (openai.APIConnectionError, openai.RateLimitError,
+                            openai.InternalServerError)
+        
+        for attempt in range(max_retries + 1):
+            try:
+                return request()
+            except transient_errors as e:
+                if attempt >= max_retries:
+                    FAILURES.inc(stage=stage)
+                    if isinstance(e, openai.APIConnectionError):
+                        self.network_estimator.record_failure()
+                    raise
+                RETRIES.inc(stage=stage)
+                self.logger.warning(f"Erreur {stage} (tentative {attempt + 1}/{max_retries + 1}): {e}")
+                time.sleep(retry_delay)
+            except Exception:
+                FAILURES.inc(stage=stage)
+                raise
+    
+    def on_config_changed(self, old, new, changes: Dict[str, set]) -> None:
+        """
+        Applique une configuration rechargée aux composants concernés
+        
+        Args:
+            old: Instantané précédent
+            new: Nouvel instantané
+            changes: Clés modifiées par configuration
+        """
+        if 'openai' in changes:
+            self.network_estimator.configure(self.config_manager)
+            if self.openai_client is not None:
+                self.setup_openai()
+        
+        gpt_changes = changes.get('gpt', set())
+        if gpt_changes & {'trace_enabled', 'trace_file', 'trace_max_kb', 'trace_backups'}:
+            tracer.configure(self.config_manager)
+        if 'gpio_pin' in gpt_changes:
+            self.gpio_input.restart()
+        if any(key.startswith('memory_') for key in gpt_changes):
+            memory_governor.configure(self.config_manager)
+        if any(key.startswith('thermal_') for key in gpt_changes):
+            thermal_governor.configure(self.config_manager)
+        if any(key.startswith('health_') for key in gpt_changes):
+            self.setup_health_checks()
+    
+    def reload_config(self) -> None:
+        """Recharge la configuration (SIGHUP, systemctl reload)"""
+        self.logger.info("Rechargement de la configuration...")
+        self.config_manager.reload_all()
+    
+    def start_metrics_server(self) -> None:
+        """Démarre le serveur de métriques local si activé"""
+        if not self.config_manager.get_bool_value('gpt', 'metrics_enabled', True):
+            return
+        
+        port = self.config_manager.get_int_value('gpt', 'metrics_port', 9105)
+        self.metrics_server = MetricsServer(port)
+        if not self.metrics_server.start():
+            self.metrics_server = None
+    
+    def _parallel_init(self, tasks: Dict[str, Callable[[], object]], trace) -> Dict[str, object]:
+        """
+        Exécute les initialisations indépendantes en parallèle
+        
+        Args:
+            tasks: Fonctions d'initialisation par nom d'étape
+            trace: Trace de démarrage (ou None)
+            
+        Returns:
+            Résultat de chaque initialisation (None en cas d'exception)
+        """
+        def timed(func):
+            start = time.monotonic()
+            try:
+                return func(), start, time.monotonic() - start
+            except Exception as e:
+                self.logger.error(f"Erreur d'initialisation: {e}")
+                return None, start, time.monotonic() - start
+        
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='startup') as executor:
+            futures = {name: executor.submit(timed, func) for name, func in tasks.items()}
+        
+        results = {}
+        for name, future in futures.items():
+            result, start, duration = future.result()
+            results[name] = result
+            if trace is not None:
+                trace.add_span(name, start, duration, {})
+            self.logger.info(f"{name}: {duration:.2f} s")
+        return results
+    
     def startup_sequence(self) -> None:
         """Séquence de démarrage de l'assistant"""
         try:
@@ -272,25 +592,39 @@ class VoiceAssistant:
                 self.logger.info("Assistant désactivé dans la configuration")
                 return
             
-            if not self.openai_client:
-                self.logger.error("Configuration OpenAI invalide, assistant désactivé")
-                return
-            
-            # Initialiser Bluetooth
-            self.logger.info("Configuration Bluetooth...")
-            if not self.bluetooth_manager.setup_target_speaker():
-                self.logger.warning("Échec de la configuration Bluetooth")
-                # Continuer quand même, on essaiera de reconnecter plus tard
-            
-            # Test audio
-            self.logger.info("Test des composants audio...")
-            if not self.audio_manager.test_audio_playback():
-                self.logger.warning("Problème avec le système audio")
-            
-            # Signal de démarrage
-            self.audio_manager.speak_text("Assistant vocal prêt", use_bluetooth=True)
+            with tracer.start_trace('startup') as trace:
+                # OpenAI (import du SDK), Bluetooth (scan) et audio (PyAudio) sont indépendants
+                self.logger.info("Initialisation de Bluetooth, de l'audio et d'OpenAI...")
+                results = self._parallel_init({
+                    'startup.openai': self.setup_openai,
+                    'startup.bluetooth': self.bluetooth_manager.start_connection,
+                    'startup.audio': self.audio_manager.warm_up,
+                }, trace)
+                
+                if not self.openai_client:
+                    self.logger.error("Configuration OpenAI invalide, assistant désactivé")
+                    self._set_trace_status(trace, 'no_openai')
+                    return
+                
+                if not results['startup.bluetooth']:
+                    self.logger.warning("Échec de la configuration Bluetooth")
+                    # Continuer quand même, la reconnexion continue en arrière-plan
+                
+                # Sonde audio silencieuse (résultat en cache entre redémarrages)
+                self.logger.info("Vérification de la sortie audio...")
+                with tracer.span('startup.audio_probe'):
+                    if not results['startup.audio'] or not self.audio_manager.check_audio_ready():
+                        self.logger.warning("Problème avec le système audio")
+                
+                # Signal de démarrage (clip synthétisé une seule fois)
+                with tracer.span('startup.ready_prompt'):
+                    self.audio_manager.play_cached_prompt("Assistant vocal prêt")
             
-            self.logger.info("Assistant vocal démarré avec succès")
+            self.startup_seconds = process_age()
+            if self.startup_seconds is not None:
+                self.logger.info(f"Assistant vocal démarré avec succès en {self.startup_seconds:.1f} s")
+            else:
+                self.logger.info("Assistant vocal démarré avec succès")
             
         except Exception as e:
             self.logger.error(f"Erreur lors du démarrage: {e}")
@@ -299,22 +633,19 @@ class VoiceAssistant:
         """Boucle principale de l'assistant"""
         try:
             self.running = True
+            self.start_metrics_server()
             self.startup_sequence()
-            
-            # Démarrer la surveillance Bluetooth dans un thread séparé
-            bluetooth_thread = threading.Thread(target=self.bluetooth_monitor)
-            bluetooth_thread.daemon = True
-            bluetooth_thread.start()
+            self.config_manager.start_watching()
+            self.network_estimator.start()
+            self.spotify_stats.start()
+            memory_governor.start()
             
             self.logger.info("Assistant vocal en cours d'exécution...")
             
-            # Boucle principale
+            # Boucle principale : contrôles de santé à leur échéance (horloge monotone)
             while self.running:
-                time.sleep(1)
-                
-                # Vérifier l'état du système périodiquement
-                if int(time.time()) % 300 == 0:  # Toutes les 5 minutes
-                    self.system_health_check()
+                delay = self.health_monitor.run_pending()
+                time.sleep(min(1.0, delay))
             
         except KeyboardInterrupt:
             self.logger.info("Arrêt demandé par l'utilisateur")
@@ -323,40 +654,52 @@ class VoiceAssistant:
         finally:
             self.shutdown()
     
-    def bluetooth_monitor(self) -> None:
-        """Surveille la connexion Bluetooth"""
-        try:
-            while self.running:
-                if not self.bluetooth_manager.ensure_connection():
-                    self.logger.warning("Tentative de reconnexion Bluetooth...")
-                
-                time.sleep(30)  # Vérifier toutes les 30 secondes
-                
-        except Exception as e:
-            self.logger.error(f"Erreur dans la surveillance Bluetooth: {e}")
+    def setup_health_checks(self) -> None:
+        """Enregistre les contrôles de santé (health_* de config-gpt.txt)"""
+        config = self.config_manager
+        interval = config.get_int_value('gpt', 'health_check_interval', 60)
+        cache_dir = config.get_value('gpt', 'cache_dir', '/opt/rpi-assistant/cache')
+        disk_paths = [self.audio_manager.temp_dir, cache_dir if os.path.isdir(cache_dir) else '/']
+        
+        self.health_monitor.register(
+            'disk', disk_check(disk_paths, config.get_int_value('gpt', 'health_disk_min_mb', 100)),
+            interval)
+        self.health_monitor.register('memory', memory_check(memory_governor), interval)
+        self.health_monitor.register(
+            'thermal', thermal_check(thermal_governor.sys_root,
+                                     config.get_float_value('gpt', 'health_temp_warning', 70.0),
+                                     config.get_float_value('gpt', 'health_temp_critical', 80.0)),
+            interval)
+        self.health_monitor.register('bluetooth', bluetooth_check(self.bluetooth_manager.connection),
+                                     interval)
+        self.health_monitor.register('network', network_check(self.network_estimator, interval),
+                                     interval)
+    
+    def on_health_changed(self, result, previous: str) -> None:
+        """
+        Réagit à un changement d'état de santé
+        
+        Args:
+            result: Nouveau résultat du contrôle
+            previous: État précédent
+        """
+        if result.name == 'disk' and result.status in (WARNING, CRITICAL) and not self.button_pressed:
+            # Jamais pendant une commande : le spool contient l'enregistrement en cours
+            self.audio_manager.cleanup_temp_files()
     
-    def system_health_check(self) -> None:
-        """Vérification de la santé du système"""
+    def system_health_check(self) -> Dict:
+        """
+        Vérification immédiate de tous les contrôles de santé
+        
+        Returns:
+            État de santé (global et par contrôle)
+        """
         try:
-            # Vérifier l'espace disque
-            import shutil
-            disk_usage = shutil.disk_usage('/tmp')
-            free_space = disk_usage.free / (1024 * 1024 * 1024)  # GB
-            
-            if free_space < 0.1:  # Moins de 100MB
-                self.logger.warning(f"Espace disque faible: {free_space:.2f} GB")
-                self.audio_manager.cleanup_temp_files()
-            
-            # Vérifier la connectivité réseau
-            import subprocess
-            result = subprocess.run(['ping', '-c', '1', '8.8.8.8'], 
-                                  capture_output=True, timeout=5)
-            
-            if result.returncode != 0:
-                self.logger.warning("Connectivité réseau limitée")
-            
+            for name in list(self.health_monitor.status.results):
+                self.health_monitor.run_check(name)
         except Exception as e:
             self.logger.error(f"Erreur lors de la vérification système: {e}")
+        return self.health_monitor.status.to_dict()
     
     def shutdown(self) -> None:
         """Arrêt propre de l'assistant"""
@@ -364,9 +707,23 @@ class VoiceAssistant:
             self.logger.info("Arrêt de l'assistant vocal...")
             self.running = False
             
-            # Nettoyer les GPIO
-            if GPIO:
-                GPIO.cleanup()
+            # Libérer le bouton et arrêter le traitement des gestes
+            self.gpio_input.stop()
+            self.gpio_input.events.put(None)
+            self.command_executor.shutdown(wait=False)
+            self._speaker_executor.shutdown(wait=False)
+            
+            self.config_manager.stop_watching()
+            self.network_estimator.stop()
+            self.spotify_stats.stop()
+            memory_governor.stop()
+            self.bluetooth_manager.connection.stop()
+            sink_manager.stop()
+            
+            # Arrêter le serveur de métriques
+            if self.metrics_server:
+                self.metrics_server.stop()
+                self.metrics_server = None
             
             # Nettoyer les fichiers temporaires
             self.audio_manager.cleanup_temp_files()
@@ -375,23 +732,56 @@ class VoiceAssistant:
             
         except Exception as e:
             self.logger.error(f"Erreur lors de l'arrêt: {e}")
+        
+        finally:
+            # Écrire les logs encore en file
+            log_pipeline.stop()
     
     def signal_handler(self, signum, frame):
         """Gestionnaire de signaux pour arrêt propre"""
         self.logger.info(f"Signal {signum} reçu, arrêt en cours...")
         self.shutdown()
         sys.exit(0)
+    
+    def reload_handler(self, signum, frame):
+        """Gestionnaire de SIGHUP : rechargement hors du gestionnaire de signal"""
+        thread = threading.Thread(target=self.reload_config, name='config-reload')
+        thread.daemon = True
+        thread.start()
 
 
 def main():
     """Fonction principale"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Assistant vocal Raspberry Pi")
+    parser.add_argument('--config-dir', default='/boot', help="Dossier des fichiers config-*.txt")
+    parser.add_argument('--simulate', action='store_true',
+                        help="Matériel simulé (bouton, micro, enceinte, PulseAudio, API OpenAI)")
+    parser.add_argument('--seed', type=int, default=0, help="Graine de la simulation")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Vitesse de l'horloge simulée (1.0 : temps réel, 0 : sans attente)")
+    args = parser.parse_args()
+    
     try:
+        simulation = None
+        if args.simulate:
+            # Avant la création de l'assistant : pyaudio et pygame sont remplacés
+            from simulation import Simulation
+            simulation = Simulation(seed=args.seed, speed=args.speed).start()
+        
         # Créer l'assistant
-        assistant = VoiceAssistant()
+        assistant = VoiceAssistant(simulation.config_dir if simulation else args.config_dir)
+        if simulation:
+            simulation.attach(assistant)
+            simulation.console()
+            print("Simulation : Entrée = appui, d = double appui, h = appui long, "
+                  "x = perte de l'enceinte, o = hors de portée, n = panne réseau")
         
         # Configurer les gestionnaires de signaux
         signal.signal(signal.SIGINT, assistant.signal_handler)
         signal.signal(signal.SIGTERM, assistant.signal_handler)
+        signal.signal(signal.SIGHUP, assistant.reload_handler)
         
         # Démarrer l'assistant
         assistant.run()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Encodeur audio en streaming pour l'envoi à Whisper
+Encode en FLAC ou Opus dans un thread dédié pendant la capture (libsndfile via soundfile)
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Optional
+
+
+# Format libsndfile et extension par codec
+CODECS = {
+    'flac': ('FLAC', 'PCM_16', '.flac'),
+    'opus': ('OGG', 'OPUS', '.ogg'),
+}
+
+# Fréquences acceptées par Opus
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+_STOP = object()
+
+
+def encoder_available(codec: str, sample_rate: int) -> bool:
+    """
+    Indique si le codec peut être utilisé en processus
+
+    Args:
+        codec: flac ou opus
+        sample_rate: Fréquence de capture
+
+    Returns:
+        True si soundfile est installé et prend en charge le codec
+    """
+    if codec not in CODECS:
+        return False
+    if codec == 'opus' and sample_rate not in OPUS_SAMPLE_RATES:
+        return False
+
+    try:
+        import soundfile
+    except (ImportError, OSError):
+        return False
+
+    file_format, subtype, _ = CODECS[codec]
+    return subtype in soundfile.available_subtypes(file_format)
+
+
+class StreamingEncoder:
+    def __init__(self, output_file: str, codec: str, sample_rate: int,
+                 channels: int = 1, compression_level: Optional[float] = None):
+        """
+        Encodeur alimenté par blocs PCM 16 bits depuis le thread de capture
+
+        Args:
+            output_file: Fichier encodé produit
+            codec: flac ou opus
+            sample_rate: Fréquence d'échantillonnage
+            channels: Nombre de canaux
+            compression_level: Niveau de compression libsndfile (0 à 1)
+        """
+        self.output_file = output_file
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.compression_level = compression_level
+        self.logger = logging.getLogger(__name__)
+
+        self.error: Optional[Exception] = None
+        self.encode_seconds = 0.0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'StreamingEncoder':
+        """Démarre le thread d'encodage"""
+        self._thread = threading.Thread(target=self._run, name=f'encoder-{self.codec}')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def feed(self, pcm: bytes) -> None:
+        """Transmet un bloc PCM (non bloquant)"""
+        if self.error is None:
+            self._queue.put(pcm)
+
+    def finish(self, timeout: float = 10.0) -> Optional[str]:
+        """
+        Termine l'encodage des blocs restants
+
+        Args:
+            timeout: Attente maximale du thread d'encodage
+
+        Returns:
+            Chemin du fichier encodé ou None en cas d'échec
+        """
+        self._queue.put(_STOP)
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self.error = TimeoutError("encodage non terminé")
+
+        if self.error:
+            self.logger.error(f"Erreur d'encodage {self.codec}: {self.error}")
+            return None
+        return self.output_file
+
+    def _run(self) -> None:
+        """Boucle du thread d'encodage"""
+        try:
+            import soundfile
+
+            file_format, subtype, _ = CODECS[self.codec]
+            options = {}
+            if self.compression_level is not None:
+                options['compression_level'] = self.compression_level
+
+            with soundfile.SoundFile(self.output_file, 'w', samplerate=self.sample_rate,
+                                     channels=self.channels, format=file_format,
+                                     subtype=subtype, **options) as sf:
+                while True:
+                    pcm = self._queue.get()
+                    if pcm is _STOP:
+                        break
+                    start = time.thread_time()
+                    sf.buffer_write(pcm, dtype='int16')
+                    self.encode_seconds += time.thread_time() - start
+
+        except Exception as e:
+            self.error = e
+            # Vider la file pour ne pas retenir les blocs en mémoire
+            while True:
+                try:
+                    if self._queue.get_nowait() is _STOP:
+                        break
+                except queue.Empty:
+                    break
+
+
+if __name__ == "__main__":
+    # Encodage d'un WAV (python3 audio_encoder.py fichier.wav [flac|opus])
+    import sys
+    import wave
+
+    logging.basicConfig(level=logging.INFO)
+
+    wav_file = sys.argv[1]
+    codec = sys.argv[2] if len(sys.argv) > 2 else 'flac'
+
+    with wave.open(wav_file, 'rb') as wf:
+        rate = wf.getframerate()
+        if not encoder_available(codec, rate):
+            print(f"Codec {codec} indisponible à {rate} Hz (soundfile installé ?)")
+            sys.exit(1)
+
+        output = os.path.splitext(wav_file)[0] + CODECS[codec][2]
+        encoder = StreamingEncoder(output, codec, rate, wf.getnchannels()).start()
+        while True:
+            chunk = wf.readframes(1024)
+            if not chunk:
+                break
+            encoder.feed(chunk)
+
+    if encoder.finish():
+        print(f"{output}: {os.path.getsize(output)} octets "
+              f"({encoder.encode_seconds * 1000:.0f} ms CPU)")
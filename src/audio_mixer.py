@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Mixage de la voix de l'assistant avec la lecture Spotify
+Atténuation (ducking) de raspotify par courbes de gain et flux A2DP unique maintenu ouvert
+"""
+
+import math
+import time
+import queue
+import logging
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from audio_sinks import SPOTIFY_APPLICATIONS, sink_manager
+from metrics import metrics
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Plancher des courbes en dB (un gain nul n'a pas de valeur en dB)
+FLOOR_DB = -60.0
+
+# Intervalle entre deux points d'une rampe de volume (secondes)
+RAMP_INTERVAL = 0.02
+
+# Fondu appliqué au début et à la fin de chaque phrase (secondes)
+FADE_SECONDS = 0.01
+
+
+def gain_curve(start: float, end: float, steps: int) -> List[float]:
+    """
+    Courbe de gain en cosinus surélevé, interpolée en dB
+
+    Args:
+        start: Gain linéaire de départ
+        end: Gain linéaire d'arrivée
+        steps: Nombre de points (le dernier vaut end)
+
+    Returns:
+        Gains linéaires successifs
+    """
+    steps = max(1, steps)
+    start_db = 20 * math.log10(start) if start > 0 else FLOOR_DB
+    end_db = 20 * math.log10(end) if end > 0 else FLOOR_DB
+
+    if numpy is not None:
+        t = (1 - numpy.cos(numpy.pi * numpy.arange(1, steps + 1) / steps)) / 2
+        gains = 10 ** ((start_db + (end_db - start_db) * t) / 20)
+        gains[gains <= 10 ** (FLOOR_DB / 20) * 1.0001] = 0.0
+        return gains.tolist()
+
+    gains = []
+    for k in range(1, steps + 1):
+        t = (1 - math.cos(math.pi * k / steps)) / 2
+        db = start_db + (end_db - start_db) * t
+        gains.append(0.0 if db <= FLOOR_DB else 10 ** (db / 20))
+    return gains
+
+
+def apply_gain(pcm: bytes, curve: List[float], at_end: bool = False) -> bytes:
+    """
+    Applique une courbe de gain aux premiers (ou derniers) échantillons d'un bloc PCM 16 bits
+
+    Args:
+        pcm: Bloc PCM 16 bits mono
+        curve: Gain par échantillon
+        at_end: Appliquer la courbe à la fin du bloc plutôt qu'au début
+
+    Returns:
+        Bloc PCM modifié
+    """
+    count = min(len(curve), len(pcm) // 2)
+    if count == 0:
+        return pcm
+    curve = curve[len(curve) - count:] if at_end else curve[:count]
+
+    if numpy is not None:
+        samples = numpy.frombuffer(pcm[:len(pcm) // 2 * 2], dtype=numpy.int16).astype(numpy.float32)
+        region = slice(len(samples) - count, None) if at_end else slice(0, count)
+        samples[region] *= numpy.asarray(curve, dtype=numpy.float32)
+        return samples.astype(numpy.int16).tobytes() + pcm[len(pcm) // 2 * 2:]
+
+    samples = array('h')
+    samples.frombytes(pcm[:len(pcm) // 2 * 2])
+    offset = len(samples) - count if at_end else 0
+    for i, gain in enumerate(curve):
+        samples[offset + i] = int(samples[offset + i] * gain)
+    return samples.tobytes() + pcm[len(pcm) // 2 * 2:]
+
+
+class Ducker:
+    def __init__(self, config_manager):
+        """
+        Atténue les flux raspotify pendant que l'assistant parle
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.config_manager = config_manager
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._users = 0
+        self._target = 1.0
+        self._gain = 1.0
+        self._original: Dict[int, Dict[str, float]] = {}
+        self._ramping = False
+
+        metrics.gauge('assistant_duck_gain', "Gain appliqué à Spotify (1 = non atténué)",
+                      lambda: self._gain)
+
+    def _enabled(self) -> bool:
+        return self.config_manager.get_bool_value('gpt', 'duck_enabled', True)
+
+    @contextmanager
+    def ducked(self) -> Iterator[None]:
+        """Atténue Spotify pendant le bloc (imbrications comptées)"""
+        self.duck()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def duck(self) -> None:
+        """Lance l'atténuation (rampe en arrière-plan, n'attend pas)"""
+        if not self._enabled():
+            return
+        with self._lock:
+            self._users += 1
+            if self._users > 1:
+                return
+            if self._gain >= 1.0:
+                # Volumes d'origine relus au début de chaque atténuation
+                self._original = sink_manager.stream_volumes(SPOTIFY_APPLICATIONS)
+            if not self._original:
+                return
+            level_db = self.config_manager.get_float_value('gpt', 'duck_level_db', -18.0)
+            self._set_target(10 ** (level_db / 20))
+
+    def release(self) -> None:
+        """Rétablit le volume de Spotify quand plus personne ne parle"""
+        with self._lock:
+            if self._users == 0:
+                return
+            self._users -= 1
+            if self._users == 0 and self._original:
+                self._set_target(1.0)
+
+    def base_volumes(self) -> Dict[int, Dict[str, float]]:
+        """
+        Volumes de Spotify hors atténuation
+
+        Returns:
+            {index du flux: {'volume': volume linéaire, 'channels': canaux}}
+        """
+        current = sink_manager.stream_volumes(SPOTIFY_APPLICATIONS)
+        with self._lock:
+            return {index: self._original.get(index, stream) for index, stream in current.items()}
+
+    def set_volumes(self, volumes: Dict[int, Dict[str, float]]) -> None:
+        """
+        Change le volume de base de Spotify, atténuation en cours comprise
+
+        Args:
+            volumes: {index du flux: {'volume': volume linéaire, 'channels': canaux}}
+        """
+        with self._lock:
+            if self._original:
+                self._original.update(volumes)
+            gain = self._gain if self._original else 1.0
+        for index, stream in volumes.items():
+            sink_manager.set_stream_volume(index, stream['volume'] * gain, int(stream['channels']))
+
+    def _set_target(self, target: float) -> None:
+        """Change la cible de la rampe (verrou tenu)"""
+        self._target = target
+        if not self._ramping:
+            self._ramping = True
+            thread = threading.Thread(target=self._ramp, name='audio-duck')
+            thread.daemon = True
+            thread.start()
+
+    def _ramp(self) -> None:
+        """Applique la courbe de gain point par point ; recalculée si la cible change"""
+        while True:
+            with self._lock:
+                target = self._target
+                if self._gain == target:
+                    if target >= 1.0:
+                        self._original = {}
+                    self._ramping = False
+                    return
+                if target < self._gain:
+                    duration = self.config_manager.get_int_value('gpt', 'duck_attack_ms', 250) / 1000.0
+                else:
+                    duration = self.config_manager.get_int_value('gpt', 'duck_release_ms', 600) / 1000.0
+                # Sans rampe possible (repli pactl), le volume cible est appliqué en une fois
+                steps = int(duration / RAMP_INTERVAL) if sink_manager.volume_ramp else 1
+                curve = gain_curve(self._gain, target, steps)
+
+            for gain in curve:
+                if self._target != target:
+                    break
+                # Volumes de base relus à chaque point : une commande vocale peut les changer
+                for index, stream in list(self._original.items()):
+                    sink_manager.set_stream_volume(index, stream['volume'] * gain, int(stream['channels']))
+                self._gain = gain
+                time.sleep(RAMP_INTERVAL)
+            else:
+                self._gain = target
+
+
+class SpeechOutput:
+    def __init__(self, config_manager, open_stream: Callable, close_stream: Callable,
+                 rate: int, chunk_frames: int = 1024):
+        """
+        Flux de sortie unique pour la voix de l'assistant
+
+        Le flux reste ouvert et reçoit du silence entre les phrases : l'enceinte
+        A2DP ne renégocie pas la liaison à chaque message.
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+            open_stream: Ouvre le flux de sortie (PCM 16 bits mono à rate)
+            close_stream: Ferme le flux de sortie
+            rate: Fréquence du flux
+            chunk_frames: Taille des blocs écrits
+        """
+        self.config_manager = config_manager
+        self.logger = logging.getLogger(__name__)
+        self.open_stream = open_stream
+        self.close_stream = close_stream
+        self.rate = rate
+        self.chunk_frames = chunk_frames
+        self.ducker = Ducker(config_manager)
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._interrupted = False
+        self._fade = gain_curve(0.0, 1.0, int(rate * FADE_SECONDS))
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='speech-output')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def play(self, chunks: Iterable[bytes], timeout: Optional[float] = None) -> bool:
+        """
+        Joue des blocs PCM (16 bits mono à rate) avec Spotify atténué
+
+        Args:
+            chunks: Blocs PCM, consommés au fil de la lecture
+            timeout: Attente maximale de la fin de lecture ; au-delà, la phrase est
+                abandonnée (retirée de la file ou coupée avec un fondu)
+
+        Returns:
+            True si tous les blocs ont été joués
+        """
+        self._ensure_thread()
+        done = threading.Event()
+        result = {'ok': False, 'cancelled': False}
+        with self.ducker.ducked():
+            self._queue.put((chunks, done, result))
+            if not done.wait(timeout):
+                result['cancelled'] = True
+        return result['ok']
+
+    def interrupt(self) -> None:
+        """Coupe la phrase en cours de lecture, avec un fondu (annulation par double appui)"""
+        self._interrupted = True
+
+    def stop(self) -> None:
+        """Arrête le thread de sortie et ferme le flux"""
+        self._stopped = True
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _faded(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Fondu d'entrée et de sortie (un bloc d'avance pour repérer le dernier)"""
+        previous = None
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if previous is None:
+                chunk = apply_gain(chunk, self._fade)
+            else:
+                yield previous
+            previous = chunk
+        if previous is not None:
+            yield apply_gain(previous, self._fade[::-1], at_end=True)
+
+    def _run(self) -> None:
+        """Écrit les phrases, puis du silence jusqu'à speech_keepalive_s d'inactivité"""
+        stream = None
+        idle_since = time.monotonic()
+        silence = b'\x00\x00' * self.chunk_frames
+
+        while not self._stopped:
+            keepalive = self.config_manager.get_int_value('gpt', 'speech_keepalive_s', 300)
+            try:
+                if stream is not None and time.monotonic() - idle_since < keepalive:
+                    item = self._queue.get_nowait()
+                else:
+                    if stream is not None:
+                        self.close_stream()
+                        stream = None
+                        self.logger.info("Flux de sortie vocal fermé (inactif)")
+                    item = self._queue.get()
+            except queue.Empty:
+                # Silence cadencé par le flux : la liaison A2DP reste active
+                try:
+                    stream.write(silence)
+                except Exception as e:
+                    self.logger.warning(f"Flux de sortie interrompu: {e}")
+                    self.close_stream()
+                    stream = None
+                continue
+
+            if item is None:
+                break
+
+            chunks, done, result = item
+            self._interrupted = False
+            try:
+                if result['cancelled']:
+                    # Délai de l'appelant dépassé avant la lecture : phrase abandonnée
+                    continue
+                if stream is None:
+                    stream = self.open_stream()
+                for chunk in self._faded(chunks):
+                    if self._interrupted or result['cancelled']:
+                        # Coupure volontaire : fondu de sortie sur le bloc suivant
+                        stream.write(apply_gain(chunk[:len(self._fade) * 2], self._fade[::-1]))
+                        break
+                    stream.write(chunk)
+                else:
+                    result['ok'] = True
+            except Exception as e:
+                self.logger.error(f"Erreur de lecture de la voix: {e}")
+                try:
+                    self.close_stream()
+                except Exception:
+                    pass
+                stream = None
+            finally:
+                idle_since = time.monotonic()
+                done.set()
+
+        if stream is not None:
+            self.close_stream()
+
+
+if __name__ == "__main__":
+    # Courbes de gain de l'atténuation par défaut
+    logging.basicConfig(level=logging.INFO)
+
+    level = 10 ** (-18 / 20)
+    print("Attaque :", ' '.join(f"{g:.2f}" for g in gain_curve(1.0, level, int(0.25 / RAMP_INTERVAL))))
+    print("Retour  :", ' '.join(f"{g:.2f}" for g in gain_curve(level, 1.0, int(0.6 / RAMP_INTERVAL))))
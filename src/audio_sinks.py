@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+"""
+Gestionnaire des sinks PulseAudio/PipeWire pour l'assistant Raspberry Pi
+Liste des sinks en cache, mise à jour par les événements du serveur, routage des flux assistant et Spotify
+"""
+
+import os
+import re
+import pwd
+import json
+import shutil
+import logging
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import pulsectl
+except ImportError:
+    pulsectl = None
+
+
+# Applications dont les flux suivent la sortie choisie (raspotify et lecteurs de l'assistant)
+ROUTED_APPLICATIONS = ('librespot', 'raspotify', 'espeak', 'espeak-ng', 'mpg123',
+                       'aplay', 'paplay', 'ffplay', 'rpi-assistant')
+
+# Applications de lecture Spotify (atténuées pendant que l'assistant parle)
+SPOTIFY_APPLICATIONS = ('librespot', 'raspotify')
+
+# Délai avant une nouvelle connexion au serveur après un échec (secondes)
+RECONNECT_DELAY = 10.0
+
+_PACTL_EVENT = re.compile(r"Event '(\w+)' on ([\w-]+) #(\d+)")
+_PACTL_VERSION = re.compile(r"pactl (\d+)\.(\d+)")
+
+# Repli pactl : -f json et get-default-sink (PulseAudio 16)
+PACTL_MIN_VERSION = (16, 0)
+
+
+def bluetooth_sink_id(mac_address: str) -> str:
+    """Partie du nom de sink bluez correspondant à une adresse MAC"""
+    return mac_address.upper().replace(':', '_')
+
+
+def _run_pactl(server: Optional[str], *args: str, json_output: bool = False) -> str:
+    """
+    Exécute pactl (sans shell)
+
+    Args:
+        server: Adresse du serveur (None : celui de l'environnement)
+        args: Commande et arguments
+        json_output: Sortie JSON (pactl >= 16)
+
+    Returns:
+        Sortie standard
+    """
+    command = ['pactl']
+    if server:
+        command += ['--server', server]
+    if json_output:
+        command += ['-f', 'json']
+    result = subprocess.run(command + list(args), capture_output=True, text=True, timeout=10)
+    if result.returncode != 0:
+        raise RuntimeError(f"pactl {' '.join(args)}: {result.stderr.strip()}")
+    return result.stdout
+
+
+def pactl_version() -> Optional[Tuple[int, int]]:
+    """
+    Version de pactl (« pactl 16.1 »)
+
+    Returns:
+        (majeure, mineure) ou None si pactl est absent ou sa sortie illisible
+    """
+    try:
+        output = subprocess.run(['pactl', '--version'], capture_output=True, text=True,
+                                timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _PACTL_VERSION.search(output)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _matches(properties: Dict[str, str], applications) -> bool:
+    """True si le flux appartient à l'une des applications"""
+    names = (properties.get('application.process.binary', ''),
+             properties.get('application.name', ''))
+    return any(app in name.lower() for name in names for app in applications)
+
+
+class _PulsectlBackend:
+    """Protocole natif via libpulse (pulsectl), compatible pipewire-pulse"""
+
+    # Changement de volume peu coûteux : rampes point par point possibles
+    volume_ramp = True
+
+    def __init__(self, server: Optional[str]):
+        self.server = server
+        self._pulse = pulsectl.Pulse('rpi-assistant', server=server)
+        self._events = None
+
+    def sinks(self) -> List[Dict[str, Any]]:
+        return [{'index': s.index, 'name': s.name, 'description': s.description,
+                 'properties': dict(s.proplist)} for s in self._pulse.sink_list()]
+
+    def default_sink(self) -> Optional[str]:
+        return self._pulse.server_info().default_sink_name or None
+
+    def set_default_sink(self, name: str) -> None:
+        self._pulse.sink_default_set(name)
+
+    def sink_inputs(self) -> List[Dict[str, Any]]:
+        return [{'index': i.index, 'sink': i.sink, 'properties': dict(i.proplist),
+                 'volume': i.volume.value_flat, 'channels': len(i.volume.values)}
+                for i in self._pulse.sink_input_list()]
+
+    def set_sink_input_volume(self, index: int, volume: float, channels: int) -> None:
+        self._pulse.sink_input_volume_set(index, pulsectl.PulseVolumeInfo(volume, channels))
+
+    def move_sink_input(self, index: int, sink_index: int) -> None:
+        self._pulse.sink_input_move(index, sink_index)
+
+    def card_list(self) -> List[Dict[str, Any]]:
+        return [{'name': card.name,
+                 'ports': [port.name for port in card.port_list if port.direction == 'output']}
+                for card in self._pulse.card_list()]
+
+    def port_offset_set(self, card: str, port: str, offset_us: int) -> None:
+        # pa_context_set_port_latency_offset n'est pas exposé par toutes les versions de
+        # pulsectl : pactl (même serveur) sinon, appelé seulement à la formation d'un groupe
+        method = getattr(self._pulse, 'port_offset_set', None)
+        if method is not None:
+            method(card, port, offset_us)
+        else:
+            _run_pactl(self.server, 'set-port-latency-offset', card, port, str(offset_us))
+
+    def load_module(self, name: str, args: str) -> Optional[int]:
+        return self._pulse.module_load(name, args)
+
+    def unload_module(self, index: int) -> None:
+        self._pulse.module_unload(index)
+
+    def listen(self, callback: Callable[[str, str, int], None]) -> None:
+        """Bloque en attendant les événements (connexion dédiée) jusqu'à stop_listening"""
+        self._events = pulsectl.Pulse('rpi-assistant-events', server=self.server)
+        try:
+            self._events.event_mask_set('sink', 'sink_input', 'server')
+            self._events.event_callback_set(
+                lambda ev: callback(str(ev.facility), str(ev.t), ev.index))
+            self._events.event_listen()
+        finally:
+            self._events.close()
+            self._events = None
+
+    def stop_listening(self) -> None:
+        if self._events is not None:
+            self._events.event_listen_stop()
+
+    def close(self) -> None:
+        self._pulse.close()
+
+
+class _PactlBackend:
+    """Repli sans pulsectl : pactl en JSON (sans shell, PulseAudio >= 16) et pactl subscribe"""
+
+    # Un processus pactl par changement de volume : pas de rampe, volume cible en une fois
+    volume_ramp = False
+
+    def __init__(self, server: Optional[str]):
+        self.server = server
+        self._subscriber: Optional[subprocess.Popen] = None
+
+    def _pactl(self, *args: str, json_output: bool = False) -> str:
+        return _run_pactl(self.server, *args, json_output=json_output)
+
+    def sinks(self) -> List[Dict[str, Any]]:
+        return [{'index': s['index'], 'name': s['name'], 'description': s.get('description', ''),
+                 'properties': s.get('properties', {})}
+                for s in json.loads(self._pactl('list', 'sinks', json_output=True) or '[]')]
+
+    def default_sink(self) -> Optional[str]:
+        return self._pactl('get-default-sink').strip() or None
+
+    def set_default_sink(self, name: str) -> None:
+        self._pactl('set-default-sink', name)
+
+    def sink_inputs(self) -> List[Dict[str, Any]]:
+        inputs = []
+        for i in json.loads(self._pactl('list', 'sink-inputs', json_output=True) or '[]'):
+            values = [c['value'] / 65536 for c in i.get('volume', {}).values()] or [1.0]
+            inputs.append({'index': i['index'], 'sink': i['sink'], 'properties': i.get('properties', {}),
+                           'volume': sum(values) / len(values), 'channels': len(values)})
+        return inputs
+
+    def set_sink_input_volume(self, index: int, volume: float, channels: int) -> None:
+        self._pactl('set-sink-input-volume', str(index), f'{volume * 100:.1f}%')
+
+    def move_sink_input(self, index: int, sink_index: int) -> None:
+        self._pactl('move-sink-input', str(index), str(sink_index))
+
+    def card_list(self) -> List[Dict[str, Any]]:
+        # Sens des ports absent du JSON de pactl : ports de sortie d'après leur nom
+        return [{'name': card['name'],
+                 'ports': [name for name in card.get('ports', {}) if 'output' in name]}
+                for card in json.loads(self._pactl('list', 'cards', json_output=True) or '[]')]
+
+    def port_offset_set(self, card: str, port: str, offset_us: int) -> None:
+        self._pactl('set-port-latency-offset', card, port, str(offset_us))
+
+    def load_module(self, name: str, args: str) -> Optional[int]:
+        output = self._pactl('load-module', name, *args.split()).strip()
+        return int(output) if output.isdigit() else None
+
+    def unload_module(self, index: int) -> None:
+        self._pactl('unload-module', str(index))
+
+    def listen(self, callback: Callable[[str, str, int], None]) -> None:
+        command = ['pactl'] + (['--server', self.server] if self.server else []) + ['subscribe']
+        # stdin ouvert : le processus voit la fin de l'assistant même sans stop_listening
+        self._subscriber = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL, text=True)
+        try:
+            for line in self._subscriber.stdout:
+                match = _PACTL_EVENT.search(line)
+                if match:
+                    callback(match.group(2).replace('-', '_'), match.group(1), int(match.group(3)))
+        finally:
+            self._subscriber.wait()
+            self._subscriber = None
+
+    def stop_listening(self) -> None:
+        if self._subscriber is not None:
+            self._subscriber.terminate()
+
+    def close(self) -> None:
+        pass
+
+
+class SinkManager:
+    def __init__(self, server: Optional[str] = None):
+        """
+        Initialise le gestionnaire de sinks
+
+        Args:
+            server: Adresse du serveur PulseAudio (ex: unix:/run/user/1000/pulse/native),
+                    par défaut celui de l'environnement
+        """
+        self.server = server
+        self.logger = logging.getLogger(__name__)
+        # Backend imposé (simulation) : fonction recevant server
+        self.backend_factory: Optional[Callable[[Optional[str]], Any]] = None
+
+        self._backend = None
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._sinks: Dict[str, Dict[str, Any]] = {}
+        self._default: Optional[str] = None
+        self._route: Optional[str] = None
+        self._listener: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
+        self._pending = threading.Event()
+        self._refresh_needed = False
+        self._new_inputs: Deque[int] = deque()
+        self._stopping = False
+        self._next_connect = 0.0
+
+    def start(self) -> bool:
+        """
+        Se connecte au serveur et démarre l'écoute des événements (idempotent)
+
+        Returns:
+            True si la connexion est établie
+        """
+        with self._lock:
+            if self._backend is not None:
+                return True
+            if time.monotonic() < self._next_connect:
+                return False
+            try:
+                if self.backend_factory is not None:
+                    self._backend = self.backend_factory(self.server)
+                elif pulsectl is not None:
+                    self._backend = _PulsectlBackend(self.server)
+                elif shutil.which('pactl'):
+                    version = pactl_version()
+                    if version is None or version < PACTL_MIN_VERSION:
+                        found = '.'.join(map(str, version)) if version else 'de version inconnue'
+                        self.logger.error(f"pulsectl non installé et pactl {found} trop ancien "
+                                          f"(PulseAudio 16 requis) : installez python3-pulsectl")
+                        self._next_connect = float('inf')
+                        return False
+                    self.logger.info("pulsectl non installé, utilisation de pactl")
+                    self._backend = _PactlBackend(self.server)
+                else:
+                    self._next_connect = float('inf')
+                    return False
+                self._refresh()
+            except Exception as e:
+                self.logger.warning(f"Serveur de son indisponible: {e}")
+                self._backend = None
+                self._next_connect = time.monotonic() + RECONNECT_DELAY
+                return False
+
+        self._stopping = False
+        self._listener = threading.Thread(target=self._listen, name='audio-sinks')
+        self._listener.daemon = True
+        self._listener.start()
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._process_events, name='audio-sinks-events')
+            self._worker.daemon = True
+            self._worker.start()
+        return True
+
+    def stop(self) -> None:
+        """Arrête l'écoute et ferme la connexion"""
+        self._stopping = True
+        self._pending.set()
+        with self._lock:
+            backend, self._backend = self._backend, None
+        if backend is not None:
+            backend.stop_listening()
+            if self._listener:
+                self._listener.join(timeout=5)
+            backend.close()
+        self._listener = None
+
+    def _listen(self) -> None:
+        """Thread d'écoute : chaque événement met le cache à jour"""
+        backend = self._backend
+        try:
+            backend.listen(self._on_event)
+        except Exception as e:
+            if not self._stopping:
+                self.logger.error(f"Écoute des événements audio interrompue: {e}")
+        if not self._stopping:
+            # Serveur redémarré : reconnexion au prochain appel
+            with self._lock:
+                if self._backend is backend:
+                    self._backend = None
+            backend.close()
+
+    def _on_event(self, facility: str, event: str, index: int) -> None:
+        """Appelé dans le thread d'écoute : note l'événement pour le thread de traitement"""
+        # Les changements de volume (événements 'change' des sinks) ne modifient pas la liste
+        if facility == 'sink' and event != 'change' or facility == 'server':
+            self._refresh_needed = True
+        elif facility == 'sink_input' and event == 'new':
+            self._new_inputs.append(index)
+        else:
+            return
+        self._pending.set()
+
+    def _process_events(self) -> None:
+        """Thread de traitement : l'écoute pulsectl ne permet pas d'appeler le serveur depuis le callback"""
+        while not self._stopping:
+            self._pending.wait()
+            self._pending.clear()
+            try:
+                with self._lock:
+                    if self._backend is None:
+                        continue
+                    if self._refresh_needed:
+                        self._refresh_needed = False
+                        self._refresh()
+                        # La sortie choisie vient peut-être d'apparaître
+                        if self._route:
+                            self._route_inputs()
+                    while self._new_inputs:
+                        index = self._new_inputs.popleft()
+                        if self._route:
+                            self._route_inputs(only_index=index)
+            except Exception as e:
+                self.logger.debug(f"Traitement des événements audio: {e}")
+
+    def _refresh(self) -> None:
+        """Relit les sinks et le sink par défaut (verrou tenu)"""
+        sinks = {sink['name']: sink for sink in self._backend.sinks()}
+        default = self._backend.default_sink()
+        with self._changed:
+            added = set(sinks) - set(self._sinks)
+            removed = set(self._sinks) - set(sinks)
+            self._sinks = sinks
+            self._default = default
+            self._changed.notify_all()
+        for name in added:
+            self.logger.info(f"Sink ajouté: {name}")
+        for name in removed:
+            self.logger.info(f"Sink retiré: {name}")
+
+    def sinks(self) -> List[str]:
+        """Noms des sinks connus (cache)"""
+        self.start()
+        return list(self._sinks)
+
+    def default_sink(self) -> Optional[str]:
+        """Sink par défaut s'il existe (cache)"""
+        self.start()
+        default = self._default
+        return default if default in self._sinks else None
+
+    def find_bluetooth_sink(self, mac_address: str) -> Optional[str]:
+        """
+        Sink bluez d'une enceinte (formats PulseAudio et PipeWire)
+
+        Args:
+            mac_address: Adresse MAC de l'enceinte
+
+        Returns:
+            Nom du sink ou None
+        """
+        self.start()
+        return self._find_bluetooth_sink(mac_address)
+
+    def _find_bluetooth_sink(self, mac_address: str) -> Optional[str]:
+        mac_id = bluetooth_sink_id(mac_address)
+        return next((name for name in self._sinks
+                     if name.startswith('bluez') and mac_id in name.upper()), None)
+
+    def wait_for_sink(self, sink_name: str, timeout: float = 5.0) -> bool:
+        """
+        Attend l'apparition d'un sink (ex: sink combiné qui vient d'être chargé)
+
+        Args:
+            sink_name: Nom du sink
+            timeout: Attente maximale en secondes
+
+        Returns:
+            True si le sink existe
+        """
+        if not self.start():
+            return False
+        with self._changed:
+            return self._changed.wait_for(lambda: sink_name in self._sinks, timeout=timeout)
+
+    def wait_for_bluetooth_sink(self, mac_address: str, timeout: float = 5.0) -> Optional[str]:
+        """
+        Attend l'apparition du sink d'une enceinte qui vient de se connecter
+
+        Args:
+            mac_address: Adresse MAC de l'enceinte
+            timeout: Attente maximale en secondes
+
+        Returns:
+            Nom du sink ou None
+        """
+        if not self.start():
+            return None
+        with self._changed:
+            self._changed.wait_for(lambda: self._find_bluetooth_sink(mac_address), timeout=timeout)
+            return self._find_bluetooth_sink(mac_address)
+
+    def route_to(self, sink_name: str) -> bool:
+        """
+        Utilise un sink comme sortie par défaut et y déplace les flux assistant et Spotify
+
+        Les flux de ces applications créés ensuite y sont aussi déplacés.
+
+        Args:
+            sink_name: Nom du sink
+
+        Returns:
+            True si le routage est appliqué
+        """
+        if not self.start():
+            return False
+        try:
+            with self._lock:
+                self._route = sink_name
+                self._backend.set_default_sink(sink_name)
+                self._default = sink_name
+                self._route_inputs()
+            self.logger.info(f"Sortie audio configurée: {sink_name}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors du routage vers {sink_name}: {e}")
+            return False
+
+    def _route_inputs(self, only_index: Optional[int] = None) -> None:
+        """Déplace les flux concernés vers la sortie choisie (verrou tenu)"""
+        sink = self._sinks.get(self._route)
+        if sink is None:
+            return
+        for stream in self._backend.sink_inputs():
+            if only_index is not None and stream['index'] != only_index:
+                continue
+            if stream['sink'] != sink['index'] and self._is_routed(stream['properties']):
+                self._backend.move_sink_input(stream['index'], sink['index'])
+
+    @staticmethod
+    def _is_routed(properties: Dict[str, str]) -> bool:
+        """Flux de raspotify ou de l'assistant"""
+        if properties.get('application.process.id') == str(os.getpid()):
+            return True
+        return _matches(properties, ROUTED_APPLICATIONS)
+
+    def stream_volumes(self, applications=SPOTIFY_APPLICATIONS) -> Dict[int, Dict[str, float]]:
+        """
+        Volumes des flux d'un ensemble d'applications
+
+        Args:
+            applications: Noms d'applications ou d'exécutables recherchés
+
+        Returns:
+            {index du flux: {'volume': volume linéaire, 'channels': canaux}}
+        """
+        if not self.start():
+            return {}
+        try:
+            with self._lock:
+                return {i['index']: {'volume': i['volume'], 'channels': i['channels']}
+                        for i in self._backend.sink_inputs() if _matches(i['properties'], applications)}
+        except Exception as e:
+            self.logger.warning(f"Erreur lors de la lecture des volumes: {e}")
+            return {}
+
+    def set_stream_volume(self, index: int, volume: float, channels: int = 2) -> bool:
+        """
+        Règle le volume d'un flux (toutes voies)
+
+        Args:
+            index: Index du flux
+            volume: Volume linéaire (1.0 = 100 %)
+            channels: Nombre de voies du flux
+
+        Returns:
+            True si le volume est appliqué
+        """
+        if self._backend is None:
+            return False
+        try:
+            with self._lock:
+                self._backend.set_sink_input_volume(index, volume, channels)
+            return True
+        except Exception as e:
+            # Le flux a pu disparaître (fin de lecture Spotify)
+            self.logger.debug(f"Volume du flux {index}: {e}")
+            return False
+
+    @property
+    def volume_ramp(self) -> bool:
+        """True si le backend supporte des changements de volume rapprochés (rampes)"""
+        return getattr(self._backend, 'volume_ramp', True)
+
+    def card_ports(self) -> Dict[str, List[str]]:
+        """
+        Ports de sortie par carte (bluez_card.XX_XX..., alsa_card...)
+
+        Returns:
+            Noms des ports de sortie par nom de carte (vide si le serveur est indisponible)
+        """
+        if not self.start():
+            return {}
+        try:
+            with self._lock:
+                return {card['name']: card['ports'] for card in self._backend.card_list()}
+        except Exception as e:
+            self.logger.warning(f"Erreur lors de la lecture des cartes: {e}")
+            return {}
+
+    def set_port_latency_offset(self, card: str, port: str, offset_ms: int) -> bool:
+        """
+        Retarde un port de carte (alignement des enceintes d'un groupe)
+
+        Args:
+            card: Nom de la carte
+            port: Nom du port de sortie
+            offset_ms: Décalage de latence en ms
+
+        Returns:
+            True si le décalage est appliqué
+        """
+        if not self.start():
+            return False
+        try:
+            with self._lock:
+                self._backend.port_offset_set(card, port, offset_ms * 1000)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Décalage de latence de {card}/{port}: {e}")
+            return False
+
+    def load_module(self, name: str, args: str) -> Optional[int]:
+        """
+        Charge un module du serveur (ex: module-combine-sink)
+
+        Returns:
+            Index du module ou None
+        """
+        if not self.start():
+            return None
+        try:
+            with self._lock:
+                return self._backend.load_module(name, args)
+        except Exception as e:
+            self.logger.error(f"Erreur lors du chargement de {name}: {e}")
+            return None
+
+    def unload_module(self, index: int) -> None:
+        """Décharge un module chargé par load_module"""
+        if not self.start():
+            return
+        try:
+            with self._lock:
+                self._backend.unload_module(index)
+        except Exception as e:
+            self.logger.warning(f"Erreur lors du déchargement du module {index}: {e}")
+
+
+def user_sink_manager(user: str) -> SinkManager:
+    """
+    Gestionnaire connecté au serveur de son d'un autre utilisateur (portail captif, sudo)
+
+    Args:
+        user: Utilisateur propriétaire du serveur PulseAudio/PipeWire
+
+    Returns:
+        Gestionnaire dédié (protocole pulse sur la socket de l'utilisateur)
+    """
+    account = pwd.getpwnam(user)
+    os.environ.setdefault('PULSE_COOKIE', os.path.join(account.pw_dir, '.config/pulse/cookie'))
+    return SinkManager(server=f'unix:/run/user/{account.pw_uid}/pulse/native')
+
+
+# Connexion partagée par tous les composants
+sink_manager = SinkManager()
+
+
+if __name__ == "__main__":
+    # Suivi des sinks (python3 audio_sinks.py [MAC])
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    if not sink_manager.start():
+        print("Aucun serveur PulseAudio/PipeWire joignable")
+        sys.exit(1)
+
+    print(f"Sinks: {', '.join(sink_manager.sinks())}")
+    print(f"Par défaut: {sink_manager.default_sink()}")
+    if len(sys.argv) > 1:
+        sink = sink_manager.wait_for_bluetooth_sink(sys.argv[1], timeout=10)
+        print(f"Sink de {sys.argv[1]}: {sink}")
+        if sink:
+            sink_manager.route_to(sink)
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sink_manager.stop()
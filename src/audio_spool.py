@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Spool des fichiers audio temporaires de l'assistant Raspberry Pi
+En mémoire (tmpfs /dev/shm) si possible, budget d'octets borné, nettoyage par comptage de références
+"""
+
+import os
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from metrics import SPOOL_EVICTIONS
+
+
+DEFAULT_RAM_DIR = "/dev/shm/rpi-assistant-audio"
+DEFAULT_DISK_DIR = "/tmp/rpi-assistant-audio"
+
+
+def available_memory() -> Optional[int]:
+    """
+    Mémoire disponible selon le noyau (MemAvailable)
+
+    Returns:
+        Octets disponibles ou None si /proc/meminfo est illisible
+    """
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class _SpoolEntry:
+    __slots__ = ('size', 'refs', 'in_ram')
+
+    def __init__(self, in_ram: bool):
+        self.size = 0
+        self.refs = 1
+        self.in_ram = in_ram
+
+
+class AudioSpool:
+    def __init__(self, ram_dir: str = DEFAULT_RAM_DIR, disk_dir: str = DEFAULT_DISK_DIR,
+                 budget_bytes: int = 32 * 1024 * 1024,
+                 min_free_memory: int = 64 * 1024 * 1024):
+        """
+        Initialise le spool audio
+
+        Args:
+            ram_dir: Dossier sur tmpfs, utilisé si la mémoire le permet
+            disk_dir: Dossier de repli sur disque
+            budget_bytes: Taille maximale cumulée des fichiers en mémoire (au-delà : disque)
+            min_free_memory: Mémoire à laisser disponible en plus du budget pour utiliser tmpfs
+        """
+        self.logger = logging.getLogger(__name__)
+        self.budget_bytes = budget_bytes
+        self.disk_dir = disk_dir
+        self.directory = self._select_directory(ram_dir, disk_dir, min_free_memory)
+
+        self._entries: Dict[str, _SpoolEntry] = {}
+        self._total = 0
+        self._ram_total = 0
+        self._lock = threading.Lock()
+
+        self._remove_orphans()
+
+    def _select_directory(self, ram_dir: str, disk_dir: str, min_free_memory: int) -> str:
+        """Choisit tmpfs si la mémoire disponible couvre le budget et la marge"""
+        available = available_memory()
+        if (available is not None and available >= self.budget_bytes + min_free_memory and
+                os.path.isdir(os.path.dirname(ram_dir))):
+            try:
+                os.makedirs(ram_dir, mode=0o700, exist_ok=True)
+                self.logger.info(f"Spool audio en mémoire: {ram_dir}")
+                return ram_dir
+            except OSError as e:
+                self.logger.warning(f"Impossible d'utiliser {ram_dir}: {e}")
+
+        os.makedirs(disk_dir, exist_ok=True)
+        self.logger.info(f"Spool audio sur disque: {disk_dir}")
+        return disk_dir
+
+    def _remove_orphans(self) -> None:
+        """Supprime les fichiers laissés par une exécution précédente (mémoire et disque)"""
+        for directory in {self.directory, self.disk_dir}:
+            if not os.path.isdir(directory):
+                continue
+            try:
+                for filename in os.listdir(directory):
+                    path = os.path.join(directory, filename)
+                    if os.path.isfile(path):
+                        os.remove(path)
+            except OSError as e:
+                self.logger.warning(f"Nettoyage du spool impossible: {e}")
+
+    def allocate(self, prefix: str, suffix: str) -> str:
+        """
+        Réserve un nom de fichier unique, détenu par l'appelant (1 référence)
+
+        Quand les fichiers en mémoire atteignent le budget, le fichier est placé
+        sur disque : un fichier détenu n'est jamais supprimé sous son détenteur.
+
+        Args:
+            prefix: Préfixe (recording, tts...)
+            suffix: Extension (.wav, .mp3...)
+
+        Returns:
+            Chemin du fichier à écrire
+        """
+        with self._lock:
+            directory = self.directory
+            if directory != self.disk_dir and self._ram_total >= self.budget_bytes:
+                directory = self.disk_dir
+                os.makedirs(directory, exist_ok=True)
+                SPOOL_EVICTIONS.inc()
+                self.logger.debug(f"Budget du spool en mémoire atteint ({self._ram_total} octets), "
+                                  f"fichier sur disque")
+            path = os.path.join(directory, f"{prefix}_{uuid.uuid4().hex[:12]}{suffix}")
+            self._entries[path] = _SpoolEntry(directory != self.disk_dir)
+        return path
+
+    def commit(self, path: str) -> None:
+        """
+        Comptabilise la taille d'un fichier écrit
+
+        Args:
+            path: Chemin retourné par allocate
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return
+            self._total += size - entry.size
+            if entry.in_ram:
+                self._ram_total += size - entry.size
+            entry.size = size
+
+    def acquire(self, path: str) -> None:
+        """Ajoute une référence à un fichier du spool"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry.refs += 1
+
+    def release(self, path: str) -> bool:
+        """
+        Retire une référence ; le fichier est supprimé à la dernière
+
+        Args:
+            path: Chemin du fichier
+
+        Returns:
+            True si le fichier appartient au spool
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return False
+            entry.refs -= 1
+            if entry.refs <= 0:
+                self._delete(path)
+            return True
+
+    @contextmanager
+    def hold(self, path: str) -> Iterator[str]:
+        """Référence temporaire pendant l'utilisation d'un fichier"""
+        self.acquire(path)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def owns(self, path: str) -> bool:
+        """True si le fichier est géré par le spool"""
+        with self._lock:
+            return path in self._entries
+
+    def _delete(self, path: str) -> None:
+        """Supprime un fichier et son entrée (verrou tenu)"""
+        entry = self._entries.pop(path)
+        self._total -= entry.size
+        if entry.in_ram:
+            self._ram_total -= entry.size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Impossible de supprimer {path}: {e}")
+
+    def usage(self) -> int:
+        """Octets actuellement comptabilisés dans le spool"""
+        return self._total
+
+    def ram_usage(self) -> int:
+        """Octets des fichiers du spool en mémoire (tmpfs)"""
+        return self._ram_total
+
+    def use_disk(self) -> bool:
+        """
+        Place les prochains fichiers sur disque (pression mémoire : tmpfs occupe la RAM)
+
+        Returns:
+            True si le spool quitte tmpfs
+        """
+        if self.directory == self.disk_dir:
+            return False
+        os.makedirs(self.disk_dir, exist_ok=True)
+        self.directory = self.disk_dir
+        return True
+
+    def clear(self) -> None:
+        """Supprime tous les fichiers du spool"""
+        with self._lock:
+            for path in list(self._entries):
+                self._delete(path)
+            self._remove_orphans()
+
+
+if __name__ == "__main__":
+    # Test du spool audio
+    logging.basicConfig(level=logging.INFO)
+
+    spool = AudioSpool(budget_bytes=4096)
+    print(f"Dossier: {spool.directory}")
+
+    paths = []
+    for i in range(3):
+        path = spool.allocate('test', '.raw')
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * 2048)
+        spool.commit(path)
+        paths.append(path)
+        print(f"{path}: spool {spool.usage()} octets dont {spool.ram_usage()} en mémoire")
+
+    for path in paths:
+        spool.release(path)
+    print(f"Après libération: {spool.usage()} octets")
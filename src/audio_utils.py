@@ -5,15 +5,25 @@ Gère l'enregistrement audio et la synthèse vocale
 """
 
 import os
+import json
 import time
+import hashlib
 import logging
+import struct
 import subprocess
 import tempfile
+import threading
 import wave
-import pyaudio
-from typing import Optional, Tuple
-from gtts import gTTS
-import pygame
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from tracing import tracer
+from metrics import CACHE_REQUESTS, FAILURES, RETRIES, metrics
+from audio_spool import AudioSpool, DEFAULT_DISK_DIR
+from audio_encoder import CODECS, StreamingEncoder, encoder_available
+from audio_sinks import sink_manager
+from audio_mixer import SpeechOutput
+from memory_governor import CRITICAL, memory_governor
+from thermal_governor import thermal_governor
 
 class AudioManager:
     def __init__(self, config_manager):
@@ -30,20 +40,108 @@ class AudioManager:
         self.sample_rate = self.config_manager.get_int_value('gpt', 'sample_rate', 44100)
         self.channels = 1
         self.chunk_size = 1024
-        self.audio_format = pyaudio.paInt16
         
-        # Initialiser PyAudio
-        self.pyaudio = pyaudio.PyAudio()
+        # PyAudio et pygame sont importés au premier usage : leur import prend
+        # plusieurs secondes sur Pi Zero et pygame ne sert qu'à la lecture locale
+        self._pyaudio_module = None
+        self._pyaudio = None
+        self._pygame = None
+        # Protège PyAudio contre sa libération par le gouverneur mémoire pendant un usage
+        self._pa_lock = threading.RLock()
+        self._capturing = False
+        # Index du micro, recherché une fois (la recherche parcourt tous les périphériques)
+        self._input_device: Optional[int] = None
+        self._input_device_known = False
+        # Durée réellement capturée par le dernier enregistrement (secondes)
+        self.last_capture_seconds = 0.0
+        
+        # Flux de sortie persistant (ouvert une fois, réutilisé) : fréquence d'espeak-ng
+        self.output_rate = 22050
+        self._output_stream = None
+        # Voix de l'assistant sur ce flux unique, Spotify atténué pendant la lecture
+        self.speech = SpeechOutput(self.config_manager, self._get_output_stream,
+                                   self._close_output_stream, self.output_rate, self.chunk_size)
+        
+        # Cache persistant entre redémarrages (sonde audio, messages fixes)
+        self.cache_dir = self.config_manager.get_value('gpt', 'cache_dir', '/opt/rpi-assistant/cache')
+        self.probe_max_age = self.config_manager.get_int_value('gpt', 'audio_probe_max_age_hours', 24) * 3600
+        
+        # Spool des fichiers audio temporaires (tmpfs si la mémoire le permet)
+        self.spool = AudioSpool(
+            ram_dir=self.config_manager.get_value('gpt', 'spool_dir', '/dev/shm/rpi-assistant-audio'),
+            disk_dir=DEFAULT_DISK_DIR,
+            budget_bytes=self.config_manager.get_int_value('gpt', 'spool_budget_mb', 32) * 1024 * 1024,
+            min_free_memory=self.config_manager.get_int_value('gpt', 'spool_min_free_memory_mb', 64) * 1024 * 1024
+        )
+        self.temp_dir = self.spool.directory
+        self._encoder_warned = False
         
-        # Initialiser pygame pour la lecture audio
-        pygame.mixer.init()
+        # Désactivé par la politique réseau quand la connexion est mauvaise
+        self.cloud_tts_enabled = True
+        metrics.gauge('assistant_spool_bytes', "Octets des fichiers audio temporaires",
+                      self.spool.usage)
+        memory_governor.register('audio', usage=self.spool.ram_usage, release=self.release_memory)
         
-        # Répertoire temporaire pour les fichiers audio
-        self.temp_dir = "/tmp/rpi-assistant-audio"
-        os.makedirs(self.temp_dir, exist_ok=True)
+        self.config_manager.subscribe(self.on_config_changed)
         
         self.logger.info("Gestionnaire audio initialisé")
     
+    def on_config_changed(self, old, new, changes: Dict[str, set]) -> None:
+        """
+        Applique les paramètres audio rechargés (pris en compte à la prochaine capture)
+        
+        Args:
+            old: Instantané précédent
+            new: Nouvel instantané
+            changes: Clés modifiées par configuration
+        """
+        gpt_changes = changes.get('gpt', set())
+        if 'sample_rate' in gpt_changes:
+            self.sample_rate = self.config_manager.get_int_value('gpt', 'sample_rate', 44100)
+        if 'audio_probe_max_age_hours' in gpt_changes:
+            self.probe_max_age = self.config_manager.get_int_value('gpt', 'audio_probe_max_age_hours', 24) * 3600
+    
+    @property
+    def pyaudio(self):
+        """Instance PyAudio, créée au premier usage"""
+        with self._pa_lock:
+            if self._pyaudio is None:
+                with memory_governor.measure('audio'):
+                    import pyaudio
+                    self._pyaudio_module = pyaudio
+                    self._pyaudio = pyaudio.PyAudio()
+            return self._pyaudio
+    
+    @property
+    def audio_format(self) -> int:
+        """Format d'échantillon PyAudio (16 bits signés)"""
+        if self._pyaudio_module is None:
+            self.pyaudio
+        return self._pyaudio_module.paInt16
+    
+    def _get_mixer(self):
+        """Mixer pygame, initialisé seulement pour la lecture locale"""
+        if self._pygame is None:
+            with memory_governor.measure('audio'):
+                import pygame
+                pygame.mixer.init()
+            self._pygame = pygame
+        return self._pygame.mixer
+    
+    def warm_up(self) -> bool:
+        """
+        Prépare la capture audio (import PyAudio et recherche du micro)
+        
+        Returns:
+            True si le backend de capture est disponible
+        """
+        try:
+            self.input_device()
+            return True
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'initialisation audio: {e}")
+            return False
+    
     def list_audio_devices(self) -> None:
         """Liste tous les périphériques audio disponibles"""
         self.logger.info("Périphériques audio disponibles:")
@@ -76,59 +174,159 @@ class AudioManager:
         self.logger.warning("Aucun micro USB trouvé, utilisation du périphérique par défaut")
         return None
     
-    def record_audio(self, duration: int, output_file: str = None) -> Optional[str]:
+    def input_device(self) -> Optional[int]:
+        """Index du micro de capture, mis en cache jusqu'à un échec d'ouverture"""
+        if not self._input_device_known:
+            self._input_device = self.find_usb_microphone()
+            self._input_device_known = True
+        return self._input_device
+    
+    def capture_rate(self) -> int:
+        """Fréquence de la prochaine capture (réduite par le gouverneur thermique)"""
+        return thermal_governor.capture_rate(self.sample_rate)
+    
+    def _create_upload_encoder(self, codec: Optional[str] = None,
+                               compression_level: Optional[float] = None,
+                               sample_rate: Optional[int] = None) -> Optional[StreamingEncoder]:
+        """Encodeur en processus selon upload_codec, ou None (repli WAV + ffmpeg)"""
+        codec = codec or self.config_manager.get_value('gpt', 'upload_codec', 'flac').lower()
+        sample_rate = sample_rate or self.sample_rate
+        if codec == 'mp3':
+            return None
+        if not encoder_available(codec, sample_rate):
+            if not self._encoder_warned:
+                self.logger.warning(f"Encodeur {codec} indisponible à {sample_rate} Hz, "
+                                    f"repli sur ffmpeg")
+                self._encoder_warned = True
+            return None
+        
+        output_file = self.spool.allocate('recording', CODECS[codec][2])
+        level = compression_level
+        if level is None:
+            level = self.config_manager.get_float_value('gpt', 'upload_compression_level', 0.5)
+        return StreamingEncoder(output_file, codec, sample_rate, self.channels, level).start()
+    
+    def record_audio(self, duration: int, output_file: str = None, encode: bool = False,
+                     codec: Optional[str] = None,
+                     compression_level: Optional[float] = None,
+                     until: Optional[Callable[[], Optional[float]]] = None,
+                     tail: float = 0.0,
+                     started_at: Optional[float] = None) -> Optional[str]:
         """
         Enregistre l'audio depuis le microphone
         
         Args:
-            duration: Durée d'enregistrement en secondes
+            duration: Durée d'enregistrement en secondes (durée maximale si until est fourni)
             output_file: Chemin du fichier de sortie (optionnel)
+            encode: Encoder pendant la capture pour l'envoi (FLAC/Opus au lieu de WAV)
+            codec: Codec d'envoi (par défaut upload_codec)
+            compression_level: Niveau de compression (par défaut upload_compression_level)
+            until: Horodatage (time.monotonic) du relâchement du bouton, None tant
+                qu'il est appuyé : la capture s'arrête à ce relâchement plus tail
+            tail: Durée capturée après le relâchement (secondes)
+            started_at: Horodatage (time.monotonic) de l'appui : la durée capturée est
+                comptée depuis cet instant, même si le flux s'ouvre après le relâchement
             
         Returns:
             Chemin du fichier audio enregistré ou None en cas d'erreur
         """
         if output_file is None:
-            output_file = os.path.join(self.temp_dir, f"recording_{int(time.time())}.wav")
+            output_file = self.spool.allocate('recording', '.wav')
+        # SoC très chaud : capture à fréquence réduite (moins de calcul à chaque bloc)
+        sample_rate = self.capture_rate()
+        if sample_rate != self.sample_rate:
+            thermal_governor.adapted('sample_rate')
+        encoder = self._create_upload_encoder(codec, compression_level, sample_rate) if encode else None
+        stream = None
+        wav = None
+        self._capturing = True
+        self.last_capture_seconds = 0.0
         
         try:
             self.logger.info(f"Début d'enregistrement audio ({duration}s)...")
             
             # Trouver le micro USB
-            input_device = self.find_usb_microphone()
-            
-            # Configurer le stream audio
-            stream = self.pyaudio.open(
-                format=self.audio_format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=input_device,
-                frames_per_buffer=self.chunk_size
-            )
-            
-            # Enregistrer l'audio
-            frames = []
-            for i in range(0, int(self.sample_rate / self.chunk_size * duration)):
-                data = stream.read(self.chunk_size)
-                frames.append(data)
-            
-            # Fermer le stream
+            with tracer.span('audio.open_stream'):
+                input_device = self.input_device()
+                
+                # Configurer le stream audio
+                stream = self.pyaudio.open(
+                    format=self.audio_format,
+                    channels=self.channels,
+                    rate=sample_rate,
+                    input=True,
+                    input_device_index=input_device,
+                    frames_per_buffer=self.chunk_size
+                )
+            
+            # Enregistrer l'audio ; chaque bloc part aussitôt dans l'encodeur et dans
+            # le WAV de secours, sans accumuler la capture en mémoire
+            wav = wave.open(output_file, 'wb')
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(self.pyaudio.get_sample_size(self.audio_format))
+            wav.setframerate(sample_rate)
+            frame_bytes = self.channels * self.pyaudio.get_sample_size(self.audio_format)
+            limit = int(sample_rate * duration)
+            captured = 0
+            started = started_at if started_at is not None else time.monotonic()
+            with tracer.span('audio.capture', seconds=duration, hold=until is not None):
+                while captured < limit:
+                    data = stream.read(self.chunk_size)
+                    released = until() if until else None
+                    if released is not None:
+                        # Arrêt au front montant (plus la traîne), pas au bloc suivant
+                        limit = min(limit, max(0, int((released + tail - started) * sample_rate)))
+                    data = data[:max(0, limit - captured) * frame_bytes]
+                    captured += len(data) // frame_bytes
+                    wav.writeframes(data)
+                    if encoder:
+                        encoder.feed(data)
+            self.last_capture_seconds = captured / sample_rate
+            if until:
+                self.logger.info(f"Capture: {self.last_capture_seconds:.2f}s")
+            
+            # Fermer le stream et le WAV de secours
             stream.stop_stream()
             stream.close()
-            
-            # Sauvegarder le fichier WAV
-            with wave.open(output_file, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.pyaudio.get_sample_size(self.audio_format))
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(b''.join(frames))
+            stream = None
+            wav.close()
+            self.spool.commit(output_file)
+            
+            # L'encodage a suivi la capture : seuls les derniers blocs restent
+            if encoder:
+                with tracer.span('audio.encode_tail', codec=encoder.codec):
+                    encoded_file = encoder.finish()
+                if encoded_file:
+                    self.spool.commit(encoded_file)
+                    self.cleanup_file(output_file)
+                    self.logger.info(f"Enregistrement terminé: {encoded_file} "
+                                     f"(encodage {encoder.encode_seconds * 1000:.0f} ms CPU)")
+                    return encoded_file
+                self.cleanup_file(encoder.output_file)
+                encoder = None
             
             self.logger.info(f"Enregistrement terminé: {output_file}")
             return output_file
             
         except Exception as e:
             self.logger.error(f"Erreur lors de l'enregistrement: {e}")
+            # Micro débranché ou renuméroté : nouvelle recherche à la prochaine capture
+            self._input_device_known = False
+            if stream is not None:
+                stream.close()
+            if encoder:
+                encoder.finish()
+                self.cleanup_file(encoder.output_file)
+            self.cleanup_file(output_file)
             return None
+        
+        finally:
+            if wav is not None:
+                try:
+                    wav.close()
+                except Exception:
+                    pass
+            self._capturing = False
     
     def convert_to_mp3(self, wav_file: str) -> Optional[str]:
         """
@@ -140,9 +338,9 @@ class AudioManager:
         Returns:
             Chemin du fichier MP3 ou None en cas d'erreur
         """
+        mp3_file = self.spool.allocate('upload', '.mp3')
+        
         try:
-            mp3_file = wav_file.replace('.wav', '.mp3')
-            
             # Utiliser ffmpeg pour la conversion
             command = [
                 'ffmpeg', '-i', wav_file,
@@ -152,17 +350,21 @@ class AudioManager:
                 mp3_file
             ]
             
-            result = subprocess.run(command, capture_output=True, text=True)
+            with tracer.span('audio.convert_mp3'):
+                result = subprocess.run(command, capture_output=True, text=True)
             
             if result.returncode == 0:
+                self.spool.commit(mp3_file)
                 self.logger.info(f"Conversion réussie: {mp3_file}")
                 return mp3_file
             else:
                 self.logger.error(f"Erreur de conversion: {result.stderr}")
+                self.cleanup_file(mp3_file)
                 return None
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la conversion: {e}")
+            self.cleanup_file(mp3_file)
             return None
     
     def text_to_speech(self, text: str, language: str = 'fr') -> Optional[str]:
@@ -176,26 +378,34 @@ class AudioManager:
         Returns:
             Chemin du fichier audio généré ou None en cas d'erreur
         """
+        # Générer le fichier audio
+        output_file = self.spool.allocate('tts', '.mp3')
+        
         try:
-            self.logger.info(f"Génération TTS: {text[:50]}...")
+            self.logger.debug(f"Génération TTS: {text[:50]}...")
             
-            # Générer le fichier audio
-            output_file = os.path.join(self.temp_dir, f"tts_{int(time.time())}.mp3")
+            from gtts import gTTS
             
-            tts = gTTS(text=text, lang=language, slow=False)
-            tts.save(output_file)
+            with tracer.span('tts.gtts', chars=len(text)):
+                tts = gTTS(text=text, lang=language, slow=False)
+                tts.save(output_file)
+            self.spool.commit(output_file)
             
             self.logger.info(f"TTS généré: {output_file}")
             return output_file
             
         except Exception as e:
             self.logger.error(f"Erreur lors de la génération TTS: {e}")
+            self.cleanup_file(output_file)
             return None
     
     def espeak_tts(self, text: str, language: str = 'fr') -> bool:
         """
         Utilise espeak pour la synthèse vocale (plus rapide, offline)
         
+        Le PCM produit sur la sortie standard est joué au fil de la synthèse
+        sur le flux de sortie persistant.
+        
         Args:
             text: Texte à dire
             language: Langue de synthèse
@@ -204,7 +414,7 @@ class AudioManager:
             True si la synthèse a réussi
         """
         try:
-            self.logger.info(f"Synthèse vocale espeak: {text[:50]}...")
+            self.logger.debug(f"Synthèse vocale espeak: {text[:50]}...")
             
             # Utiliser espeak-ng pour la synthèse
             command = [
@@ -212,22 +422,71 @@ class AudioManager:
                 '-v', language,
                 '-s', '150',  # Vitesse de parole
                 '-a', '50',   # Amplitude
+                '--stdout',
                 text
             ]
             
-            result = subprocess.run(command, capture_output=True, text=True)
+            with tracer.span('tts.espeak', chars=len(text)):
+                success = self.speech.play(self._command_pcm(command, wav_header=True))
             
-            if result.returncode == 0:
+            if success:
                 self.logger.info("Synthèse vocale réussie")
-                return True
-            else:
-                self.logger.error(f"Erreur espeak: {result.stderr}")
-                return False
+            return success
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la synthèse espeak: {e}")
             return False
     
+    def _command_pcm(self, command, wav_header: bool = False) -> Iterator[bytes]:
+        """
+        Blocs PCM produits sur la sortie standard d'une commande
+        
+        Args:
+            command: Commande (espeak-ng --stdout, ffmpeg ... -f s16le -)
+            wav_header: La sortie commence par un en-tête WAV à vérifier
+        """
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            if wav_header:
+                header = process.stdout.read(44)
+                if len(header) < 44 or header[:4] != b'RIFF':
+                    raise RuntimeError(f"{command[0]}: sortie WAV invalide")
+                channels, rate = struct.unpack('<HI', header[22:28])
+                bits = struct.unpack('<H', header[34:36])[0]
+                if (channels, rate, bits) != (1, self.output_rate, 16):
+                    raise RuntimeError(f"{command[0]}: format {channels}x{rate} Hz/{bits} bits non pris en charge")
+            
+            while True:
+                chunk = process.stdout.read(self.chunk_size * 2)
+                if not chunk:
+                    break
+                yield chunk
+            
+            if process.wait(timeout=10) != 0:
+                raise RuntimeError(f"{command[0]}: {process.stderr.read().decode(errors='replace').strip()}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+    
+    def _file_pcm(self, audio_file: str) -> Iterator[bytes]:
+        """Blocs PCM d'un fichier audio au format du flux de sortie (décodé par ffmpeg si besoin)"""
+        if audio_file.endswith('.wav'):
+            with wave.open(audio_file, 'rb') as wf:
+                if (wf.getnchannels(), wf.getframerate(), wf.getsampwidth()) == (1, self.output_rate, 2):
+                    while True:
+                        chunk = wf.readframes(self.chunk_size)
+                        if not chunk:
+                            return
+                        yield chunk
+        
+        yield from self._command_pcm([
+            'ffmpeg', '-v', 'error', '-i', audio_file,
+            '-f', 's16le', '-ac', '1', '-ar', str(self.output_rate), '-'
+        ])
+    
     def play_audio_file(self, audio_file: str) -> bool:
         """
         Lit un fichier audio via pygame
@@ -242,12 +501,14 @@ class AudioManager:
             self.logger.info(f"Lecture audio: {audio_file}")
             
             # Charger et lire le fichier
-            pygame.mixer.music.load(audio_file)
-            pygame.mixer.music.play()
-            
-            # Attendre la fin de la lecture
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+            with tracer.span('playback.local'):
+                mixer = self._get_mixer()
+                mixer.music.load(audio_file)
+                mixer.music.play()
+                
+                # Attendre la fin de la lecture
+                while mixer.music.get_busy():
+                    time.sleep(0.1)
             
             self.logger.info("Lecture audio terminée")
             return True
@@ -269,10 +530,15 @@ class AudioManager:
         try:
             self.logger.info(f"Lecture audio via Bluetooth: {audio_file}")
             
-            # Utiliser paplay pour forcer la lecture sur l'enceinte Bluetooth
-            command = ['paplay', audio_file]
-            
-            result = subprocess.run(command, capture_output=True, text=True)
+            # Flux persistant : pas de nouveau flux A2DP par message
+            with tracer.span('playback.bluetooth'):
+                if self.speech.play(self._file_pcm(audio_file)):
+                    self.logger.info("Lecture Bluetooth réussie")
+                    return True
+                
+                # Repli : paplay, Spotify toujours atténué
+                with self.speech.ducker.ducked():
+                    result = subprocess.run(['paplay', audio_file], capture_output=True, text=True)
             
             if result.returncode == 0:
                 self.logger.info("Lecture Bluetooth réussie")
@@ -301,10 +567,17 @@ class AudioManager:
                 # Essayer d'abord espeak direct (plus rapide)
                 if self.espeak_tts(text):
                     return True
+                RETRIES.inc(stage='tts')
+            
+            if not self.cloud_tts_enabled or not memory_governor.allows('cloud_tts'):
+                FAILURES.inc(stage='tts')
+                return False
             
             # Fallback vers gTTS + lecture fichier
             audio_file = self.text_to_speech(text)
-            if audio_file:
+            if not audio_file:
+                FAILURES.inc(stage='tts')
+            else:
                 if use_bluetooth:
                     success = self.play_audio_via_bluetooth(audio_file)
                 else:
@@ -353,6 +626,138 @@ class AudioManager:
             self.logger.error(f"Erreur lors du test audio: {e}")
             return False
     
+    def _get_output_stream(self):
+        """Flux de sortie PyAudio persistant vers le sink par défaut"""
+        with self._pa_lock:
+            if self._output_stream is None:
+                self._output_stream = self.pyaudio.open(
+                    format=self.audio_format,
+                    channels=1,
+                    rate=self.output_rate,
+                    output=True,
+                    frames_per_buffer=self.chunk_size
+                )
+            return self._output_stream
+    
+    def _close_output_stream(self) -> None:
+        """Ferme le flux de sortie persistant (rouvert à la prochaine lecture)"""
+        stream, self._output_stream = self._output_stream, None
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+    
+    def get_default_sink(self) -> Optional[str]:
+        """
+        Récupère le sink PulseAudio par défaut s'il existe
+        
+        Returns:
+            Nom du sink ou None
+        """
+        try:
+            return sink_manager.default_sink()
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la recherche du sink: {e}")
+            return None
+    
+    def probe_output(self) -> bool:
+        """
+        Sonde silencieuse de la sortie audio : sink présent, flux ouvert, trame muette écrite
+        
+        Returns:
+            True si la sortie audio est prête
+        """
+        try:
+            if not self.get_default_sink():
+                self.logger.warning("Aucun sink audio par défaut")
+                return False
+            
+            # 20 ms de silence sur le flux persistant
+            frames = self.output_rate // 50
+            return self.speech.play([b'\x00\x00' * frames], timeout=5)
+            
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la sonde audio: {e}")
+            return False
+    
+    def check_audio_ready(self) -> bool:
+        """
+        Vérifie que la sortie audio est prête, sans rien jouer
+        
+        Le résultat est conservé entre redémarrages : tant que le sink par
+        défaut est le même et que la sonde est récente, seule la présence
+        du sink est revérifiée.
+        
+        Returns:
+            True si la sortie audio est prête
+        """
+        cache_file = os.path.join(self.cache_dir, 'audio_probe.json')
+        sink = self.get_default_sink()
+        
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if (sink and cached.get('ok') and cached.get('sink') == sink and
+                    time.time() - cached.get('checked_at', 0) < self.probe_max_age):
+                CACHE_REQUESTS.inc(cache='audio_probe', result='hit')
+                self.logger.info(f"Sortie audio prête (sonde en cache, sink {sink})")
+                return True
+        except (OSError, ValueError):
+            pass
+        
+        CACHE_REQUESTS.inc(cache='audio_probe', result='miss')
+        ok = self.probe_output()
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'ok': ok, 'sink': sink, 'checked_at': time.time()}, f)
+        except OSError as e:
+            self.logger.warning(f"Impossible d'enregistrer la sonde audio: {e}")
+        
+        self.logger.info(f"Sonde audio: {'OK' if ok else 'échec'} (sink {sink})")
+        return ok
+    
+    def play_cached_prompt(self, text: str, language: str = 'fr') -> bool:
+        """
+        Joue un message fixe depuis un clip synthétisé une seule fois
+        
+        Args:
+            text: Texte du message
+            language: Langue de synthèse
+            
+        Returns:
+            True si la lecture a réussi
+        """
+        digest = hashlib.sha1(f"{language}:{text}".encode('utf-8')).hexdigest()[:16]
+        clip = os.path.join(self.cache_dir, f"prompt_{digest}.wav")
+        
+        if os.path.exists(clip):
+            CACHE_REQUESTS.inc(cache='prompt', result='hit')
+        elif not memory_governor.allows('cache_warmup'):
+            # Pression mémoire : synthèse directe, mise en cache reportée
+            return self.speak_text(text)
+        elif not thermal_governor.allows('cache_warmup'):
+            # SoC chaud : synthèse directe, mise en cache reportée
+            thermal_governor.adapted('cache_warmup')
+            return self.speak_text(text)
+        else:
+            CACHE_REQUESTS.inc(cache='prompt', result='miss')
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                partial = clip + '.part'
+                command = ['espeak-ng', '-v', language, '-s', '150', '-a', '50', '-w', partial, text]
+                with tracer.span('tts.espeak', chars=len(text)):
+                    result = subprocess.run(command, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self.logger.error(f"Erreur espeak: {result.stderr}")
+                    return self.speak_text(text)
+                os.replace(partial, clip)
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la mise en cache du message: {e}")
+                return self.speak_text(text)
+        
+        return self.play_audio_via_bluetooth(clip)
+    
     def test_audio_playback(self) -> bool:
         """
         Test la lecture audio
@@ -374,25 +779,59 @@ class AudioManager:
     
     def cleanup_file(self, file_path: str) -> None:
         """
-        Supprime un fichier temporaire
+        Libère un fichier temporaire (supprimé à la dernière référence s'il vient du spool)
         
         Args:
             file_path: Chemin du fichier à supprimer
         """
         try:
+            if self.spool.release(file_path):
+                return
             if os.path.exists(file_path):
                 os.remove(file_path)
                 self.logger.debug(f"Fichier supprimé: {file_path}")
         except Exception as e:
             self.logger.warning(f"Impossible de supprimer {file_path}: {e}")
     
+    def release_memory(self, level: str) -> None:
+        """
+        Libère la mémoire audio inutilisée (appelé par le gouverneur mémoire)
+        
+        PyAudio et le mixer pygame sont déchargés s'ils ne servent pas (rechargés
+        au prochain usage), les clips en cache quittent le cache de pages ; en
+        situation critique, les fichiers du spool sans référence sont supprimés.
+        
+        Args:
+            level: Niveau de pression (pressure ou critical)
+        """
+        with self._pa_lock:
+            if self._pyaudio is not None and self._output_stream is None and not self._capturing:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+                self._input_device_known = False
+                self.logger.info("PyAudio déchargé (pression mémoire)")
+        if self._pygame is not None and not self._pygame.mixer.get_busy():
+            self._pygame.mixer.quit()
+            self._pygame = None
+        if self._pyaudio is None and self._pygame is None:
+            memory_governor.unloaded('audio')
+        
+        # Les clips en cache sont relus depuis la carte SD au besoin
+        try:
+            for filename in os.listdir(self.cache_dir):
+                with open(os.path.join(self.cache_dir, filename), 'rb') as f:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except (OSError, AttributeError):
+            pass
+        
+        if level == CRITICAL and self.spool.use_disk():
+            self.temp_dir = self.spool.directory
+            self.logger.warning(f"Spool audio déplacé sur disque: {self.spool.directory}")
+    
     def cleanup_temp_files(self) -> None:
         """Supprime tous les fichiers temporaires"""
         try:
-            for filename in os.listdir(self.temp_dir):
-                file_path = os.path.join(self.temp_dir, filename)
-                if os.path.isfile(file_path):
-                    self.cleanup_file(file_path)
+            self.spool.clear()
             
             self.logger.info("Fichiers temporaires nettoyés")
             
@@ -441,8 +880,11 @@ class AudioManager:
     def __del__(self):
         """Nettoyage lors de la destruction de l'objet"""
         try:
-            self.pyaudio.terminate()
-            pygame.mixer.quit()
+            self.speech.stop()
+            if self._pyaudio is not None:
+                self._pyaudio.terminate()
+            if self._pygame is not None:
+                self._pygame.mixer.quit()
             self.cleanup_temp_files()
         except:
             pass
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Machine d'états de la connexion Bluetooth pour l'assistant Raspberry Pi
+Découverte, appairage et reconnexion en arrière-plan avec délai exponentiel et gigue
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Optional
+
+from metrics import BLUETOOTH_RECONNECTS, BLUETOOTH_RECONNECT_LATENCY, metrics
+
+
+UNKNOWN = 'unknown'
+DISCOVERING = 'discovering'
+PAIRED = 'paired'
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+DEGRADED = 'degraded'
+
+STATES = (UNKNOWN, DISCOVERING, PAIRED, CONNECTING, CONNECTED, DEGRADED)
+
+# Échecs de reconnexion avant de relancer une découverte complète
+MAX_FAILURES_BEFORE_DISCOVERY = 5
+
+STATE_TRANSITIONS = metrics.counter(
+    'bluetooth_state_transitions_total', "Transitions de la connexion Bluetooth", ['state'])
+
+
+class BluetoothConnection:
+    def __init__(self, bluetooth_manager, config_manager):
+        """
+        Initialise la machine d'états
+
+        Args:
+            bluetooth_manager: Gestionnaire Bluetooth (commandes bluetoothctl)
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.manager = bluetooth_manager
+        self.config_manager = config_manager
+        self.logger = logging.getLogger(__name__)
+
+        self.state = UNKNOWN
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.state_since = time.monotonic()
+
+        self._initialized = False
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        metrics.gauge('bluetooth_state', "État de la connexion (index dans unknown..degraded)",
+                      lambda: STATES.index(self.state))
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Démarre la machine d'états dans un thread dédié"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='bluetooth-connection')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête la machine d'états"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def reset(self) -> None:
+        """Oublie l'enceinte courante et relance la découverte (changement de configuration)"""
+        self.manager.target_speaker = None
+        self.manager.target_mac = None
+        self.failures = 0
+        self.next_attempt = 0.0
+        self._set_state(UNKNOWN)
+        self._wake.set()
+
+    def wait_connected(self, deadline: Optional[float] = None) -> bool:
+        """
+        Attend l'état connecté sans jamais exécuter bluetoothctl dans l'appelant
+
+        Args:
+            deadline: Attente maximale en secondes (par défaut command_deadline_ms)
+
+        Returns:
+            True si l'enceinte est connectée avant l'échéance
+        """
+        if self.state == CONNECTED:
+            return True
+
+        if deadline is None:
+            deadline = self.config_manager.get_int_value('bluetooth', 'command_deadline_ms', 1500) / 1000.0
+
+        # Une commande est en attente : réessayer sans attendre la fin du délai
+        if self.state == DEGRADED:
+            self.next_attempt = 0.0
+        self.start()
+        self._wake.set()
+
+        with self._condition:
+            self._condition.wait_for(lambda: self.state == CONNECTED, timeout=deadline)
+            return self.state == CONNECTED
+
+    def _set_state(self, state: str) -> None:
+        with self._condition:
+            if state == self.state:
+                return
+            self.logger.info(f"Bluetooth: {self.state} -> {state}")
+            self.state = state
+            self.state_since = time.monotonic()
+            STATE_TRANSITIONS.inc(state=state)
+            self._condition.notify_all()
+
+    def _backoff(self) -> None:
+        """Prochaine tentative après un délai exponentiel avec gigue"""
+        self.failures += 1
+        base = 2.0 * 2 ** min(self.failures - 1, 10)
+        maximum = self.config_manager.get_int_value('bluetooth', 'backoff_max', 300)
+        delay = min(maximum, base) * random.uniform(0.5, 1.5)
+        self.next_attempt = time.monotonic() + delay
+        self.logger.info(f"Bluetooth: nouvelle tentative dans {delay:.1f} s (échec {self.failures})")
+
+    def _sleep(self, seconds: float) -> None:
+        """Attend, en se réveillant sur demande (commande, configuration, arrêt)"""
+        if seconds > 0:
+            self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _run(self) -> None:
+        """Boucle de la machine d'états"""
+        while not self._stop.is_set():
+            try:
+                delay = self.next_attempt - time.monotonic()
+                if self.state != CONNECTED and delay > 0:
+                    self._sleep(delay)
+                    continue
+                self._step()
+            except Exception as e:
+                self.logger.error(f"Erreur de la machine d'états Bluetooth: {e}")
+                self._set_state(DEGRADED)
+                self._backoff()
+
+    def _step(self) -> None:
+        """Exécute une transition depuis l'état courant"""
+        manager = self.manager
+        # Alimentation, agent et déblocage rfkill avant toute connexion (groupe compris)
+        if not self._initialized:
+            self._initialized = manager.initialize()
+
+        if manager.group:
+            # Groupe : chaque enceinte a sa propre reconnexion, on suit l'ensemble
+            self._set_state(CONNECTED if manager.group.ensure() else DEGRADED)
+            self._sleep(self._check_interval())
+            return
+
+        if self.state in (UNKNOWN, DISCOVERING):
+            if manager.target_mac:
+                self._set_state(PAIRED if manager._is_device_paired(manager.target_mac) else DISCOVERING)
+                if self.state == PAIRED:
+                    return
+
+            self._set_state(DISCOVERING)
+            speaker = manager.target_mac and {'mac': manager.target_mac} or manager.find_target_speaker()
+            if not speaker:
+                self._set_state(UNKNOWN)
+                self._backoff()
+                return
+
+            mac = speaker['mac']
+            if manager._is_device_paired(mac) or manager.pair_device(mac):
+                self._set_state(PAIRED)
+            else:
+                self._backoff()
+            return
+
+        if self.state in (PAIRED, DEGRADED):
+            self._set_state(CONNECTING)
+            start = time.monotonic()
+            connected = (manager._is_device_connected(manager.target_mac) or
+                         manager.connect_device(manager.target_mac))
+            BLUETOOTH_RECONNECT_LATENCY.observe(time.monotonic() - start)
+            BLUETOOTH_RECONNECTS.inc(result='ok' if connected else 'failed')
+
+            if connected:
+                self.failures = 0
+                manager._set_bluetooth_audio_sink(manager.target_mac)
+                self._set_state(CONNECTED)
+            elif self.failures + 1 >= MAX_FAILURES_BEFORE_DISCOVERY:
+                # L'enceinte a peut-être été réinitialisée : nouvel appairage
+                self._set_state(DISCOVERING)
+                manager.target_mac = None
+                self._backoff()
+            else:
+                self._set_state(DEGRADED)
+                self._backoff()
+            return
+
+        if self.state == CONNECTED:
+            self._sleep(self._check_interval())
+            if self.state == CONNECTED and not manager._is_device_connected(manager.target_mac):
+                self.logger.warning("Enceinte déconnectée")
+                self._set_state(DEGRADED)
+                self.next_attempt = 0.0
+            return
+
+        if self.state == CONNECTING:
+            # Reprise après une exception pendant la connexion
+            self._set_state(DEGRADED)
+
+    def _check_interval(self) -> float:
+        return self.config_manager.get_int_value('bluetooth', 'check_interval', 30)
+
+
+if __name__ == "__main__":
+    # Suivi de la machine d'états (Ctrl+C pour arrêter)
+    from config_manager import ConfigManager
+    from bluetooth_manager import BluetoothManager
+
+    logging.basicConfig(level=logging.INFO)
+
+    config_manager = ConfigManager("/boot")
+    bluetooth_manager = BluetoothManager(config_manager)
+    connection = bluetooth_manager.connection
+    connection.start()
+    try:
+        while True:
+            print(f"Connecté: {connection.wait_connected(5)} (état {connection.state})")
+            time.sleep(5)
+    except KeyboardInterrupt:
+        connection.stop()
@@ -2,28 +2,103 @@
 """
 Gestionnaire Bluetooth pour l'assistant Raspberry Pi
 Gère la connexion automatique avec l'enceinte Bluetooth
+Moteur d'appairage commun à l'assistant, au portail captif et à scripts/setup_bluetooth.sh
 """
 
 import os
+import json
+import argparse
 import subprocess
 import time
 import logging
 import re
-from typing import List, Optional, Dict, Any
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tracing import tracer
+from metrics import RETRIES, metrics
+from speaker_group import SpeakerGroup, parse_group_config
+from bluetooth_connection import BluetoothConnection
+from audio_sinks import sink_manager, user_sink_manager
+
+
+# Délais d'appairage partagés par tous les appelants (secondes)
+SCAN_TIMEOUT = 15
+SCAN_POLL = 1.0
+PAIR_ATTEMPTS = 3
+PAIR_TIMEOUT = 45
+CONNECT_TIMEOUT = 30
+RETRY_DELAY = 3
+SINK_TIMEOUT = 10.0
+
+PROVISION_LATENCY = metrics.histogram(
+    'bluetooth_provision_step_duration_seconds', "Durée des étapes d'appairage Bluetooth", ['step'])
+PROVISION_STEPS = metrics.counter(
+    'bluetooth_provision_steps_total', "Étapes d'appairage Bluetooth par résultat", ['step', 'result'])
+
+# Rapport de progression : (étape, statut running/ok/error, message)
+ProgressCallback = Callable[[str, str, str], None]
+
 
 class BluetoothManager:
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, progress: Optional[ProgressCallback] = None):
         """
         Initialise le gestionnaire Bluetooth
         
         Args:
             config_manager: Instance du gestionnaire de configuration
+            progress: Reçoit l'avancement des étapes d'appairage (portail, CLI)
         """
         self.config_manager = config_manager
         self.logger = logging.getLogger(__name__)
+        self.progress = progress
+        self.timings: Dict[str, float] = {}
         self.connected_devices = {}
         self.target_speaker = None
         self.target_mac = None
+        self.group: Optional[SpeakerGroup] = None
+        self._configure_group()
+        self.connection = BluetoothConnection(self, config_manager)
+        self.config_manager.subscribe(self.on_config_changed)
+    
+    def _configure_group(self) -> None:
+        """Crée le groupe d'enceintes si group_speakers est renseigné"""
+        members = parse_group_config(
+            self.config_manager.get_value('bluetooth', 'group_speakers', ''),
+            self.config_manager.get_value('bluetooth', 'group_latency_offsets_ms', ''))
+        
+        if self.group:
+            self.group.close()
+            self.group = None
+        
+        if members:
+            self.group = SpeakerGroup(
+                self, members,
+                sink_name=self.config_manager.get_value('bluetooth', 'group_sink_name', 'assistant_group'),
+                connect_timeout=self.config_manager.get_int_value('bluetooth', 'connection_timeout', 30))
+            self.logger.info(f"Groupe de {len(members)} enceintes configuré")
+    
+    def on_config_changed(self, old, new, changes: Dict[str, set]) -> None:
+        """
+        Change d'enceinte cible quand speaker_name est modifié
+        
+        Args:
+            old: Instantané précédent
+            new: Nouvel instantané
+            changes: Clés modifiées par configuration
+        """
+        bluetooth_changes = changes.get('bluetooth', set())
+        if bluetooth_changes & {'group_speakers', 'group_latency_offsets_ms', 'group_sink_name'}:
+            self._configure_group()
+            self.connection.reset()
+            return
+        
+        if 'speaker_name' not in bluetooth_changes or self.group:
+            return
+        
+        self.logger.info(f"Nouvelle enceinte cible: {new.get('bluetooth', 'speaker_name')}")
+        # Le scan prend plusieurs secondes : il est fait par la machine d'états
+        self.connection.reset()
         
     def initialize(self) -> bool:
         """
@@ -35,15 +110,15 @@ class BluetoothManager:
         try:
             # Démarrer le service Bluetooth
             self._run_command("sudo systemctl start bluetooth")
-            time.sleep(2)
             
             # Activer le contrôleur Bluetooth
             self._run_command("sudo rfkill unblock bluetooth")
-            time.sleep(1)
             
-            # Configurer bluetoothctl
+            # Configurer bluetoothctl (attend le contrôleur au lieu d'un délai fixe)
             self._bluetoothctl_command("power on")
-            time.sleep(1)
+            if not self._wait_for(lambda: "Powered: yes" in self._bluetoothctl_command("show"), timeout=5.0):
+                self.logger.warning("Contrôleur Bluetooth non alimenté")
+                return False
             self._bluetoothctl_command("agent on")
             self._bluetoothctl_command("default-agent")
             
@@ -64,30 +139,12 @@ class BluetoothManager:
         Returns:
             Liste des appareils découverts
         """
-        devices = []
-        
         try:
             self.logger.info(f"Début du scan Bluetooth ({duration}s)...")
             
-            # Lancer le scan
-            self._bluetoothctl_command("scan on")
-            time.sleep(duration)
-            self._bluetoothctl_command("scan off")
-            
-            # Récupérer la liste des appareils
-            result = self._bluetoothctl_command("devices")
-            
-            for line in result.split('\n'):
-                if line.strip().startswith('Device'):
-                    parts = line.strip().split(' ', 2)
-                    if len(parts) >= 3:
-                        mac = parts[1]
-                        name = parts[2]
-                        devices.append({
-                            'mac': mac,
-                            'name': name,
-                            'connected': self._is_device_connected(mac)
-                        })
+            _, devices = self._discover(None, duration)
+            for device in devices:
+                device['connected'] = self._is_device_connected(device['mac'])
             
             self.logger.info(f"Scan terminé, {len(devices)} appareils trouvés")
             return devices
@@ -96,56 +153,109 @@ class BluetoothManager:
             self.logger.error(f"Erreur lors du scan: {e}")
             return []
     
-    def find_target_speaker(self) -> Optional[Dict[str, str]]:
+    def find_target_speaker(self, speaker_name: Optional[str] = None) -> Optional[Dict[str, str]]:
         """
         Trouve l'enceinte cible configurée
         
+        Les appareils déjà connus sont trouvés sans attendre ; sinon la
+        découverte s'arrête dès que l'enceinte apparaît (au plus SCAN_TIMEOUT).
+        
+        Args:
+            speaker_name: Nom recherché, insensible à la casse (par défaut speaker_name)
+        
         Returns:
             Informations sur l'enceinte si trouvée
         """
-        target_name = self.config_manager.get_speaker_name()
+        target_name = speaker_name or self.config_manager.get_speaker_name()
         self.logger.info(f"Recherche de l'enceinte: {target_name}")
         
-        devices = self.scan_for_devices(15)
+        device, devices = self._discover(lambda d: target_name.lower() in d['name'].lower(), SCAN_TIMEOUT)
         
-        for device in devices:
-            if target_name.lower() in device['name'].lower():
-                self.target_speaker = device
-                self.target_mac = device['mac']
-                self.logger.info(f"Enceinte trouvée: {device['name']} ({device['mac']})")
-                return device
+        if device:
+            self.target_speaker = device
+            self.target_mac = device['mac']
+            self.logger.info(f"Enceinte trouvée: {device['name']} ({device['mac']})")
+            return device
         
-        self.logger.warning(f"Enceinte '{target_name}' non trouvée")
+        self.logger.warning(f"Enceinte '{target_name}' non trouvée parmi: "
+                            f"{', '.join(d['name'] for d in devices) or 'aucun appareil'}")
         return None
     
-    def pair_device(self, mac_address: str) -> bool:
+    def _discover(self, match: Optional[Callable[[Dict[str, str]], bool]],
+                  duration: float) -> Tuple[Optional[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Découverte active pendant au plus duration secondes
+        
+        bluetoothctl reste lancé pendant la découverte (elle s'arrête avec lui) ;
+        la liste des appareils est relue toutes les SCAN_POLL secondes.
+        
+        Args:
+            match: Appareil recherché (None : découverte complète)
+            duration: Durée maximale
+        
+        Returns:
+            (appareil trouvé ou None, appareils connus)
+        """
+        scan = subprocess.Popen(['bluetoothctl', '--timeout', str(int(duration) + 1), 'scan', 'on'],
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + duration
+        try:
+            while True:
+                devices = self._list_devices()
+                found = next((d for d in devices if match(d)), None) if match else None
+                if found or time.monotonic() >= deadline:
+                    return found, devices
+                time.sleep(SCAN_POLL)
+        finally:
+            if scan.poll() is None:
+                scan.terminate()
+            scan.wait()
+    
+    def _list_devices(self) -> List[Dict[str, str]]:
+        """Appareils connus de bluez (découverts ou appairés)"""
+        devices = []
+        for line in self._bluetoothctl_command("devices").split('\n'):
+            parts = line.strip().split(' ', 2)
+            if len(parts) == 3 and parts[0] == 'Device':
+                devices.append({'mac': parts[1], 'name': parts[2]})
+        return devices
+    
+    def pair_device(self, mac_address: str, attempts: int = PAIR_ATTEMPTS) -> bool:
         """
         Appaire un appareil Bluetooth
         
         Args:
             mac_address: Adresse MAC de l'appareil
+            attempts: Nombre de tentatives
             
         Returns:
             True si l'appairage est réussi
         """
         try:
-            self.logger.info(f"Appairage de l'appareil {mac_address}...")
-            
-            # Supprimer l'appareil s'il existe déjà
-            self._bluetoothctl_command(f"remove {mac_address}")
-            time.sleep(1)
-            
-            # Appairer l'appareil
-            result = self._bluetoothctl_command(f"pair {mac_address}")
+            for attempt in range(attempts):
+                if attempt:
+                    RETRIES.inc(stage='bluetooth.pair')
+                    time.sleep(RETRY_DELAY)
+                self.logger.info(f"Appairage de l'appareil {mac_address} "
+                                 f"(tentative {attempt + 1}/{attempts})...")
+                self._report('pair', 'running', f"Appairage, tentative {attempt + 1}/{attempts}")
+                
+                # Supprimer l'appareil s'il existe déjà
+                self._bluetoothctl_command(f"remove {mac_address}")
+                
+                # Appairer l'appareil
+                result = self._bluetoothctl_command(f"pair {mac_address}", timeout=PAIR_TIMEOUT)
+                
+                if "successful" in result.lower() or "paired: yes" in result.lower():
+                    # Faire confiance à l'appareil
+                    self._bluetoothctl_command(f"trust {mac_address}")
+                    self.logger.info(f"Appareil {mac_address} appairé avec succès")
+                    return True
+                
+                self.logger.warning(f"Échec de l'appairage: {result.strip()}")
             
-            if "successful" in result.lower() or "paired" in result.lower():
-                # Faire confiance à l'appareil
-                self._bluetoothctl_command(f"trust {mac_address}")
-                self.logger.info(f"Appareil {mac_address} appairé avec succès")
-                return True
-            else:
-                self.logger.warning(f"Échec de l'appairage: {result}")
-                return False
+            return False
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de l'appairage: {e}")
@@ -164,9 +274,9 @@ class BluetoothManager:
         try:
             self.logger.info(f"Connexion à l'appareil {mac_address}...")
             
-            result = self._bluetoothctl_command(f"connect {mac_address}")
+            result = self._bluetoothctl_command(f"connect {mac_address}", timeout=CONNECT_TIMEOUT)
             
-            if "successful" in result.lower() or "connected" in result.lower():
+            if "successful" in result.lower() or "connected: yes" in result.lower():
                 self.logger.info(f"Connexion réussie à {mac_address}")
                 self.connected_devices[mac_address] = True
                 return True
@@ -210,54 +320,145 @@ class BluetoothManager:
             True si la configuration est réussie
         """
         try:
-            # Initialiser Bluetooth
-            if not self.initialize():
-                return False
+            # Groupe d'enceintes : connexions en parallèle et sink combiné
+            if self.group:
+                return self.initialize() and self.group.setup()
             
-            # Chercher l'enceinte cible
-            speaker = self.find_target_speaker()
-            if not speaker:
-                return False
-            
-            mac_address = speaker['mac']
+            return self.provision() is not None
             
-            # Vérifier si déjà connecté
-            if self._is_device_connected(mac_address):
-                self.logger.info("Enceinte déjà connectée")
-                return True
-            
-            # Appairer si nécessaire
-            if not self._is_device_paired(mac_address):
-                if not self.pair_device(mac_address):
-                    return False
+        except Exception as e:
+            self.logger.error(f"Erreur lors de la configuration de l'enceinte: {e}")
+            return False
+    
+    def provision(self, speaker_name: Optional[str] = None, sinks=None,
+                  progress: Optional[ProgressCallback] = None) -> Optional[Dict[str, Any]]:
+        """
+        Appairage complet : initialisation, recherche, appairage, connexion, sortie audio
+        
+        Chaque étape est mesurée (métriques, trace active, timings) et
+        rapportée à progress.
+        
+        Args:
+            speaker_name: Nom de l'enceinte (par défaut speaker_name de la configuration)
+            sinks: Gestionnaire de sinks (par défaut celui de l'utilisateur courant)
+            progress: Reçoit l'avancement des étapes (par défaut celui du constructeur)
+        
+        Returns:
+            {'mac', 'name', 'sink', 'timings'} ou None en cas d'échec
+        """
+        previous, self.progress = self.progress, progress or self.progress
+        self.timings = {}
+        try:
+            if not self._timed_step('init', "Initialisation du Bluetooth", self.initialize):
+                return None
             
-            # Connecter l'enceinte
-            if self.connect_device(mac_address):
-                # Configurer comme sortie audio par défaut
-                self._set_bluetooth_audio_sink(mac_address)
-                return True
+            target_name = speaker_name or self.config_manager.get_speaker_name()
+            speaker = self._timed_step('scan', f"Recherche de {target_name}",
+                                       lambda: self.find_target_speaker(target_name))
+            if not speaker:
+                return None
+            mac_address = speaker['mac']
             
-            return False
+            if not self._is_device_connected(mac_address):
+                paired = self._is_device_paired(mac_address)
+                if not paired and not self._timed_step(
+                        'pair', f"Appairage de {speaker['name']}", lambda: self.pair_device(mac_address)):
+                    return None
+                
+                connect = lambda: self.connect_device(mac_address)
+                if not self._timed_step('connect', f"Connexion à {speaker['name']}", connect):
+                    # Appairage existant périmé (enceinte réinitialisée) : nouvel appairage
+                    if not paired or not self._timed_step(
+                            'pair', f"Nouvel appairage de {speaker['name']}",
+                            lambda: self.pair_device(mac_address)):
+                        return None
+                    if not self._timed_step('connect', f"Connexion à {speaker['name']}", connect):
+                        return None
+            
+            sink = self._timed_step('audio', "Configuration de la sortie audio",
+                                    lambda: self._set_bluetooth_audio_sink(mac_address, sinks))
+            
+            self.logger.info("Appairage terminé: " +
+                             ', '.join(f"{step} {seconds:.1f} s" for step, seconds in self.timings.items()))
+            return {'mac': mac_address, 'name': speaker['name'], 'sink': sink,
+                    'timings': {step: round(seconds, 3) for step, seconds in self.timings.items()}}
             
         except Exception as e:
-            self.logger.error(f"Erreur lors de la configuration de l'enceinte: {e}")
-            return False
+            self.logger.error(f"Erreur lors de l'appairage: {e}")
+            self._report('error', 'error', f"Erreur Bluetooth: {e}")
+            return None
+        finally:
+            self.progress = previous
     
-    def ensure_connection(self) -> bool:
+    def _timed_step(self, step: str, message: str, action: Callable[[], Any]) -> Any:
         """
-        S'assure que l'enceinte cible est connectée
+        Exécute une étape d'appairage mesurée
+        
+        Args:
+            step: Nom de l'étape (init, scan, pair, connect, audio)
+            message: Description affichée
+            action: Étape ; un résultat faux est un échec
         
         Returns:
-            True si la connexion est active
+            Résultat de l'étape
         """
-        if not self.target_mac:
-            return self.setup_target_speaker()
+        self._report(step, 'running', message)
+        start = time.monotonic()
+        with tracer.span(f'bluetooth.{step}'):
+            result = action()
+        elapsed = time.monotonic() - start
         
-        if self._is_device_connected(self.target_mac):
-            return True
+        PROVISION_LATENCY.observe(elapsed, step=step)
+        PROVISION_STEPS.inc(step=step, result='ok' if result else 'failed')
+        self.timings[step] = self.timings.get(step, 0.0) + elapsed
+        self._report(step, 'ok' if result else 'error',
+                     f"{message} : {'OK' if result else 'échec'} ({elapsed:.1f} s)")
+        return result
+    
+    def _report(self, step: str, status: str, message: str) -> None:
+        """Transmet l'avancement au rapport de progression, s'il y en a un"""
+        if self.progress:
+            try:
+                self.progress(step, status, message)
+            except Exception as e:
+                self.logger.debug(f"Rapport de progression: {e}")
+    
+    @staticmethod
+    def _wait_for(predicate: Callable[[], bool], timeout: float, interval: float = 0.2) -> bool:
+        """Attend qu'une condition soit vraie (au plus timeout secondes)"""
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+        return True
+    
+    def start_connection(self) -> bool:
+        """
+        Démarre la machine d'états et attend la première connexion
         
-        # Tenter de reconnecter
-        return self.connect_device(self.target_mac)
+        Returns:
+            True si l'enceinte est connectée avant connection_timeout
+        """
+        self.connection.start()
+        timeout = self.config_manager.get_int_value('bluetooth', 'connection_timeout', 30)
+        return self.connection.wait_connected(timeout)
+    
+    def ensure_connection(self, deadline: Optional[float] = None) -> bool:
+        """
+        S'assure que l'enceinte cible est connectée
+        
+        La découverte et la reconnexion sont faites en arrière-plan par la
+        machine d'états : l'appelant ne lit que l'état et attend au plus deadline.
+        
+        Args:
+            deadline: Attente maximale en secondes (par défaut command_deadline_ms)
+        
+        Returns:
+            True si la connexion est active
+        """
+        with tracer.span('bluetooth.ensure_connection'):
+            return self.connection.wait_connected(deadline)
     
     def _is_device_connected(self, mac_address: str) -> bool:
         """
@@ -291,19 +492,23 @@ class BluetoothManager:
         except:
             return False
     
-    def _bluetoothctl_command(self, command: str) -> str:
+    def _bluetoothctl_command(self, command: str, timeout: float = 10) -> str:
         """
         Execute une commande bluetoothctl
         
+        La commande est passée en arguments : bluetoothctl attend son
+        résultat (appairage, connexion) avant de se terminer.
+        
         Args:
             command: Commande à exécuter
+            timeout: Durée maximale de la commande
             
         Returns:
             Résultat de la commande
         """
         try:
-            full_command = f"echo '{command}' | bluetoothctl"
-            result = subprocess.run(full_command, shell=True, capture_output=True, text=True, timeout=30)
+            result = subprocess.run(['bluetoothctl'] + command.split(), stdin=subprocess.DEVNULL,
+                                    capture_output=True, text=True, timeout=timeout)
             return result.stdout
         except subprocess.TimeoutExpired:
             self.logger.warning(f"Timeout lors de l'exécution de: {command}")
@@ -329,29 +534,30 @@ class BluetoothManager:
             self.logger.error(f"Erreur lors de l'exécution de {command}: {e}")
             return ""
     
-    def _set_bluetooth_audio_sink(self, mac_address: str) -> None:
+    def _set_bluetooth_audio_sink(self, mac_address: str, sinks=None) -> Optional[str]:
         """
         Configure l'enceinte Bluetooth comme sortie audio par défaut
         
         Args:
             mac_address: Adresse MAC de l'enceinte
+            sinks: Gestionnaire de sinks (par défaut celui de l'utilisateur courant)
+        
+        Returns:
+            Nom du sink de l'enceinte, None s'il n'est pas publié
         """
+        sinks = sinks or sink_manager
         try:
-            # Attendre que l'enceinte soit reconnue par PulseAudio
-            time.sleep(3)
-            
-            # Récupérer le nom du sink Bluetooth
-            result = self._run_command("pactl list sinks short")
-            
-            for line in result.split('\n'):
-                if 'bluez' in line and mac_address.replace(':', '_') in line:
-                    sink_name = line.split()[1]
-                    self._run_command(f"pactl set-default-sink {sink_name}")
-                    self.logger.info(f"Sortie audio configurée: {sink_name}")
-                    break
+            # Attendre que l'enceinte soit publiée par PulseAudio/PipeWire
+            sink_name = sinks.wait_for_bluetooth_sink(mac_address, timeout=SINK_TIMEOUT)
+            if sink_name:
+                sinks.route_to(sink_name)
+            else:
+                self.logger.warning(f"Aucun sink audio pour {mac_address}")
+            return sink_name
             
         except Exception as e:
             self.logger.error(f"Erreur lors de la configuration audio: {e}")
+            return None
     
     def get_connected_devices(self) -> List[Dict[str, str]]:
         """
@@ -406,28 +612,67 @@ class BluetoothManager:
                 time.sleep(60)
 
 
-if __name__ == "__main__":
-    # Test du gestionnaire Bluetooth
-    import sys
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+def main() -> int:
+    """
+    Appairage en ligne de commande (portail captif, scripts/setup_bluetooth.sh)
     
+    Returns:
+        Code de sortie (0 : succès)
+    """
     from config_manager import ConfigManager
     
-    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Appairage Bluetooth de l'assistant")
+    parser.add_argument('--config-dir', default='/boot', help="Dossier des fichiers config-*.txt")
+    parser.add_argument('--json', action='store_true', help="Avancement et résultat en JSON, une ligne par événement")
+    parser.add_argument('--audio-user', default=os.environ.get('SUDO_USER'),
+                        help="Propriétaire du serveur de son (défaut : utilisateur ayant lancé sudo)")
+    parser.add_argument('--simulate', action='store_true',
+                        help="Enceinte et serveur de son simulés (voir simulation.py)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    provision = commands.add_parser('provision', help="Rechercher, appairer et connecter une enceinte")
+    provision.add_argument('speaker_name', nargs='?', help="Nom de l'enceinte (défaut : speaker_name)")
+    scan = commands.add_parser('scan', help="Lister les appareils à proximité")
+    scan.add_argument('--duration', type=int, default=10, help="Durée de la découverte en secondes")
+    commands.add_parser('status', help="Appareils connectés")
+    args = parser.parse_args()
     
-    config_manager = ConfigManager("/tmp")
-    bluetooth_manager = BluetoothManager(config_manager)
+    logging.basicConfig(level=logging.WARNING if args.json else logging.INFO)
     
-    print("Test du gestionnaire Bluetooth:")
-    print("Initialisation...")
-    if bluetooth_manager.initialize():
-        print("✓ Bluetooth initialisé")
-        
-        print("Scan des appareils...")
-        devices = bluetooth_manager.scan_for_devices(5)
-        print(f"✓ {len(devices)} appareils trouvés")
-        
-        for device in devices:
-            print(f"  - {device['name']} ({device['mac']})")
+    def output(data: Dict[str, Any], text: str) -> None:
+        print(json.dumps(data, ensure_ascii=False) if args.json else text, flush=True)
+    
+    simulation = None
+    if args.simulate:
+        from simulation import Simulation
+        simulation = Simulation().start()
+        args.config_dir, args.audio_user = simulation.config_dir, None
+    
+    bluetooth_manager = BluetoothManager(ConfigManager(args.config_dir))
+    if simulation:
+        simulation.speaker.attach(bluetooth_manager)
+    
+    if args.command == 'provision':
+        sinks = user_sink_manager(args.audio_user) if args.audio_user else None
+        result = bluetooth_manager.provision(
+            args.speaker_name, sinks,
+            progress=lambda step, status, message: output(
+                {'step': step, 'status': status, 'message': message}, f"[{step}] {message}"))
+        if not result:
+            return 1
+        output(dict(result, step='done', status='ok'),
+               '\n'.join(f"{key}={result[key] or ''}" for key in ('mac', 'name', 'sink')))
+        return 0
+    
+    if args.command == 'scan':
+        if not bluetooth_manager.initialize():
+            return 1
+        devices = bluetooth_manager.scan_for_devices(args.duration)
     else:
-        print("✗ Erreur d'initialisation")
\ No newline at end of file
+        devices = bluetooth_manager.get_connected_devices()
+    for device in devices:
+        output(device, f"{device['mac']}  {device['name']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -6,8 +6,147 @@ Lit les fichiers de configuration depuis /boot
 
 import os
 import logging
+import threading
 from configparser import ConfigParser
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Mapping, Optional, Set
+
+from config_watcher import ConfigWatcher
+
+
+CONFIG_FILES = {
+    'spotify': 'config-spotify.txt',
+    'bluetooth': 'config-bluetooth.txt',
+    'gpt': 'config-gpt.txt',
+    'openai': 'config-openai.txt'
+}
+
+# Type et bornes des valeurs numériques/booléennes : (type, minimum, maximum)
+# Les clés absentes du schéma restent des chaînes
+CONFIG_SCHEMA = {
+    'spotify': {
+        'bitrate': (int, 96, 320),
+        'initial_volume': (int, 0, 100),
+        'volume_normalisation': (bool, None, None),
+        'normalisation_pregain': (float, -10, 10),
+        'autoplay': (bool, None, None),
+        'voice_control': (bool, None, None),
+        'volume_step': (int, 1, 50),
+    },
+    'bluetooth': {
+        'auto_connect': (bool, None, None),
+        'connection_timeout': (int, 1, 300),
+        'auto_reconnect': (bool, None, None),
+        'check_interval': (int, 1, 3600),
+        'default_volume': (int, 0, 100),
+        'command_deadline_ms': (int, 0, 30000),
+        'backoff_max': (int, 5, 3600),
+    },
+    'gpt': {
+        'enabled': (bool, None, None),
+        'gpio_pin': (int, 0, 27),
+        'recording_duration': (int, 1, 120),
+        'button_debounce_ms': (int, 0, 200),
+        'button_double_press_ms': (int, 0, 1000),
+        'button_hold_ms': (int, 100, 3000),
+        'button_long_press_ms': (int, 500, 10000),
+        'push_to_talk': (bool, None, None),
+        'push_to_talk_tail_ms': (int, 0, 2000),
+        'push_to_talk_min_ms': (int, 0, 2000),
+        'sample_rate': (int, 8000, 48000),
+        'silence_threshold': (int, 0, 32767),
+        'voice_activation': (bool, None, None),
+        'voice_sensitivity': (int, 1, 10),
+        'auto_stop_timeout': (int, 1, 300),
+        'trace_enabled': (bool, None, None),
+        'trace_max_kb': (int, 1, None),
+        'trace_backups': (int, 0, 100),
+        'metrics_enabled': (bool, None, None),
+        'log_max_kb': (int, 1, None),
+        'log_backups': (int, 0, 100),
+        'log_journald': (bool, None, None),
+        'memory_budget_mb': (int, 64, 8192),
+        'memory_pressure_percent': (int, 10, 99),
+        'memory_critical_percent': (int, 10, 100),
+        'memory_psi_threshold': (float, 0.0, 100.0),
+        'memory_check_interval': (int, 1, 3600),
+        'metrics_port': (int, 1, 65535),
+        'audio_probe_max_age_hours': (int, 0, None),
+        'spool_budget_mb': (int, 1, 1024),
+        'spool_min_free_memory_mb': (int, 0, None),
+        'upload_compression_level': (float, 0.0, 1.0),
+        'duck_enabled': (bool, None, None),
+        'duck_level_db': (float, -60.0, 0.0),
+        'duck_attack_ms': (int, 0, 2000),
+        'duck_release_ms': (int, 0, 5000),
+        'speech_keepalive_s': (int, 0, 3600),
+        'health_check_interval': (int, 10, 3600),
+        'health_disk_min_mb': (int, 1, None),
+        'health_temp_warning': (float, 40.0, 100.0),
+        'health_temp_critical': (float, 40.0, 100.0),
+        'thermal_adaptive': (bool, None, None),
+        'thermal_warm_c': (float, 40.0, 100.0),
+        'thermal_hot_c': (float, 40.0, 100.0),
+        'thermal_quota_percent': (int, 1, 100),
+        'thermal_sample_rate': (int, 0, 48000),
+        'thermal_check_interval': (int, 1, 600),
+    },
+    'openai': {
+        'max_tokens': (int, 1, 4096),
+        'temperature': (float, 0.0, 2.0),
+        'frequency_penalty': (float, -2.0, 2.0),
+        'presence_penalty': (float, -2.0, 2.0),
+        'request_timeout': (int, 1, 600),
+        'max_retries': (int, 0, 10),
+        'retry_delay': (float, 0.0, 60.0),
+        'adaptive_pipeline': (bool, None, None),
+        'latency_target_ms': (int, 500, 60000),
+        'network_probe_interval': (int, 10, 3600),
+    },
+}
+
+
+def parse_bool(value: Any) -> bool:
+    """Interprète une valeur de configuration booléenne"""
+    return str(value).strip().lower() in ['true', '1', 'yes', 'on']
+
+
+class ConfigSnapshot:
+    def __init__(self, raw: Dict[str, Dict[str, str]], typed: Dict[str, Dict[str, Any]]):
+        """
+        Configuration figée : valeurs brutes et valeurs typées validées
+
+        Args:
+            raw: Chaînes lues dans les fichiers (avec valeurs par défaut)
+            typed: Valeurs converties selon CONFIG_SCHEMA
+        """
+        self.raw: Mapping[str, Mapping[str, str]] = MappingProxyType(
+            {name: MappingProxyType(dict(values)) for name, values in raw.items()})
+        self.typed: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {name: MappingProxyType(dict(values)) for name, values in typed.items()})
+
+    def get(self, config_name: str, key: str, default: Any = None) -> Any:
+        """Valeur typée (ou brute hors schéma)"""
+        return self.typed.get(config_name, {}).get(key, default)
+
+    def changed_keys(self, other: 'ConfigSnapshot') -> Dict[str, Set[str]]:
+        """
+        Clés dont la valeur diffère d'un autre instantané
+
+        Args:
+            other: Instantané précédent
+
+        Returns:
+            Clés modifiées par configuration
+        """
+        changes = {}
+        for name in set(self.raw) | set(other.raw):
+            new, old = self.raw.get(name, {}), other.raw.get(name, {})
+            keys = {key for key in set(new) | set(old) if new.get(key) != old.get(key)}
+            if keys:
+                changes[name] = keys
+        return changes
+
 
 class ConfigManager:
     def __init__(self, boot_dir: str = "/boot"):
@@ -25,42 +164,151 @@ class ConfigManager:
             'spotify': {
                 'device_name': 'Mon Assistant Pi',
                 'bitrate': '320',
-                'initial_volume': '50'
+                'initial_volume': '50',
+                'cache_size': '1G',
+                'cache_dir': '/var/cache/raspotify',
+                'voice_control': 'true',
+                'control_backend': 'auto',
+                'volume_step': '10'
             },
             'bluetooth': {
                 'speaker_name': 'Mon Enceinte Bluetooth',
                 'auto_connect': 'true',
-                'connection_timeout': '30'
+                'connection_timeout': '30',
+                'command_deadline_ms': '1500',
+                'backoff_max': '300'
             },
             'gpt': {
                 'enabled': 'true',
                 'gpio_pin': '17',
                 'recording_duration': '10',
-                'sample_rate': '44100'
+                'button_debounce_ms': '20',
+                'button_double_press_ms': '250',
+                'button_hold_ms': '400',
+                'button_long_press_ms': '1500',
+                'push_to_talk': 'false',
+                'push_to_talk_tail_ms': '250',
+                'push_to_talk_min_ms': '250',
+                'sample_rate': '44100',
+                'trace_enabled': 'true',
+                'trace_file': '/opt/rpi-assistant/logs/traces.jsonl',
+                'trace_max_kb': '1024',
+                'trace_backups': '3',
+                'metrics_enabled': 'true',
+                'log_level': 'INFO',
+                'log_levels': '',
+                'log_file': '/opt/rpi-assistant/logs/assistant.log',
+                'log_rotate': 'size',
+                'log_max_kb': '1024',
+                'log_backups': '3',
+                'log_journald': 'false',
+                'memory_budget_mb': '512',
+                'memory_pressure_percent': '80',
+                'memory_critical_percent': '92',
+                'memory_psi_threshold': '10',
+                'memory_check_interval': '10',
+                'metrics_port': '9105',
+                'cache_dir': '/opt/rpi-assistant/cache',
+                'audio_probe_max_age_hours': '24',
+                'spool_dir': '/dev/shm/rpi-assistant-audio',
+                'spool_budget_mb': '32',
+                'spool_min_free_memory_mb': '64',
+                'upload_codec': 'flac',
+                'upload_compression_level': '0.5',
+                'duck_enabled': 'true',
+                'duck_level_db': '-18',
+                'duck_attack_ms': '250',
+                'duck_release_ms': '600',
+                'speech_keepalive_s': '300',
+                'health_check_interval': '60',
+                'health_disk_min_mb': '100',
+                'health_temp_warning': '70',
+                'health_temp_critical': '80',
+                'thermal_adaptive': 'true',
+                'thermal_warm_c': '65',
+                'thermal_hot_c': '75',
+                'thermal_quota_percent': '20',
+                'thermal_sample_rate': '16000',
+                'thermal_check_interval': '5'
             },
             'openai': {
                 'api_key': '',
                 'model': 'gpt-4o',
                 'whisper_model': 'whisper-1',
                 'max_tokens': '150',
-                'temperature': '0.7'
+                'temperature': '0.7',
+                'request_timeout': '30',
+                'max_retries': '3',
+                'retry_delay': '2',
+                'api_base_url': '',
+                'adaptive_pipeline': 'true',
+                'fallback_model': 'gpt-4o-mini',
+                'latency_target_ms': '5000',
+                'network_probe_interval': '60'
             }
         }
         
-        self.configs = {}
+        self.snapshot = ConfigSnapshot({}, {})
+        self._subscribers: List[Callable[[ConfigSnapshot, ConfigSnapshot, Dict[str, Set[str]]], None]] = []
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[ConfigWatcher] = None
         self.load_all_configs()
     
+    @property
+    def configs(self) -> Mapping[str, Mapping[str, str]]:
+        """Valeurs brutes de l'instantané courant"""
+        return self.snapshot.raw
+    
     def load_all_configs(self) -> None:
         """Charge toutes les configurations depuis les fichiers"""
-        config_files = {
-            'spotify': 'config-spotify.txt',
-            'bluetooth': 'config-bluetooth.txt',
-            'gpt': 'config-gpt.txt',
-            'openai': 'config-openai.txt'
-        }
+        self.snapshot = self._build_snapshot()
+    
+    def _build_snapshot(self) -> ConfigSnapshot:
+        """Lit, valide et type toutes les configurations"""
+        raw = {}
+        typed = {}
+        for config_name, filename in CONFIG_FILES.items():
+            raw[config_name] = self._load_config_file(filename, config_name)
+            typed[config_name] = self._type_config(config_name, raw[config_name])
+        return ConfigSnapshot(raw, typed)
+    
+    def _type_config(self, config_name: str, values: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Convertit et valide les valeurs d'une configuration selon CONFIG_SCHEMA
+        
+        Args:
+            config_name: Nom de la configuration
+            values: Valeurs brutes
+            
+        Returns:
+            Valeurs typées (valeur par défaut si invalide)
+        """
+        schema = CONFIG_SCHEMA.get(config_name, {})
+        defaults = self.default_configs.get(config_name, {})
+        typed = dict(values)
         
-        for config_name, filename in config_files.items():
-            self.configs[config_name] = self._load_config_file(filename, config_name)
+        for key, (value_type, minimum, maximum) in schema.items():
+            if key not in values:
+                continue
+            try:
+                value = self._convert(values[key], value_type)
+                if ((minimum is not None and value < minimum) or
+                        (maximum is not None and value > maximum)):
+                    raise ValueError(f"hors limites [{minimum}, {maximum}]")
+                typed[key] = value
+            except ValueError as e:
+                fallback = defaults.get(key)
+                self.logger.warning(f"Valeur invalide pour {config_name}.{key}={values[key]!r} ({e}), "
+                                    f"utilisation de la valeur par défaut {fallback}")
+                typed[key] = self._convert(fallback, value_type) if fallback is not None else None
+        
+        return typed
+    
+    @staticmethod
+    def _convert(value: Any, value_type: type) -> Any:
+        if value_type is bool:
+            return parse_bool(value)
+        return value_type(value)
     
     def _load_config_file(self, filename: str, config_name: str) -> Dict[str, Any]:
         """
@@ -105,7 +353,7 @@ class ConfigManager:
         Returns:
             Dictionnaire avec les valeurs de configuration
         """
-        return self.configs.get(config_name, {})
+        return dict(self.snapshot.raw.get(config_name, {}))
     
     def get_value(self, config_name: str, key: str, default: Any = None) -> Any:
         """
@@ -119,8 +367,24 @@ class ConfigManager:
         Returns:
             Valeur de configuration
         """
-        config = self.get_config(config_name)
-        return config.get(key, default)
+        return self.snapshot.raw.get(config_name, {}).get(key, default)
+    
+    def _get_typed(self, config_name: str, key: str, value_type: type, default: Any) -> Any:
+        """Valeur typée de l'instantané, ou conversion ponctuelle hors schéma"""
+        snapshot = self.snapshot
+        if key in CONFIG_SCHEMA.get(config_name, {}):
+            value = snapshot.get(config_name, key)
+            return default if value is None else value
+        
+        value = snapshot.raw.get(config_name, {}).get(key)
+        if value is None:
+            return default
+        try:
+            return self._convert(value, value_type)
+        except ValueError:
+            self.logger.warning(f"Impossible de convertir {key} en {value_type.__name__}, "
+                                f"utilisation de la valeur par défaut {default}")
+            return default
     
     def get_bool_value(self, config_name: str, key: str, default: bool = False) -> bool:
         """
@@ -134,8 +398,7 @@ class ConfigManager:
         Returns:
             Valeur booléenne
         """
-        value = self.get_value(config_name, key, str(default))
-        return str(value).lower() in ['true', '1', 'yes', 'on']
+        return self._get_typed(config_name, key, bool, default)
     
     def get_int_value(self, config_name: str, key: str, default: int = 0) -> int:
         """
@@ -149,12 +412,58 @@ class ConfigManager:
         Returns:
             Valeur entière
         """
-        try:
-            value = self.get_value(config_name, key, default)
-            return int(value)
-        except ValueError:
-            self.logger.warning(f"Impossible de convertir {key} en entier, utilisation de la valeur par défaut {default}")
-            return default
+        return self._get_typed(config_name, key, int, default)
+    
+    def get_float_value(self, config_name: str, key: str, default: float = 0.0) -> float:
+        """
+        Récupère une valeur décimale de configuration
+        
+        Args:
+            config_name: Nom de la configuration
+            key: Clé de la valeur
+            default: Valeur par défaut
+            
+        Returns:
+            Valeur décimale
+        """
+        return self._get_typed(config_name, key, float, default)
+    
+    def subscribe(self, callback: Callable[[ConfigSnapshot, ConfigSnapshot, Dict[str, Set[str]]], None]) -> None:
+        """
+        Enregistre une fonction appelée après chaque rechargement modifiant la configuration
+        
+        Args:
+            callback: Fonction (ancien instantané, nouvel instantané, clés modifiées)
+        """
+        self._subscribers.append(callback)
+    
+    def reload_all(self) -> Dict[str, Set[str]]:
+        """
+        Recharge tous les fichiers et remplace l'instantané de façon atomique
+        
+        Returns:
+            Clés modifiées par configuration
+        """
+        with self._reload_lock:
+            new_snapshot = self._build_snapshot()
+            old_snapshot = self.snapshot
+            changes = new_snapshot.changed_keys(old_snapshot)
+            if not changes:
+                self.logger.info("Configuration inchangée")
+                return changes
+            
+            self.snapshot = new_snapshot
+        
+        for config_name, keys in changes.items():
+            self.logger.info(f"Configuration {config_name} modifiée: {', '.join(sorted(keys))}")
+        
+        for callback in list(self._subscribers):
+            try:
+                callback(old_snapshot, new_snapshot, changes)
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la notification de configuration: {e}")
+        
+        return changes
     
     def reload_config(self, config_name: str) -> None:
         """
@@ -163,17 +472,22 @@ class ConfigManager:
         Args:
             config_name: Nom de la configuration à recharger
         """
-        config_files = {
-            'spotify': 'config-spotify.txt',
-            'bluetooth': 'config-bluetooth.txt',
-            'gpt': 'config-gpt.txt',
-            'openai': 'config-openai.txt'
-        }
-        
-        if config_name in config_files:
-            self.configs[config_name] = self._load_config_file(config_files[config_name], config_name)
+        if config_name in CONFIG_FILES:
+            self.reload_all()
             self.logger.info(f"Configuration {config_name} rechargée")
     
+    def start_watching(self) -> None:
+        """Recharge automatiquement la configuration quand un fichier change"""
+        if self._watcher is None:
+            self._watcher = ConfigWatcher(self.boot_dir, CONFIG_FILES.values(), self.reload_all)
+            self._watcher.start()
+    
+    def stop_watching(self) -> None:
+        """Arrête la surveillance des fichiers"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+    
     def validate_openai_config(self) -> bool:
         """
         Valide la configuration OpenAI
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Surveillance des fichiers de configuration pour l'assistant Raspberry Pi
+inotify (via la libc) avec repli sur une comparaison périodique des dates de modification
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = os.O_CLOEXEC
+IN_NONBLOCK = os.O_NONBLOCK
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class ConfigWatcher:
+    def __init__(self, directory: str, filenames: Iterable[str],
+                 callback: Callable[[], None], debounce: float = 0.5,
+                 poll_interval: float = 5.0):
+        """
+        Surveille des fichiers d'un dossier et appelle callback après modification
+
+        Args:
+            directory: Dossier surveillé
+            filenames: Noms des fichiers concernés
+            callback: Fonction appelée (une fois par rafale de modifications)
+            debounce: Délai de regroupement des événements en secondes
+            poll_interval: Intervalle de vérification si inotify est indisponible
+        """
+        self.directory = directory
+        self.filenames = set(filenames)
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r, self._wake_w = None, None
+
+    def start(self) -> None:
+        """Démarre la surveillance dans un thread dédié"""
+        if self._thread:
+            return
+
+        self._stop.clear()
+        self._wake_r, self._wake_w = os.pipe()
+        fd = self._init_inotify()
+        target = self._inotify_loop if fd is not None else self._poll_loop
+        args = (fd,) if fd is not None else ()
+
+        self._thread = threading.Thread(target=target, args=args, name='config-watcher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête la surveillance"""
+        self._stop.set()
+        if self._wake_w is not None:
+            os.write(self._wake_w, b'x')
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r, self._wake_w = None, None
+
+    def _init_inotify(self) -> Optional[int]:
+        """Crée le descripteur inotify, ou None si indisponible"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1")
+
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+            if libc.inotify_add_watch(fd, os.fsencode(self.directory), mask) < 0:
+                error = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(error, "inotify_add_watch")
+
+            self.logger.info(f"Surveillance inotify de {self.directory}")
+            return fd
+
+        except (OSError, AttributeError) as e:
+            self.logger.warning(f"inotify indisponible ({e}), vérification toutes les "
+                                f"{self.poll_interval:.0f} s")
+            return None
+
+    def _inotify_loop(self, fd: int) -> None:
+        """Attend les événements inotify et regroupe les rafales"""
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd, self._wake_r], [], [])
+                if self._wake_r in readable:
+                    break
+
+                if not self._read_events(fd):
+                    continue
+
+                # Regrouper les écritures successives d'un éditeur
+                deadline = time.monotonic() + self.debounce
+                while not self._stop.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    readable, _, _ = select.select([fd, self._wake_r], [], [], remaining)
+                    if self._wake_r in readable:
+                        return
+                    if readable:
+                        self._read_events(fd)
+
+                self._notify()
+        finally:
+            os.close(fd)
+
+    def _read_events(self, fd: int) -> bool:
+        """Lit les événements disponibles, True si un fichier surveillé a changé"""
+        try:
+            data = os.read(fd, 4096)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return False
+            raise
+
+        relevant = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            if name in self.filenames:
+                relevant = True
+        return relevant
+
+    def _snapshot_mtimes(self) -> Dict[str, Optional[float]]:
+        mtimes = {}
+        for name in self.filenames:
+            try:
+                mtimes[name] = os.stat(os.path.join(self.directory, name)).st_mtime
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+    def _poll_loop(self) -> None:
+        """Repli sans inotify : compare les dates de modification"""
+        previous = self._snapshot_mtimes()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot_mtimes()
+            if current != previous:
+                previous = current
+                self._notify()
+
+    def _notify(self) -> None:
+        try:
+            self.callback()
+        except Exception as e:
+            self.logger.error(f"Erreur lors du rechargement de la configuration: {e}")
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Bouton GPIO de l'assistant Raspberry Pi
+Fronts horodatés dans le callback, anti-rebond logiciel et reconnaissance des gestes
+(appui, double appui, maintien pour parler, appui long)
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Iterable, Optional, Tuple
+
+from metrics import metrics
+
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    GPIO = None
+
+
+# Gestes transmis au planificateur de commandes
+DOWN = 'down'
+UP = 'up'
+PRESS = 'press'
+DOUBLE_PRESS = 'double_press'
+HOLD = 'hold'
+LONG_PRESS = 'long_press'
+ALL_GESTURES = frozenset({DOWN, UP, PRESS, DOUBLE_PRESS, HOLD, LONG_PRESS})
+
+GESTURES = metrics.counter(
+    'button_gestures_total', "Gestes reconnus sur le bouton", ['gesture'])
+BOUNCES = metrics.counter(
+    'button_bounces_total', "Fronts ignorés par l'anti-rebond")
+
+# Niveau du bouton appuyé (entrée en pull-up, bouton relié à la masse)
+PRESSED = 0
+RELEASED = 1
+
+
+class ButtonEvent:
+    __slots__ = ('gesture', 'time', 'duration')
+
+    def __init__(self, gesture: str, time: float, duration: float = 0.0):
+        """
+        Geste reconnu sur le bouton
+
+        Args:
+            gesture: down, up, press, double_press, hold ou long_press
+            time: Horodatage (time.monotonic) du front à l'origine du geste
+            duration: Durée d'appui jusqu'au geste (secondes)
+        """
+        self.gesture = gesture
+        self.time = time
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        return f"ButtonEvent({self.gesture}, {self.duration * 1000:.0f} ms)"
+
+
+class RPiGPIOBackend:
+    def __init__(self, pin: int):
+        """
+        Bouton sur une broche du Raspberry Pi (RPi.GPIO, numérotation BCM)
+
+        Args:
+            pin: Broche du bouton
+        """
+        self.pin = pin
+
+    def start(self, on_edge: Callable[[int, float], None]) -> None:
+        """Détecte les deux fronts ; le callback reçoit (niveau, horodatage)"""
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        GPIO.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        # Pas de bouncetime : l'anti-rebond est logiciel, sur les horodatages
+        GPIO.add_event_detect(self.pin, GPIO.BOTH,
+                              callback=lambda channel: on_edge(GPIO.input(channel), time.monotonic()))
+
+    def stop(self) -> None:
+        GPIO.remove_event_detect(self.pin)
+        GPIO.cleanup(self.pin)
+
+
+class SimulatedBackend:
+    def __init__(self, pin: int):
+        """
+        Bouton simulé (tests, machine sans GPIO) : les fronts sont injectés
+
+        Args:
+            pin: Broche configurée (informative)
+        """
+        self.pin = pin
+        self._on_edge: Optional[Callable[[int, float], None]] = None
+
+    def start(self, on_edge: Callable[[int, float], None]) -> None:
+        self._on_edge = on_edge
+
+    def stop(self) -> None:
+        self._on_edge = None
+
+    def edge(self, level: int, timestamp: Optional[float] = None) -> None:
+        """Injecte un front comme le ferait l'interruption GPIO"""
+        if self._on_edge:
+            self._on_edge(level, time.monotonic() if timestamp is None else timestamp)
+
+    def press(self, duration: float = 0.1, bounces: int = 0) -> None:
+        """
+        Appui complet, bloquant pendant duration
+
+        Args:
+            duration: Durée d'appui en secondes
+            bounces: Rebonds simulés à l'appui et au relâchement
+        """
+        for level in (PRESSED, RELEASED):
+            for _ in range(bounces):
+                self.edge(level)
+                self.edge(RELEASED if level == PRESSED else PRESSED)
+            self.edge(level)
+            if level == PRESSED:
+                time.sleep(duration)
+
+
+class GpioInput:
+    def __init__(self, config_manager, backend=None, gestures: Optional[Iterable[str]] = None):
+        """
+        Entrée bouton : fronts horodatés, anti-rebond et gestes
+
+        Le callback GPIO ne fait qu'ajouter (niveau, horodatage) à une file ;
+        un thread dédié filtre les rebonds, reconnaît les gestes et les publie
+        dans events (file sans verrou pour le planificateur de commandes).
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+            backend: Bouton (par défaut RPi.GPIO, simulé si indisponible)
+            gestures: Gestes traités par le consommateur (par défaut tous) ; sans
+                double_press, l'appui simple est publié sans attendre la fenêtre du double appui
+        """
+        self.config_manager = config_manager
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        self.gestures = frozenset(gestures) if gestures is not None else ALL_GESTURES
+        self.events: queue.SimpleQueue = queue.SimpleQueue()
+
+        self._edges: Deque[Tuple[int, float]] = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Niveau stable et front candidat de l'anti-rebond
+        self._level = RELEASED
+        self._candidate: Optional[Tuple[int, float]] = None
+
+        # État des gestes
+        self._down_at: Optional[float] = None
+        self._hold_sent = False
+        self._long_sent = False
+        self._pending_click: Optional[float] = None
+        self._last_up = 0.0
+
+    @property
+    def simulated(self) -> bool:
+        return isinstance(self.backend, SimulatedBackend)
+
+    def _setting(self, key: str, default: int) -> float:
+        return self.config_manager.get_int_value('gpt', key, default) / 1000.0
+
+    def start(self) -> None:
+        """Configure le bouton et démarre la reconnaissance des gestes"""
+        if self._thread is not None:
+            return
+        pin = self.config_manager.get_gpio_pin()
+        if self.backend is None:
+            self.backend = RPiGPIOBackend(pin) if GPIO else SimulatedBackend(pin)
+        if self.simulated:
+            self.logger.warning("GPIO non disponible, bouton simulé")
+
+        try:
+            self.backend.start(self._on_edge)
+        except Exception as e:
+            self.logger.error(f"Erreur configuration GPIO: {e}")
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='gpio-input')
+        self._thread.daemon = True
+        self._thread.start()
+        self.logger.info(f"GPIO configuré, bouton sur pin {pin}")
+
+    def stop(self) -> None:
+        """Libère le bouton et arrête la reconnaissance"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self.backend is not None:
+            try:
+                self.backend.stop()
+            except Exception as e:
+                self.logger.debug(f"Libération du GPIO: {e}")
+            if not self.simulated:
+                self.backend = None
+
+    def restart(self) -> None:
+        """Reconfigure le bouton (changement de gpio_pin)"""
+        self.stop()
+        self.start()
+
+    def _on_edge(self, level: int, timestamp: float) -> None:
+        """Callback GPIO : horodatage seulement, aucun traitement"""
+        self._edges.append((level, timestamp))
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._next_deadline())
+            self._wake.clear()
+            while self._edges:
+                self._debounce(*self._edges.popleft())
+            self._check_timers(time.monotonic())
+
+    def _next_deadline(self) -> Optional[float]:
+        """Délai jusqu'à la prochaine échéance (rebond, maintien, double appui)"""
+        now = time.monotonic()
+        deadlines = []
+        if self._candidate is not None:
+            deadlines.append(self._candidate[1] + self._setting('button_debounce_ms', 20))
+        if self._down_at is not None and not self._long_sent:
+            hold = self._setting('button_hold_ms', 400)
+            deadlines.append(self._down_at + (self._setting('button_long_press_ms', 1500)
+                                              if self._hold_sent else hold))
+        if self._pending_click is not None:
+            deadlines.append(self._last_up + self._setting('button_double_press_ms', 250))
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+    def _debounce(self, level: int, timestamp: float) -> None:
+        """
+        Anti-rebond : un front n'est retenu que si aucun autre ne le suit
+        pendant button_debounce_ms ; il garde alors son horodatage d'origine.
+        """
+        if self._candidate is not None:
+            if timestamp - self._candidate[1] < self._setting('button_debounce_ms', 20):
+                BOUNCES.inc()
+                # Rebond : le dernier niveau lu fait foi
+                self._candidate = (level, self._candidate[1])
+                return
+            self._commit()
+        if level != self._level:
+            self._candidate = (level, timestamp)
+
+    def _commit(self) -> None:
+        """Retient le front candidat s'il change le niveau stable"""
+        level, timestamp = self._candidate
+        self._candidate = None
+        if level == self._level:
+            return
+        self._level = level
+        if level == PRESSED:
+            self._pressed(timestamp)
+        else:
+            self._released(timestamp)
+
+    def _check_timers(self, now: float) -> None:
+        if self._candidate is not None and now - self._candidate[1] >= self._setting('button_debounce_ms', 20):
+            self._commit()
+
+        if self._down_at is not None:
+            held = now - self._down_at
+            if not self._hold_sent and held >= self._setting('button_hold_ms', 400):
+                self._hold_sent = True
+                self._flush_click()
+                self._emit(HOLD, self._down_at, held)
+            if self._hold_sent and not self._long_sent and held >= self._setting('button_long_press_ms', 1500):
+                self._long_sent = True
+                self._emit(LONG_PRESS, self._down_at, held)
+
+        if (self._pending_click is not None and
+                now - self._last_up >= self._setting('button_double_press_ms', 250)):
+            self._flush_click()
+
+    def _pressed(self, timestamp: float) -> None:
+        self._down_at = timestamp
+        self._hold_sent = False
+        self._long_sent = False
+        self._emit(DOWN, timestamp)
+
+    def _released(self, timestamp: float) -> None:
+        if self._down_at is None:
+            return
+        duration = timestamp - self._down_at
+        down_at, self._down_at = self._down_at, None
+        self._emit(UP, timestamp, duration)
+        if self._hold_sent:
+            return
+
+        if self._pending_click is not None:
+            # Deuxième appui court dans la fenêtre : double appui
+            self._pending_click = None
+            self._emit(DOUBLE_PRESS, down_at, duration)
+        elif DOUBLE_PRESS in self.gestures and self._setting('button_double_press_ms', 250) > 0:
+            # Appui simple confirmé quand la fenêtre du double appui expire
+            self._pending_click = down_at
+            self._last_up = timestamp
+        else:
+            self._emit(PRESS, down_at, duration)
+
+    def _flush_click(self) -> None:
+        """Publie l'appui simple en attente d'un éventuel double appui"""
+        if self._pending_click is not None:
+            self._emit(PRESS, self._pending_click, self._last_up - self._pending_click)
+            self._pending_click = None
+
+    def _emit(self, gesture: str, timestamp: float, duration: float = 0.0) -> None:
+        GESTURES.inc(gesture=gesture)
+        self.events.put(ButtonEvent(gesture, timestamp, duration))
+        if gesture not in (DOWN, UP):
+            self.logger.debug(f"Geste: {gesture} ({duration * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    # Gestes reconnus sur le bouton (Ctrl+C pour arrêter) ; sans GPIO : séquence simulée
+    from config_manager import ConfigManager
+
+    logging.basicConfig(level=logging.INFO)
+
+    gpio_input = GpioInput(ConfigManager("/boot"))
+    gpio_input.start()
+    if gpio_input.simulated:
+        button = gpio_input.backend
+        # Appui avec rebonds, double appui, maintien, appui long
+        for duration, bounces, pause in ((0.1, 3, 0.5), (0.08, 0, 0.1), (0.08, 0, 0.5),
+                                         (0.8, 2, 0.5), (2.0, 0, 0.1)):
+            button.press(duration, bounces)
+            time.sleep(pause)
+        time.sleep(0.5)
+        while not gpio_input.events.empty():
+            print(gpio_input.events.get())
+        gpio_input.stop()
+    else:
+        try:
+            while True:
+                print(gpio_input.events.get())
+        except KeyboardInterrupt:
+            gpio_input.stop()
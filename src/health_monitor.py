@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Surveillance de la santé de l'assistant Raspberry Pi
+Contrôles planifiés sur horloge monotone (disque, mémoire, température,
+Bluetooth, réseau), sans processus externe ; alerte aux seuls changements d'état
+"""
+
+import time
+import shutil
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from metrics import metrics
+from memory_governor import CRITICAL as MEMORY_CRITICAL, NORMAL, PRESSURE
+from bluetooth_connection import CONNECTED, UNKNOWN as BLUETOOTH_UNKNOWN
+from thermal_governor import read_cpu_temperature, read_throttled, throttle_names
+
+
+UNKNOWN = 'unknown'
+OK = 'ok'
+WARNING = 'warning'
+CRITICAL = 'critical'
+
+# Ordre de gravité (UNKNOWN : pas encore mesuré ou mesure impossible)
+SEVERITY = (UNKNOWN, OK, WARNING, CRITICAL)
+
+TRANSITIONS = metrics.counter(
+    'health_transitions_total', "Changements d'état des contrôles de santé", ['check', 'status'])
+
+# Résultat d'une fonction de contrôle : état, message, mesures
+CheckOutcome = Tuple[str, str, Dict[str, Any]]
+
+
+def disk_check(paths: Iterable[str], min_free_mb: int) -> Callable[[], CheckOutcome]:
+    """
+    Contrôle de l'espace libre (critique sous min_free_mb, alerte sous le double)
+
+    Args:
+        paths: Dossiers surveillés (le plus rempli l'emporte)
+        min_free_mb: Espace libre minimal en Mo
+    """
+    paths = list(paths)
+
+    def check() -> CheckOutcome:
+        free = {}
+        for path in paths:
+            try:
+                free[path] = shutil.disk_usage(path).free / (1024 * 1024)
+            except OSError:
+                continue
+        if not free:
+            return UNKNOWN, "aucun dossier mesurable", {}
+        path = min(free, key=free.get)
+        details = {'path': path, 'free_mb': round(free[path])}
+        message = f"{free[path]:.0f} Mo libres sur {path}"
+        if free[path] < min_free_mb:
+            return CRITICAL, message, details
+        if free[path] < min_free_mb * 2:
+            return WARNING, message, details
+        return OK, message, details
+
+    return check
+
+
+def thermal_check(sys_root: str, warning_c: float, critical_c: float) -> Callable[[], CheckOutcome]:
+    """
+    Contrôle de la température du SoC et du bridage du firmware
+
+    Args:
+        sys_root: Racine de sysfs
+        warning_c: Température d'alerte
+        critical_c: Température critique
+    """
+    def check() -> CheckOutcome:
+        temperature = read_cpu_temperature(sys_root)
+        flags = read_throttled(sys_root)
+        active = throttle_names(flags)
+        details = {'temperature_c': temperature, 'throttled': active,
+                   'throttled_since_boot': throttle_names(flags, occurred=True)}
+        if temperature is None and flags is None:
+            return UNKNOWN, "aucune zone thermique", details
+        message = (f"{temperature:.1f} °C" if temperature is not None else "température inconnue")
+        if active:
+            message += f", bridage: {', '.join(active)}"
+        if temperature is not None and temperature >= critical_c:
+            return CRITICAL, message, details
+        if active or (temperature is not None and temperature >= warning_c):
+            return WARNING, message, details
+        return OK, message, details
+
+    return check
+
+
+def memory_check(governor) -> Callable[[], CheckOutcome]:
+    """
+    Niveau du gouverneur mémoire (sans nouvel échantillon : son thread l'entretient)
+
+    Args:
+        governor: MemoryGovernor
+    """
+    statuses = {NORMAL: OK, PRESSURE: WARNING, MEMORY_CRITICAL: CRITICAL}
+
+    def check() -> CheckOutcome:
+        sample = governor.last_sample
+        if not sample:
+            return UNKNOWN, "pas encore mesurée", {}
+        used = (sample.get('current') or 0) / (1024 * 1024)
+        limit = (sample.get('limit') or 0) / (1024 * 1024)
+        details = {'level': governor.level, 'used_mb': round(used), 'limit_mb': round(limit),
+                   'psi': sample.get('psi')}
+        return statuses[governor.level], f"{used:.0f} Mo / {limit:.0f} Mo ({governor.level})", details
+
+    return check
+
+
+def bluetooth_check(connection) -> Callable[[], CheckOutcome]:
+    """
+    État de la connexion à l'enceinte (machine d'états, sans appel à bluetoothctl)
+
+    Args:
+        connection: BluetoothConnection
+    """
+    def check() -> CheckOutcome:
+        state = connection.state
+        details = {'state': state, 'state_s': round(time.monotonic() - connection.state_since),
+                   'failures': connection.failures}
+        if state == CONNECTED:
+            return OK, state, details
+        if state == BLUETOOTH_UNKNOWN:
+            # Connexion pas encore lancée (démarrage)
+            return UNKNOWN, state, details
+        return WARNING, f"{state} depuis {details['state_s']} s", details
+
+    return check
+
+
+def network_check(estimator, max_age: float) -> Callable[[], CheckOutcome]:
+    """
+    Contrôle d'accessibilité de l'API : estimation entretenue par les requêtes,
+    sonde TCP (connexion simple) si elle est trop ancienne et l'assistant au repos
+
+    Args:
+        estimator: NetworkQualityEstimator
+        max_age: Âge maximal de la dernière mesure avant une sonde (secondes)
+    """
+    def check() -> CheckOutcome:
+        network = estimator.estimate()
+        idle = time.monotonic() - estimator.last_activity >= 10
+        if idle and (network.age is None or network.age > max_age):
+            estimator.probe()
+            network = estimator.estimate()
+        details = network.to_dict()
+        message = f"{estimator.host}:{estimator.port} {network.quality}"
+        if network.quality == 'offline':
+            return CRITICAL, message, details
+        if network.quality == 'poor':
+            return WARNING, message, details
+        if network.quality == 'unknown':
+            return UNKNOWN, message, details
+        return OK, message, details
+
+    return check
+
+
+class CheckResult:
+    __slots__ = ('name', 'status', 'message', 'details', 'checked_at', 'since')
+
+    def __init__(self, name: str, status: str = UNKNOWN, message: str = '',
+                 details: Optional[Dict[str, Any]] = None, checked_at: Optional[float] = None,
+                 since: Optional[float] = None):
+        """
+        Dernier résultat d'un contrôle
+
+        Args:
+            name: Nom du contrôle
+            status: ok, warning, critical ou unknown
+            message: Description lisible
+            details: Mesures du contrôle
+            checked_at: Instant du contrôle (horloge monotone)
+            since: Instant du dernier changement d'état (horloge monotone)
+        """
+        self.name = name
+        self.status = status
+        self.message = message
+        self.details = details or {}
+        self.checked_at = checked_at
+        self.since = since
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'status': self.status,
+            'message': self.message,
+            'age_s': None if self.checked_at is None else round(now - self.checked_at),
+            'since_s': None if self.since is None else round(now - self.since),
+            **self.details,
+        }
+
+
+class HealthStatus:
+    def __init__(self):
+        """État de santé en cache : dernier résultat de chaque contrôle"""
+        self.results: Dict[str, CheckResult] = {}
+
+    @property
+    def overall(self) -> str:
+        """État le plus grave parmi les contrôles"""
+        statuses = [result.status for result in self.results.values()]
+        return max(statuses, key=SEVERITY.index) if statuses else UNKNOWN
+
+    def get(self, name: str) -> CheckResult:
+        return self.results.get(name) or CheckResult(name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': self.overall,
+            'checks': {name: result.to_dict() for name, result in self.results.items()},
+        }
+
+
+class _Check:
+    __slots__ = ('name', 'func', 'interval', 'next_due')
+
+    def __init__(self, name: str, func: Callable[[], CheckOutcome], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        # Premier contrôle dès le prochain passage
+        self.next_due = 0.0
+
+
+class HealthMonitor:
+    def __init__(self):
+        """
+        Planificateur des contrôles de santé
+
+        Chaque contrôle a son échéance sur l'horloge monotone : un contrôle n'est
+        ni sauté ni répété quand l'horloge murale change. Les résultats restent
+        en cache (status) ; les écouteurs ne sont appelés qu'aux changements d'état.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.status = HealthStatus()
+        self._checks: Dict[str, _Check] = {}
+        self._listeners: List[Callable[[CheckResult, str], None]] = []
+        self._lock = threading.Lock()
+
+        metrics.gauge('health_status', "État de santé global (0 inconnu, 1 ok, 2 alerte, 3 critique)",
+                      lambda: SEVERITY.index(self.status.overall))
+
+    def register(self, name: str, func: Callable[[], CheckOutcome], interval: float) -> None:
+        """
+        Enregistre (ou remplace) un contrôle
+
+        Args:
+            name: Nom du contrôle (disk, memory, thermal...)
+            func: Fonction retournant (état, message, mesures)
+            interval: Intervalle entre deux contrôles en secondes
+        """
+        with self._lock:
+            check = self._checks.get(name)
+            if check is None:
+                self._checks[name] = _Check(name, func, interval)
+                self.status.results.setdefault(name, CheckResult(name))
+                metrics.gauge(f'health_{name}_status',
+                              f"État du contrôle {name} (0 inconnu, 1 ok, 2 alerte, 3 critique)",
+                              lambda: SEVERITY.index(self.status.get(name).status))
+            else:
+                check.func = func
+                check.interval = interval
+                check.next_due = min(check.next_due, time.monotonic() + interval)
+
+    def add_listener(self, listener: Callable[[CheckResult, str], None]) -> None:
+        """
+        Ajoute un écouteur des changements d'état
+
+        Args:
+            listener: Fonction recevant le nouveau résultat et l'état précédent
+        """
+        self._listeners.append(listener)
+
+    def run_check(self, name: str) -> CheckResult:
+        """
+        Exécute un contrôle immédiatement et met à jour le cache
+
+        Args:
+            name: Nom du contrôle
+
+        Returns:
+            Résultat du contrôle
+        """
+        check = self._checks[name]
+        now = time.monotonic()
+        check.next_due = now + check.interval
+        try:
+            status, message, details = check.func()
+        except Exception as e:
+            self.logger.error(f"Erreur du contrôle de santé {name}: {e}")
+            status, message, details = UNKNOWN, str(e), {}
+
+        previous = self.status.get(name)
+        changed = status != previous.status
+        result = CheckResult(name, status, message, details, now,
+                             now if changed else previous.since)
+        self.status.results[name] = result
+        if changed:
+            self._transition(result, previous.status)
+        return result
+
+    def _transition(self, result: CheckResult, previous: str) -> None:
+        """Alerte sur changement d'état (aggravation en warning, retour à la normale en info)"""
+        TRANSITIONS.inc(check=result.name, status=result.status)
+        if result.status in (WARNING, CRITICAL):
+            self.logger.warning(f"Santé {result.name} {previous} -> {result.status}: {result.message}")
+        elif previous in (WARNING, CRITICAL):
+            self.logger.info(f"Santé {result.name} {previous} -> {result.status}: {result.message}")
+        for listener in list(self._listeners):
+            try:
+                listener(result, previous)
+            except Exception as e:
+                self.logger.error(f"Erreur d'écouteur de santé ({result.name}): {e}")
+
+    def run_pending(self) -> float:
+        """
+        Exécute les contrôles arrivés à échéance
+
+        Returns:
+            Secondes jusqu'à la prochaine échéance
+        """
+        with self._lock:
+            checks = list(self._checks.values())
+        for check in checks:
+            if time.monotonic() >= check.next_due:
+                self.run_check(check.name)
+        if not checks:
+            return 60.0
+        return max(0.0, min(check.next_due for check in checks) - time.monotonic())
+
+
+if __name__ == "__main__":
+    # État de santé de la machine courante (python3 health_monitor.py [racine sysfs])
+    import sys
+    import json
+
+    logging.basicConfig(level=logging.INFO)
+
+    sys_root = sys.argv[1] if len(sys.argv) > 1 else '/sys'
+    monitor = HealthMonitor()
+    monitor.register('disk', disk_check(['/tmp', '/'], 100), 300)
+    monitor.register('thermal', thermal_check(sys_root, 70, 80), 60)
+    monitor.run_pending()
+    print(json.dumps(monitor.status.to_dict(), indent=2, ensure_ascii=False))
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Journalisation non bloquante de l'assistant Raspberry Pi
+Les threads audio et de requêtes ne font que déposer les enregistrements dans une
+file ; un thread dédié écrit le fichier (avec rotation), la console ou journald
+"""
+
+import os
+import sys
+import queue
+import socket
+import struct
+import logging
+import logging.handlers
+from typing import Dict, List, Optional
+
+from tracing import tracer
+from metrics import metrics
+
+
+DEFAULT_LOG_FILE = '/opt/rpi-assistant/logs/assistant.log'
+JOURNAL_SOCKET = '/run/systemd/journal/socket'
+SYSLOG_IDENTIFIER = 'rpi-assistant'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Enregistrements en attente au plus : au-delà ils sont abandonnés, jamais attendus
+QUEUE_SIZE = 10000
+
+# Valeurs de log_rotate acceptées par TimedRotatingFileHandler
+TIMED_ROTATIONS = ('S', 'M', 'H', 'D', 'MIDNIGHT', 'W0', 'W1', 'W2', 'W3', 'W4', 'W5', 'W6')
+
+# Priorités syslog par niveau Python
+_PRIORITIES = {logging.DEBUG: 7, logging.INFO: 6, logging.WARNING: 4,
+               logging.ERROR: 3, logging.CRITICAL: 2}
+
+DROPPED = metrics.counter(
+    'log_records_dropped_total', "Enregistrements de log abandonnés (file pleine)")
+
+
+def parse_levels(value: str) -> Dict[str, int]:
+    """
+    Lit les niveaux par module
+
+    Args:
+        value: Paires "module=NIVEAU" séparées par des virgules
+
+    Returns:
+        Niveau par nom de logger (entrées invalides ignorées)
+    """
+    levels = {}
+    for item in (value or '').split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        level = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+class ContextFilter(logging.Filter):
+    """Ajoute la trace active (thread appelant) aux enregistrements"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = tracer.current()
+        record.trace_id = trace.id if trace is not None else None
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format texte suivi des champs structurés (clé=valeur)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = dict(getattr(record, 'fields', None) or {})
+        if getattr(record, 'trace_id', None):
+            fields['trace_id'] = record.trace_id
+        if fields:
+            text += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui abandonne l'enregistrement plutôt que d'attendre"""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.inc()
+
+
+class JournaldHandler(logging.Handler):
+    def __init__(self, socket_path: str = JOURNAL_SOCKET, identifier: str = SYSLOG_IDENTIFIER):
+        """
+        Envoi natif à journald (champs structurés, sans passer par stdout)
+
+        Args:
+            socket_path: Socket du journal systemd
+            identifier: SYSLOG_IDENTIFIER des enregistrements
+        """
+        super().__init__()
+        self.socket_path = socket_path
+        self.identifier = identifier
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    @staticmethod
+    def _field(key: str, value) -> bytes:
+        """Champ du protocole natif (forme binaire si la valeur contient un saut de ligne)"""
+        data = str(value).encode('utf-8', 'replace')
+        name = key.upper().encode('ascii', 'replace')
+        if b'\n' in data:
+            return name + b'\n' + struct.pack('<Q', len(data)) + data + b'\n'
+        return name + b'=' + data + b'\n'
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            fields = {
+                'MESSAGE': self.format(record),
+                'PRIORITY': _PRIORITIES.get(record.levelno, 6),
+                'SYSLOG_IDENTIFIER': self.identifier,
+                'LOGGER': record.name,
+                'THREAD_NAME': record.threadName,
+                'CODE_FILE': record.pathname,
+                'CODE_LINE': record.lineno,
+                'CODE_FUNC': record.funcName,
+            }
+            if getattr(record, 'trace_id', None):
+                fields['TRACE_ID'] = record.trace_id
+            for key, value in (getattr(record, 'fields', None) or {}).items():
+                fields[key.upper().lstrip('_')] = value
+            self._socket.sendto(b''.join(self._field(k, v) for k, v in fields.items()),
+                                self.socket_path)
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self._socket.close()
+        super().close()
+
+
+class LogPipeline:
+    def __init__(self):
+        """
+        Journalisation en file : QueueHandler sur le logger racine, QueueListener
+        vers les sorties configurées (fichier avec rotation, console ou journald)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+        self.handler: Optional[DroppingQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.config_manager = None
+        self._module_levels: Dict[str, int] = {}
+
+    @property
+    def installed(self) -> bool:
+        return self.handler is not None
+
+    def install(self, level: int = logging.INFO) -> None:
+        """
+        Branche la file sur le logger racine ; les enregistrements attendent
+        la configuration des sorties (configure)
+        """
+        if self.installed:
+            return
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(ContextFilter())
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+
+    def configure(self, config_manager) -> None:
+        """
+        Applique log_* de config-gpt.txt (sans effet si la file n'est pas installée)
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        if not self.installed:
+            return
+        if self.config_manager is None:
+            self.config_manager = config_manager
+            config_manager.subscribe(self.on_config_changed)
+        self._apply_levels()
+        self._start(self._build_handlers())
+
+    def on_config_changed(self, old, new, changes) -> None:
+        """Reconfigure à chaud quand une clé log_* change"""
+        keys = changes.get('gpt', set())
+        if any(key.startswith('log_') for key in keys):
+            self.configure(self.config_manager)
+            self.logger.info("Journalisation reconfigurée")
+
+    def _apply_levels(self) -> None:
+        config = self.config_manager
+        level = logging.getLevelName(config.get_value('gpt', 'log_level', 'INFO').upper())
+        logging.getLogger().setLevel(level if isinstance(level, int) else logging.INFO)
+
+        levels = parse_levels(config.get_value('gpt', 'log_levels', ''))
+        for name in set(self._module_levels) - set(levels):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        for name, module_level in levels.items():
+            logging.getLogger(name).setLevel(module_level)
+        self._module_levels = levels
+
+    def _build_handlers(self) -> List[logging.Handler]:
+        config = self.config_manager
+        formatter = StructuredFormatter(LOG_FORMAT)
+        handlers: List[logging.Handler] = []
+
+        if config.get_bool_value('gpt', 'log_journald', False) and os.path.exists(JOURNAL_SOCKET):
+            console = JournaldHandler()
+            # Champs structurés envoyés à part : message seul
+            console.setFormatter(logging.Formatter('%(name)s - %(message)s'))
+        else:
+            console = logging.StreamHandler(sys.stderr)
+            console.setFormatter(formatter)
+        handlers.append(console)
+
+        log_file = config.get_value('gpt', 'log_file', DEFAULT_LOG_FILE)
+        if log_file:
+            try:
+                handlers.append(self._file_handler(log_file))
+                handlers[-1].setFormatter(formatter)
+            except OSError as e:
+                # Pas de fichier : la console (ou journald) reste disponible
+                console.handle(logging.makeLogRecord({
+                    'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': f"Fichier de log indisponible ({log_file}): {e}"}))
+        return handlers
+
+    def _file_handler(self, log_file: str) -> logging.Handler:
+        """Fichier avec rotation par taille (log_rotate=size) ou par période"""
+        config = self.config_manager
+        backups = config.get_int_value('gpt', 'log_backups', 3)
+        rotate = config.get_value('gpt', 'log_rotate', 'size').upper()
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        if rotate in TIMED_ROTATIONS:
+            return logging.handlers.TimedRotatingFileHandler(
+                log_file, when=rotate, backupCount=backups, encoding='utf-8')
+        return logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=config.get_int_value('gpt', 'log_max_kb', 1024) * 1024,
+            backupCount=backups, encoding='utf-8')
+
+    def _start(self, handlers: List[logging.Handler]) -> None:
+        """Remplace les sorties : l'ancien listener vide la file avant de s'arrêter"""
+        previous = self.listener
+        if previous is not None:
+            previous.stop()
+            for handler in previous.handlers:
+                handler.close()
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Écrit les enregistrements en attente et ferme les sorties"""
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+
+
+# Journalisation partagée par tout le processus
+log_pipeline = LogPipeline()
+
+
+if __name__ == "__main__":
+    # Démonstration : champs structurés et niveaux par module
+    import tempfile
+    from config_manager import ConfigManager
+
+    log_dir = tempfile.mkdtemp()
+    with open(os.path.join(log_dir, 'config-gpt.txt'), 'w', encoding='utf-8') as f:
+        f.write(f"log_file={os.path.join(log_dir, 'assistant.log')}\n"
+                "log_levels=demo.verbose=DEBUG\n")
+    config_manager = ConfigManager(log_dir)
+
+    log_pipeline.install()
+    log_pipeline.configure(config_manager)
+    logging.getLogger('demo').info("Transcription reçue", extra={'fields': {'chars': 42}})
+    logging.getLogger('demo').debug("Masqué (niveau INFO)")
+    logging.getLogger('demo.verbose').debug("Visible (log_levels)")
+    log_pipeline.stop()
+    print(open(os.path.join(log_dir, 'assistant.log')).read(), end='')
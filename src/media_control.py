@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Commandes Spotify locales pour l'assistant Raspberry Pi
+Reconnaît les commandes de lecture (pause, suivant, volume...) et les exécute sans passer par GPT
+"""
+
+import os
+import re
+import time
+import logging
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from tracing import tracer
+from metrics import metrics
+
+try:
+    from jeepney import DBusAddress, new_method_call
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:
+    DBusAddress = None
+
+
+LOCAL_INTENTS = metrics.counter(
+    'assistant_local_intents_total', "Commandes exécutées localement", ['intent', 'result'])
+
+# Formules de politesse autour d'une commande ("tu peux mettre pause s'il te plaît")
+_PREFIX = r"(?:(?:ok|dis|alors|euh|eh)\s+)*(?:(?:est ce que tu peux|tu peux|peux tu|pourrais tu|merci de)\s+)?"
+_SUFFIX = r"(?:\s+(?:s il te plait|stp|merci|maintenant))*"
+_TRACK = r"(?:la |le )?(?:chanson|morceau|titre|piste|musique)"
+_VOLUME = r"(?:le |du )?(?:volume|son)"
+
+# Motifs appliqués au texte normalisé (minuscules, sans accents ni ponctuation)
+INTENT_PATTERNS: List[Tuple[str, str]] = [
+    ('volume_set', rf"(?:mets? |regle )?{_VOLUME} (?:a )?(?P<value>100|\d{{1,2}})(?: pour ?cent)?"),
+    ('volume_up', rf"(?:{_VOLUME} )?plus fort|(?:monte|augmente)(?: {_VOLUME})?(?: un peu)?"),
+    ('volume_down', rf"(?:{_VOLUME} )?moins fort|(?:baisse|diminue)(?: {_VOLUME})?(?: un peu)?"),
+    ('unmute', rf"(?:remets?|rallume|reactive) {_VOLUME}|(?:enleve|retire|coupe) (?:la )?sourdine|unmute"),
+    ('mute', rf"(?:coupe|enleve|eteins) {_VOLUME}|(?:mets? (?:en |la )?)?sourdine|(?:mode )?silencieux|mute"),
+    ('next', rf"(?:{_TRACK} )?suivante?|(?:passe|saute)(?: (?:a )?{_TRACK}(?: suivante?)?)?|next"),
+    ('previous', rf"(?:{_TRACK} )?precedente?|(?:reviens|retourne)(?: (?:a )?{_TRACK} precedente?| en arriere)?"),
+    ('pause', rf"(?:mets? (?:en )?|fais )?pause|(?:arrete|stoppe|stop|coupe)(?: {_TRACK}| la lecture| spotify)?"),
+    ('play', rf"(?:reprends?|relance|continue|play|joue)(?: {_TRACK}| la lecture| spotify)?"
+             rf"|(?:remets?|mets) (?:{_TRACK}|spotify)|lecture"),
+]
+
+COMPILED_INTENTS = [(name, re.compile(rf"{_PREFIX}(?:{pattern}){_SUFFIX}"))
+                    for name, pattern in INTENT_PATTERNS]
+
+# Commandes appliquées au volume des flux Spotify plutôt qu'au lecteur
+VOLUME_INTENTS = ('volume_set', 'volume_up', 'volume_down', 'mute', 'unmute')
+
+# Méthodes MPRIS par commande
+MPRIS_METHODS = {'play': 'Play', 'pause': 'Pause', 'next': 'Next', 'previous': 'Previous'}
+
+
+def normalize(text: str) -> str:
+    """Minuscules, sans accents, ponctuation remplacée par des espaces"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9%]+", ' ', text).replace('%', ' pour cent')
+    return ' '.join(text.split())
+
+
+def match_intent(text: str) -> Optional[Tuple[str, Optional[int]]]:
+    """
+    Reconnaît une commande de lecture dans une transcription
+
+    Seule une phrase entière est reconnue : une question qui contient
+    "pause" ou "suivant" continue vers GPT.
+
+    Args:
+        text: Transcription Whisper
+
+    Returns:
+        (commande, valeur) ou None
+    """
+    normalized = normalize(text)
+    for name, pattern in COMPILED_INTENTS:
+        match = pattern.fullmatch(normalized)
+        if match:
+            value = match.groupdict().get('value')
+            return name, int(value) if value is not None else None
+    return None
+
+
+class MprisBackend:
+    def __init__(self, bus_address: Optional[str] = None):
+        """
+        Contrôle de librespot via MPRIS sur le bus de session D-Bus
+
+        Args:
+            bus_address: Adresse du bus (par défaut celui de l'utilisateur courant)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.bus_address = (bus_address or os.environ.get('DBUS_SESSION_BUS_ADDRESS') or
+                            f"unix:path=/run/user/{os.getuid()}/bus")
+        self._connection = None
+        self._player: Optional[str] = None
+
+    @staticmethod
+    def available() -> bool:
+        return DBusAddress is not None
+
+    def _call(self, bus_name: str, path: str, interface: str, method: str):
+        """Appel D-Bus sur la connexion persistante"""
+        if self._connection is None:
+            self._connection = open_dbus_connection(bus=self.bus_address)
+        message = new_method_call(DBusAddress(path, bus_name=bus_name, interface=interface), method)
+        return unwrap_msg(self._connection.send_and_get_reply(message, timeout=2))
+
+    def _find_player(self) -> Optional[str]:
+        """Nom D-Bus du lecteur MPRIS, librespot de préférence"""
+        names = self._call('org.freedesktop.DBus', '/org/freedesktop/DBus',
+                           'org.freedesktop.DBus', 'ListNames')[0]
+        players = [n for n in names if n.startswith('org.mpris.MediaPlayer2.')]
+        return next((n for n in players if 'librespot' in n.lower() or 'spotify' in n.lower()),
+                    players[0] if players else None)
+
+    def command(self, name: str) -> bool:
+        """
+        Exécute play, pause, next ou previous
+
+        Returns:
+            True si le lecteur a accepté la commande
+        """
+        for attempt in range(2):
+            try:
+                if self._player is None:
+                    self._player = self._find_player()
+                    if self._player is None:
+                        self.logger.warning("Aucun lecteur MPRIS (librespot lancé avec D-Bus ?)")
+                        return False
+                self._call(self._player, '/org/mpris/MediaPlayer2',
+                           'org.mpris.MediaPlayer2.Player', MPRIS_METHODS[name])
+                return True
+            except Exception as e:
+                # Lecteur redémarré ou bus fermé : une nouvelle tentative avec une nouvelle connexion
+                self.logger.debug(f"Appel MPRIS {name} (tentative {attempt + 1}): {e}")
+                if self._connection is not None:
+                    self._connection.close()
+                self._connection = None
+                self._player = None
+        self.logger.error(f"Commande Spotify {name} impossible")
+        return False
+
+
+class StubBackend:
+    def __init__(self):
+        """Lecteur factice pour les tests : enregistre les commandes reçues"""
+        self.commands: List[str] = []
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def command(self, name: str) -> bool:
+        self.commands.append(name)
+        return True
+
+
+class MediaController:
+    def __init__(self, config_manager, ducker=None, backend=None):
+        """
+        Exécute les commandes reconnues sur Spotify
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+            ducker: Atténuation en cours (les réglages de volume en tiennent compte)
+            backend: Lecteur (par défaut selon control_backend)
+        """
+        self.config_manager = config_manager
+        self.logger = logging.getLogger(__name__)
+        self.ducker = ducker
+        self.backend = backend or self._create_backend()
+        # Volume des flux Spotify pour le lecteur factice
+        self.stub_volumes: Dict[int, Dict[str, float]] = {}
+        # Volumes d'avant la sourdine, rétablis par unmute
+        self._unmuted: Dict[int, Dict[str, float]] = {}
+
+    def _create_backend(self):
+        choice = self.config_manager.get_value('spotify', 'control_backend', 'auto')
+        if choice == 'stub':
+            return StubBackend()
+        if MprisBackend.available():
+            return MprisBackend()
+        if choice == 'mpris':
+            self.logger.warning("jeepney non installé, commandes Spotify indisponibles")
+        return None
+
+    @property
+    def enabled(self) -> bool:
+        return self.config_manager.get_bool_value('spotify', 'voice_control', True)
+
+    def match(self, text: str) -> Optional[Tuple[str, Optional[int]]]:
+        """Commande locale reconnue dans la transcription, si activé"""
+        return match_intent(text) if self.enabled else None
+
+    def execute(self, intent: Tuple[str, Optional[int]]) -> bool:
+        """
+        Exécute une commande reconnue
+
+        Args:
+            intent: (commande, valeur) retourné par match
+
+        Returns:
+            True si la commande est appliquée
+        """
+        name, value = intent
+        start = time.monotonic()
+        with tracer.span('intent.execute', intent=name):
+            try:
+                if name in VOLUME_INTENTS:
+                    ok = self._change_volume(name, value)
+                elif self.backend is not None:
+                    ok = self.backend.command(name)
+                else:
+                    ok = False
+            except Exception as e:
+                self.logger.error(f"Erreur lors de la commande {name}: {e}")
+                ok = False
+
+        LOCAL_INTENTS.inc(intent=name, result='ok' if ok else 'failed')
+        self.logger.info(f"Commande locale {name}: {'OK' if ok else 'échec'} "
+                         f"({(time.monotonic() - start) * 1000:.0f} ms)")
+        return ok
+
+    def _change_volume(self, name: str, value: Optional[int]) -> bool:
+        """Volume des flux raspotify (hors atténuation) via le serveur de son"""
+        if isinstance(self.backend, StubBackend):
+            streams = self.stub_volumes
+        else:
+            streams = self.ducker.base_volumes() if self.ducker else {}
+        if not streams:
+            self.logger.warning("Aucun flux Spotify en cours")
+            return False
+
+        step = self.config_manager.get_int_value('spotify', 'volume_step', 10) / 100.0
+        volumes = {}
+        for index, stream in streams.items():
+            if name == 'volume_set':
+                volume = value / 100.0
+            elif name == 'mute':
+                volume = 0.0
+            elif name == 'unmute':
+                volume = self._unmuted.get(index, stream)['volume']
+            elif name == 'volume_up':
+                volume = stream['volume'] + step
+            else:
+                volume = stream['volume'] - step
+            volumes[index] = {'volume': min(1.0, max(0.0, volume)), 'channels': stream['channels']}
+
+        if name == 'mute':
+            # Une seconde sourdine ne remplace pas les volumes à rétablir
+            self._unmuted.update({index: stream for index, stream in streams.items()
+                                  if stream['volume'] > 0})
+        else:
+            self._unmuted = {}
+
+        if isinstance(self.backend, StubBackend):
+            self.stub_volumes.update(volumes)
+            self.backend.command(name)
+        else:
+            self.ducker.set_volumes(volumes)
+        return True
+
+
+if __name__ == "__main__":
+    # Reconnaissance des commandes (python3 media_control.py "mets pause")
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    phrases = sys.argv[1:] or [
+        "Pause.", "Mets pause s'il te plaît", "Suivant !", "Chanson précédente",
+        "Volume plus fort", "Baisse le son", "Mets le volume à 30 %", "Reprends la musique",
+        "Coupe le son", "Remets le son", "Mets le volume à 150",
+        "Pourquoi la musique s'arrête ?", "Quelle est la chanson suivante ?",
+    ]
+    for phrase in phrases:
+        start = time.perf_counter()
+        intent = match_intent(phrase)
+        print(f"{phrase!r:40} -> {intent} ({(time.perf_counter() - start) * 1e6:.0f} µs)")
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Gouverneur mémoire de l'assistant Raspberry Pi
+Suit la mémoire par sous-système, surveille la pression (PSI, événements du cgroup)
+et libère les caches ou dégrade les fonctions optionnelles avant l'OOM killer
+"""
+
+import os
+import gc
+import select
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from metrics import metrics
+
+
+NORMAL = 'normal'
+PRESSURE = 'pressure'
+CRITICAL = 'critical'
+LEVELS = (NORMAL, PRESSURE, CRITICAL)
+
+# Fonctions optionnelles coupées à partir de chaque niveau
+DEGRADED_FEATURES = {
+    NORMAL: frozenset(),
+    PRESSURE: frozenset({'cloud_tts', 'cache_warmup'}),
+    CRITICAL: frozenset({'cloud_tts', 'cache_warmup', 'voice_command'}),
+}
+
+# Seuil PSI du déclencheur noyau : 150 ms de blocage sur 2 s (fenêtre
+# multiple de 2 s exigée des utilisateurs non privilégiés)
+PSI_TRIGGER = b"some 150000 2000000"
+
+# Retour au niveau inférieur seulement sous le seuil moins cette marge (anti-oscillation)
+HYSTERESIS = 0.05
+
+PRESSURE_LEVEL = metrics.gauge(
+    'memory_pressure_level', "Niveau de pression mémoire (0 normal, 1 pression, 2 critique)",
+    lambda: LEVELS.index(memory_governor.level))
+metrics.gauge('memory_rss_bytes', "RSS du processus au dernier contrôle",
+              lambda: memory_governor.last_sample.get('rss'))
+metrics.gauge('memory_cgroup_bytes', "Mémoire du cgroup du service (memory.current)",
+              lambda: memory_governor.last_sample.get('current'))
+metrics.gauge('memory_psi_some_avg10', "Pression mémoire PSI (some avg10, %)",
+              lambda: memory_governor.last_sample.get('psi'))
+RELEASES = metrics.counter(
+    'memory_releases_total', "Libérations de mémoire par niveau", ['level'])
+
+
+def read_rss(proc_root: str = '/proc') -> Optional[int]:
+    """RSS du processus en octets (/proc/self/statm, sans allocation notable)"""
+    try:
+        with open(os.path.join(proc_root, 'self', 'statm'), 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_psi(path: str) -> Optional[float]:
+    """
+    Pression mémoire "some avg10" (pourcentage du temps bloqué sur 10 s)
+
+    Args:
+        path: Fichier memory.pressure (cgroup) ou /proc/pressure/memory
+    """
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.startswith('some '):
+                    fields = dict(item.split('=', 1) for item in line.split()[1:])
+                    return float(fields['avg10'])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def read_keyed(path: str) -> Dict[str, int]:
+    """Fichier "clé valeur" du cgroup (memory.events, memory.stat)"""
+    values = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1].isdigit():
+                    values[parts[0]] = int(parts[1])
+    except OSError:
+        pass
+    return values
+
+
+def _read_int(path: str) -> Optional[int]:
+    """Entier d'un fichier du cgroup (None si absent ou "max")"""
+    try:
+        with open(path, 'r') as f:
+            value = f.read().strip()
+        return int(value) if value.isdigit() else None
+    except OSError:
+        return None
+
+
+def release_heap() -> None:
+    """Rend au système la mémoire libérée par Python (gc puis malloc_trim de la glibc)"""
+    gc.collect()
+    try:
+        import ctypes
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class _Subsystem:
+    __slots__ = ('name', 'usage', 'release', 'loaded')
+
+    def __init__(self, name: str, usage: Optional[Callable[[], int]],
+                 release: Optional[Callable[[str], None]]):
+        self.name = name
+        self.usage = usage
+        self.release = release
+        # RSS mesuré au chargement (imports, bibliothèques natives)
+        self.loaded = 0
+
+    def bytes(self) -> int:
+        try:
+            return self.loaded + (self.usage() if self.usage else 0)
+        except Exception:
+            return self.loaded
+
+
+class MemoryGovernor:
+    def __init__(self, cgroup_root: str = '/sys/fs/cgroup', proc_root: str = '/proc'):
+        """
+        Gouverneur mémoire
+
+        La consommation vient du cgroup du service (memory.current face à
+        MemoryMax), à défaut du RSS face à memory_budget_mb. La pression vient
+        aussi de PSI et des événements high/max/oom du cgroup. À chaque montée
+        de niveau, les sous-systèmes enregistrés libèrent ce qu'ils peuvent.
+
+        Args:
+            cgroup_root: Racine du cgroup v2 (arborescence factice pour les tests)
+            proc_root: Racine de /proc
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self.level = NORMAL
+        self.last_sample: Dict[str, Optional[float]] = {}
+
+        self.budget_bytes = 512 * 1024 * 1024
+        self.pressure_ratio = 0.80
+        self.critical_ratio = 0.92
+        self.psi_threshold = 10.0
+        self.interval = 10.0
+
+        self._subsystems: Dict[str, _Subsystem] = {}
+        self._events: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[int] = None
+        self._cgroup = self._find_cgroup()
+        # Compteurs hérités d'avant le démarrage : seule leur progression compte
+        self._events = self._read_events()
+
+    def configure(self, config_manager) -> None:
+        """
+        Applique les seuils memory_* de config-gpt.txt
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.budget_bytes = config_manager.get_int_value('gpt', 'memory_budget_mb', 512) * 1024 * 1024
+        self.pressure_ratio = config_manager.get_int_value('gpt', 'memory_pressure_percent', 80) / 100.0
+        self.critical_ratio = config_manager.get_int_value('gpt', 'memory_critical_percent', 92) / 100.0
+        self.psi_threshold = config_manager.get_float_value('gpt', 'memory_psi_threshold', 10.0)
+        self.interval = config_manager.get_int_value('gpt', 'memory_check_interval', 10)
+
+    def _find_cgroup(self) -> Optional[str]:
+        """Dossier du cgroup v2 du processus (ligne "0::/chemin" de /proc/self/cgroup)"""
+        try:
+            with open(os.path.join(self.proc_root, 'self', 'cgroup'), 'r') as f:
+                for line in f:
+                    if line.startswith('0::'):
+                        path = os.path.join(self.cgroup_root, line[3:].strip().lstrip('/'))
+                        if os.path.exists(os.path.join(path, 'memory.current')):
+                            return path
+        except OSError:
+            pass
+        return None
+
+    def _read_events(self) -> Dict[str, int]:
+        """Compteurs memory.events du cgroup (vide hors cgroup)"""
+        if not self._cgroup:
+            return {}
+        return read_keyed(os.path.join(self._cgroup, 'memory.events'))
+
+    def register(self, name: str, usage: Optional[Callable[[], int]] = None,
+                 release: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Enregistre un sous-système suivi
+
+        Args:
+            name: Nom du sous-système (audio, spool...)
+            usage: Octets occupés par ses données (spool, tampons)
+            release: Libère ses caches ; reçoit le niveau (pressure ou critical)
+        """
+        with self._lock:
+            subsystem = self._subsystems.get(name)
+            if subsystem is None:
+                subsystem = self._subsystems[name] = _Subsystem(name, usage, release)
+                metrics.gauge(f'memory_{name}_bytes', f"Mémoire suivie du sous-système {name}",
+                              subsystem.bytes)
+            subsystem.usage = usage or subsystem.usage
+            subsystem.release = release or subsystem.release
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Attribue au sous-système la croissance du RSS pendant un chargement"""
+        before = read_rss(self.proc_root)
+        try:
+            yield
+        finally:
+            after = read_rss(self.proc_root)
+            if before is not None and after is not None:
+                self.register(name)
+                self._subsystems[name].loaded += max(0, after - before)
+
+    def unloaded(self, name: str) -> None:
+        """Le sous-système a libéré ce qu'il avait chargé"""
+        subsystem = self._subsystems.get(name)
+        if subsystem is not None:
+            subsystem.loaded = 0
+
+    def subsystems(self) -> Dict[str, int]:
+        """Octets suivis par sous-système"""
+        return {name: subsystem.bytes() for name, subsystem in self._subsystems.items()}
+
+    def allows(self, feature: str) -> bool:
+        """
+        Indique si une fonction optionnelle reste permise au niveau actuel
+
+        Args:
+            feature: cloud_tts, cache_warmup ou voice_command
+        """
+        return feature not in DEGRADED_FEATURES[self.level]
+
+    def sample(self) -> Dict[str, Optional[float]]:
+        """
+        Lit l'état mémoire courant
+
+        Returns:
+            rss, current et limit (octets), psi (avg10 %), événements du cgroup
+        """
+        rss = read_rss(self.proc_root)
+        current = limit = None
+        psi = None
+        events: Dict[str, int] = {}
+        if self._cgroup:
+            current = _read_int(os.path.join(self._cgroup, 'memory.current'))
+            limit = _read_int(os.path.join(self._cgroup, 'memory.max'))
+            psi = read_psi(os.path.join(self._cgroup, 'memory.pressure'))
+            events = self._read_events()
+        if psi is None:
+            psi = read_psi(os.path.join(self.proc_root, 'pressure', 'memory'))
+
+        sample = {
+            'rss': rss,
+            'current': current if current is not None else rss,
+            'limit': limit or self.budget_bytes,
+            'psi': psi,
+        }
+        sample.update({f'events_{key}': value for key, value in events.items()})
+        return sample
+
+    def _classify(self, sample: Dict[str, Optional[float]]) -> str:
+        """Niveau correspondant à un échantillon"""
+        ratio = (sample['current'] or 0) / sample['limit'] if sample['limit'] else 0.0
+        psi = sample['psi'] or 0.0
+
+        # Le cgroup a atteint sa limite ou tué un processus depuis le dernier contrôle
+        hit_limit = any(sample.get(f'events_{key}', 0) > self._events.get(key, 0)
+                        for key in ('max', 'oom', 'oom_kill'))
+        self._events = {key[7:]: value for key, value in sample.items()
+                        if key.startswith('events_')}
+
+        if hit_limit or ratio >= self.critical_ratio:
+            return CRITICAL
+        if self.level == CRITICAL and ratio >= self.critical_ratio - HYSTERESIS:
+            return CRITICAL
+        if ratio >= self.pressure_ratio or psi >= self.psi_threshold:
+            return PRESSURE
+        if self.level != NORMAL and ratio >= self.pressure_ratio - HYSTERESIS:
+            return PRESSURE
+        return NORMAL
+
+    def check(self) -> str:
+        """
+        Contrôle la mémoire et agit sur les changements de niveau
+
+        Returns:
+            Niveau courant
+        """
+        sample = self.sample()
+        self.last_sample = sample
+        level = self._classify(sample)
+        previous, self.level = self.level, level
+
+        if level != previous:
+            used = (sample['current'] or 0) / (1024 * 1024)
+            message = (f"Mémoire {previous} -> {level}: {used:.0f} Mo / "
+                       f"{sample['limit'] / (1024 * 1024):.0f} Mo, PSI {sample['psi']}")
+            if LEVELS.index(level) > LEVELS.index(previous):
+                self.logger.warning(message)
+            else:
+                self.logger.info(message)
+
+        if LEVELS.index(level) > LEVELS.index(previous):
+            self.release(level)
+        return level
+
+    def release(self, level: str) -> None:
+        """Demande aux sous-systèmes de libérer leurs caches, puis compacte le tas"""
+        RELEASES.inc(level=level)
+        for subsystem in list(self._subsystems.values()):
+            if subsystem.release is None:
+                continue
+            try:
+                subsystem.release(level)
+            except Exception as e:
+                self.logger.error(f"Erreur de libération mémoire ({subsystem.name}): {e}")
+        release_heap()
+
+    def start(self) -> None:
+        """Surveille la mémoire dans un thread (déclencheur PSI si possible, sinon périodique)"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._events = self._read_events()
+        self._thread = threading.Thread(target=self._run, name='memory-governor')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête le thread de surveillance et attend sa fin"""
+        self._stop.set()
+        wakeup = self._wakeup
+        if wakeup is not None:
+            # Réveille le poll du déclencheur PSI
+            try:
+                os.write(wakeup, b'\0')
+            except OSError:
+                pass
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def _open_trigger(self) -> Optional[int]:
+        """
+        Déclencheur PSI du noyau : réveil dès que la pression dépasse le seuil
+        (écriture dans memory.pressure, refusée sans délégation du cgroup)
+        """
+        if not self._cgroup:
+            return None
+        try:
+            fd = os.open(os.path.join(self._cgroup, 'memory.pressure'), os.O_RDWR | os.O_NONBLOCK)
+        except OSError:
+            return None
+        try:
+            os.write(fd, PSI_TRIGGER + b'\0')
+            return fd
+        except OSError:
+            os.close(fd)
+            return None
+
+    def _run(self) -> None:
+        trigger = self._open_trigger()
+        poller = None
+        wakeup = None
+        if trigger is not None:
+            poller = select.poll()
+            poller.register(trigger, select.POLLPRI)
+            wakeup, self._wakeup = os.pipe()
+            poller.register(wakeup, select.POLLIN)
+            self.logger.info("Déclencheur PSI mémoire actif")
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.check()
+                except Exception as e:
+                    self.logger.error(f"Erreur du contrôle mémoire: {e}")
+                if poller is not None:
+                    # Réveil immédiat sur pression, sinon contrôle périodique
+                    poller.poll(self.interval * 1000)
+                    if self._stop.wait(0.1):
+                        break
+                else:
+                    self._stop.wait(self.interval)
+        finally:
+            if trigger is not None:
+                os.close(trigger)
+            if wakeup is not None:
+                os.close(self._wakeup)
+                self._wakeup = None
+                os.close(wakeup)
+
+
+# Gouverneur partagé par tout le processus
+memory_governor = MemoryGovernor()
+
+
+if __name__ == "__main__":
+    # État mémoire courant et niveau calculé
+    logging.basicConfig(level=logging.INFO)
+
+    governor = MemoryGovernor()
+    governor.register('heap', release=lambda level: print(f"  libération ({level})"))
+    with governor.measure('heap'):
+        buffers = [bytearray(1024 * 1024) for _ in range(8)]
+    print(f"cgroup: {governor._cgroup or 'aucun'}")
+    print(f"niveau: {governor.check()}")
+    for key, value in governor.last_sample.items():
+        print(f"  {key}: {value}")
+    for name, size in governor.subsystems().items():
+        print(f"  {name}: {size / (1024 * 1024):.1f} Mo")
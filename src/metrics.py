@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Métriques de l'assistant Raspberry Pi au format texte Prometheus
+Compteurs et histogrammes en mémoire, exposés par un petit serveur HTTP local
+"""
+
+import os
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Bornes par défaut des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    """Formate les labels Prometheus: {a="x",b="y"}"""
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Compteur monotone avec labels
+
+        Args:
+            name: Nom de la métrique
+            documentation: Texte d'aide
+            labelnames: Noms des labels
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Incrémente le compteur pour les labels donnés"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Valeur courante pour les labels donnés"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        """Lignes au format texte Prometheus"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Histogramme cumulatif avec labels
+
+        Args:
+            name: Nom de la métrique
+            documentation: Texte d'aide
+            labelnames: Noms des labels
+            buckets: Bornes supérieures des classes
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Ajoute une observation"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            # Comptes par classe, puis somme et nombre total en fin de liste
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        """Lignes au format texte Prometheus"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+
+        for key, series in items:
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += series[i]
+                labels = _format_labels(self.labelnames, key, ('le', str(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ('le', '+Inf'))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, func: Callable[[], Optional[float]],
+                 metric_type: str = 'gauge'):
+        """
+        Jauge calculée uniquement au moment de la collecte
+
+        Args:
+            name: Nom de la métrique
+            documentation: Texte d'aide
+            func: Fonction retournant la valeur (ou None si indisponible)
+            metric_type: Type exporté ('counter' pour un cumul tenu ailleurs, ex: temps CPU)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+        self.metric_type = metric_type
+
+    def render(self) -> List[str]:
+        """Lignes au format texte Prometheus"""
+        try:
+            value = self.func()
+        except Exception:
+            value = None
+        if value is None:
+            return []
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}",
+                f"{self.name} {value}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Registre des métriques de l'assistant"""
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name: str, factory: Callable[[], object]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Retourne le compteur nommé (créé au premier appel)"""
+        return self._register(name, lambda: Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Retourne l'histogramme nommé (créé au premier appel)"""
+        return self._register(name, lambda: Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, func: Callable[[], Optional[float]]) -> Gauge:
+        """Enregistre une jauge calculée à la collecte"""
+        return self._register(name, lambda: Gauge(name, documentation, func))
+
+    def collected_counter(self, name: str, documentation: str,
+                          func: Callable[[], Optional[float]]) -> Gauge:
+        """Enregistre un compteur lu à la collecte (cumul tenu par le système, ex: temps CPU)"""
+        return self._register(name, lambda: Gauge(name, documentation, func, 'counter'))
+
+    def render(self) -> str:
+        """Exporte toutes les métriques au format texte Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registre partagé par tous les composants
+metrics = MetricsRegistry()
+
+STAGE_LATENCY = metrics.histogram(
+    'assistant_stage_duration_seconds', "Durée des étapes d'une commande vocale", ['stage'])
+COMMANDS = metrics.counter(
+    'assistant_commands_total', "Commandes vocales traitées par issue", ['status'])
+FAILURES = metrics.counter(
+    'assistant_failures_total', "Échecs par étape (stt, gpt, tts)", ['stage'])
+RETRIES = metrics.counter(
+    'assistant_retries_total', "Nouvelles tentatives par étape (stt, gpt, tts)", ['stage'])
+BLUETOOTH_RECONNECTS = metrics.counter(
+    'bluetooth_reconnects_total', "Tentatives de reconnexion Bluetooth par résultat", ['result'])
+BLUETOOTH_RECONNECT_LATENCY = metrics.histogram(
+    'bluetooth_reconnect_duration_seconds', "Durée des reconnexions Bluetooth")
+CACHE_REQUESTS = metrics.counter(
+    'assistant_cache_requests_total', "Accès aux caches par résultat (hit, miss)", ['cache', 'result'])
+SPOOL_EVICTIONS = metrics.counter(
+    'assistant_spool_evictions_total', "Fichiers audio placés sur disque (budget du spool en mémoire atteint)")
+
+
+def observe_trace(trace_record: Dict) -> None:
+    """
+    Alimente les métriques à partir d'une trace terminée (écouteur du traceur)
+
+    Args:
+        trace_record: Enregistrement produit par Tracer
+    """
+    if trace_record['trace'] == 'voice_command':
+        COMMANDS.inc(status=trace_record['status'])
+    STAGE_LATENCY.observe(trace_record['total_ms'] / 1000.0, stage=trace_record['trace'])
+    for span in trace_record['spans']:
+        STAGE_LATENCY.observe(span['duration_ms'] / 1000.0, stage=span['name'])
+
+
+def _process():
+    """Processus courant via psutil (importé seulement lors d'une collecte)"""
+    global _psutil_process
+    if _psutil_process is None:
+        import psutil
+        _psutil_process = psutil.Process(os.getpid())
+    return _psutil_process
+
+
+_psutil_process = None
+
+metrics.gauge('process_resident_memory_bytes', "Mémoire résidente du processus",
+              lambda: _process().memory_info().rss)
+metrics.collected_counter('process_cpu_seconds_total', "Temps CPU utilisateur et système du processus",
+                          lambda: sum(_process().cpu_times()[:2]))
+metrics.gauge('process_cpu_percent', "Utilisation CPU depuis la collecte précédente",
+              lambda: _process().cpu_percent(interval=None))
+metrics.gauge('process_threads', "Nombre de threads du processus",
+              lambda: _process().num_threads())
+metrics.gauge('process_start_time_seconds', "Heure de démarrage du processus",
+              lambda: _process().create_time())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = metrics
+
+    def do_GET(self):
+        if self.path not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Les collectes périodiques ne doivent pas polluer les logs
+        pass
+
+
+class MetricsServer:
+    def __init__(self, port: int = 9105, host: str = '127.0.0.1'):
+        """
+        Serveur HTTP local exposant /metrics
+
+        Args:
+            port: Port d'écoute
+            host: Adresse d'écoute (locale par défaut)
+        """
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> bool:
+        """
+        Démarre le serveur dans un thread dédié
+
+        Returns:
+            True si le serveur écoute
+        """
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            self.server.daemon_threads = True
+            thread = threading.Thread(target=self.server.serve_forever, name='metrics-server')
+            thread.daemon = True
+            thread.start()
+            self.logger.info(f"Métriques disponibles sur http://{self.host}:{self.port}/metrics")
+            return True
+        except Exception as e:
+            self.logger.error(f"Impossible de démarrer le serveur de métriques: {e}")
+            self.server = None
+            return False
+
+    def stop(self) -> None:
+        """Arrête le serveur"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+if __name__ == "__main__":
+    # Exposer les métriques de test
+    logging.basicConfig(level=logging.INFO)
+
+    FAILURES.inc(stage='stt')
+    STAGE_LATENCY.observe(0.42, stage='openai.whisper')
+    print(metrics.render())
+
+    server = MetricsServer()
+    if server.start():
+        print("Ctrl+C pour arrêter")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
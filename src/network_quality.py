@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Qualité réseau et choix adaptatif du pipeline pour l'assistant Raspberry Pi
+Estimation passive (traces des requêtes OpenAI) et sondes TCP légères au repos
+"""
+
+import time
+import socket
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from thermal_governor import thermal_governor
+
+
+DEFAULT_API_HOST = 'api.openai.com'
+
+# Octets par seconde de parole selon le codec d'envoi (mono 16 bits)
+# FLAC ~ 55 % du PCM brut sur la voix, Opus à débit vocal ~ 3 à 4 Ko/s
+CODEC_BYTES_PER_SECOND = {
+    'flac': lambda rate: rate * 2 * 0.55,
+    'opus': lambda rate: 4000,
+    'mp3': lambda rate: 16000,
+}
+
+# Latence de génération supposée avant toute mesure (ms)
+DEFAULT_CHAT_MS = 1500.0
+# Traitement Whisper côté serveur par seconde de parole (ms)
+STT_MS_PER_SECOND = 150.0
+
+# Étapes couvertes par la prévision de latence
+PREDICTED_STAGES = ('audio.encode_tail', 'audio.convert_mp3', 'openai.whisper', 'openai.chat')
+
+
+class NetworkEstimate:
+    __slots__ = ('rtt_ms', 'upload_bps', 'quality', 'age')
+
+    def __init__(self, rtt_ms: Optional[float], upload_bps: Optional[float],
+                 quality: str, age: Optional[float]):
+        """
+        Estimation instantanée de la qualité réseau
+
+        Args:
+            rtt_ms: Temps d'aller-retour lissé vers l'API
+            upload_bps: Débit montant lissé (octets/s)
+            quality: good, fair, poor, offline ou unknown
+            age: Ancienneté de la dernière mesure en secondes
+        """
+        self.rtt_ms = rtt_ms
+        self.upload_bps = upload_bps
+        self.quality = quality
+        self.age = age
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rtt_ms': None if self.rtt_ms is None else round(self.rtt_ms, 1),
+            'age_s': None if self.age is None else round(self.age),
+            'upload_kbps': None if self.upload_bps is None else round(self.upload_bps * 8 / 1000, 1),
+            'quality': self.quality,
+        }
+
+
+class NetworkQualityEstimator:
+    def __init__(self, api_base_url: str = '', alpha: float = 0.3,
+                 probe_interval: float = 60.0):
+        """
+        Estimateur de qualité réseau vers l'API OpenAI
+
+        Args:
+            api_base_url: URL de l'API (vide = api.openai.com)
+            alpha: Poids des nouvelles mesures dans la moyenne lissée
+            probe_interval: Intervalle des sondes actives quand aucune requête n'a eu lieu
+        """
+        self.logger = logging.getLogger(__name__)
+        self.alpha = alpha
+        self.probe_interval = probe_interval
+        self.host, self.port = self._parse_host(api_base_url)
+
+        self.rtt_ms: Optional[float] = None
+        self.upload_bps: Optional[float] = None
+        self.model_latency_ms: Dict[str, float] = {}
+        self.consecutive_failures = 0
+        self.last_sample = 0.0
+        self.last_activity = 0.0
+        self.last_probe = 0.0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _parse_host(api_base_url: str) -> Tuple[str, int]:
+        """Hôte et port de l'API"""
+        if not api_base_url:
+            return DEFAULT_API_HOST, 443
+        parsed = urlparse(api_base_url)
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        return parsed.hostname or DEFAULT_API_HOST, port
+
+    def configure(self, config_manager) -> None:
+        """
+        Applique la configuration réseau
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.host, self.port = self._parse_host(
+            config_manager.get_value('openai', 'api_base_url', ''))
+        self.probe_interval = config_manager.get_int_value('openai', 'network_probe_interval', 60)
+
+    def _smooth(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else current + self.alpha * (sample - current)
+
+    def observe_trace(self, trace_record: Dict) -> None:
+        """
+        Mesures passives à partir d'une trace terminée (écouteur du traceur)
+
+        Args:
+            trace_record: Enregistrement produit par Tracer
+        """
+        if trace_record['trace'] != 'voice_command':
+            return
+
+        with self._lock:
+            self.last_activity = time.monotonic()
+            for span in trace_record['spans']:
+                attrs = span.get('attrs', {})
+                seconds = span['duration_ms'] / 1000.0
+                if seconds <= 0:
+                    continue
+
+                if span['name'] == 'openai.whisper' and attrs.get('bytes'):
+                    # Borne basse : la durée inclut le traitement côté serveur
+                    self.upload_bps = self._smooth(self.upload_bps, attrs['bytes'] / seconds)
+                    self._sampled()
+                elif span['name'] == 'openai.chat.first_token':
+                    # Réponse reçue : l'API est joignable (durée dominée par le modèle, non retenue)
+                    self._sampled()
+                elif span['name'] == 'openai.chat' and attrs.get('model'):
+                    model = attrs['model']
+                    self.model_latency_ms[model] = self._smooth(
+                        self.model_latency_ms.get(model), span['duration_ms'])
+
+    def record_failure(self) -> None:
+        """Requête réelle en échec de connexion (après nouvelles tentatives)"""
+        with self._lock:
+            self.consecutive_failures += 1
+
+    def _sampled(self) -> None:
+        """Mesure réussie (verrou tenu)"""
+        self.last_sample = time.monotonic()
+        self.consecutive_failures = 0
+
+    def probe(self, timeout: float = 3.0) -> Optional[float]:
+        """
+        Sonde active : durée d'établissement d'une connexion TCP vers l'API
+
+        Args:
+            timeout: Délai maximal de connexion
+
+        Returns:
+            RTT mesuré en ms ou None en cas d'échec
+        """
+        start = time.monotonic()
+        self.last_probe = start
+        try:
+            with socket.create_connection((self.host, self.port), timeout=timeout):
+                rtt_ms = (time.monotonic() - start) * 1000
+        except OSError as e:
+            with self._lock:
+                self.consecutive_failures += 1
+            self.logger.debug(f"Sonde réseau vers {self.host}:{self.port} en échec: {e}")
+            return None
+
+        with self._lock:
+            self.rtt_ms = self._smooth(self.rtt_ms, rtt_ms)
+            self._sampled()
+        return rtt_ms
+
+    def estimate(self) -> NetworkEstimate:
+        """Estimation courante (sans bloquer)"""
+        with self._lock:
+            rtt_ms, upload_bps = self.rtt_ms, self.upload_bps
+            failures = self.consecutive_failures
+            age = time.monotonic() - self.last_sample if self.last_sample else None
+
+        if failures >= 2:
+            quality = 'offline'
+        elif rtt_ms is None:
+            quality = 'unknown'
+        elif rtt_ms < 150 and (upload_bps is None or upload_bps > 64000):
+            quality = 'good'
+        elif rtt_ms < 600 and (upload_bps is None or upload_bps > 16000):
+            quality = 'fair'
+        else:
+            quality = 'poor'
+        return NetworkEstimate(rtt_ms, upload_bps, quality, age)
+
+    def start(self) -> None:
+        """Démarre les sondes actives en arrière-plan"""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._probe_loop, name='network-probe')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Arrête les sondes actives"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _probe_loop(self) -> None:
+        """Sonde seulement au repos, jamais pendant une commande vocale"""
+        while not self._stop.wait(min(self.probe_interval, 10)):
+            now = time.monotonic()
+            with self._lock:
+                idle = now - self.last_activity >= 10
+                due = now - self.last_probe >= self.probe_interval
+                offline = self.consecutive_failures >= 2
+            if idle and (due or offline):
+                self.probe()
+
+
+class PipelineDecision:
+    __slots__ = ('codec', 'compression_level', 'model', 'cloud_stt', 'cloud_tts',
+                 'predicted_ms', 'reason', 'network')
+
+    def __init__(self, codec: str, compression_level: float, model: str, cloud_stt: bool,
+                 cloud_tts: bool, predicted_ms: float, reason: str, network: NetworkEstimate):
+        self.codec = codec
+        self.compression_level = compression_level
+        self.model = model
+        self.cloud_stt = cloud_stt
+        self.cloud_tts = cloud_tts
+        self.predicted_ms = predicted_ms
+        self.reason = reason
+        self.network = network
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'codec': self.codec,
+            'model': self.model,
+            'cloud_stt': self.cloud_stt,
+            'cloud_tts': self.cloud_tts,
+            'predicted_ms': round(self.predicted_ms),
+            'reason': self.reason,
+        }
+        data.update(self.network.to_dict())
+        return data
+
+
+class PipelinePolicy:
+    def __init__(self, config_manager, estimator: NetworkQualityEstimator):
+        """
+        Politique de choix du pipeline selon la qualité réseau
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+            estimator: Estimateur de qualité réseau
+        """
+        self.config_manager = config_manager
+        self.estimator = estimator
+        self.logger = logging.getLogger(__name__)
+        self.last_decision: Optional[PipelineDecision] = None
+
+    def decide(self, speech_seconds: float, sample_rate: int,
+               encoder_available: Callable[[str, int], bool]) -> PipelineDecision:
+        """
+        Choisit codec, modèle et synthèse pour tenir la cible de latence
+
+        Args:
+            speech_seconds: Durée d'enregistrement prévue
+            sample_rate: Fréquence de capture
+            encoder_available: Indique si un codec (flac, opus) s'encode en processus à cette fréquence
+
+        Returns:
+            Décision pour la commande à venir
+        """
+        config = self.config_manager
+        codec = config.get_value('gpt', 'upload_codec', 'flac').lower()
+        level = config.get_float_value('gpt', 'upload_compression_level', 0.5)
+        model = config.get_value('openai', 'model', 'gpt-4o')
+        fallback_model = config.get_value('openai', 'fallback_model', '')
+        target_ms = config.get_int_value('openai', 'latency_target_ms', 5000)
+        network = self.estimator.estimate()
+
+        reasons = []
+        if codec != 'mp3' and not encoder_available(codec, sample_rate):
+            # Sans encodeur en processus, l'enregistrement part en WAV converti par ffmpeg
+            codec = 'mp3'
+            reasons.append('no_encoder')
+
+        if not config.get_bool_value('openai', 'adaptive_pipeline', True):
+            reasons.insert(0, 'fixed')
+            codec, level = self._thermal(codec, level, reasons, sample_rate, encoder_available)
+            decision = PipelineDecision(codec, level, model, True, True,
+                                        self._predict(network, codec, model, speech_seconds, sample_rate),
+                                        '+'.join(reasons), network)
+            self.last_decision = decision
+            return decision
+
+        if network.quality == 'offline':
+            # Aucune requête cloud : échec immédiat plutôt qu'un délai d'attente
+            decision = PipelineDecision(codec, level, model, False, False, 0.0, 'offline', network)
+            self.last_decision = decision
+            self.logger.info(f"Décision pipeline: {decision.to_dict()}")
+            return decision
+
+        codec, level = self._thermal(codec, level, reasons, sample_rate, encoder_available)
+        predicted = self._predict(network, codec, model, speech_seconds, sample_rate)
+
+        if predicted > target_ms and codec != 'opus' and encoder_available('opus', sample_rate):
+            codec = 'opus'
+            # Lien lent : compression plus forte, sauf si le SoC chauffe (niveau minimal conservé)
+            if 'thermal' not in reasons:
+                level = max(level, 0.7)
+            predicted = self._predict(network, codec, model, speech_seconds, sample_rate)
+            reasons.append('opus')
+
+        if predicted > target_ms and fallback_model and fallback_model != model:
+            fallback_predicted = self._predict(network, codec, fallback_model, speech_seconds, sample_rate)
+            if fallback_predicted < predicted:
+                model, predicted = fallback_model, fallback_predicted
+                reasons.append('fallback_model')
+
+        cloud_tts = network.quality in ('good', 'fair', 'unknown')
+        if not cloud_tts:
+            reasons.append('local_tts')
+
+        decision = PipelineDecision(codec, level, model, True, cloud_tts, predicted,
+                                    '+'.join(reasons) or 'default', network)
+        self.last_decision = decision
+        self.logger.info(f"Décision pipeline: {decision.to_dict()}")
+        return decision
+
+    @staticmethod
+    def _thermal(codec: str, level: float, reasons: list, sample_rate: int,
+                 encoder_available: Callable[[str, int], bool]) -> Tuple[str, float]:
+        """
+        Encodeur le moins coûteux quand le SoC chauffe : compression minimale,
+        FLAC en processus plutôt que la conversion MP3 par ffmpeg
+
+        Returns:
+            Codec et niveau de compression
+        """
+        if thermal_governor.allows('encoder'):
+            return codec, level
+        if codec == 'mp3':
+            if not encoder_available('flac', sample_rate):
+                # Aucun encodeur plus léger : la conversion par ffmpeg reste inévitable
+                return codec, level
+            codec = 'flac'
+        reasons.append('thermal')
+        thermal_governor.adapted('encoder')
+        return codec, 0.0
+
+    def _predict(self, network: NetworkEstimate, codec: str, model: str,
+                 speech_seconds: float, sample_rate: int) -> float:
+        """Latence prévue (ms) : envoi + transcription + génération"""
+        rtt = network.rtt_ms if network.rtt_ms is not None else 100.0
+        upload_bytes = CODEC_BYTES_PER_SECOND.get(codec, CODEC_BYTES_PER_SECOND['mp3'])(sample_rate) * speech_seconds
+        upload_ms = upload_bytes / network.upload_bps * 1000 if network.upload_bps else 0.0
+        stt_ms = rtt + upload_ms + STT_MS_PER_SECOND * speech_seconds
+        chat_ms = self.estimator.model_latency_ms.get(model, DEFAULT_CHAT_MS)
+        return stt_ms + chat_ms
+
+    def observe_outcome(self, trace_record: Dict) -> None:
+        """
+        Journalise la latence observée face à la décision (écouteur du traceur)
+
+        Args:
+            trace_record: Enregistrement produit par Tracer
+        """
+        decision = self.last_decision
+        if trace_record['trace'] != 'voice_command' or decision is None:
+            return
+
+        self.last_decision = None
+        # Même périmètre que la prévision : de la fin de capture à la réponse complète
+        observed_ms = sum(span['duration_ms'] for span in trace_record['spans']
+                          if span['name'] in PREDICTED_STAGES)
+        self.logger.info(f"Résultat pipeline: {decision.reason}, modèle {decision.model}, "
+                         f"codec {decision.codec}, prévu {decision.predicted_ms:.0f} ms, "
+                         f"observé {observed_ms:.0f} ms ({trace_record['status']})")
+
+
+if __name__ == "__main__":
+    # Sonde réseau (python3 network_quality.py [url de l'API])
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    estimator = NetworkQualityEstimator(sys.argv[1] if len(sys.argv) > 1 else '')
+    for _ in range(3):
+        rtt = estimator.probe()
+        print(f"{estimator.host}:{estimator.port} -> "
+              f"{'échec' if rtt is None else f'{rtt:.1f} ms'}")
+    print(f"Estimation: {estimator.estimate().to_dict()}")
@@ -0,0 +1,970 @@
+#!/usr/bin/env python3
+"""
+Simulation déterministe du matériel de l'assistant Raspberry Pi
+Horloge virtuelle, micro scripté, enceinte Bluetooth virtuelle, serveur PulseAudio
+factice et serveur compatible OpenAI local : profilage sur un simple PC Linux
+"""
+
+import os
+import sys
+import json
+import math
+import stat
+import time
+import types
+import wave
+import queue
+import random
+import struct
+import logging
+import tempfile
+import threading
+import http.client
+from array import array
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from audio_sinks import bluetooth_sink_id, sink_manager
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Amplitude au-delà de laquelle un bloc joué compte comme parole (et non silence)
+AUDIBLE_THRESHOLD = 64
+
+# Durée de parole synthétisée par caractère (espeak-ng simulé)
+TTS_SECONDS_PER_CHAR = 0.06
+
+# Micro : une question, puis un peu de silence avant la suivante
+DEFAULT_SCRIPT = [('speech', 2.5), ('silence', 0.5)]
+
+# Sortie analogique du Pi, toujours présente (repli quand l'enceinte disparaît)
+BUILTIN_SINK = 'alsa_output.platform-bcm2835_audio.analog-stereo'
+
+
+class VirtualClock:
+    def __init__(self, speed: float = 0.0):
+        """
+        Horloge des périphériques simulés
+
+        Chaque attente d'un périphérique (lecture du micro, écriture sur le
+        sink, latence de connexion ou de l'API) avance le temps simulé de sa
+        durée : le total ne dépend pas de la machine qui exécute la simulation.
+
+        Args:
+            speed: Rapport temps simulé / temps réel (1.0 : temps réel, 0 : sans attendre)
+        """
+        self.speed = speed
+        self._now = 0.0
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        """Temps simulé écoulé (secondes)"""
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        """Avance le temps simulé, en attendant seconds / speed en temps réel"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._now += seconds
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+
+
+def synthetic_speech(seconds: float, sample_rate: int) -> bytes:
+    """
+    PCM 16 bits mono déterministe imitant une voix (salves de tonalités modulées)
+
+    Args:
+        seconds: Durée
+        sample_rate: Fréquence d'échantillonnage
+
+    Returns:
+        Échantillons bruts
+    """
+    frames = array('h')
+    for n in range(int(seconds * sample_rate)):
+        t = n / sample_rate
+        envelope = 0.5 * (1 + math.sin(2 * math.pi * 3 * t))  # ~3 syllabes/s
+        sample = envelope * (0.6 * math.sin(2 * math.pi * 180 * t) +
+                             0.3 * math.sin(2 * math.pi * 720 * t))
+        frames.append(int(sample * 12000))
+    return frames.tobytes()
+
+
+def synthetic_noise(seconds: float, sample_rate: int, seed: int = 0, level: int = 300) -> bytes:
+    """Bruit de fond déterministe (PCM 16 bits mono)"""
+    rng = random.Random(seed)
+    return array('h', (rng.randint(-level, level)
+                       for _ in range(int(seconds * sample_rate)))).tobytes()
+
+
+def wav_bytes(pcm: bytes, sample_rate: int) -> bytes:
+    """En-tête WAV canonique (44 octets) suivi du PCM 16 bits mono"""
+    return (b'RIFF' + struct.pack('<I', 36 + len(pcm)) + b'WAVEfmt ' +
+            struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16) +
+            b'data' + struct.pack('<I', len(pcm)) + pcm)
+
+
+def _resample(pcm: bytes, source_rate: int, rate: int) -> bytes:
+    """Rééchantillonnage au plus proche (suffisant pour un micro simulé)"""
+    if source_rate == rate:
+        return pcm
+    samples = array('h', pcm)
+    count = int(len(samples) * rate / source_rate)
+    return array('h', (samples[int(i * source_rate / rate)] for i in range(count))).tobytes()
+
+
+class ScriptedMicrophone:
+    def __init__(self, script: Optional[List[Tuple[str, Any]]] = None,
+                 clock: Optional[VirtualClock] = None, seed: int = 0):
+        """
+        Micro rejouant un scénario en boucle ; chaque capture reprend où la précédente s'est arrêtée
+
+        Args:
+            script: Segments (speech, secondes), (silence, secondes), (noise, secondes) ou (wav, chemin)
+            clock: Horloge cadençant les lectures
+            seed: Graine du bruit
+        """
+        self.script = script or DEFAULT_SCRIPT
+        self.clock = clock or VirtualClock()
+        self.seed = seed
+        self.seconds_read = 0.0
+        self._pcm: Dict[int, bytes] = {}
+        self._position: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _render(self, rate: int) -> bytes:
+        parts = []
+        for index, (kind, value) in enumerate(self.script):
+            if kind == 'speech':
+                parts.append(synthetic_speech(value, rate))
+            elif kind == 'silence':
+                parts.append(b'\x00\x00' * int(value * rate))
+            elif kind == 'noise':
+                parts.append(synthetic_noise(value, rate, self.seed + index))
+            elif kind == 'wav':
+                with wave.open(value, 'rb') as wf:
+                    parts.append(_resample(wf.readframes(wf.getnframes()), wf.getframerate(), rate))
+            else:
+                raise ValueError(f"Segment de scénario inconnu: {kind}")
+        return b''.join(parts) or b'\x00\x00'
+
+    def read(self, num_frames: int, rate: int) -> bytes:
+        """
+        Prochains échantillons du scénario
+
+        Args:
+            num_frames: Nombre de trames
+            rate: Fréquence du flux
+
+        Returns:
+            PCM 16 bits mono
+        """
+        with self._lock:
+            if rate not in self._pcm:
+                self._pcm[rate] = self._render(rate)
+                self._position[rate] = 0
+            pcm, position = self._pcm[rate], self._position[rate]
+            size = num_frames * 2
+            chunk = bytearray()
+            while len(chunk) < size:
+                piece = pcm[position:position + size - len(chunk)]
+                chunk += piece
+                position = (position + len(piece)) % len(pcm)
+            self._position[rate] = position
+            self.seconds_read += num_frames / rate
+        self.clock.sleep(num_frames / rate)
+        return bytes(chunk)
+
+
+class VirtualBluetoothDevice:
+    def __init__(self, mac: str = 'AA:BB:CC:DD:EE:FF', name: str = 'Simulated Speaker',
+                 clock: Optional[VirtualClock] = None,
+                 connect_latency: Tuple[float, float] = (0.5, 2.0),
+                 connect_failure_rate: float = 0.0, drop_rate: float = 0.0,
+                 discovery_latency: float = 2.0, seed: int = 0):
+        """
+        Enceinte Bluetooth simulée, répondant comme bluetoothctl
+
+        Args:
+            mac: Adresse MAC
+            name: Nom annoncé
+            clock: Horloge des latences
+            connect_latency: Latence de connexion (min, max) en secondes
+            connect_failure_rate: Probabilité d'échec d'une connexion
+            drop_rate: Probabilité de perte de liaison à chaque vérification (info)
+            discovery_latency: Délai avant que l'enceinte apparaisse au scan
+            seed: Graine des tirages (latences, échecs, pertes)
+        """
+        self.mac = mac
+        self.name = name
+        self.clock = clock or VirtualClock()
+        self.connect_latency = connect_latency
+        self.connect_failure_rate = connect_failure_rate
+        self.drop_rate = drop_rate
+        self.discovery_latency = discovery_latency
+        self.logger = logging.getLogger(__name__)
+
+        self.in_range = True
+        self.discovered = False
+        self.paired = False
+        self.trusted = False
+        self.connected = False
+
+        self.connect_latencies: List[float] = []
+        self.failed_connects = 0
+        self.drops = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[['VirtualBluetoothDevice'], None]] = []
+
+    def add_listener(self, listener: Callable[['VirtualBluetoothDevice'], None]) -> None:
+        """Appelé à chaque connexion ou déconnexion (publication du sink)"""
+        self._listeners.append(listener)
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected == self.connected:
+            return
+        self.connected = connected
+        for listener in self._listeners:
+            listener(self)
+
+    def drop(self) -> None:
+        """Perte de liaison (enceinte éteinte ou hors de portée un instant)"""
+        with self._lock:
+            if self.connected:
+                self.drops += 1
+                self.logger.info(f"Enceinte simulée: liaison perdue ({self.mac})")
+                self._set_connected(False)
+
+    def set_in_range(self, in_range: bool) -> None:
+        """Hors de portée : liaison perdue et connexions refusées jusqu'au retour"""
+        with self._lock:
+            self.in_range = in_range
+            if not in_range:
+                self.drop()
+
+    def _info(self) -> str:
+        if self.connected and self.drop_rate and self._rng.random() < self.drop_rate:
+            self.drop()
+        yes_no = lambda value: 'yes' if value else 'no'
+        return (f"Device {self.mac} (public)\n\tName: {self.name}\n\tAlias: {self.name}\n"
+                f"\tPaired: {yes_no(self.paired)}\n\tTrusted: {yes_no(self.trusted)}\n"
+                f"\tConnected: {yes_no(self.connected)}\n")
+
+    def _connect(self) -> str:
+        latency = self._rng.uniform(*self.connect_latency)
+        failed = not self.in_range or not self.paired or self._rng.random() < self.connect_failure_rate
+        self.clock.sleep(latency)
+        if failed:
+            self.failed_connects += 1
+            return f"Attempting to connect to {self.mac}\nFailed to connect: org.bluez.Error.Failed\n"
+        self.connect_latencies.append(latency)
+        self._set_connected(True)
+        return f"Attempting to connect to {self.mac}\nConnection successful\n"
+
+    def bluetoothctl(self, command: str, timeout: float = 10) -> str:
+        """
+        Résultat d'une commande bluetoothctl (même signature que BluetoothManager)
+
+        Args:
+            command: Commande (ex: "connect AA:BB:CC:DD:EE:FF")
+            timeout: Ignoré (les latences viennent du modèle)
+
+        Returns:
+            Sortie imitant bluetoothctl
+        """
+        verb, _, argument = command.partition(' ')
+        argument = argument.strip()
+        with self._lock:
+            if verb == 'show':
+                return "Controller 00:00:00:00:00:01 (public)\n\tPowered: yes\n\tDiscoverable: no\n"
+            if verb in ('power', 'agent', 'default-agent'):
+                return "Changing succeeded\n"
+            if verb == 'devices':
+                return f"Device {self.mac} {self.name}\n" if self.discovered or self.paired else ""
+            if argument.upper() != self.mac.upper():
+                return f"Device {argument} not available\n"
+            if verb == 'info':
+                return self._info()
+            if verb == 'remove':
+                self.paired = self.trusted = False
+                self._set_connected(False)
+                return "Device has been removed\n"
+            if verb == 'pair':
+                self.clock.sleep(1.0)
+                if not self.in_range:
+                    return "Failed to pair: org.bluez.Error.AuthenticationFailed\n"
+                self.paired = True
+                return "Pairing successful\n"
+            if verb == 'trust':
+                self.trusted = True
+                return f"Changing {self.mac} trust succeeded\n"
+            if verb == 'connect':
+                return self._connect()
+            if verb == 'disconnect':
+                self._set_connected(False)
+                return "Successful disconnected\n"
+        return ""
+
+    def discover(self, match: Optional[Callable[[Dict[str, str]], bool]],
+                 duration: float) -> Tuple[Optional[Dict[str, str]], List[Dict[str, str]]]:
+        """Découverte (même contrat que BluetoothManager._discover)"""
+        self.clock.sleep(min(duration, self.discovery_latency))
+        with self._lock:
+            self.discovered = self.discovered or self.in_range
+            devices = [{'mac': self.mac, 'name': self.name}] if self.discovered else []
+        found = next((d for d in devices if match(d)), None) if match else None
+        return found, devices
+
+    def attach(self, bluetooth_manager) -> None:
+        """Remplace bluetoothctl et les commandes système du gestionnaire Bluetooth"""
+        bluetooth_manager._bluetoothctl_command = self.bluetoothctl
+        bluetooth_manager._discover = self.discover
+        bluetooth_manager._run_command = lambda command: ""
+
+
+class _OutputStream:
+    def __init__(self, server: 'FakePulseServer', index: int, rate: int, channels: int):
+        """Flux de lecture PyAudio simulé (un sink-input du serveur factice)"""
+        self.server = server
+        self.index = index
+        self.rate = rate
+        self.channels = channels
+        self.sink = server.default
+        self.volume = 1.0
+        self.audible = 0.0
+
+    def write(self, data: bytes, num_frames: Optional[int] = None) -> None:
+        seconds = len(data) / (2 * self.channels * self.rate)
+        self.server._played(self, data, seconds)
+        self.server.clock.sleep(seconds)
+
+    def stop_stream(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.server._closed(self)
+
+
+class FakePulseServer:
+    def __init__(self, clock: Optional[VirtualClock] = None,
+                 speaker: Optional[VirtualBluetoothDevice] = None, spotify: bool = True,
+                 history: int = 1000):
+        """
+        Serveur PulseAudio simulé : backend de SinkManager et destination des flux PyAudio
+
+        Le sink de l'enceinte n'existe que pendant sa connexion ; ce qui est
+        joué est enregistré par sink (phrases audibles et silence).
+
+        Args:
+            clock: Horloge cadençant les écritures
+            speaker: Enceinte dont le sink suit la connexion
+            spotify: Ajouter un flux librespot (atténuation pendant la voix)
+            history: Phrases et changements de volume conservés (les plus récents)
+        """
+        self.clock = clock or VirtualClock()
+        self.sinks_by_name: Dict[str, int] = {BUILTIN_SINK: 0}
+        self.default = BUILTIN_SINK
+        self.utterances: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.utterance_count = 0
+        self.seconds_by_sink: Dict[str, float] = {}
+        self.volume_changes: Deque[Tuple[float, int, float]] = deque(maxlen=history)
+        self.volume_change_count = 0
+        self.port_offsets: Dict[Tuple[str, str], int] = {}
+
+        self._next_index = 1
+        self._streams: Dict[int, _OutputStream] = {}
+        self._spotify_index: Optional[int] = None
+        self._spotify_volume = 1.0
+        self._lock = threading.RLock()
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._listening = False
+
+        if spotify:
+            self._spotify_index = self._allocate()
+        if speaker is not None:
+            speaker.add_listener(self._on_speaker)
+
+    def _allocate(self) -> int:
+        index, self._next_index = self._next_index, self._next_index + 1
+        return index
+
+    def _emit(self, facility: str, event: str, index: int) -> None:
+        # Sans abonné, rien ne s'accumule : SinkManager relit tout à la connexion
+        if self._listening:
+            self._events.put((facility, event, index))
+
+    def _on_speaker(self, device: VirtualBluetoothDevice) -> None:
+        """Publication ou retrait du sink bluez, comme module-bluez5-device"""
+        name = f"bluez_sink.{bluetooth_sink_id(device.mac)}.a2dp_sink"
+        with self._lock:
+            if device.connected and name not in self.sinks_by_name:
+                self.sinks_by_name[name] = self._allocate()
+                self._emit('sink', 'new', self.sinks_by_name[name])
+            elif not device.connected and name in self.sinks_by_name:
+                index = self.sinks_by_name.pop(name)
+                if self.default == name:
+                    self.default = BUILTIN_SINK
+                    self._emit('server', 'change', 0)
+                # Les flux de l'enceinte passent sur la sortie de repli
+                for stream in self._streams.values():
+                    if stream.sink == name:
+                        stream.sink = self.default
+                self._emit('sink', 'remove', index)
+
+    # Backend de SinkManager (mêmes méthodes que _PactlBackend)
+
+    def sinks(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'index': index, 'name': name, 'description': name, 'properties': {}}
+                    for name, index in self.sinks_by_name.items()]
+
+    def default_sink(self) -> Optional[str]:
+        return self.default
+
+    def set_default_sink(self, name: str) -> None:
+        with self._lock:
+            if name not in self.sinks_by_name:
+                raise RuntimeError(f"Sink inconnu: {name}")
+            self.default = name
+        self._emit('server', 'change', 0)
+
+    def sink_inputs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            inputs = [{'index': s.index, 'sink': self.sinks_by_name.get(s.sink, 0),
+                       'properties': {'application.name': 'rpi-assistant',
+                                      'application.process.id': str(os.getpid())},
+                       'volume': s.volume, 'channels': s.channels}
+                      for s in self._streams.values()]
+            if self._spotify_index is not None:
+                inputs.append({'index': self._spotify_index, 'sink': self.sinks_by_name.get(self.default, 0),
+                               'properties': {'application.name': 'librespot',
+                                              'application.process.binary': 'librespot'},
+                               'volume': self._spotify_volume, 'channels': 2})
+            return inputs
+
+    def set_sink_input_volume(self, index: int, volume: float, channels: int) -> None:
+        with self._lock:
+            if index == self._spotify_index:
+                self._spotify_volume = volume
+            elif index in self._streams:
+                self._streams[index].volume = volume
+            self.volume_changes.append((self.clock.monotonic(), index, round(volume, 3)))
+            self.volume_change_count += 1
+
+    def move_sink_input(self, index: int, sink_index: int) -> None:
+        with self._lock:
+            name = next((n for n, i in self.sinks_by_name.items() if i == sink_index), None)
+            if index in self._streams and name:
+                self._streams[index].sink = name
+
+    def card_list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'name': name.split('.a2dp_sink')[0].replace('bluez_sink.', 'bluez_card.'),
+                     'ports': ['speaker-output']}
+                    for name in self.sinks_by_name if name.startswith('bluez_sink.')]
+
+    def port_offset_set(self, card: str, port: str, offset_us: int) -> None:
+        with self._lock:
+            self.port_offsets[(card, port)] = offset_us
+
+    def load_module(self, name: str, args: str) -> Optional[int]:
+        return None
+
+    def unload_module(self, index: int) -> None:
+        pass
+
+    def listen(self, callback: Callable[[str, str, int], None]) -> None:
+        """Bloque en transmettant les événements jusqu'à stop_listening"""
+        self._listening = True
+        try:
+            while True:
+                item = self._events.get()
+                if item is None:
+                    return
+                callback(*item)
+        finally:
+            self._listening = False
+
+    def stop_listening(self) -> None:
+        self._events.put(None)
+
+    def close(self) -> None:
+        pass
+
+    # Flux de lecture (PyAudio simulé)
+
+    def open_stream(self, rate: int, channels: int = 1) -> _OutputStream:
+        with self._lock:
+            stream = _OutputStream(self, self._allocate(), rate, channels)
+            self._streams[stream.index] = stream
+        self._emit('sink_input', 'new', stream.index)
+        return stream
+
+    def _played(self, stream: _OutputStream, data: bytes, seconds: float) -> None:
+        samples = array('h', data[:len(data) - len(data) % 2])
+        audible = bool(samples) and max(max(samples), -min(samples)) > AUDIBLE_THRESHOLD
+        with self._lock:
+            self.seconds_by_sink[stream.sink] = self.seconds_by_sink.get(stream.sink, 0.0) + seconds
+            if audible:
+                stream.audible += seconds
+            elif stream.audible:
+                self._utterance(stream)
+
+    def _utterance(self, stream: _OutputStream) -> None:
+        """Phrase terminée (verrou tenu)"""
+        self.utterances.append({'sink': stream.sink, 'at': round(self.clock.monotonic(), 3),
+                                'seconds': round(stream.audible, 3)})
+        self.utterance_count += 1
+        stream.audible = 0.0
+
+    def _closed(self, stream: _OutputStream) -> None:
+        with self._lock:
+            if stream.audible:
+                self._utterance(stream)
+            self._streams.pop(stream.index, None)
+        self._emit('sink_input', 'remove', stream.index)
+
+    def attach(self, sinks=None) -> None:
+        """Utilise ce serveur comme backend du gestionnaire de sinks (par défaut sink_manager)"""
+        sinks = sinks or sink_manager
+        sinks.stop()
+        sinks.backend_factory = lambda server: self
+
+
+def fake_audio_modules(microphone: ScriptedMicrophone, pulse: FakePulseServer) -> Dict[str, types.ModuleType]:
+    """
+    Modules pyaudio, pygame et gtts simulés
+
+    Args:
+        microphone: Source des flux d'entrée
+        pulse: Destination des flux de sortie
+
+    Returns:
+        Modules par nom, à placer dans sys.modules avant le premier import
+    """
+    pyaudio = types.ModuleType('pyaudio')
+    pyaudio.paInt16 = 8
+
+    class _InputStream:
+        def __init__(self, rate: int):
+            self.rate = rate
+
+        def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+            return microphone.read(num_frames, self.rate)
+
+        def stop_stream(self) -> None:
+            pass
+
+        def close(self) -> None:
+            pass
+
+    class PyAudio:
+        def get_device_count(self):
+            return 1
+
+        def get_device_info_by_index(self, index):
+            return {'name': 'Simulated USB Microphone', 'maxInputChannels': 1,
+                    'maxOutputChannels': 1, 'defaultSampleRate': 16000.0}
+
+        def get_sample_size(self, audio_format):
+            return 2
+
+        def open(self, rate=16000, channels=1, input=False, output=False, **kwargs):
+            return _InputStream(rate) if input else pulse.open_stream(rate, channels)
+
+        def terminate(self):
+            pass
+
+    pyaudio.PyAudio = PyAudio
+
+    pygame = types.ModuleType('pygame')
+    music = types.SimpleNamespace(load=lambda path: None, play=lambda: None,
+                                  get_busy=lambda: False)
+    pygame.mixer = types.SimpleNamespace(init=lambda *a, **k: None, quit=lambda: None,
+                                         music=music)
+
+    gtts = types.ModuleType('gtts')
+
+    class gTTS:
+        def __init__(self, text, lang='fr', slow=False):
+            self.text = text
+
+        def save(self, path):
+            # WAV sous l'extension .mp3 : décodé par le ffmpeg simulé
+            with open(path, 'wb') as f:
+                f.write(wav_bytes(synthetic_speech(len(self.text) * TTS_SECONDS_PER_CHAR, 22050), 22050))
+
+    gtts.gTTS = gTTS
+    return {'pyaudio': pyaudio, 'pygame': pygame, 'gtts': gtts}
+
+
+class _RequestHeaders(http.client.HTTPMessage):
+    """
+    En-têtes de requête du serveur simulé
+
+    Sans frontière multipart, le module email n'analyse pas le corps vide des
+    en-têtes : il compilerait sinon une expression régulière par frontière
+    (aléatoire à chaque envoi Whisper), qui remplirait le cache du module re
+    et fausserait la dérive mémoire mesurée par le test d'endurance.
+    """
+
+    def get_boundary(self, failobj=None):
+        return failobj
+
+
+class OpenAIStubServer:
+    def __init__(self, stt_latency_ms: float = 300, ttft_ms: float = 400,
+                 token_delay_ms: float = 20,
+                 transcription: str = "Quelle est la capitale de l'Australie ?",
+                 response: str = "La capitale de l'Australie est Canberra.",
+                 clock: Optional[VirtualClock] = None):
+        """
+        Serveur HTTP local compatible avec l'API OpenAI (Whisper et chat en streaming)
+
+        Args:
+            stt_latency_ms: Latence simulée de la transcription
+            ttft_ms: Délai simulé avant le premier token
+            token_delay_ms: Délai simulé entre deux tokens
+            transcription: Texte retourné par la transcription
+            response: Réponse retournée par le chat
+            clock: Horloge des latences (par défaut temps réel)
+        """
+        self.stt_latency_ms = stt_latency_ms
+        self.ttft_ms = ttft_ms
+        self.token_delay_ms = token_delay_ms
+        self.transcription = transcription
+        self.response = response
+        self.clock = clock
+        self.uploaded_bytes = 0
+        # Panne réseau simulée : connexions fermées sans réponse
+        self.outage = False
+        self.requests: Dict[str, int] = {}
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def _sleep(self, ms: float) -> None:
+        (self.clock.sleep if self.clock else time.sleep)(ms / 1000.0)
+
+    def start(self) -> 'OpenAIStubServer':
+        """Démarre le serveur sur un port libre"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            MessageClass = _RequestHeaders
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                if stub.outage:
+                    self.close_connection = True
+                    return
+                stub.requests[self.path] = stub.requests.get(self.path, 0) + 1
+
+                if self.path.endswith('/audio/transcriptions'):
+                    stub.uploaded_bytes += length
+                    stub._sleep(stub.stt_latency_ms)
+                    self._send_json({'text': stub.transcription})
+                elif self.path.endswith('/chat/completions'):
+                    request = json.loads(body or b'{}')
+                    self._send_chat(request)
+                else:
+                    self.send_error(404)
+
+            def _send_json(self, data):
+                payload = json.dumps(data).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_chat(self, request):
+                model = request.get('model', 'gpt-4o')
+                stub._sleep(stub.ttft_ms)
+
+                if not request.get('stream'):
+                    self._send_json({
+                        'id': 'chatcmpl-sim', 'object': 'chat.completion', 'created': 0,
+                        'model': model,
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': stub.response}}],
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                words = stub.response.split(' ')
+                for i, word in enumerate(words):
+                    if i:
+                        stub._sleep(stub.token_delay_ms)
+                    chunk = {
+                        'id': 'chatcmpl-sim', 'object': 'chat.completion.chunk', 'created': 0,
+                        'model': model,
+                        'choices': [{'index': 0, 'finish_reason': None,
+                                     'delta': {'content': word if i == 0 else ' ' + word}}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        thread = threading.Thread(target=self.server.serve_forever, name='openai-stub')
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# Outils externes sans modèle Python (scripts exécutés par l'interpréteur courant)
+COMMANDS = {
+    'espeak-ng': """
+import sys
+sys.path.insert(0, {src!r})
+from simulation import TTS_SECONDS_PER_CHAR, synthetic_speech, wav_bytes
+
+args = sys.argv[1:]
+text = args[-1] if args else ''
+data = wav_bytes(synthetic_speech(min(len(text) * TTS_SECONDS_PER_CHAR, 20.0), 22050), 22050)
+if '-w' in args:
+    with open(args[args.index('-w') + 1], 'wb') as f:
+        f.write(data)
+else:
+    sys.stdout.buffer.write(data)
+""",
+    'ffmpeg': """
+import sys
+import shutil
+
+args = sys.argv[1:]
+source = args[args.index('-i') + 1] if '-i' in args else None
+if source and args[-1] == '-':
+    # Décodage PCM : le WAV canonique perd son en-tête
+    with open(source, 'rb') as f:
+        data = f.read()
+    sys.stdout.buffer.write(data[44:] if data[:4] == b'RIFF' else data)
+elif source:
+    shutil.copyfile(source, args[-1])
+""",
+    'paplay': """
+""",
+}
+
+
+def install_commands(bin_dir: str) -> None:
+    """
+    Écrit les outils externes simulés et les place en tête du PATH
+
+    Args:
+        bin_dir: Dossier des scripts
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, script in COMMANDS.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"#!{sys.executable}\n" + script.replace('{src!r}', repr(SRC_DIR)))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+
+
+def write_config_files(config_dir: str, overrides: Dict[str, Dict[str, str]]) -> None:
+    """
+    Écrit des fichiers config-*.txt pour un répertoire de configuration de test
+
+    Args:
+        config_dir: Répertoire cible (remplace /boot)
+        overrides: Valeurs par fichier (spotify, bluetooth, gpt, openai)
+    """
+    os.makedirs(config_dir, exist_ok=True)
+    for name, values in overrides.items():
+        lines: List[str] = [f"{key}={value}" for key, value in values.items()]
+        with open(os.path.join(config_dir, f"config-{name}.txt"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+class Simulation:
+    def __init__(self, work_dir: Optional[str] = None, seed: int = 0, speed: float = 0.0,
+                 script: Optional[List[Tuple[str, Any]]] = None,
+                 speaker_name: str = 'Simulated Speaker', mac: str = 'AA:BB:CC:DD:EE:FF',
+                 connect_latency: Tuple[float, float] = (0.5, 2.0),
+                 connect_failure_rate: float = 0.0, drop_rate: float = 0.0,
+                 stt_latency_ms: float = 300, ttft_ms: float = 400, token_delay_ms: float = 20):
+        """
+        Matériel complet simulé autour d'un VoiceAssistant
+
+        Args:
+            work_dir: Dossier de travail (configuration, journaux, cache)
+            seed: Graine de tous les tirages
+            speed: Vitesse de l'horloge simulée (0 : sans attendre, 1.0 : temps réel)
+            script: Scénario du micro
+            speaker_name: Nom de l'enceinte simulée
+            mac: Adresse de l'enceinte simulée
+            connect_latency: Latence de connexion Bluetooth (min, max)
+            connect_failure_rate: Probabilité d'échec d'une connexion Bluetooth
+            drop_rate: Probabilité de perte de liaison à chaque vérification
+            stt_latency_ms: Latence de la transcription
+            ttft_ms: Délai avant le premier token
+            token_delay_ms: Délai entre deux tokens
+        """
+        self.work_dir = work_dir or tempfile.mkdtemp(prefix='rpi-assistant-sim-')
+        self.config_dir = os.path.join(self.work_dir, 'boot')
+        self.clock = VirtualClock(speed)
+        self.microphone = ScriptedMicrophone(script, self.clock, seed)
+        self.speaker = VirtualBluetoothDevice(mac, speaker_name, self.clock, connect_latency,
+                                              connect_failure_rate, drop_rate, seed=seed)
+        self.pulse = FakePulseServer(self.clock, self.speaker)
+        self.openai = OpenAIStubServer(stt_latency_ms, ttft_ms, token_delay_ms, clock=self.clock)
+        self.assistant = None
+        self.logger = logging.getLogger(__name__)
+
+    def start(self, overrides: Optional[Dict[str, Dict[str, str]]] = None) -> 'Simulation':
+        """
+        Installe les modules et outils simulés, démarre l'API et écrit la configuration
+
+        Args:
+            overrides: Valeurs de configuration à ajouter ou remplacer par fichier
+        """
+        sys.modules.update(fake_audio_modules(self.microphone, self.pulse))
+        install_commands(os.path.join(self.work_dir, 'bin'))
+        self.pulse.attach()
+        self.openai.start()
+
+        config = {
+            'gpt': {
+                'enabled': 'true',
+                'trace_file': os.path.join(self.work_dir, 'traces.jsonl'),
+                'log_file': os.path.join(self.work_dir, 'assistant.log'),
+                'cache_dir': os.path.join(self.work_dir, 'cache'),
+                'spool_dir': os.path.join(self.work_dir, 'spool'),
+                'metrics_enabled': 'false',
+            },
+            'openai': {
+                'api_key': 'sk-simulation-000000000000',
+                'api_base_url': self.openai.base_url,
+            },
+            'bluetooth': {'speaker_name': self.speaker.name},
+            'spotify': {},
+        }
+        if self.clock.speed == 0:
+            # Sans attente, le silence d'entretien du flux de sortie tournerait à vide
+            config['gpt']['speech_keepalive_s'] = '0'
+        for name, values in (overrides or {}).items():
+            config.setdefault(name, {}).update(values)
+        write_config_files(self.config_dir, config)
+        self.logger.info(f"Simulation dans {self.work_dir} (API {self.openai.base_url})")
+        return self
+
+    def attach(self, assistant) -> None:
+        """
+        Branche un VoiceAssistant créé sur config_dir sur le matériel simulé
+
+        Args:
+            assistant: Instance de VoiceAssistant
+        """
+        from gpio_input import SimulatedBackend
+
+        self.assistant = assistant
+        self.speaker.attach(assistant.bluetooth_manager)
+        if not assistant.gpio_input.simulated:
+            assistant.gpio_input.stop()
+            assistant.gpio_input.backend = SimulatedBackend(assistant.config_manager.get_gpio_pin())
+            assistant.gpio_input.start()
+
+    @property
+    def button(self):
+        """Bouton simulé de l'assistant branché"""
+        return self.assistant.gpio_input.backend
+
+    def console(self) -> threading.Thread:
+        """
+        Pilote le bouton et les pannes depuis l'entrée standard (une commande par ligne)
+
+        Entrée : appui ; d : double appui ; h : appui long ; x : perte de l'enceinte ;
+        o : enceinte hors de portée / de retour ; n : panne réseau / retour du réseau
+        """
+        def run():
+            for line in sys.stdin:
+                command = line.strip().lower()
+                if command == '':
+                    self.button.press(0.1)
+                elif command == 'd':
+                    self.button.press(0.05)
+                    time.sleep(0.05)
+                    self.button.press(0.05)
+                elif command == 'h':
+                    self.button.press(2.0)
+                elif command == 'x':
+                    self.speaker.drop()
+                elif command == 'o':
+                    self.speaker.set_in_range(not self.speaker.in_range)
+                elif command == 'n':
+                    self.openai.outage = not self.openai.outage
+                print(json.dumps(self.report(), ensure_ascii=False), flush=True)
+
+        thread = threading.Thread(target=run, name='simulation-console')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def report(self) -> Dict[str, Any]:
+        """Bilan de la simulation (temps simulé, enceinte, lecture, API)"""
+        speaker = self.speaker
+        return {
+            'simulated_seconds': round(self.clock.monotonic(), 3),
+            'microphone_seconds': round(self.microphone.seconds_read, 3),
+            'speaker': {
+                'connected': speaker.connected,
+                'connects': len(speaker.connect_latencies),
+                'failed_connects': speaker.failed_connects,
+                'drops': speaker.drops,
+            },
+            'playback': {
+                'utterances': self.pulse.utterance_count,
+                'seconds_by_sink': {name: round(seconds, 3)
+                                    for name, seconds in self.pulse.seconds_by_sink.items()},
+                'volume_changes': self.pulse.volume_change_count,
+            },
+            'openai': {'requests': dict(self.openai.requests),
+                       'uploaded_bytes': self.openai.uploaded_bytes},
+        }
+
+    def stop(self) -> None:
+        """Arrête l'API simulée et rend sink_manager à son backend habituel"""
+        self.openai.stop()
+        sink_manager.stop()
+        sink_manager.backend_factory = None
+
+
+if __name__ == "__main__":
+    # Une commande vocale complète sur le matériel simulé, sans attente réelle
+    logging.basicConfig(level=logging.WARNING)
+
+    simulation = Simulation(seed=1).start({'gpt': {'recording_duration': '3'}})
+    from assistant import VoiceAssistant
+
+    assistant = VoiceAssistant(simulation.config_dir)
+    simulation.attach(assistant)
+    assistant.setup_openai()
+    assistant.bluetooth_manager.start_connection()
+    assistant.handle_voice_command()
+    assistant.shutdown()
+    print(json.dumps(simulation.report(), indent=2, ensure_ascii=False))
+    simulation.stop()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Groupe d'enceintes Bluetooth pour l'assistant Raspberry Pi
+Connexions en parallèle, sink combiné PulseAudio/PipeWire avec compensation de latence par enceinte
+"""
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from metrics import BLUETOOTH_RECONNECTS, BLUETOOTH_RECONNECT_LATENCY, metrics
+from audio_sinks import bluetooth_sink_id, sink_manager
+
+
+def parse_group_config(macs: str, offsets: str) -> Dict[str, int]:
+    """
+    Lit la configuration du groupe
+
+    Args:
+        macs: Adresses MAC séparées par des virgules
+        offsets: Latences supplémentaires "MAC=ms" séparées par des virgules
+
+    Returns:
+        Latence supplémentaire en ms par adresse MAC (ordre de la configuration)
+    """
+    members = {mac.strip().upper(): 0 for mac in macs.split(',') if mac.strip()}
+    for item in offsets.split(','):
+        if '=' not in item:
+            continue
+        mac, value = item.split('=', 1)
+        mac = mac.strip().upper()
+        if mac in members:
+            try:
+                members[mac] = int(value.strip())
+            except ValueError:
+                pass
+    return members
+
+
+class GroupMember:
+    def __init__(self, mac: str, latency_offset_ms: int):
+        """
+        État d'une enceinte du groupe
+
+        Args:
+            mac: Adresse MAC
+            latency_offset_ms: Latence supplémentaire mesurée de l'enceinte (le sink combiné
+                retarde d'autant les autres membres)
+        """
+        self.mac = mac
+        self.latency_offset_ms = latency_offset_ms
+        self.connected = False
+        self.sink: Optional[str] = None
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.pending: Optional[Future] = None
+
+    def schedule_retry(self) -> None:
+        """Délai exponentiel avec gigue avant la prochaine tentative"""
+        self.failures += 1
+        delay = min(300.0, 5.0 * 2 ** (self.failures - 1))
+        self.next_attempt = time.monotonic() + delay * random.uniform(0.8, 1.2)
+
+
+class SpeakerGroup:
+    def __init__(self, bluetooth_manager, members: Dict[str, int],
+                 sink_name: str = 'assistant_group', connect_timeout: float = 30.0):
+        """
+        Initialise le groupe d'enceintes
+
+        Args:
+            bluetooth_manager: Gestionnaire Bluetooth (commandes bluetoothctl)
+            members: Décalage de latence en ms par adresse MAC
+            sink_name: Nom du sink combiné
+            connect_timeout: Attente maximale quand aucune enceinte n'est connectée
+        """
+        self.bluetooth_manager = bluetooth_manager
+        self.logger = logging.getLogger(__name__)
+        self.sink_name = sink_name
+        self.connect_timeout = connect_timeout
+        self.members = {mac: GroupMember(mac, offset) for mac, offset in members.items()}
+
+        self._lock = threading.Lock()
+        self._module_index: Optional[int] = None
+        self._active_sinks: List[str] = []
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.members)),
+                                            thread_name_prefix='speaker-group')
+        # Vérifications d'état séparées : une connexion lente ne les bloque pas
+        self._check_executor = ThreadPoolExecutor(max_workers=max(1, len(self.members)),
+                                                  thread_name_prefix='speaker-check')
+
+        metrics.gauge('bluetooth_group_members_connected', "Enceintes du groupe connectées",
+                      lambda: sum(1 for m in self.members.values() if m.connected))
+
+    def _connect_member(self, member: GroupMember) -> bool:
+        """Connecte une enceinte (exécuté dans le pool)"""
+        manager = self.bluetooth_manager
+        if manager._is_device_connected(member.mac):
+            return True
+        if not manager._is_device_paired(member.mac) and not manager.pair_device(member.mac):
+            return False
+
+        start = time.monotonic()
+        connected = manager.connect_device(member.mac)
+        BLUETOOTH_RECONNECT_LATENCY.observe(time.monotonic() - start)
+        BLUETOOTH_RECONNECTS.inc(result='ok' if connected else 'failed')
+        return connected
+
+    def _connect_and_update(self, member: GroupMember) -> bool:
+        """Tentative de connexion puis mise à jour du membre et du sink (exécuté dans le pool)"""
+        try:
+            connected = self._connect_member(member)
+        except Exception as e:
+            self.logger.error(f"Erreur de connexion de {member.mac}: {e}")
+            connected = False
+
+        with self._lock:
+            member.connected = connected
+            if connected:
+                member.failures = 0
+                self.logger.info(f"Enceinte du groupe connectée: {member.mac}")
+            else:
+                member.schedule_retry()
+                self.logger.warning(f"Enceinte du groupe indisponible: {member.mac} "
+                                    f"(échec {member.failures})")
+
+        if connected:
+            # Attendre que PulseAudio/PipeWire publie le sink de l'enceinte
+            sink_manager.wait_for_bluetooth_sink(member.mac, timeout=5.0)
+        self.rebuild_sink()
+        return connected
+
+    def _start_connect(self, member: GroupMember) -> Future:
+        """Lance une connexion en arrière-plan si aucune n'est en cours (verrou tenu)"""
+        if member.pending is None or member.pending.done():
+            member.pending = self._executor.submit(self._connect_and_update, member)
+        return member.pending
+
+    def setup(self) -> bool:
+        """
+        Connecte toutes les enceintes en parallèle et crée le sink combiné
+
+        Returns:
+            True si au moins une enceinte est connectée
+        """
+        self.logger.info(f"Connexion du groupe: {', '.join(self.members)}")
+        with self._lock:
+            futures = [self._start_connect(member) for member in self.members.values()]
+        wait(futures, timeout=self.connect_timeout)
+        return self.connected_count() > 0 or self._any_connected(futures)
+
+    @staticmethod
+    def _any_connected(futures: List[Future]) -> bool:
+        """Au moins une connexion terminée avec succès"""
+        return any(f.done() and f.exception() is None and f.result() for f in futures)
+
+    def ensure(self) -> bool:
+        """
+        Vérifie le groupe sans attendre les enceintes lentes
+
+        Les enceintes déconnectées sont reconnectées en arrière-plan, chacune avec
+        son propre délai ; on n'attend que si aucune enceinte n'est disponible.
+
+        Returns:
+            True si au moins une enceinte est connectée
+        """
+        manager = self.bluetooth_manager
+        states = dict(zip(self.members, self._check_executor.map(
+            lambda mac: manager._is_device_connected(mac), list(self.members))))
+
+        changed = False
+        pending = []
+        now = time.monotonic()
+        with self._lock:
+            for mac, member in self.members.items():
+                if member.connected != states[mac]:
+                    member.connected = states[mac]
+                    changed = True
+                if not member.connected and now >= member.next_attempt:
+                    pending.append(self._start_connect(member))
+
+        if changed:
+            self.rebuild_sink()
+
+        if self.connected_count() == 0 and pending:
+            wait(pending, timeout=self.connect_timeout)
+            return self.connected_count() > 0 or self._any_connected(pending)
+
+        return self.connected_count() > 0
+
+    def connected_count(self) -> int:
+        return sum(1 for member in self.members.values() if member.connected)
+
+    def _find_sinks(self) -> None:
+        """Associe chaque enceinte connectée à son sink bluez"""
+        for member in self.members.values():
+            member.sink = sink_manager.find_bluetooth_sink(member.mac)
+
+    def _apply_latency_offsets(self) -> None:
+        """
+        Déclare la latence supplémentaire de chaque enceinte comme décalage de latence du port
+
+        module-combine-sink aligne ses sorties sur la latence totale la plus élevée : une
+        enceinte déclarée plus lente fait retarder les autres membres, pas elle-même.
+        """
+        cards = sink_manager.card_ports()
+        for member in self.members.values():
+            if not member.connected:
+                continue
+            card = f"bluez_card.{bluetooth_sink_id(member.mac)}"
+            for port in cards.get(card, []):
+                sink_manager.set_port_latency_offset(card, port, member.latency_offset_ms)
+
+    def rebuild_sink(self) -> None:
+        """Recrée le sink combiné avec les enceintes connectées et le met par défaut"""
+        with self._lock:
+            self._find_sinks()
+            sinks = [m.sink for m in self.members.values() if m.connected and m.sink]
+            if sinks == self._active_sinks:
+                return
+
+            if self._module_index is not None:
+                sink_manager.unload_module(self._module_index)
+                self._module_index = None
+            self._active_sinks = sinks
+
+            if not sinks:
+                self.logger.warning("Aucune enceinte du groupe disponible")
+                return
+
+            self._apply_latency_offsets()
+
+            if len(sinks) == 1:
+                target = sinks[0]
+            else:
+                self._module_index = sink_manager.load_module(
+                    'module-combine-sink',
+                    f'sink_name={self.sink_name} slaves={",".join(sinks)} adjust_time=5')
+                target = self.sink_name if self._module_index is not None else sinks[0]
+                if self._module_index is not None:
+                    sink_manager.wait_for_sink(self.sink_name, timeout=2.0)
+
+            sink_manager.route_to(target)
+            self.logger.info(f"Sortie du groupe: {target} ({', '.join(sinks)})")
+
+    def close(self) -> None:
+        """Supprime le sink combiné et arrête le pool"""
+        with self._lock:
+            if self._module_index is not None:
+                sink_manager.unload_module(self._module_index)
+                self._module_index = None
+            self._active_sinks = []
+        self._executor.shutdown(wait=False)
+        self._check_executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    # Test du groupe (python3 speaker_group.py MAC1,MAC2 [MAC1=80,...])
+    import sys
+
+    from config_manager import ConfigManager
+    from bluetooth_manager import BluetoothManager
+
+    logging.basicConfig(level=logging.INFO)
+
+    members = parse_group_config(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else '')
+    group = SpeakerGroup(BluetoothManager(ConfigManager("/tmp")), members)
+
+    start = time.monotonic()
+    print(f"Groupe connecté: {group.setup()} ({group.connected_count()}/{len(members)} "
+          f"en {time.monotonic() - start:.1f} s)")
+    group.close()
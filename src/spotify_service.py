@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Gestionnaire du service Spotify Connect (raspotify/librespot)
+Génère la configuration de librespot depuis config-spotify.txt, borne le cache audio, suit les accès au cache
+"""
+
+import os
+import re
+import pwd
+import logging
+import argparse
+import subprocess
+import threading
+from typing import Optional
+
+from metrics import CACHE_REQUESTS, metrics
+
+
+RASPOTIFY_CONF = '/etc/raspotify/conf'
+RASPOTIFY_SERVICE = 'raspotify'
+# Utilisateur du service raspotify (drop-in user.conf de install.sh)
+SPOTIFY_USER = 'pi'
+DEFAULT_CACHE_DIR = '/var/cache/raspotify'
+
+# Bornes du cache audio : jamais plus de la moitié de l'espace libre (cache actuel compris)
+MIN_CACHE_BYTES = 64 * 1024 * 1024
+CACHE_DISK_SHARE = 0.5
+
+# Un titre chargé plus vite que ce délai vient du cache (pas de téléchargement)
+CACHE_HIT_MS = 150
+
+_LOADED = re.compile(r"\((\d+) ms\) loaded")
+_UNDERRUN = re.compile(r"underrun", re.IGNORECASE)
+
+SPOTIFY_UNDERRUNS = metrics.counter(
+    'spotify_underruns_total', "Sous-alimentations de la sortie audio de librespot")
+
+
+def parse_size(value: str) -> Optional[int]:
+    """
+    Taille en octets depuis "1G", "512M" ou "500" (Mo)
+
+    Returns:
+        Octets ou None si la valeur est invalide
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", value or '', re.IGNORECASE)
+    if not match:
+        return None
+    unit = match.group(2).upper() or 'M'
+    return int(float(match.group(1)) * 1024 ** ' KMGT'.index(unit))
+
+
+def format_size(size: int) -> str:
+    """Taille au format de librespot (ex: 768M)"""
+    return f"{max(1, size // (1024 * 1024))}M"
+
+
+def directory_size(path: str) -> int:
+    """Taille cumulée des fichiers d'un dossier (0 s'il n'existe pas)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def cache_limit(requested: int, cache_dir: str) -> int:
+    """
+    Taille du cache audio adaptée au disque
+
+    Args:
+        requested: Taille demandée (cache_size)
+        cache_dir: Dossier du cache
+
+    Returns:
+        Limite en octets, entre MIN_CACHE_BYTES et la part autorisée de l'espace libre
+    """
+    existing = cache_dir
+    while not os.path.exists(existing):
+        existing = os.path.dirname(existing)
+    stat = os.statvfs(existing)
+    free = stat.f_bavail * stat.f_frsize
+    allowed = int((free + directory_size(cache_dir)) * CACHE_DISK_SHARE)
+    return max(MIN_CACHE_BYTES, min(requested, allowed))
+
+
+class SpotifyService:
+    def __init__(self, config_manager, conf_path: str = RASPOTIFY_CONF):
+        """
+        Initialise le gestionnaire du service Spotify
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+            conf_path: Fichier de configuration de raspotify
+        """
+        self.config_manager = config_manager
+        self.conf_path = conf_path
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def cache_dir(self) -> str:
+        return self.config_manager.get_value('spotify', 'cache_dir', DEFAULT_CACHE_DIR)
+
+    def render(self) -> str:
+        """
+        Configuration de librespot (variables LIBRESPOT_* lues par raspotify)
+
+        Returns:
+            Contenu du fichier de configuration
+        """
+        config = self.config_manager
+        lines = [
+            "# Généré par rpi-assistant depuis config-spotify.txt, ne pas modifier",
+            f'LIBRESPOT_NAME="{config.get_spotify_device_name()}"',
+            f"LIBRESPOT_DEVICE_TYPE={config.get_value('spotify', 'device_type', 'speaker')}",
+            f"LIBRESPOT_BITRATE={config.get_int_value('spotify', 'bitrate', 320)}",
+            f"LIBRESPOT_INITIAL_VOLUME={config.get_int_value('spotify', 'initial_volume', 50)}",
+            f"LIBRESPOT_AUTOPLAY={'on' if config.get_bool_value('spotify', 'autoplay', True) else 'off'}",
+        ]
+
+        if config.get_bool_value('spotify', 'volume_normalisation', True):
+            lines.append("LIBRESPOT_ENABLE_VOLUME_NORMALISATION=")
+            lines.append(f"LIBRESPOT_NORMALISATION_PREGAIN="
+                         f"{config.get_float_value('spotify', 'normalisation_pregain', 0.0):g}")
+
+        requested = parse_size(config.get_value('spotify', 'cache_size', '1G'))
+        if requested is None:
+            self.logger.warning("cache_size invalide, 1G utilisé")
+            requested = 1024 ** 3
+
+        lines.append(f"LIBRESPOT_SYSTEM_CACHE={self.cache_dir}")
+        if requested == 0:
+            lines.append("LIBRESPOT_DISABLE_AUDIO_CACHE=")
+        else:
+            limit = cache_limit(requested, self.cache_dir)
+            if limit < requested:
+                self.logger.warning(f"Cache Spotify limité à {format_size(limit)} (espace disque)")
+            lines.append(f"LIBRESPOT_CACHE={self.cache_dir}")
+            lines.append(f"LIBRESPOT_CACHE_SIZE_LIMIT={format_size(limit)}")
+
+        return '\n'.join(lines) + '\n'
+
+    def apply(self, restart: bool = True) -> bool:
+        """
+        Écrit la configuration et redémarre raspotify si elle a changé (root requis)
+
+        Args:
+            restart: Redémarrer raspotify après modification
+
+        Returns:
+            True si la configuration a été modifiée
+        """
+        try:
+            content = self.render()
+            try:
+                with open(self.conf_path, 'r', encoding='utf-8') as f:
+                    if f.read() == content:
+                        self.logger.info("Configuration Spotify inchangée")
+                        return False
+            except FileNotFoundError:
+                pass
+
+            self._prepare_cache_dir()
+
+            os.makedirs(os.path.dirname(self.conf_path), exist_ok=True)
+            partial = self.conf_path + '.tmp'
+            with open(partial, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.chmod(partial, 0o644)
+            os.replace(partial, self.conf_path)
+            self.logger.info(f"Configuration Spotify écrite: {self.conf_path}")
+
+            if restart:
+                self.restart()
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'application de la configuration Spotify: {e}")
+            return False
+
+    def _prepare_cache_dir(self) -> None:
+        """Crée le dossier du cache pour l'utilisateur de raspotify"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            account = pwd.getpwnam(SPOTIFY_USER)
+            os.chown(self.cache_dir, account.pw_uid, account.pw_gid)
+        except (KeyError, PermissionError) as e:
+            self.logger.warning(f"Propriétaire du cache Spotify inchangé: {e}")
+
+    def restart(self) -> bool:
+        """Redémarre uniquement raspotify (le reste de l'audio n'est pas touché)"""
+        result = subprocess.run(['systemctl', 'try-restart', RASPOTIFY_SERVICE],
+                                capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            self.logger.error(f"Redémarrage de raspotify impossible: {result.stderr.strip()}")
+            return False
+        self.logger.info("raspotify redémarré")
+        return True
+
+
+class SpotifyStats:
+    def __init__(self, config_manager):
+        """
+        Statistiques de lecture de librespot lues dans le journal de raspotify
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.config_manager = config_manager
+        self.logger = logging.getLogger(__name__)
+        self._process: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+
+        cache_dir = lambda: config_manager.get_value('spotify', 'cache_dir', DEFAULT_CACHE_DIR)
+        metrics.gauge('spotify_cache_bytes', "Taille du cache audio de librespot",
+                      lambda: directory_size(cache_dir()))
+
+    def start(self) -> None:
+        """Suit le journal de raspotify dans un thread (journalctl -f)"""
+        if self._thread is not None:
+            return
+        try:
+            self._process = subprocess.Popen(
+                ['journalctl', '-u', RASPOTIFY_SERVICE, '-f', '-n', '0', '-o', 'cat'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError as e:
+            self.logger.warning(f"Statistiques Spotify indisponibles: {e}")
+            return
+        self._thread = threading.Thread(target=self._follow, name='spotify-stats')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process = None
+        self._thread = None
+
+    def _follow(self) -> None:
+        process = self._process
+        try:
+            for line in process.stdout:
+                self.observe(line)
+        except Exception as e:
+            self.logger.debug(f"Suivi du journal de raspotify interrompu: {e}")
+
+    def observe(self, line: str) -> None:
+        """
+        Analyse une ligne du journal de librespot
+
+        Args:
+            line: Ligne de journal
+        """
+        loaded = _LOADED.search(line)
+        if loaded:
+            result = 'hit' if int(loaded.group(1)) <= CACHE_HIT_MS else 'miss'
+            CACHE_REQUESTS.inc(cache='spotify', result=result)
+        elif _UNDERRUN.search(line):
+            SPOTIFY_UNDERRUNS.inc()
+
+
+def main() -> int:
+    """Point d'entrée de rpi-assistant-spotify.service"""
+    from config_manager import ConfigManager
+
+    parser = argparse.ArgumentParser(description="Configuration de raspotify depuis config-spotify.txt")
+    parser.add_argument('command', choices=['apply', 'show'],
+                        help="apply : écrire et redémarrer raspotify si modifié ; show : afficher")
+    parser.add_argument('--config-dir', default='/boot', help="Dossier des fichiers config-*.txt")
+    parser.add_argument('--conf', default=RASPOTIFY_CONF, help="Fichier de configuration de raspotify")
+    parser.add_argument('--no-restart', action='store_true', help="Ne pas redémarrer raspotify")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    service = SpotifyService(ConfigManager(args.config_dir), args.conf)
+
+    if args.command == 'show':
+        print(service.render(), end='')
+        return 0
+
+    service.apply(restart=not args.no_restart)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Profil de démarrage de l'assistant Raspberry Pi
+Âge du processus et rapport des temps d'import des modules
+"""
+
+import os
+import re
+import sys
+import subprocess
+from typing import List, Optional, Tuple
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Ligne produite par python -X importtime:
+# "import time:       412 |       1530 |   openai._client"
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def process_age() -> Optional[float]:
+    """
+    Temps écoulé depuis le lancement du processus (interpréteur compris)
+
+    Returns:
+        Âge en secondes ou None si /proc n'est pas disponible
+    """
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            # Le nom du processus peut contenir des espaces, on repart après ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+        start_ticks = int(fields[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def profile_imports(module: str = 'assistant') -> List[Tuple[str, int, int, int]]:
+    """
+    Mesure les temps d'import d'un module dans un interpréteur neuf
+
+    Args:
+        module: Module à importer (depuis src/)
+
+    Returns:
+        Liste (module, self_us, cumulé_us, profondeur)
+    """
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=env, timeout=300)
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def print_import_report(module: str = 'assistant', top: int = 25) -> None:
+    """
+    Affiche les imports les plus coûteux
+
+    Args:
+        module: Module à profiler
+        top: Nombre de lignes affichées
+    """
+    entries = profile_imports(module)
+    if not entries:
+        print(f"Aucune mesure (échec de l'import de {module} ?)")
+        return
+
+    total_us = max(cumulative for _, _, cumulative, _ in entries)
+    print(f"Import de {module}: {total_us / 1000:.0f} ms au total")
+    print(f"{'Module':<48} {'self ms':>9} {'cumulé ms':>10}")
+
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda e: -e[2])[:top]:
+        print(f"{'  ' * min(depth, 4) + name:<48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    # Rapport des temps d'import (python3 startup_profile.py [module])
+    print_import_report(sys.argv[1] if len(sys.argv) > 1 else 'assistant')
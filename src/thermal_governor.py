@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Gouverneur thermique de l'assistant Raspberry Pi
+Lit les zones thermiques, les drapeaux de bridage du firmware et le bridage
+CPUQuota du cgroup, et allège le travail de l'assistant quand le SoC chauffe
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from metrics import metrics
+
+
+NORMAL = 'normal'
+WARM = 'warm'
+HOT = 'hot'
+LEVELS = (NORMAL, WARM, HOT)
+
+# Adaptations actives à partir de chaque niveau
+ADAPTATIONS = {
+    NORMAL: frozenset(),
+    WARM: frozenset({'cache_warmup', 'encoder'}),
+    HOT: frozenset({'cache_warmup', 'encoder', 'sample_rate'}),
+}
+
+# Drapeaux de get_throttled (équivalent de « vcgencmd get_throttled ») ;
+# les mêmes bits décalés de 16 indiquent que l'événement a eu lieu depuis le démarrage
+THROTTLE_FLAGS = {
+    0: 'under_voltage',
+    1: 'freq_capped',
+    2: 'throttled',
+    3: 'soft_temp_limit',
+}
+THROTTLED_PATH = os.path.join('devices', 'platform', 'soc', 'soc:firmware', 'get_throttled')
+CPUFREQ_PATH = os.path.join('devices', 'system', 'cpu', 'cpu0', 'cpufreq', 'scaling_cur_freq')
+
+# Retour au niveau inférieur seulement sous le seuil moins cette marge (°C)
+HYSTERESIS_C = 3.0
+
+metrics.gauge('thermal_level', "Niveau thermique (0 normal, 1 chaud, 2 très chaud)",
+              lambda: LEVELS.index(thermal_governor.level))
+metrics.gauge('cpu_temperature_celsius', "Température du SoC (zone thermique la plus chaude)",
+              lambda: thermal_governor.last_sample.get('temperature'))
+metrics.gauge('cpu_frequency_hertz', "Fréquence courante du CPU",
+              lambda: thermal_governor.last_sample.get('frequency'))
+metrics.gauge('cpu_throttled_flags', "Masque get_throttled du firmware",
+              lambda: thermal_governor.last_sample.get('flags'))
+metrics.gauge('cpu_quota_throttled_ratio', "Part du temps bridé par CPUQuota depuis le contrôle précédent",
+              lambda: thermal_governor.last_sample.get('quota_throttled'))
+ADAPTED = metrics.counter(
+    'thermal_adaptations_total', "Allègements appliqués pour raison thermique", ['adaptation'])
+
+
+def read_cpu_temperature(sys_root: str = '/sys') -> Optional[float]:
+    """
+    Température la plus élevée des zones thermiques (°C)
+
+    Args:
+        sys_root: Racine de sysfs (arborescence factice pour les tests)
+    """
+    thermal_dir = os.path.join(sys_root, 'class', 'thermal')
+    temperatures = []
+    try:
+        zones = [name for name in os.listdir(thermal_dir) if name.startswith('thermal_zone')]
+    except OSError:
+        return None
+    for zone in zones:
+        try:
+            with open(os.path.join(thermal_dir, zone, 'temp'), 'r') as f:
+                temperatures.append(int(f.read().strip()) / 1000.0)
+        except (OSError, ValueError):
+            continue
+    return max(temperatures) if temperatures else None
+
+
+def read_throttled(sys_root: str = '/sys') -> Optional[int]:
+    """
+    Drapeaux de bridage du firmware (sysfs, sans lancer vcgencmd)
+
+    Args:
+        sys_root: Racine de sysfs
+
+    Returns:
+        Masque de bits (voir THROTTLE_FLAGS) ou None hors Raspberry Pi
+    """
+    try:
+        with open(os.path.join(sys_root, THROTTLED_PATH), 'r') as f:
+            return int(f.read().strip(), 16)
+    except (OSError, ValueError):
+        return None
+
+
+def read_cpu_frequency(sys_root: str = '/sys') -> Optional[int]:
+    """Fréquence courante du CPU 0 en Hz (cpufreq)"""
+    try:
+        with open(os.path.join(sys_root, CPUFREQ_PATH), 'r') as f:
+            return int(f.read().strip()) * 1000
+    except (OSError, ValueError):
+        return None
+
+
+def throttle_names(flags: Optional[int], occurred: bool = False) -> List[str]:
+    """
+    Noms des drapeaux actifs
+
+    Args:
+        flags: Masque de get_throttled
+        occurred: Drapeaux « depuis le démarrage » plutôt que l'état courant
+    """
+    if not flags:
+        return []
+    shift = 16 if occurred else 0
+    return [name for bit, name in THROTTLE_FLAGS.items() if flags & (1 << (bit + shift))]
+
+
+class ThermalGovernor:
+    def __init__(self, sys_root: str = '/sys', cgroup_root: str = '/sys/fs/cgroup',
+                 proc_root: str = '/proc'):
+        """
+        Gouverneur thermique
+
+        Pas de thread : l'état est relu au plus toutes les check_interval
+        secondes, au moment où une décision en dépend (début de commande,
+        mise en cache d'un message). Deux lectures sysfs par contrôle.
+
+        Args:
+            sys_root: Racine de sysfs (arborescence factice pour les tests)
+            cgroup_root: Racine du cgroup v2
+            proc_root: Racine de /proc
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sys_root = sys_root
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        self.level = NORMAL
+        self.last_sample: Dict[str, Optional[float]] = {}
+
+        self.enabled = True
+        self.warm_c = 65.0
+        self.hot_c = 75.0
+        self.quota_ratio = 0.20
+        self.reduced_sample_rate = 16000
+        self.interval = 5.0
+
+        self._checked_at: Optional[float] = None
+        self._quota: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._cgroup = self._find_cgroup()
+
+    def configure(self, config_manager) -> None:
+        """
+        Applique les seuils thermal_* de config-gpt.txt
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.enabled = config_manager.get_bool_value('gpt', 'thermal_adaptive', True)
+        self.warm_c = config_manager.get_float_value('gpt', 'thermal_warm_c', 65.0)
+        self.hot_c = config_manager.get_float_value('gpt', 'thermal_hot_c', 75.0)
+        self.quota_ratio = config_manager.get_int_value('gpt', 'thermal_quota_percent', 20) / 100.0
+        self.reduced_sample_rate = config_manager.get_int_value('gpt', 'thermal_sample_rate', 16000)
+        self.interval = config_manager.get_int_value('gpt', 'thermal_check_interval', 5)
+        self._checked_at = None
+
+    def _find_cgroup(self) -> Optional[str]:
+        """Dossier du cgroup v2 du processus, s'il expose cpu.stat"""
+        try:
+            with open(os.path.join(self.proc_root, 'self', 'cgroup'), 'r') as f:
+                for line in f:
+                    if line.startswith('0::'):
+                        path = os.path.join(self.cgroup_root, line[3:].strip().lstrip('/'))
+                        if os.path.exists(os.path.join(path, 'cpu.stat')):
+                            return path
+        except OSError:
+            pass
+        return None
+
+    def _quota_throttled(self) -> Optional[float]:
+        """Part du temps mural bridé par CPUQuota depuis l'appel précédent (cpu.stat)"""
+        if not self._cgroup:
+            return None
+        try:
+            with open(os.path.join(self._cgroup, 'cpu.stat'), 'r') as f:
+                stats = dict(line.split() for line in f if len(line.split()) == 2)
+            throttled_us = int(stats['throttled_usec'])
+        except (OSError, ValueError, KeyError):
+            return None
+        now = time.monotonic()
+        previous, self._quota = self._quota, (now, throttled_us)
+        if previous is None or now <= previous[0]:
+            return None
+        return min(1.0, (throttled_us - previous[1]) / ((now - previous[0]) * 1e6))
+
+    def sample(self) -> Dict[str, Optional[float]]:
+        """
+        Lit l'état thermique courant
+
+        Returns:
+            temperature (°C), flags (get_throttled), frequency (Hz), quota_throttled (0..1)
+        """
+        return {
+            'temperature': read_cpu_temperature(self.sys_root),
+            'flags': read_throttled(self.sys_root),
+            'frequency': read_cpu_frequency(self.sys_root),
+            'quota_throttled': self._quota_throttled(),
+        }
+
+    def _classify(self, sample: Dict[str, Optional[float]]) -> str:
+        """Niveau correspondant à un échantillon"""
+        temperature = sample['temperature']
+        active = throttle_names(sample['flags'])
+        quota = sample['quota_throttled'] or 0.0
+
+        if 'throttled' in active:
+            return HOT
+        if temperature is not None:
+            if temperature >= self.hot_c:
+                return HOT
+            if self.level == HOT and temperature >= self.hot_c - HYSTERESIS_C:
+                return HOT
+        if 'freq_capped' in active or 'soft_temp_limit' in active or quota >= self.quota_ratio:
+            return WARM
+        if temperature is not None:
+            if temperature >= self.warm_c:
+                return WARM
+            if self.level != NORMAL and temperature >= self.warm_c - HYSTERESIS_C:
+                return WARM
+        return NORMAL
+
+    def check(self) -> str:
+        """
+        Relit l'état thermique et journalise les changements de niveau
+
+        Returns:
+            Niveau courant
+        """
+        with self._lock:
+            sample = self.sample()
+            self.last_sample = sample
+            self._checked_at = time.monotonic()
+            level = self._classify(sample)
+            previous, self.level = self.level, level
+
+        if level != previous:
+            temperature = sample['temperature']
+            message = (f"Thermique {previous} -> {level}: "
+                       f"{'?' if temperature is None else f'{temperature:.1f}'} °C, "
+                       f"bridage {throttle_names(sample['flags']) or 'aucun'}")
+            if LEVELS.index(level) > LEVELS.index(previous):
+                self.logger.warning(message)
+            else:
+                self.logger.info(message)
+        return level
+
+    def refresh(self) -> str:
+        """Niveau courant, relu si le dernier contrôle date de plus de check_interval"""
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.interval:
+            return self.check()
+        return self.level
+
+    def allows(self, adaptation: str) -> bool:
+        """
+        Indique si le travail normal reste permis (False : appliquer l'allègement)
+
+        Args:
+            adaptation: cache_warmup, encoder ou sample_rate
+        """
+        if not self.enabled:
+            return True
+        return adaptation not in ADAPTATIONS[self.refresh()]
+
+    def capture_rate(self, sample_rate: int) -> int:
+        """
+        Fréquence de capture à utiliser
+
+        Args:
+            sample_rate: Fréquence configurée
+
+        Returns:
+            thermal_sample_rate si le SoC est très chaud (jamais plus que la fréquence configurée)
+        """
+        if self.reduced_sample_rate <= 0 or self.allows('sample_rate'):
+            return sample_rate
+        return min(sample_rate, self.reduced_sample_rate)
+
+    def adapted(self, adaptation: str) -> None:
+        """Compte un allègement effectivement appliqué"""
+        ADAPTED.inc(adaptation=adaptation)
+
+
+# Gouverneur partagé par tout le processus
+thermal_governor = ThermalGovernor()
+
+
+if __name__ == "__main__":
+    # Niveau thermique de la machine courante (python3 thermal_governor.py [racine sysfs])
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+
+    governor = ThermalGovernor(sys.argv[1] if len(sys.argv) > 1 else '/sys')
+    level = governor.check()
+    print(f"niveau: {level} {governor.last_sample}")
+    print(f"capture {governor.capture_rate(44100)} Hz, allègements: {sorted(ADAPTATIONS[level])}")
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Traçage de latence pour l'assistant Raspberry Pi
+Mesure la durée de chaque étape d'une commande vocale et l'écrit en JSONL
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_TRACE_FILE = "/opt/rpi-assistant/logs/traces.jsonl"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Calcule un percentile par interpolation linéaire
+
+    Args:
+        values: Valeurs (non triées)
+        pct: Percentile entre 0 et 100
+
+    Returns:
+        Valeur du percentile (0.0 si la liste est vide)
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize_durations(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Calcule p50/p95/p99 pour chaque étape
+
+    Args:
+        samples: Durées en millisecondes par nom d'étape
+
+    Returns:
+        Statistiques par étape
+    """
+    summary = {}
+    for stage, values in samples.items():
+        summary[stage] = {
+            'count': len(values),
+            'p50': round(percentile(values, 50), 1),
+            'p95': round(percentile(values, 95), 1),
+            'p99': round(percentile(values, 99), 1),
+        }
+    return summary
+
+
+class Trace:
+    def __init__(self, name: str):
+        """
+        Trace d'une commande complète
+
+        Args:
+            name: Nom de la trace (ex: voice_command)
+        """
+        self.name = name
+        # Identifiant court, repris dans les logs de la commande (trace_id)
+        self.id = uuid.uuid4().hex[:8]
+        self.started_at = time.time()
+        self.start = time.monotonic()
+        self.status = 'ok'
+        self.spans: List[Dict[str, Any]] = []
+
+    def add_span(self, name: str, start: float, duration: float, attrs: Dict[str, Any]) -> None:
+        """Ajoute une étape terminée à la trace"""
+        span = {
+            'name': name,
+            'offset_ms': round((start - self.start) * 1000, 1),
+            'duration_ms': round(duration * 1000, 1),
+        }
+        if attrs:
+            span['attrs'] = attrs
+        self.spans.append(span)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Sérialise la trace pour le fichier JSONL"""
+        return {
+            'trace': self.name,
+            'id': self.id,
+            'timestamp': round(self.started_at, 3),
+            'status': self.status,
+            'total_ms': round((time.monotonic() - self.start) * 1000, 1),
+            'spans': self.spans,
+        }
+
+
+class Tracer:
+    def __init__(self, trace_file: str = DEFAULT_TRACE_FILE, max_bytes: int = 1024 * 1024,
+                 backup_count: int = 3, enabled: bool = True):
+        """
+        Initialise le traceur
+
+        Args:
+            trace_file: Fichier JSONL de sortie
+            max_bytes: Taille maximale avant rotation
+            backup_count: Nombre de fichiers conservés après rotation
+            enabled: Active ou désactive le traçage
+        """
+        self.logger = logging.getLogger(__name__)
+        self.trace_file = trace_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.enabled = enabled
+        self.summary_interval = 20
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._recent: Deque[Tuple[str, float]] = deque(maxlen=2000)
+        self._trace_count = 0
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def configure(self, config_manager) -> None:
+        """
+        Applique la configuration de traçage
+
+        Args:
+            config_manager: Instance du gestionnaire de configuration
+        """
+        self.enabled = config_manager.get_bool_value('gpt', 'trace_enabled', True)
+        self.trace_file = config_manager.get_value('gpt', 'trace_file', DEFAULT_TRACE_FILE)
+        self.max_bytes = config_manager.get_int_value('gpt', 'trace_max_kb', 1024) * 1024
+        self.backup_count = config_manager.get_int_value('gpt', 'trace_backups', 3)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Enregistre une fonction appelée avec chaque trace terminée
+
+        Args:
+            listener: Fonction recevant l'enregistrement de la trace
+        """
+        self._listeners.append(listener)
+
+    def current(self) -> Optional[Trace]:
+        """Retourne la trace active du thread courant"""
+        return getattr(self._local, 'trace', None)
+
+    @contextmanager
+    def start_trace(self, name: str) -> Iterator[Optional[Trace]]:
+        """
+        Démarre une trace pour le thread courant
+
+        Args:
+            name: Nom de la trace
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        trace = Trace(name)
+        self._local.trace = trace
+        try:
+            yield trace
+        except Exception:
+            trace.status = 'error'
+            raise
+        finally:
+            self._local.trace = None
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """
+        Mesure une étape de la trace active
+
+        Sans trace active (surveillance Bluetooth, tests), l'étape n'est pas mesurée.
+
+        Args:
+            name: Nom de l'étape
+            attrs: Attributs additionnels enregistrés avec l'étape
+        """
+        trace = self.current()
+        if trace is None:
+            yield
+            return
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            trace.add_span(name, start, time.monotonic() - start, attrs)
+
+    def record(self, name: str, duration: float, **attrs: Any) -> None:
+        """
+        Enregistre une étape déjà mesurée (ex: délai du premier token)
+
+        Args:
+            name: Nom de l'étape
+            duration: Durée en secondes
+            attrs: Attributs additionnels
+        """
+        trace = self.current()
+        if trace is not None:
+            trace.add_span(name, time.monotonic() - duration, duration, attrs)
+
+    def _finish(self, trace: Trace) -> None:
+        """Écrit la trace terminée et met à jour les statistiques"""
+        record = trace.to_record()
+
+        with self._lock:
+            for span in record['spans']:
+                self._recent.append((span['name'], span['duration_ms']))
+            self._recent.append((record['trace'], record['total_ms']))
+            self._trace_count += 1
+            count = self._trace_count
+
+            try:
+                self._write(record)
+            except Exception as e:
+                self.logger.warning(f"Impossible d'écrire la trace: {e}")
+
+        self.logger.info(f"Commande tracée: {record['total_ms']:.0f} ms ({record['status']})")
+
+        for listener in self._listeners:
+            try:
+                listener(record)
+            except Exception as e:
+                self.logger.warning(f"Erreur d'un écouteur de trace: {e}")
+
+        if count % self.summary_interval == 0:
+            self.log_summary()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Ajoute un enregistrement au fichier JSONL avec rotation par taille"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+
+        if (os.path.exists(self.trace_file) and
+                os.path.getsize(self.trace_file) + len(line) > self.max_bytes):
+            self._rotate()
+
+        with open(self.trace_file, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    def _rotate(self) -> None:
+        """Fait tourner les fichiers de trace (traces.jsonl -> traces.jsonl.1 ...)"""
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.trace_file}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.trace_file}.{i + 1}")
+
+        if self.backup_count > 0:
+            os.replace(self.trace_file, f"{self.trace_file}.1")
+        else:
+            os.remove(self.trace_file)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Statistiques p50/p95/p99 sur les traces récentes en mémoire
+
+        Returns:
+            Statistiques par étape
+        """
+        samples: Dict[str, List[float]] = defaultdict(list)
+        with self._lock:
+            for name, duration in self._recent:
+                samples[name].append(duration)
+        return summarize_durations(samples)
+
+    def log_summary(self) -> None:
+        """Log les percentiles de latence par étape"""
+        self.logger.info("Latence par étape (ms):")
+        for stage, stats in sorted(self.summary().items()):
+            self.logger.info(f"  {stage}: p50={stats['p50']} p95={stats['p95']} "
+                             f"p99={stats['p99']} (n={stats['count']})")
+
+
+def summarize_trace_files(trace_file: str = DEFAULT_TRACE_FILE,
+                          backup_count: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Calcule les percentiles à partir des fichiers JSONL (courant et rotations)
+
+    Args:
+        trace_file: Fichier de trace principal
+        backup_count: Nombre de fichiers de rotation à inclure
+
+    Returns:
+        Statistiques par étape
+    """
+    samples: Dict[str, List[float]] = defaultdict(list)
+    paths = [trace_file] + [f"{trace_file}.{i}" for i in range(1, backup_count + 1)]
+
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                samples[record.get('trace', 'total')].append(record.get('total_ms', 0.0))
+                for span in record.get('spans', []):
+                    samples[span['name']].append(span['duration_ms'])
+
+    return summarize_durations(samples)
+
+
+# Traceur partagé par tous les composants
+tracer = Tracer()
+
+
+if __name__ == "__main__":
+    # Résumé des traces enregistrées
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TRACE_FILE
+    summary = summarize_trace_files(path)
+
+    if not summary:
+        print(f"Aucune trace dans {path}")
+        sys.exit(1)
+
+    print(f"{'Étape':<32} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for stage, stats in sorted(summary.items()):
+        print(f"{stage:<32} {stats['count']:>6} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests de l'atténuation de Spotify et du flux de sortie vocal (serveur PulseAudio simulé)
+Usage: python3 -m pytest test_audio_mixer.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from audio_mixer import Ducker, SpeechOutput, gain_curve
+from audio_sinks import SinkManager
+from config_manager import ConfigManager
+from simulation import FakePulseServer
+import audio_mixer
+
+
+class MixerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+        with open(os.path.join(self.boot_dir, 'config-gpt.txt'), 'w') as f:
+            f.write("duck_attack_ms=100\nduck_release_ms=100\n")
+        self.config_manager = ConfigManager(self.boot_dir)
+
+        self.pulse = FakePulseServer()
+        self.sinks = SinkManager()
+        self.sinks.backend_factory = lambda server: self.pulse
+        patcher = mock.patch.object(audio_mixer, 'sink_manager', self.sinks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.sinks.stop)
+
+    def wait_gain(self, ducker: Ducker, gain: float) -> None:
+        deadline = time.monotonic() + 2
+        while (ducker._ramping or ducker._gain != gain) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertAlmostEqual(ducker._gain, gain)
+
+
+class DuckerTest(MixerTestCase):
+    def test_gain_curve_ends_on_target(self):
+        self.assertEqual(gain_curve(1.0, 0.5, 1), [0.5])
+        curve = gain_curve(1.0, 0.125, 5)
+        self.assertEqual(len(curve), 5)
+        self.assertAlmostEqual(curve[-1], 0.125)
+        self.assertEqual(curve, sorted(curve, reverse=True))
+
+    def test_ramp_with_native_backend(self):
+        ducker = Ducker(self.config_manager)
+        ducker.duck()
+        self.wait_gain(ducker, 10 ** (-18 / 20))
+        # 100 ms de rampe par points de 20 ms
+        self.assertEqual(self.pulse.volume_change_count, 5)
+        ducker.release()
+        self.wait_gain(ducker, 1.0)
+        self.assertEqual(self.pulse.volume_change_count, 10)
+
+    def test_single_step_without_volume_ramp(self):
+        # Repli pactl : un processus par changement, volume cible en une fois
+        self.pulse.volume_ramp = False
+        ducker = Ducker(self.config_manager)
+        with ducker.ducked():
+            self.wait_gain(ducker, 10 ** (-18 / 20))
+            self.assertEqual(self.pulse.volume_change_count, 1)
+        self.wait_gain(ducker, 1.0)
+        self.assertEqual(self.pulse.volume_change_count, 2)
+        self.assertEqual(self.pulse.volume_changes[-1][2], 1.0)
+
+
+class BlockingStream:
+    def __init__(self):
+        self.written = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data: bytes) -> None:
+        if any(data):
+            self.writing.set()
+            self.release.wait(2)
+            self.written.append(data)
+
+
+class SpeechOutputTest(MixerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stream = BlockingStream()
+        self.output = SpeechOutput(self.config_manager, lambda: self.stream, lambda: None, 16000)
+        self.addCleanup(self.output.stop)
+        self.addCleanup(self.stream.release.set)
+
+    def test_timed_out_sentence_is_not_played_later(self):
+        first = threading.Thread(target=self.output.play, args=([b'\x01\x01' * 512],))
+        first.start()
+        self.assertTrue(self.stream.writing.wait(2))
+        self.assertFalse(self.output.play([b'\x02\x02' * 512], timeout=0.05))
+
+        self.stream.release.set()
+        first.join(2)
+        # Passage du thread de sortie sur la phrase abandonnée
+        self.assertTrue(self.output.play([b'\x03\x03' * 512], timeout=2))
+        # Milieu des blocs : hors des fondus d'entrée et de sortie
+        played = [chunk[len(chunk) // 2:len(chunk) // 2 + 2] for chunk in self.stream.written]
+        self.assertEqual(played, [b'\x01\x01', b'\x03\x03'])
+
+    def test_interrupted_sentence_is_not_reported_as_played(self):
+        results = []
+        sentence = threading.Thread(target=lambda: results.append(
+            self.output.play([b'\x01\x01' * 512, b'\x02\x02' * 512, b'\x03\x03' * 512], timeout=2)))
+        sentence.start()
+        self.assertTrue(self.stream.writing.wait(2))
+        self.output.interrupt()
+        self.stream.release.set()
+        sentence.join(2)
+
+        self.assertEqual(results, [False])
+        # Premier bloc joué, le suivant réduit au fondu de sortie, le dernier jamais écrit
+        self.assertEqual(len(self.stream.written), 2)
+        self.assertEqual(len(self.stream.written[1]), len(self.output._fade) * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests du gestionnaire de sinks (cache d'événements, routage, volumes) et du repli pactl
+Usage: python3 -m pytest test_audio_sinks.py
+"""
+
+import os
+import sys
+import time
+import json
+import subprocess
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from audio_sinks import SinkManager, _PactlBackend, _PulsectlBackend, pactl_version
+from simulation import BUILTIN_SINK, FakePulseServer, VirtualBluetoothDevice
+import audio_sinks
+
+SPEAKER_SINK = 'bluez_sink.AA_BB_CC_DD_EE_FF.a2dp_sink'
+
+
+def wait_until(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class SinkManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.speaker = VirtualBluetoothDevice()
+        self.speaker.paired = True
+        self.pulse = FakePulseServer(speaker=self.speaker)
+        self.sinks = SinkManager()
+        self.pulse.attach(self.sinks)
+        self.addCleanup(self.sinks.stop)
+        self.assertTrue(self.sinks.start())
+        # Événements transmis dès que le thread d'écoute est abonné
+        self.assertTrue(wait_until(lambda: self.pulse._listening))
+
+    def connect_speaker(self) -> str:
+        self.speaker.bluetoothctl(f"connect {self.speaker.mac}")
+        return self.sinks.wait_for_bluetooth_sink(self.speaker.mac, timeout=2)
+
+    def test_cache_follows_server_events(self):
+        self.assertEqual(self.sinks.sinks(), [BUILTIN_SINK])
+        self.assertEqual(self.connect_speaker(), SPEAKER_SINK)
+        self.assertEqual(set(self.sinks.sinks()), {BUILTIN_SINK, SPEAKER_SINK})
+
+        self.speaker.drop()
+        self.assertTrue(wait_until(lambda: SPEAKER_SINK not in self.sinks.sinks()))
+        self.assertIsNone(self.sinks.find_bluetooth_sink(self.speaker.mac))
+        self.assertEqual(self.sinks.default_sink(), BUILTIN_SINK)
+
+    def test_route_moves_existing_and_new_streams(self):
+        before = self.pulse.open_stream(22050)
+        sink = self.connect_speaker()
+        self.assertTrue(self.sinks.route_to(sink))
+        self.assertEqual(self.pulse.default, sink)
+        self.assertEqual(before.sink, sink)
+
+        # Flux créé après le routage : déplacé par le thread de traitement des événements
+        self.pulse.default = BUILTIN_SINK
+        after = self.pulse.open_stream(22050)
+        self.assertEqual(after.sink, BUILTIN_SINK)
+        self.assertTrue(wait_until(lambda: after.sink == sink))
+
+    def test_route_to_unknown_sink(self):
+        self.assertFalse(self.sinks.route_to('bluez_sink.00_00_00_00_00_00.a2dp_sink'))
+
+    def test_spotify_volume(self):
+        self.pulse.open_stream(22050)
+        volumes = self.sinks.stream_volumes()
+        self.assertEqual(list(volumes), [self.pulse._spotify_index])
+        self.assertEqual(volumes[self.pulse._spotify_index], {'volume': 1.0, 'channels': 2})
+
+        self.assertTrue(self.sinks.set_stream_volume(self.pulse._spotify_index, 0.25))
+        self.assertEqual(self.sinks.stream_volumes()[self.pulse._spotify_index]['volume'], 0.25)
+        self.assertEqual(self.pulse.volume_change_count, 1)
+
+    def test_volume_ramp_follows_backend(self):
+        self.assertTrue(self.sinks.volume_ramp)
+        self.pulse.volume_ramp = False
+        self.assertFalse(self.sinks.volume_ramp)
+
+    def test_port_latency_offset_in_microseconds(self):
+        self.connect_speaker()
+        card = 'bluez_card.AA_BB_CC_DD_EE_FF'
+        self.assertEqual(self.sinks.card_ports(), {card: ['speaker-output']})
+        self.assertTrue(self.sinks.set_port_latency_offset(card, 'speaker-output', 25))
+        self.assertEqual(self.pulse.port_offsets, {(card, 'speaker-output'): 25000})
+
+
+def completed(stdout: str = '', returncode: int = 0) -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess([], returncode, stdout=stdout, stderr='')
+
+
+class PactlFallbackTest(unittest.TestCase):
+    def setUp(self):
+        for patcher in (mock.patch.object(audio_sinks, 'pulsectl', None),
+                        mock.patch.object(audio_sinks.shutil, 'which', lambda name: '/usr/bin/pactl')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sinks = SinkManager()
+        self.addCleanup(self.sinks.stop)
+
+    def pactl(self, version: str):
+        def run(command, **kwargs):
+            if command[-1] == '--version':
+                return completed(f"pactl {version}\nCompiled with libpulse {version}.0\n")
+            if 'get-default-sink' in command:
+                return completed(BUILTIN_SINK + '\n')
+            if 'subscribe' in command:
+                return completed()
+            return completed(json.dumps([{'index': 0, 'name': BUILTIN_SINK}]))
+        return mock.patch.object(audio_sinks.subprocess, 'run', side_effect=run)
+
+    def test_version(self):
+        with self.pactl('16.1'):
+            self.assertEqual(pactl_version(), (16, 1))
+        with mock.patch.object(audio_sinks.subprocess, 'run', side_effect=FileNotFoundError):
+            self.assertIsNone(pactl_version())
+
+    def test_old_pactl_is_refused_once(self):
+        with self.pactl('14.2') as run, self.assertLogs('audio_sinks', 'ERROR') as logs:
+            self.assertFalse(self.sinks.start())
+            self.assertFalse(self.sinks.start())
+        self.assertIn('python3-pulsectl', logs.output[0])
+        # Pas de nouvelle tentative : une seule lecture de version
+        self.assertEqual(run.call_count, 1)
+
+    def test_recent_pactl_is_used(self):
+        # pactl subscribe est un processus : remplacé par un abonnement vide
+        with self.pactl('16.1'), mock.patch.object(_PactlBackend, 'listen', lambda self, callback: None):
+            self.assertTrue(self.sinks.start())
+            self.assertEqual(self.sinks.sinks(), [BUILTIN_SINK])
+            self.assertEqual(self.sinks.default_sink(), BUILTIN_SINK)
+
+
+class PulsectlPortOffsetTest(unittest.TestCase):
+    def test_falls_back_to_pactl(self):
+        # Connexion pulsectl sans port_offset_set (absent de pulsectl)
+        backend = _PulsectlBackend.__new__(_PulsectlBackend)
+        backend.server = 'unix:/run/user/1000/pulse/native'
+        backend._pulse = object()
+        with mock.patch.object(audio_sinks.subprocess, 'run', return_value=completed()) as run:
+            backend.port_offset_set('bluez_card.AA', 'speaker-output', 25000)
+        self.assertEqual(run.call_args[0][0],
+                         ['pactl', '--server', 'unix:/run/user/1000/pulse/native',
+                          'set-port-latency-offset', 'bluez_card.AA', 'speaker-output', '25000'])
+
+    def test_uses_native_method_when_available(self):
+        backend = _PulsectlBackend.__new__(_PulsectlBackend)
+        backend.server = None
+        backend._pulse = mock.Mock()
+        with mock.patch.object(audio_sinks.subprocess, 'run') as run:
+            backend.port_offset_set('bluez_card.AA', 'speaker-output', 25000)
+        backend._pulse.port_offset_set.assert_called_once_with('bluez_card.AA', 'speaker-output', 25000)
+        run.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests du spool audio (budget, références, nettoyage)
+Usage: python3 -m pytest test_audio_spool.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from audio_spool import AudioSpool
+from metrics import SPOOL_EVICTIONS
+
+
+class AudioSpoolTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        # Mémoire minimale impossible : le spool reste sur le dossier « disque » de test
+        self.spool = AudioSpool(os.path.join(self.root, 'ram'), os.path.join(self.root, 'disk'),
+                                budget_bytes=4096, min_free_memory=1 << 62)
+
+    def _write(self, size: int) -> str:
+        path = self.spool.allocate('test', '.raw')
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * size)
+        self.spool.commit(path)
+        return path
+
+    def test_orphans_removed_at_startup(self):
+        orphan = os.path.join(self.spool.directory, 'recording_old.wav')
+        with open(orphan, 'wb') as f:
+            f.write(b'\x00')
+        # Un spool en mémoire nettoie aussi son dossier de débordement sur disque
+        AudioSpool(os.path.join(self.root, 'ram'), os.path.join(self.root, 'disk'),
+                   min_free_memory=0)
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_release_deletes_at_last_reference(self):
+        path = self._write(1024)
+        self.spool.acquire(path)
+        self.assertTrue(self.spool.release(path))
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(self.spool.release(path))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.spool.usage(), 0)
+        self.assertFalse(self.spool.release(path))
+
+    def test_budget_sends_new_files_to_disk(self):
+        # Spool en mémoire (aucune marge exigée), budget de 4 Kio
+        spool = AudioSpool(os.path.join(self.root, 'ram'), os.path.join(self.root, 'disk'),
+                           budget_bytes=4096, min_free_memory=0)
+        self.assertEqual(spool.directory, os.path.join(self.root, 'ram'))
+        self.spool = spool
+        before = SPOOL_EVICTIONS.value()
+
+        paths = [self._write(2048) for _ in range(3)]
+        self.assertEqual([os.path.basename(os.path.dirname(path)) for path in paths],
+                         ['ram', 'ram', 'disk'])
+        self.assertEqual(SPOOL_EVICTIONS.value(), before + 1)
+        self.assertEqual((spool.usage(), spool.ram_usage()), (6144, 4096))
+        # Les fichiers détenus ne sont jamais supprimés
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+
+        # Place libérée en mémoire : retour sur tmpfs
+        spool.release(paths[0])
+        self.assertEqual(spool.ram_usage(), 2048)
+        path = self._write(1024)
+        self.assertEqual(os.path.dirname(path), spool.directory)
+        self.assertEqual(SPOOL_EVICTIONS.value(), before + 1)
+
+    def test_disk_spool_is_not_counted_as_evictions(self):
+        before = SPOOL_EVICTIONS.value()
+        paths = [self._write(2048) for _ in range(3)]
+        self.assertEqual(self.spool.usage(), 6144)
+        self.assertEqual(self.spool.ram_usage(), 0)
+        self.assertEqual({os.path.dirname(path) for path in paths}, {self.spool.disk_dir})
+        self.assertEqual(SPOOL_EVICTIONS.value(), before)
+
+    def test_clear_removes_entries_and_orphans(self):
+        path = self._write(512)
+        orphan = os.path.join(self.spool.directory, 'tts_old.mp3')
+        with open(orphan, 'wb') as f:
+            f.write(b'\x00')
+        self.spool.clear()
+        self.assertEqual(self.spool.usage(), 0)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_use_disk_only_once(self):
+        self.assertFalse(self.spool.use_disk())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests de la machine d'états Bluetooth (gestionnaire factice, sans bluetoothctl)
+Usage: python3 -m pytest test_bluetooth_connection.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+from bluetooth_connection import CONNECTED, DEGRADED, PAIRED, BluetoothConnection
+
+
+class FakeGroup:
+    def __init__(self, connected: bool):
+        self.connected = connected
+
+    def ensure(self) -> bool:
+        return self.connected
+
+
+class FakeManager:
+    def __init__(self, group=None, target_mac=None):
+        self.group = group
+        self.target_mac = target_mac
+        self.initialized = 0
+
+    def initialize(self) -> bool:
+        self.initialized += 1
+        return True
+
+    def _is_device_paired(self, mac: str) -> bool:
+        return True
+
+    def _is_device_connected(self, mac: str) -> bool:
+        return True
+
+    def _set_bluetooth_audio_sink(self, mac: str) -> None:
+        pass
+
+
+class BluetoothConnectionTest(unittest.TestCase):
+    def setUp(self):
+        self.config_manager = ConfigManager(tempfile.mkdtemp())
+
+    def _step(self, connection: BluetoothConnection) -> None:
+        # Pas d'attente du check_interval pendant le test
+        connection._wake.set()
+        connection._step()
+
+    def test_group_initializes_adapter_before_ensure(self):
+        manager = FakeManager(group=FakeGroup(True))
+        connection = BluetoothConnection(manager, self.config_manager)
+        self._step(connection)
+        self.assertEqual(manager.initialized, 1)
+        self.assertEqual(connection.state, CONNECTED)
+
+        self._step(connection)
+        self.assertEqual(manager.initialized, 1)
+
+    def test_group_degraded_when_a_speaker_is_missing(self):
+        manager = FakeManager(group=FakeGroup(False))
+        connection = BluetoothConnection(manager, self.config_manager)
+        self._step(connection)
+        self.assertEqual(connection.state, DEGRADED)
+
+    def test_known_speaker_initializes_before_connecting(self):
+        manager = FakeManager(target_mac='AA:BB:CC:DD:EE:FF')
+        connection = BluetoothConnection(manager, self.config_manager)
+        self._step(connection)
+        self.assertEqual(connection.state, PAIRED)
+        self.assertEqual(manager.initialized, 1)
+        self._step(connection)
+        self.assertEqual(connection.state, CONNECTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests des instantanés de configuration typés et du rechargement à chaud
+Usage: python3 -m pytest test_config_manager.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+
+
+class ConfigManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+
+    def write(self, filename: str, content: str) -> None:
+        with open(os.path.join(self.boot_dir, filename), 'w') as f:
+            f.write(content)
+
+    def test_typed_values(self):
+        self.write('config-gpt.txt', "# commentaire\nsample_rate = 16000\nvoice_activation=yes\n"
+                                     "custom_key=abc\n")
+        self.write('config-openai.txt', "temperature=1.2\n")
+        config_manager = ConfigManager(self.boot_dir)
+
+        snapshot = config_manager.snapshot
+        self.assertEqual(snapshot.get('gpt', 'sample_rate'), 16000)
+        self.assertIs(snapshot.get('gpt', 'voice_activation'), True)
+        self.assertEqual(snapshot.get('openai', 'temperature'), 1.2)
+        # Hors schéma : chaîne brute, conversion à la demande
+        self.assertEqual(snapshot.get('gpt', 'custom_key'), 'abc')
+        self.assertEqual(config_manager.get_int_value('gpt', 'custom_key', 7), 7)
+        self.assertEqual(config_manager.get_value('gpt', 'sample_rate'), '16000')
+        # Fichier absent : valeurs par défaut
+        self.assertEqual(config_manager.get_recording_duration(), 10)
+
+    def test_invalid_values_fall_back_to_defaults(self):
+        self.write('config-gpt.txt', "sample_rate=96000\nrecording_duration=dix\n")
+        self.write('config-openai.txt', "temperature=-1\n")
+        config_manager = ConfigManager(self.boot_dir)
+
+        self.assertEqual(config_manager.get_int_value('gpt', 'sample_rate'), 44100)
+        self.assertEqual(config_manager.get_recording_duration(), 10)
+        self.assertEqual(config_manager.get_float_value('openai', 'temperature'), 0.7)
+        # La valeur brute reste celle du fichier
+        self.assertEqual(config_manager.get_value('gpt', 'sample_rate'), '96000')
+
+    def test_snapshot_is_read_only(self):
+        config_manager = ConfigManager(self.boot_dir)
+        with self.assertRaises(TypeError):
+            config_manager.snapshot.typed['gpt']['sample_rate'] = 8000
+        with self.assertRaises(TypeError):
+            config_manager.configs['gpt']['sample_rate'] = '8000'
+        # get_config renvoie une copie modifiable
+        config = config_manager.get_config('gpt')
+        config['sample_rate'] = '8000'
+        self.assertEqual(config_manager.get_value('gpt', 'sample_rate'), '44100')
+
+    def test_reload_reports_changed_keys(self):
+        self.write('config-gpt.txt', "sample_rate=16000\n")
+        config_manager = ConfigManager(self.boot_dir)
+        notifications = []
+        config_manager.subscribe(lambda old, new, changes: notifications.append((old, new, changes)))
+        config_manager.subscribe(lambda old, new, changes: 1 / 0)
+
+        self.assertEqual(config_manager.reload_all(), {})
+        self.assertEqual(notifications, [])
+
+        before = config_manager.snapshot
+        self.write('config-gpt.txt', "sample_rate=22050\nvoice_activation=true\n")
+        self.write('config-openai.txt', "max_tokens=200\n")
+        changes = config_manager.reload_all()
+
+        self.assertEqual(changes, {'gpt': {'sample_rate', 'voice_activation'}, 'openai': {'max_tokens'}})
+        # Un abonné en erreur n'empêche pas les autres d'être notifiés
+        old, new, notified = notifications[-1]
+        self.assertIs(old, before)
+        self.assertIs(new, config_manager.snapshot)
+        self.assertEqual(notified, changes)
+        self.assertEqual(old.get('gpt', 'sample_rate'), 16000)
+        self.assertEqual(new.get('gpt', 'sample_rate'), 22050)
+
+
+if __name__ == "__main__":
+    unittest.main()
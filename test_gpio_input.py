@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests de l'anti-rebond et des gestes du bouton (fronts horodatés, sans thread)
+Usage: python3 -m pytest test_gpio_input.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+from gpio_input import (DOUBLE_PRESS, DOWN, HOLD, LONG_PRESS, PRESS, PRESSED, RELEASED, UP,
+                        GpioInput, SimulatedBackend)
+
+
+class GpioInputTest(unittest.TestCase):
+    def setUp(self):
+        # Seuils par défaut : anti-rebond 20 ms, double appui 250 ms, maintien 400 ms, long 1500 ms
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+        self.config_manager = ConfigManager(self.boot_dir)
+        self.gpio = GpioInput(self.config_manager, SimulatedBackend(17))
+
+    def edge(self, level: int, t: float) -> None:
+        self.gpio._debounce(level, t)
+
+    def tick(self, t: float) -> None:
+        self.gpio._check_timers(t)
+
+    def press(self, down: float, up: float, bounces: int = 0) -> None:
+        """Appui de down à up (secondes), rebonds de 2 ms à chaque front"""
+        for level, t in ((PRESSED, down), (RELEASED, up)):
+            other = RELEASED if level == PRESSED else PRESSED
+            for i in range(bounces):
+                self.edge(level, t + i * 0.004)
+                self.edge(other, t + i * 0.004 + 0.002)
+            self.edge(level, t + bounces * 0.004)
+            self.tick(t + bounces * 0.004 + 0.025)
+
+    def gestures(self):
+        events = []
+        while not self.gpio.events.empty():
+            events.append(self.gpio.events.get())
+        return events
+
+    def test_bounces_collapse_into_one_press(self):
+        self.press(0.0, 0.1, bounces=3)
+        self.tick(1.0)
+        events = self.gestures()
+        self.assertEqual([event.gesture for event in events], [DOWN, UP, PRESS])
+        # Le front retenu garde l'horodatage du premier rebond
+        self.assertEqual(events[0].time, 0.0)
+        self.assertAlmostEqual(events[2].duration, 0.1)
+
+    def test_glitch_shorter_than_debounce_is_ignored(self):
+        self.edge(PRESSED, 0.0)
+        self.edge(RELEASED, 0.005)
+        self.tick(0.1)
+        self.tick(1.0)
+        self.assertEqual(self.gestures(), [])
+
+    def test_single_press_waits_for_double_press_window(self):
+        self.press(0.0, 0.1)
+        self.tick(0.3)
+        self.assertNotIn(PRESS, [event.gesture for event in self.gestures()])
+        self.tick(0.36)
+        self.assertEqual([event.gesture for event in self.gestures()], [PRESS])
+
+    def test_double_press(self):
+        self.press(0.0, 0.08)
+        self.press(0.2, 0.28)
+        self.tick(1.0)
+        self.assertEqual([event.gesture for event in self.gestures()],
+                         [DOWN, UP, DOWN, UP, DOUBLE_PRESS])
+
+    def test_press_is_immediate_without_double_press_consumer(self):
+        self.gpio = GpioInput(self.config_manager, SimulatedBackend(17), gestures=(PRESS, LONG_PRESS))
+        self.press(0.0, 0.1)
+        self.assertEqual([event.gesture for event in self.gestures()], [DOWN, UP, PRESS])
+        self.press(0.2, 0.28)
+        self.assertEqual([event.gesture for event in self.gestures()], [DOWN, UP, PRESS])
+
+    def test_hold_then_long_press(self):
+        self.edge(PRESSED, 0.0)
+        self.tick(0.025)
+        self.assertEqual([event.gesture for event in self.gestures()], [DOWN])
+        self.tick(0.45)
+        self.tick(1.6)
+        self.edge(RELEASED, 2.0)
+        self.tick(2.05)
+        self.tick(3.0)
+        events = self.gestures()
+        self.assertEqual([event.gesture for event in events], [HOLD, LONG_PRESS, UP])
+        self.assertAlmostEqual(events[-1].duration, 2.0)
+
+    def test_simulated_backend_through_thread(self):
+        gpio = GpioInput(self.config_manager, SimulatedBackend(17), gestures=(PRESS,))
+        gpio.start()
+        self.addCleanup(gpio.stop)
+        gpio.backend.press(0.05, bounces=2)
+        event = gpio.events.get(timeout=1)
+        while event.gesture != PRESS:
+            event = gpio.events.get(timeout=1)
+        self.assertLess(time.monotonic() - event.time, 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
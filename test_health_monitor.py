@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests de la planification des contrôles de santé (horloge monotone simulée)
+Usage: python3 -m pytest test_health_monitor.py
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from health_monitor import CRITICAL, OK, UNKNOWN, WARNING, HealthMonitor, HealthStatus, CheckResult
+import health_monitor
+
+
+class FakeCheck:
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return status, status, {'call': self.calls}
+
+
+class HealthMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(health_monitor.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.monitor = HealthMonitor()
+        self.transitions = []
+        self.monitor.add_listener(lambda result, previous: self.transitions.append((previous, result.status)))
+
+    def test_checks_run_when_due(self):
+        disk = FakeCheck(OK)
+        thermal = FakeCheck(OK)
+        self.monitor.register('disk', disk, 300)
+        self.monitor.register('thermal', thermal, 60)
+
+        # Premier passage : tous les contrôles, puis attente jusqu'au plus proche
+        self.assertEqual(self.monitor.run_pending(), 60)
+        self.assertEqual((disk.calls, thermal.calls), (1, 1))
+
+        self.now += 59
+        self.assertEqual(self.monitor.run_pending(), 1)
+        self.assertEqual((disk.calls, thermal.calls), (1, 1))
+
+        self.now += 1
+        self.assertEqual(self.monitor.run_pending(), 60)
+        self.assertEqual((disk.calls, thermal.calls), (1, 2))
+
+        # Échéances manquées : un seul contrôle, sans rattrapage
+        self.now += 240
+        self.monitor.run_pending()
+        self.assertEqual((disk.calls, thermal.calls), (2, 3))
+
+    def test_no_checks(self):
+        self.assertEqual(self.monitor.run_pending(), 60.0)
+        self.assertEqual(self.monitor.status.overall, UNKNOWN)
+
+    def test_register_again_brings_next_check_forward(self):
+        self.monitor.register('disk', FakeCheck(OK), 300)
+        self.monitor.run_pending()
+        self.monitor.register('disk', FakeCheck(OK), 30)
+        self.assertEqual(self.monitor.run_pending(), 30)
+
+    def test_listeners_only_on_change(self):
+        check = FakeCheck(OK, OK, WARNING, WARNING, OK)
+        self.monitor.register('disk', check, 10)
+        for _ in range(5):
+            self.monitor.run_pending()
+            self.now += 10
+
+        self.assertEqual(self.transitions, [(UNKNOWN, OK), (OK, WARNING), (WARNING, OK)])
+        result = self.monitor.status.get('disk')
+        self.assertEqual((result.status, result.details), (OK, {'call': 5}))
+        # Dernier changement d'état au 5e contrôle, mesure au même instant
+        self.assertEqual(result.since, result.checked_at)
+
+    def test_since_kept_while_state_is_stable(self):
+        self.monitor.register('disk', FakeCheck(WARNING), 10)
+        first = self.monitor.run_check('disk')
+        self.now += 10
+        second = self.monitor.run_check('disk')
+        self.assertEqual(second.since, first.since)
+        self.assertEqual(second.checked_at, first.checked_at + 10)
+
+    def test_failing_check_is_unknown(self):
+        self.monitor.register('bluetooth', FakeCheck(OK, RuntimeError('dbus')), 10)
+        self.monitor.add_listener(lambda result, previous: 1 / 0)
+        self.monitor.run_pending()
+        self.now += 10
+        self.monitor.run_pending()
+        result = self.monitor.status.get('bluetooth')
+        self.assertEqual((result.status, result.message), (UNKNOWN, 'dbus'))
+        self.assertEqual(self.transitions, [(UNKNOWN, OK), (OK, UNKNOWN)])
+
+    def test_overall_is_most_severe(self):
+        status = HealthStatus()
+        self.assertEqual(status.overall, UNKNOWN)
+        for name, state in (('disk', OK), ('memory', UNKNOWN), ('thermal', WARNING)):
+            status.results[name] = CheckResult(name, state)
+        self.assertEqual(status.overall, WARNING)
+        status.results['network'] = CheckResult('network', CRITICAL)
+        self.assertEqual(status.overall, CRITICAL)
+        self.assertEqual(status.to_dict()['status'], CRITICAL)
+
+
+if __name__ == "__main__":
+    unittest.main()
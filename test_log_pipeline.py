@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests de la journalisation en file (abandon, format natif journald, niveaux, reconfiguration à chaud)
+Usage: python3 -m pytest test_log_pipeline.py
+"""
+
+import os
+import sys
+import queue
+import shutil
+import socket
+import struct
+import logging
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+from log_pipeline import DROPPED, DroppingQueueHandler, JournaldHandler, LogPipeline
+
+
+def parse_journal(datagram: bytes) -> dict:
+    """Décode le protocole natif de journald (formes KEY=valeur et binaire)"""
+    fields = {}
+    while datagram:
+        line, _, rest = datagram.partition(b'\n')
+        if b'=' in line:
+            key, value = line.split(b'=', 1)
+            datagram = rest
+        else:
+            key, (size,) = line, struct.unpack('<Q', rest[:8])
+            value, datagram = rest[8:8 + size], rest[8 + size + 1:]
+        fields[key.decode()] = value.decode()
+    return fields
+
+
+class DroppingQueueHandlerTest(unittest.TestCase):
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = DroppingQueueHandler(queue.Queue(1))
+        dropped = DROPPED.value()
+        for message in ('premier', 'second'):
+            handler.handle(logging.makeLogRecord({'msg': message, 'levelno': logging.INFO}))
+        self.assertEqual(DROPPED.value(), dropped + 1)
+        self.assertEqual(handler.queue.get_nowait().msg, 'premier')
+
+
+class JournaldHandlerTest(unittest.TestCase):
+    def setUp(self):
+        # Socket datagramme à la place de /run/systemd/journal/socket
+        self.socket_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.socket_dir, True)
+        path = os.path.join(self.socket_dir, 'journal.sock')
+        self.journal = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.journal.bind(path)
+        self.journal.settimeout(2)
+        self.addCleanup(self.journal.close)
+        self.handler = JournaldHandler(path, identifier='test-assistant')
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+        self.addCleanup(self.handler.close)
+
+    def test_field_forms(self):
+        self.assertEqual(JournaldHandler._field('priority', 6), b'PRIORITY=6\n')
+        self.assertEqual(JournaldHandler._field('message', 'a\nb'),
+                         b'MESSAGE\n' + struct.pack('<Q', 3) + b'a\nb\n')
+
+    def test_structured_record(self):
+        record = logging.makeLogRecord({
+            'name': 'assistant', 'levelno': logging.ERROR, 'msg': "Erreur STT\nréponse: 500",
+            'fields': {'chars': 42, '_stage': 'stt'}, 'trace_id': 'abc123'})
+        self.handler.handle(record)
+
+        fields = parse_journal(self.journal.recv(65536))
+        self.assertEqual(fields['MESSAGE'], "Erreur STT\nréponse: 500")
+        self.assertEqual(fields['PRIORITY'], '3')
+        self.assertEqual(fields['SYSLOG_IDENTIFIER'], 'test-assistant')
+        self.assertEqual(fields['LOGGER'], 'assistant')
+        self.assertEqual(fields['TRACE_ID'], 'abc123')
+        self.assertEqual((fields['CHARS'], fields['STAGE']), ('42', 'stt'))
+
+
+class LogPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+        self.log_file = os.path.join(self.boot_dir, 'logs', 'assistant.log')
+        self.write_config(f"log_file={self.log_file}\n")
+        self.config_manager = ConfigManager(self.boot_dir)
+
+        # Logger racine rendu tel quel (capture de pytest comprise)
+        root = logging.getLogger()
+        self.addCleanup(setattr, root, 'handlers', list(root.handlers))
+        self.addCleanup(root.setLevel, root.level)
+        self.pipeline = LogPipeline()
+        self.addCleanup(self.pipeline.stop)
+        self.pipeline.install()
+        self.pipeline.configure(self.config_manager)
+        self.logger = logging.getLogger('test_log_pipeline.module')
+
+    def write_config(self, content: str) -> None:
+        with open(os.path.join(self.boot_dir, 'config-gpt.txt'), 'w') as f:
+            f.write(content)
+
+    def read(self, path: str) -> str:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_records_reach_file_with_fields(self):
+        self.logger.info("Transcription reçue", extra={'fields': {'chars': 42}})
+        self.logger.debug("Masqué")
+        self.pipeline.stop()
+        content = self.read(self.log_file)
+        self.assertIn("Transcription reçue chars=42", content)
+        self.assertNotIn("Masqué", content)
+
+    def test_module_levels_are_reset_when_removed(self):
+        names = ('test_log_pipeline.verbose', 'test_log_pipeline.quiet')
+        for name in names:
+            self.addCleanup(logging.getLogger(name).setLevel, logging.NOTSET)
+        self.write_config(f"log_file={self.log_file}\nlog_levels={names[0]}=DEBUG,{names[1]}=ERROR\n")
+        self.config_manager.reload_all()
+        self.assertEqual([logging.getLogger(name).level for name in names], [logging.DEBUG, logging.ERROR])
+
+        # quiet retiré : il reprend le niveau racine au lieu de rester en ERROR
+        self.write_config(f"log_file={self.log_file}\nlog_level=WARNING\nlog_levels={names[0]}=INFO\n")
+        self.config_manager.reload_all()
+        self.assertEqual([logging.getLogger(name).level for name in names], [logging.INFO, logging.NOTSET])
+        self.assertEqual(logging.getLogger(names[1]).getEffectiveLevel(), logging.WARNING)
+
+    def test_hot_reconfiguration_switches_file_without_losing_records(self):
+        self.logger.info("avant")
+        previous = self.pipeline.listener
+        new_file = os.path.join(self.boot_dir, 'logs', 'nouveau.log')
+        self.write_config(f"log_file={new_file}\n")
+        self.config_manager.reload_all()
+        self.logger.info("après")
+        self.pipeline.stop()
+
+        self.assertIsNot(self.pipeline.listener, previous)
+        # L'ancien listener a vidé la file avant de s'arrêter
+        old = self.read(self.log_file)
+        self.assertIn("avant", old)
+        self.assertNotIn("après", old)
+        new = self.read(new_file)
+        self.assertIn("Journalisation reconfigurée", new)
+        self.assertIn("après", new)
+        self.assertTrue(all(handler.stream is None for handler in previous.handlers
+                            if isinstance(handler, logging.FileHandler)))
+
+    def test_unchanged_log_keys_keep_listener(self):
+        listener = self.pipeline.listener
+        self.write_config(f"log_file={self.log_file}\nsample_rate=16000\n")
+        self.config_manager.reload_all()
+        self.assertIs(self.pipeline.listener, listener)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests de la reconnaissance et de l'exécution des commandes Spotify locales (lecteur factice)
+Usage: python3 -m pytest test_media_control.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+from media_control import MediaController, StubBackend, match_intent
+
+
+class MatchIntentTest(unittest.TestCase):
+    def test_commands(self):
+        cases = {
+            "Pause.": ('pause', None),
+            "Mets pause s'il te plaît": ('pause', None),
+            "Arrête la musique s'il te plaît": ('pause', None),
+            "Suivant !": ('next', None),
+            "Passe à la chanson suivante": ('next', None),
+            "Chanson précédente": ('previous', None),
+            "Reprends la lecture": ('play', None),
+            "Volume plus fort": ('volume_up', None),
+            "Baisse le son un peu": ('volume_down', None),
+            "Mets le volume à 30 %": ('volume_set', 30),
+            "Volume 100": ('volume_set', 100),
+            "Volume à 0": ('volume_set', 0),
+        }
+        for phrase, intent in cases.items():
+            self.assertEqual(match_intent(phrase), intent, phrase)
+
+    def test_mute_phrasings(self):
+        for phrase in ("Coupe le son", "Coupe le son s'il te plaît", "Éteins le son",
+                       "Mets en sourdine", "Sourdine", "Mode silencieux", "Coupe le volume"):
+            self.assertEqual(match_intent(phrase), ('mute', None), phrase)
+        for phrase in ("Remets le son", "Enlève la sourdine", "Rallume le son"):
+            self.assertEqual(match_intent(phrase), ('unmute', None), phrase)
+
+    def test_volume_above_100_is_rejected(self):
+        for phrase in ("Mets le volume à 150", "Volume à 101 %", "Volume 999"):
+            self.assertIsNone(match_intent(phrase), phrase)
+
+    def test_questions_go_to_gpt(self):
+        for phrase in ("Quelle est la chanson suivante ?", "Pourquoi la musique s'arrête ?",
+                       "C'est quoi la chanson précédente ?", "Comment couper le son de ma télé ?",
+                       "Quel est le volume de la Terre ?", "Joue-moi quelque chose de calme",
+                       "Pause café à quelle heure ?"):
+            self.assertIsNone(match_intent(phrase), phrase)
+
+
+class MediaControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+        self.backend = StubBackend()
+        self.controller = MediaController(ConfigManager(self.boot_dir), backend=self.backend)
+        self.controller.stub_volumes = {7: {'volume': 0.5, 'channels': 2}}
+
+    def volume(self) -> float:
+        return round(self.controller.stub_volumes[7]['volume'], 3)
+
+    def test_player_commands(self):
+        self.assertTrue(self.controller.execute(match_intent("Pause")))
+        self.assertTrue(self.controller.execute(match_intent("Suivant")))
+        self.assertEqual(self.backend.commands, ['pause', 'next'])
+
+    def test_volume_steps_are_clamped(self):
+        self.controller.execute(('volume_set', 95))
+        self.controller.execute(('volume_up', None))
+        self.assertEqual(self.volume(), 1.0)
+        self.controller.execute(('volume_set', 5))
+        self.controller.execute(('volume_down', None))
+        self.assertEqual(self.volume(), 0.0)
+
+    def test_mute_then_unmute_restores_volume(self):
+        self.assertTrue(self.controller.execute(match_intent("Coupe le son")))
+        self.assertEqual(self.volume(), 0.0)
+        # Une seconde sourdine garde le volume d'origine
+        self.controller.execute(('mute', None))
+        self.assertTrue(self.controller.execute(match_intent("Remets le son")))
+        self.assertEqual(self.volume(), 0.5)
+        self.assertEqual(self.backend.commands, ['mute', 'mute', 'unmute'])
+
+    def test_no_spotify_stream(self):
+        self.controller.stub_volumes = {}
+        self.assertFalse(self.controller.execute(('mute', None)))
+
+
+if __name__ == "__main__":
+    unittest.main()
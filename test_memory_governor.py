@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests du gouverneur mémoire (cgroup et /proc factices)
+Usage: python3 -m pytest test_memory_governor.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from memory_governor import CRITICAL, NORMAL, PRESSURE, MemoryGovernor
+
+MB = 1024 * 1024
+
+
+class MemoryGovernorTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.proc_root = os.path.join(self.root, 'proc')
+        self.cgroup = os.path.join(self.root, 'cgroup', 'assistant.service')
+        os.makedirs(os.path.join(self.proc_root, 'self'))
+        os.makedirs(self.cgroup)
+        self._write(os.path.join(self.proc_root, 'self', 'cgroup'), "0::/assistant.service\n")
+        self._write(os.path.join(self.proc_root, 'self', 'statm'), "25600 12800 0 0 0 0 0\n")
+        self._write(os.path.join(self.cgroup, 'memory.max'), f"{100 * MB}\n")
+        self.set_memory(50 * MB)
+        self.set_psi(0.0)
+
+    def _write(self, path: str, content: str) -> None:
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def set_memory(self, current: int) -> None:
+        self._write(os.path.join(self.cgroup, 'memory.current'), f"{current}\n")
+
+    def set_psi(self, avg10: float) -> None:
+        self._write(os.path.join(self.cgroup, 'memory.pressure'),
+                    f"some avg10={avg10:.2f} avg60=0.00 avg300=0.00 total=0\n"
+                    "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n")
+
+    def set_events(self, high: int = 0, max_: int = 0, oom: int = 0, oom_kill: int = 0) -> None:
+        self._write(os.path.join(self.cgroup, 'memory.events'),
+                    f"low 0\nhigh {high}\nmax {max_}\noom {oom}\noom_kill {oom_kill}\n")
+
+    def governor(self) -> MemoryGovernor:
+        return MemoryGovernor(os.path.join(self.root, 'cgroup'), self.proc_root)
+
+    def test_levels_follow_cgroup_usage(self):
+        governor = self.governor()
+        self.assertEqual(governor.check(), NORMAL)
+        self.set_memory(85 * MB)
+        self.assertEqual(governor.check(), PRESSURE)
+        self.set_memory(95 * MB)
+        self.assertEqual(governor.check(), CRITICAL)
+
+    def test_hysteresis_on_the_way_down(self):
+        governor = self.governor()
+        self.set_memory(95 * MB)
+        self.assertEqual(governor.check(), CRITICAL)
+        self.set_memory(89 * MB)
+        self.assertEqual(governor.check(), CRITICAL)
+        self.set_memory(86 * MB)
+        self.assertEqual(governor.check(), PRESSURE)
+        self.set_memory(77 * MB)
+        self.assertEqual(governor.check(), PRESSURE)
+        self.set_memory(70 * MB)
+        self.assertEqual(governor.check(), NORMAL)
+
+    def test_psi_raises_pressure(self):
+        governor = self.governor()
+        self.set_psi(25.0)
+        self.assertEqual(governor.check(), PRESSURE)
+
+    def test_events_before_startup_are_not_critical(self):
+        self.set_events(max_=4, oom=1, oom_kill=1)
+        governor = self.governor()
+        self.assertEqual(governor.check(), NORMAL)
+        governor.start()
+        governor.stop()
+        self.assertEqual(governor.check(), NORMAL)
+
+    def test_new_oom_event_is_critical(self):
+        self.set_events(max_=4)
+        governor = self.governor()
+        self.assertEqual(governor.check(), NORMAL)
+        self.set_events(max_=5)
+        self.assertEqual(governor.check(), CRITICAL)
+
+    def test_release_called_on_escalation(self):
+        governor = self.governor()
+        released = []
+        governor.register('cache', usage=lambda: 1024, release=released.append)
+        governor.check()
+        self.set_memory(85 * MB)
+        governor.check()
+        governor.check()
+        self.assertEqual(released, [PRESSURE])
+        self.assertEqual(governor.subsystems(), {'cache': 1024})
+        self.assertFalse(governor.allows('cloud_tts'))
+        self.assertTrue(governor.allows('voice_command'))
+
+    def test_stop_joins_monitor_thread(self):
+        governor = self.governor()
+        governor.start()
+        thread = governor._thread
+        governor.stop()
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests du format texte Prometheus et du serveur /metrics
+Usage: python3 -m pytest test_metrics.py
+"""
+
+import os
+import sys
+import types
+import unittest
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from metrics import Counter, Histogram, MetricsRegistry, MetricsServer, metrics
+import metrics as metrics_module
+
+
+class RenderTest(unittest.TestCase):
+    def test_counter_labels(self):
+        counter = Counter('cache_total', "Accès", ['cache', 'result'])
+        counter.inc(cache='tts', result='hit')
+        counter.inc(2, cache='tts', result='hit')
+        counter.inc(cache='gpt')
+        self.assertEqual(counter.value(cache='tts', result='hit'), 3.0)
+        self.assertEqual(counter.render(), [
+            '# HELP cache_total Accès', '# TYPE cache_total counter',
+            'cache_total{cache="tts",result="hit"} 3.0',
+            # Label absent : valeur vide
+            'cache_total{cache="gpt",result=""} 1.0',
+        ])
+
+    def test_counter_without_labels(self):
+        counter = Counter('evictions_total', "Évictions")
+        counter.inc()
+        self.assertEqual(counter.render()[-1], 'evictions_total 1.0')
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('stage_seconds', "Durée", ['stage'], buckets=(1.0, 0.1))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value, stage='stt')
+        self.assertEqual(histogram.render()[2:], [
+            'stage_seconds_bucket{stage="stt",le="0.1"} 2.0',
+            'stage_seconds_bucket{stage="stt",le="1.0"} 3.0',
+            'stage_seconds_bucket{stage="stt",le="+Inf"} 4.0',
+            'stage_seconds_sum{stage="stt"} 5.65',
+            'stage_seconds_count{stage="stt"} 4.0',
+        ])
+
+    def test_registry_reuses_metrics(self):
+        registry = MetricsRegistry()
+        first = registry.counter('commands_total', "Commandes", ['status'])
+        self.assertIs(registry.counter('commands_total', "Commandes", ['status']), first)
+        first.inc(status='ok')
+        registry.gauge('temperature', "Température", lambda: 52.5)
+        registry.gauge('missing', "Indisponible", lambda: None)
+        registry.gauge('failing', "En erreur", lambda: 1 / 0)
+        registry.collected_counter('cpu_seconds_total', "CPU", lambda: 1.5)
+
+        self.assertEqual(registry.render(), '\n'.join([
+            '# HELP commands_total Commandes', '# TYPE commands_total counter',
+            'commands_total{status="ok"} 1.0',
+            '# HELP temperature Température', '# TYPE temperature gauge', 'temperature 52.5',
+            '# HELP cpu_seconds_total CPU', '# TYPE cpu_seconds_total counter', 'cpu_seconds_total 1.5',
+        ]) + '\n')
+
+
+class ProcessMetricsTest(unittest.TestCase):
+    def setUp(self):
+        # psutil simulé, importé seulement à la première collecte
+        self.created = []
+        cpu_times = namedtuple('pcputimes', 'user system children_user children_system')
+        memory_info = namedtuple('pmem', 'rss vms')
+        created = self.created
+
+        class Process:
+            def __init__(self, pid):
+                created.append(pid)
+
+            def memory_info(self):
+                return memory_info(4096, 8192)
+
+            def cpu_times(self):
+                return cpu_times(1.25, 0.5, 9.0, 9.0)
+
+            def cpu_percent(self, interval=None):
+                return 3.0
+
+            def num_threads(self):
+                return 7
+
+            def create_time(self):
+                return 1700000000.0
+
+        patcher = mock.patch.dict(sys.modules, {'psutil': types.SimpleNamespace(Process=Process)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(metrics_module, '_psutil_process', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_psutil_loaded_lazily_once(self):
+        self.assertEqual(self.created, [])
+        metrics.render()
+        text = metrics.render()
+        self.assertEqual(self.created, [os.getpid()])
+
+        self.assertIn('# TYPE process_cpu_seconds_total counter\nprocess_cpu_seconds_total 1.75\n', text)
+        self.assertIn('# TYPE process_resident_memory_bytes gauge\nprocess_resident_memory_bytes 4096\n', text)
+        self.assertIn('process_threads 7\n', text)
+
+    def test_without_psutil(self):
+        with mock.patch.dict(sys.modules, {'psutil': None}):
+            text = metrics.render()
+        self.assertNotIn('process_', text)
+        self.assertIn('# TYPE assistant_commands_total counter', text)
+
+
+class MetricsServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MetricsServer(port=0)
+        self.assertTrue(self.server.start())
+        self.addCleanup(self.server.stop)
+        self.url = f"http://127.0.0.1:{self.server.server.server_address[1]}"
+
+    def test_scrape(self):
+        metrics_module.FAILURES.inc(stage='scrape-test')
+        with urllib.request.urlopen(f"{self.url}/metrics", timeout=2) as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.headers['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+            text = response.read().decode('utf-8')
+        self.assertIn('assistant_failures_total{stage="scrape-test"} 1.0', text)
+
+    def test_unknown_path(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(f"{self.url}/other", timeout=2)
+        self.assertEqual(raised.exception.code, 404)
+        raised.exception.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests de la politique de pipeline (codec, modèle, synthèse selon le réseau)
+Usage: python3 -m pytest test_network_quality.py
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+from network_quality import NetworkQualityEstimator, PipelinePolicy
+from thermal_governor import ADAPTED, thermal_governor
+
+
+def encoders(*codecs):
+    """encoder_available factice : codecs encodables en processus"""
+    return lambda codec, sample_rate: codec in codecs
+
+
+class PipelinePolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+        patcher = mock.patch.object(thermal_governor, 'enabled', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.estimator = NetworkQualityEstimator()
+
+    def policy(self, gpt: str = '', openai: str = '') -> PipelinePolicy:
+        for filename, content in (('config-gpt.txt', gpt), ('config-openai.txt', openai)):
+            with open(os.path.join(self.boot_dir, filename), 'w') as f:
+                f.write(content)
+        return PipelinePolicy(ConfigManager(self.boot_dir), self.estimator)
+
+    def set_network(self, rtt_ms: float, upload_bps: float) -> None:
+        self.estimator.rtt_ms = rtt_ms
+        self.estimator.upload_bps = upload_bps
+        self.estimator.last_sample = time.monotonic()
+
+    def test_good_network_keeps_configured_codec(self):
+        self.set_network(40, 500000)
+        decision = self.policy().decide(5, 44100, encoders('flac', 'opus'))
+        self.assertEqual((decision.codec, decision.reason), ('flac', 'default'))
+        self.assertTrue(decision.cloud_tts)
+
+    def test_missing_encoder_falls_back_to_mp3(self):
+        self.set_network(40, 500000)
+        decision = self.policy().decide(5, 44100, encoders())
+        self.assertEqual((decision.codec, decision.reason), ('mp3', 'no_encoder'))
+
+    def test_fixed_pipeline_checks_encoder(self):
+        self.set_network(40, 500000)
+        decision = self.policy(openai='adaptive_pipeline=false\n').decide(5, 16000, encoders())
+        self.assertEqual((decision.codec, decision.reason), ('mp3', 'fixed+no_encoder'))
+
+    def test_slow_upload_switches_to_opus(self):
+        self.set_network(300, 20000)
+        decision = self.policy().decide(10, 16000, encoders('flac', 'opus'))
+        self.assertEqual((decision.codec, decision.compression_level), ('opus', 0.7))
+        self.assertIn('opus', decision.reason.split('+'))
+
+    def test_opus_needs_its_encoder(self):
+        self.set_network(300, 20000)
+        decision = self.policy().decide(10, 16000, encoders('flac'))
+        self.assertEqual(decision.codec, 'flac')
+        self.assertNotIn('opus', decision.reason.split('+'))
+
+    def hot(self):
+        """SoC chaud : l'allègement de l'encodeur est demandé"""
+        patcher = mock.patch.object(thermal_governor, 'allows', lambda adaptation: adaptation != 'encoder')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return ADAPTED.value(adaptation='encoder')
+
+    def test_thermal_mp3_uses_flac_encoder(self):
+        self.set_network(40, 500000)
+        before = self.hot()
+        decision = self.policy('upload_codec=mp3\n').decide(5, 44100, encoders('flac'))
+        self.assertEqual((decision.codec, decision.compression_level), ('flac', 0.0))
+        self.assertEqual(decision.reason, 'thermal')
+        self.assertEqual(ADAPTED.value(adaptation='encoder'), before + 1)
+
+    def test_thermal_mp3_without_flac_encoder(self):
+        self.set_network(40, 500000)
+        before = self.hot()
+        decision = self.policy('upload_codec=mp3\n').decide(5, 44100, encoders())
+        self.assertEqual((decision.codec, decision.reason), ('mp3', 'default'))
+        self.assertEqual(ADAPTED.value(adaptation='encoder'), before)
+
+    def test_thermal_slow_upload_keeps_minimal_compression(self):
+        self.set_network(300, 20000)
+        self.hot()
+        decision = self.policy().decide(10, 16000, encoders('flac', 'opus'))
+        self.assertEqual((decision.codec, decision.compression_level), ('opus', 0.0))
+        self.assertEqual(decision.reason.split('+')[:2], ['thermal', 'opus'])
+
+    def test_first_token_marks_api_reachable(self):
+        self.estimator.consecutive_failures = 1
+        self.estimator.observe_trace({'trace': 'voice_command', 'spans': [
+            {'name': 'openai.chat.first_token', 'duration_ms': 900.0},
+            {'name': 'openai.chat', 'duration_ms': 2000.0, 'attrs': {'model': 'gpt-4o'}}]})
+        self.assertEqual(self.estimator.consecutive_failures, 0)
+        self.assertGreater(self.estimator.last_sample, 0)
+        # Seule la durée complète de la génération alimente la prévision
+        self.assertEqual(self.estimator.model_latency_ms, {'gpt-4o': 2000.0})
+        self.assertIsNone(self.estimator.rtt_ms)
+
+    def test_offline_skips_cloud(self):
+        self.estimator.consecutive_failures = 2
+        decision = self.policy().decide(5, 44100, encoders('flac', 'opus'))
+        self.assertFalse(decision.cloud_stt)
+        self.assertEqual(decision.reason, 'offline')
+
+
+if __name__ == "__main__":
+    unittest.main()
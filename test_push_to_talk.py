@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests du maintien pour parler (bouton simulé, micro scripté en temps réel)
+Usage: python3 -m pytest test_push_to_talk.py
+"""
+
+import os
+import sys
+import time
+import wave
+import queue
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from config_manager import ConfigManager
+from gpio_input import DOWN, UP, GpioInput, SimulatedBackend
+from simulation import (FakePulseServer, ScriptedMicrophone, Simulation, VirtualClock,
+                        fake_audio_modules)
+
+
+class RecordAudioTest(unittest.TestCase):
+    def setUp(self):
+        self.boot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.boot_dir, True)
+        with open(os.path.join(self.boot_dir, 'config-gpt.txt'), 'w') as f:
+            f.write(f"sample_rate=16000\nspool_dir={os.path.join(self.boot_dir, 'spool')}\n")
+        self.config_manager = ConfigManager(self.boot_dir)
+
+        # Micro cadencé en temps réel : la capture suit l'horloge du bouton
+        self.microphone = ScriptedMicrophone([('speech', 5.0)], VirtualClock(1.0))
+        patcher = mock.patch.dict(sys.modules, fake_audio_modules(self.microphone, FakePulseServer()))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        from audio_utils import AudioManager
+        self.audio = AudioManager(self.config_manager)
+        self.addCleanup(self.audio.cleanup_temp_files)
+
+    def frames(self, path: str) -> int:
+        with wave.open(path, 'rb') as wf:
+            return wf.getnframes()
+
+    def test_capture_stops_at_release_plus_tail(self):
+        gpio = GpioInput(self.config_manager, SimulatedBackend(17), gestures=(DOWN, UP))
+        gpio.start()
+        self.addCleanup(gpio.stop)
+        threading.Thread(target=gpio.backend.press, args=(0.5,)).start()
+        down = gpio.events.get(timeout=1)
+        self.assertEqual(down.gesture, DOWN)
+
+        released = []
+
+        def until():
+            while not gpio.events.empty():
+                event = gpio.events.get()
+                if event.gesture == UP:
+                    released.append(event.time)
+            return released[0] if released else None
+
+        path = self.audio.record_audio(5, until=until, tail=0.1, started_at=down.time)
+        self.assertTrue(released)
+        # 0,5 s d'appui plus 0,1 s de traîne, à un bloc de 64 ms près
+        self.assertAlmostEqual(self.audio.last_capture_seconds, 0.6, delta=0.07)
+        self.assertEqual(self.frames(path), round(self.audio.last_capture_seconds * 16000))
+
+    def test_release_before_stream_opens(self):
+        # Flux ouvert 0,4 s après un appui de 0,4 s : la capture garde la durée de l'appui
+        now = time.monotonic()
+        path = self.audio.record_audio(5, until=lambda: now - 0.2, tail=0.1, started_at=now - 0.6)
+        self.assertEqual(self.frames(path), 8000)
+        self.assertEqual(self.audio.last_capture_seconds, 0.5)
+
+    def test_late_release_does_not_write_extra_frames(self):
+        self.microphone.clock.speed = 0
+        started = time.monotonic()
+        calls = []
+
+        def until():
+            # Relâchement constaté au 3e bloc (3072 trames lues), 2000 trames après l'appui
+            calls.append(None)
+            return started + 2000 / 16000 - 0.1 if len(calls) >= 3 else None
+
+        path = self.audio.record_audio(5, until=until, tail=0.1, started_at=started)
+        self.assertEqual(self.frames(path), 2048)
+
+
+class AssistantPushToTalkTest(unittest.TestCase):
+    def setUp(self):
+        # Enceinte connectée en 0,8 s, temps réel : la capture doit démarrer avant
+        self.simulation = Simulation(speed=1.0, connect_latency=(0.8, 0.8), stt_latency_ms=0,
+                                     ttft_ms=0, token_delay_ms=0)
+        self.addCleanup(shutil.rmtree, self.simulation.work_dir, True)
+        self.addCleanup(self.simulation.stop)
+        patcher = mock.patch.dict(sys.modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.simulation.start({'gpt': {'push_to_talk': 'true', 'sample_rate': '16000',
+                                       'speech_keepalive_s': '0'}})
+
+        from assistant import VoiceAssistant
+        from tracing import tracer
+        self.assistant = VoiceAssistant(self.simulation.config_dir)
+        self.addCleanup(self.assistant.shutdown)
+        self.simulation.attach(self.assistant)
+        self.assistant.setup_openai()
+        self.traces = queue.SimpleQueue()
+        tracer.add_listener(lambda record: record['trace'] == 'voice_command' and self.traces.put(record))
+        self.addCleanup(tracer._listeners.clear)
+
+    def spans(self, record):
+        return {span['name']: span for span in record['spans']}
+
+    def test_capture_starts_while_speaker_connects(self):
+        # Enceinte déjà appairée ; machine d'états démarrée sans attendre la connexion
+        speaker = self.simulation.speaker
+        speaker.paired = speaker.trusted = True
+        self.assistant.bluetooth_manager.target_mac = speaker.mac
+        self.assistant.bluetooth_manager.connection.start()
+        self.simulation.button.press(0.6)
+        record = self.traces.get(timeout=20)
+
+        spans = self.spans(record)
+        self.assertEqual(record['status'], 'ok')
+        # Flux ouvert avant la fin de l'attente de l'enceinte, menée en parallèle
+        bluetooth = spans['bluetooth.ensure_connection']
+        self.assertEqual(bluetooth['attrs'], {'parallel': True})
+        self.assertGreater(bluetooth['duration_ms'], 300)
+        self.assertLess(spans['audio.open_stream']['offset_ms'], 200)
+        self.assertAlmostEqual(self.assistant.audio_manager.last_capture_seconds, 0.85, delta=0.1)
+
+    def test_short_tap_is_dropped(self):
+        self.assistant.bluetooth_manager.start_connection()
+        self.simulation.button.press(0.1)
+        record = self.traces.get(timeout=20)
+        self.assertEqual(record['status'], 'too_short')
+        self.assertEqual(self.simulation.openai.requests.get('transcriptions', 0), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests du groupe d'enceintes (enceintes et serveur PulseAudio simulés, sans pactl)
+Usage: python3 -m pytest test_speaker_group.py
+"""
+
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from audio_sinks import SinkManager
+from simulation import FakePulseServer, VirtualBluetoothDevice, VirtualClock
+from speaker_group import GroupMember, SpeakerGroup, parse_group_config
+import speaker_group
+
+EARLY = 'AA:BB:CC:DD:EE:01'
+LATE = 'AA:BB:CC:DD:EE:02'
+FLAKY = 'AA:BB:CC:DD:EE:03'
+
+
+class DeviceManager:
+    """Gestionnaire Bluetooth réduit à ce qu'utilise le groupe, une enceinte simulée par MAC"""
+
+    def __init__(self, devices):
+        self.devices = {device.mac: device for device in devices}
+
+    def _bluetoothctl(self, command: str) -> str:
+        return self.devices[command.split()[-1]].bluetoothctl(command)
+
+    def _is_device_connected(self, mac: str) -> bool:
+        return "Connected: yes" in self._bluetoothctl(f"info {mac}")
+
+    def _is_device_paired(self, mac: str) -> bool:
+        return "Paired: yes" in self._bluetoothctl(f"info {mac}")
+
+    def pair_device(self, mac: str) -> bool:
+        return "successful" in self._bluetoothctl(f"pair {mac}")
+
+    def connect_device(self, mac: str) -> bool:
+        return "successful" in self._bluetoothctl(f"connect {mac}")
+
+
+def combine_sink_delays(port_offsets):
+    """Retard appliqué à chaque sortie par module-combine-sink (alignement sur la plus lente)"""
+    slowest = max(port_offsets.values())
+    return {card: slowest - offset for (card, _), offset in port_offsets.items()}
+
+
+class SpeakerGroupTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1.0)
+        self.pulse = FakePulseServer(self.clock, spotify=False)
+        self.sinks = SinkManager()
+        self.pulse.attach(self.sinks)
+        patcher = mock.patch.object(speaker_group, 'sink_manager', self.sinks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.sinks.stop)
+
+    def make_group(self, latencies, offsets: str = '', **kwargs) -> SpeakerGroup:
+        """Groupe d'enceintes appairées, latence de connexion fixe par MAC"""
+        self.devices = {}
+        for seed, (mac, latency) in enumerate(latencies.items()):
+            device = VirtualBluetoothDevice(mac, 'Enceinte', self.clock, connect_latency=(latency, latency),
+                                            seed=seed, **kwargs.get(mac, {}))
+            device.paired = device.trusted = True
+            device.add_listener(self.pulse._on_speaker)
+            self.devices[mac] = device
+        group = SpeakerGroup(DeviceManager(self.devices.values()),
+                             parse_group_config(','.join(latencies), offsets), connect_timeout=5.0)
+        self.addCleanup(group.close)
+        return group
+
+    def test_parse_group_config(self):
+        self.assertEqual(parse_group_config(f" {EARLY.lower()} ,{LATE}", f"{LATE}=80,{EARLY}=x,ZZ=5"),
+                         {EARLY: 0, LATE: 80})
+
+    def test_latency_offsets_go_through_sink_backend(self):
+        group = self.make_group({EARLY: 0, LATE: 0}, f"{LATE}=80")
+        for device in self.devices.values():
+            device.bluetoothctl(f"connect {device.mac}")
+        for member in group.members.values():
+            member.connected = True
+        with mock.patch('subprocess.run') as run:
+            group._apply_latency_offsets()
+        run.assert_not_called()
+        self.assertEqual(self.pulse.port_offsets, {
+            ('bluez_card.AA_BB_CC_DD_EE_01', 'speaker-output'): 0,
+            ('bluez_card.AA_BB_CC_DD_EE_02', 'speaker-output'): 80000,
+        })
+
+    def test_offset_delays_the_other_speakers(self):
+        # L'enceinte 02 joue 120 ms après la 01 : c'est la 01 qui doit être retardée
+        group = self.make_group({EARLY: 0, LATE: 0}, f"{LATE}=120")
+        self.assertTrue(group.setup())
+        extra_latency_us = {'bluez_card.AA_BB_CC_DD_EE_01': 0, 'bluez_card.AA_BB_CC_DD_EE_02': 120000}
+
+        delays = combine_sink_delays(self.pulse.port_offsets)
+        self.assertEqual(delays, {'bluez_card.AA_BB_CC_DD_EE_01': 120000, 'bluez_card.AA_BB_CC_DD_EE_02': 0})
+        played_at = {card: delays[card] + extra for card, extra in extra_latency_us.items()}
+        self.assertEqual(len(set(played_at.values())), 1)
+
+    def test_disconnected_member_is_not_offset(self):
+        group = self.make_group({EARLY: 0, LATE: 0}, f"{LATE}=80")
+        self.devices[LATE].bluetoothctl(f"connect {LATE}")
+        group.members[LATE].connected = True
+        group._apply_latency_offsets()
+        self.assertEqual(list(self.pulse.port_offsets), [('bluez_card.AA_BB_CC_DD_EE_02', 'speaker-output')])
+
+    def test_setup_connects_members_in_parallel(self):
+        group = self.make_group({EARLY: 0.4, LATE: 0.4, FLAKY: 0.4})
+        start = time.monotonic()
+        self.assertTrue(group.setup())
+        # 3 x 0,4 s en série : 1,2 s
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(group.connected_count(), 3)
+        self.assertLessEqual({f"bluez_sink.AA_BB_CC_DD_EE_0{i}.a2dp_sink" for i in (1, 2, 3)},
+                             set(self.sinks.sinks()))
+
+    def test_failed_member_backs_off(self):
+        group = self.make_group({EARLY: 0.0, FLAKY: 0.0}, **{FLAKY: {'connect_failure_rate': 1.0}})
+        self.assertTrue(group.setup())
+        flaky = group.members[FLAKY]
+        self.assertEqual((flaky.connected, flaky.failures), (False, 1))
+        self.assertEqual(self.devices[FLAKY].failed_connects, 1)
+
+        # Pas de nouvelle tentative avant l'échéance du membre
+        self.assertTrue(group.ensure())
+        self.assertEqual(self.devices[FLAKY].failed_connects, 1)
+
+        flaky.next_attempt = 0.0
+        self.assertTrue(group.ensure())
+        flaky.pending.result(timeout=2)
+        self.assertEqual((self.devices[FLAKY].failed_connects, flaky.failures), (2, 2))
+        self.assertEqual(group.members[EARLY].failures, 0)
+
+    def test_retry_delay_doubles_up_to_limit(self):
+        member = GroupMember(FLAKY, 0)
+        with mock.patch.object(speaker_group.random, 'uniform', return_value=1.0), \
+                mock.patch.object(speaker_group.time, 'monotonic', return_value=100.0):
+            delays = []
+            for _ in range(8):
+                member.schedule_retry()
+                delays.append(member.next_attempt - 100.0)
+        self.assertEqual(delays, [5.0, 10.0, 20.0, 40.0, 80.0, 160.0, 300.0, 300.0])
+
+    def test_ensure_does_not_wait_for_slow_member(self):
+        group = self.make_group({EARLY: 0.0, LATE: 1.0})
+        self.devices[EARLY].bluetoothctl(f"connect {EARLY}")
+
+        start = time.monotonic()
+        self.assertTrue(group.ensure())
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(group.connected_count(), 1)
+
+        # L'enceinte lente se connecte en arrière-plan puis rejoint le groupe
+        self.assertTrue(group.members[LATE].pending.result(timeout=3))
+        self.assertEqual(group.connected_count(), 2)
+
+    def test_ensure_waits_when_no_member_is_connected(self):
+        group = self.make_group({EARLY: 0.3, LATE: 0.3})
+        start = time.monotonic()
+        self.assertTrue(group.ensure())
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests du gouverneur thermique (arborescence sysfs factice)
+Usage: python3 -m pytest test_thermal_governor.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from thermal_governor import HOT, NORMAL, THROTTLED_PATH, WARM, ThermalGovernor, throttle_names
+
+
+class ThermalGovernorTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.sys_root = os.path.join(self.root, 'sys')
+        self.zone = os.path.join(self.sys_root, 'class', 'thermal', 'thermal_zone0')
+        os.makedirs(self.zone)
+        os.makedirs(os.path.dirname(os.path.join(self.sys_root, THROTTLED_PATH)))
+        # /proc sans cgroup : pas de bridage CPUQuota mesuré
+        self.governor = ThermalGovernor(self.sys_root, os.path.join(self.root, 'cgroup'),
+                                        os.path.join(self.root, 'proc'))
+
+    def set_state(self, temperature: float, flags: int = 0) -> str:
+        with open(os.path.join(self.zone, 'temp'), 'w') as f:
+            f.write(f"{int(temperature * 1000)}\n")
+        with open(os.path.join(self.sys_root, THROTTLED_PATH), 'w') as f:
+            f.write(f"{flags:x}\n")
+        return self.governor.check()
+
+    def test_levels_and_hysteresis(self):
+        # Température, get_throttled, niveau attendu
+        steps = [
+            (52.0, 0x0, NORMAL),
+            (68.5, 0x0, WARM),
+            (77.0, 0x80008, HOT),
+            (73.0, 0x80000, HOT),      # sous 75 °C mais au-dessus de 75 - 3
+            (70.0, 0x80000, WARM),
+            (63.0, 0x80000, WARM),     # sous 65 °C mais au-dessus de 65 - 3
+            (60.0, 0x80000, NORMAL),
+        ]
+        for temperature, flags, expected in steps:
+            self.assertEqual(self.set_state(temperature, flags), expected, f"{temperature} °C")
+
+    def test_no_hysteresis_on_the_way_up(self):
+        self.assertEqual(self.set_state(63.0), NORMAL)
+        self.assertEqual(self.set_state(73.0), WARM)
+
+    def test_firmware_flags(self):
+        self.assertEqual(self.set_state(50.0, 0x4), HOT)
+        self.assertEqual(self.set_state(50.0, 0x2), WARM)
+        self.assertEqual(self.set_state(50.0, 0x50000), NORMAL)
+        self.assertEqual(throttle_names(0x50005), ['under_voltage', 'throttled'])
+        self.assertEqual(throttle_names(0x50005, occurred=True), ['under_voltage', 'throttled'])
+
+    def test_adaptations_by_level(self):
+        self.set_state(68.5)
+        self.assertFalse(self.governor.allows('encoder'))
+        self.assertTrue(self.governor.allows('sample_rate'))
+        self.assertEqual(self.governor.capture_rate(44100), 44100)
+
+        self.set_state(80.0)
+        self.assertFalse(self.governor.allows('sample_rate'))
+        self.assertEqual(self.governor.capture_rate(44100), 16000)
+        self.assertEqual(self.governor.capture_rate(8000), 8000)
+
+        self.governor.enabled = False
+        self.assertTrue(self.governor.allows('encoder'))
+
+    def test_missing_sensors_stay_normal(self):
+        governor = ThermalGovernor(os.path.join(self.root, 'none'), self.root, self.root)
+        self.assertEqual(governor.check(), NORMAL)
+        self.assertIsNone(governor.last_sample['temperature'])
+
+
+if __name__ == "__main__":
+    unittest.main()
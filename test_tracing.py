@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests des percentiles de latence et du traceur JSONL
+Usage: python3 -m pytest test_tracing.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from tracing import Tracer, percentile, summarize_durations, summarize_trace_files
+
+
+class PercentileTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_single_value(self):
+        self.assertEqual(percentile([42.0], 50), 42.0)
+        self.assertEqual(percentile([42.0], 99), 42.0)
+
+    def test_linear_interpolation(self):
+        values = [40.0, 10.0, 30.0, 20.0]
+        self.assertEqual(percentile(values, 0), 10.0)
+        self.assertEqual(percentile(values, 100), 40.0)
+        self.assertEqual(percentile(values, 50), 25.0)
+        self.assertAlmostEqual(percentile(values, 95), 38.5)
+
+    def test_summary_per_stage(self):
+        summary = summarize_durations({'stt': [float(v) for v in range(101)], 'tts': [5.0]})
+        self.assertEqual(summary['stt'], {'count': 101, 'p50': 50.0, 'p95': 95.0, 'p99': 99.0})
+        self.assertEqual(summary['tts'], {'count': 1, 'p50': 5.0, 'p95': 5.0, 'p99': 5.0})
+
+
+class TracerTest(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir, True)
+        self.trace_file = os.path.join(self.log_dir, 'traces.jsonl')
+        self.tracer = Tracer(self.trace_file)
+
+    def records(self):
+        with open(self.trace_file, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_spans_are_written_and_summarized(self):
+        received = []
+        self.tracer.add_listener(received.append)
+        with self.tracer.start_trace('voice_command') as trace:
+            with self.tracer.span('stt', codec='flac'):
+                pass
+            self.tracer.record('first_token', 0.25)
+
+        record, = self.records()
+        self.assertEqual(received, [record])
+        self.assertEqual((record['trace'], record['id'], record['status']), ('voice_command', trace.id, 'ok'))
+        self.assertEqual([span['name'] for span in record['spans']], ['stt', 'first_token'])
+        self.assertEqual(record['spans'][0]['attrs'], {'codec': 'flac'})
+        self.assertEqual(record['spans'][1]['duration_ms'], 250.0)
+
+        summary = self.tracer.summary()
+        self.assertEqual(set(summary), {'voice_command', 'stt', 'first_token'})
+        self.assertEqual(summary['first_token']['p50'], 250.0)
+        self.assertEqual(summarize_trace_files(self.trace_file), summary)
+
+    def test_error_status_and_no_active_trace(self):
+        # Hors trace, les étapes ne sont pas mesurées
+        with self.tracer.span('bluetooth'):
+            pass
+        self.tracer.record('orphan', 0.1)
+        with self.assertRaises(RuntimeError):
+            with self.tracer.start_trace('voice_command'):
+                raise RuntimeError('stt')
+        record, = self.records()
+        self.assertEqual((record['status'], record['spans']), ('error', []))
+        self.assertIsNone(self.tracer.current())
+
+    def test_disabled(self):
+        self.tracer.enabled = False
+        with self.tracer.start_trace('voice_command') as trace:
+            self.assertIsNone(trace)
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    def test_rotation(self):
+        self.tracer.max_bytes = 200
+        self.tracer.backup_count = 2
+        for _ in range(10):
+            with self.tracer.start_trace('voice_command'):
+                with self.tracer.span('stt'):
+                    pass
+        self.assertTrue(os.path.exists(self.trace_file + '.2'))
+        self.assertFalse(os.path.exists(self.trace_file + '.3'))
+        self.assertLessEqual(os.path.getsize(self.trace_file), 200)
+        # Le résumé des fichiers reprend les rotations conservées
+        files = summarize_trace_files(self.trace_file, backup_count=2)
+        self.assertLess(files['stt']['count'], 10)
+        self.assertEqual(self.tracer.summary()['stt']['count'], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()